@@ -1,17 +1,11 @@
 import logging
-import subprocess
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from swarm.types import Agent
 from swarm.extensions.blueprint import BlueprintBase
+from swarm.utils.process import run_command
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
 class BurntNoodlesBlueprint(BlueprintBase):
     """Burnt Noodles - A blazing team igniting creative sparks with functions and flair."""
@@ -49,35 +43,40 @@ class BurntNoodlesBlueprint(BlueprintBase):
         """
         return self.swarm.agents["Sam Ashes"]
 
+    def _run_command(self, cmd: List[str], label: str, empty_output: str = "") -> str:
+        """Runs a tool command under the shared subprocess limits and formats its result.
+
+        Args:
+            cmd (List[str]): The command and its arguments.
+            label (str): The command as named in error messages.
+            empty_output (str): Returned when the command succeeds without output.
+
+        Returns:
+            str: The command's output, or an error message if it failed or was stopped.
+        """
+        try:
+            result = run_command(cmd)
+        except OSError as e:
+            return f"Error executing {label}: {e}"
+        if not result.ok:
+            return f"Error executing {label}: {result.error}"
+        return result.stdout or empty_output
+
     def git_status(self) -> str:
         """Executes 'git status' and returns the current repository status.
 
         Returns:
             str: Output of the git status command.
-
-        Raises:
-            subprocess.CalledProcessError: If the git command fails.
         """
-        try:
-            result = subprocess.run(["git", "status"], capture_output=True, text=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error executing git status: {e.stderr}"
+        return self._run_command(["git", "status"], "git status")
 
     def git_diff(self) -> str:
         """Executes 'git diff' and returns the differences in the working directory.
 
         Returns:
             str: Output of the git diff command.
-
-        Raises:
-            subprocess.CalledProcessError: If the git command fails.
         """
-        try:
-            result = subprocess.run(["git", "diff"], capture_output=True, text=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error executing git diff: {e.stderr}"
+        return self._run_command(["git", "diff"], "git diff")
 
     def git_add(self, file_path: str = ".") -> str:
         """Executes 'git add' to stage changes for the specified file or all changes.
@@ -87,15 +86,8 @@ class BurntNoodlesBlueprint(BlueprintBase):
 
         Returns:
             str: Output of the git add command.
-
-        Raises:
-            subprocess.CalledProcessError: If the git command fails.
         """
-        try:
-            result = subprocess.run(["git", "add", file_path], capture_output=True, text=True, check=True)
-            return result.stdout or "Files staged successfully."
-        except subprocess.CalledProcessError as e:
-            return f"Error executing git add: {e.stderr}"
+        return self._run_command(["git", "add", file_path], "git add", "Files staged successfully.")
 
     def git_commit(self, message: str = "Update") -> str:
         """Executes 'git commit' with a provided commit message.
@@ -105,30 +97,16 @@ class BurntNoodlesBlueprint(BlueprintBase):
 
         Returns:
             str: Output of the git commit command.
-
-        Raises:
-            subprocess.CalledProcessError: If the git command fails.
         """
-        try:
-            result = subprocess.run(["git", "commit", "-m", message], capture_output=True, text=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error executing git commit: {e.stderr}"
+        return self._run_command(["git", "commit", "-m", message], "git commit")
 
     def git_push(self) -> str:
         """Executes 'git push' to push staged commits to the remote repository.
 
         Returns:
             str: Output of the git push command.
-
-        Raises:
-            subprocess.CalledProcessError: If the git command fails.
         """
-        try:
-            result = subprocess.run(["git", "push"], capture_output=True, text=True, check=True)
-            return result.stdout or "Push completed successfully."
-        except subprocess.CalledProcessError as e:
-            return f"Error executing git push: {e.stderr}"
+        return self._run_command(["git", "push"], "git push", "Push completed successfully.")
 
     def run_npm_test(self, args: str = "") -> str:
         """Executes 'npm run test' with optional arguments.
@@ -138,16 +116,9 @@ class BurntNoodlesBlueprint(BlueprintBase):
 
         Returns:
             str: Output of the npm test command.
-
-        Raises:
-            subprocess.CalledProcessError: If the npm command fails.
         """
-        try:
-            cmd = ["npm", "run", "test"] + (args.split() if args else [])
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error executing npm run test: {e.stderr}"
+        cmd = ["npm", "run", "test"] + (args.split() if args else [])
+        return self._run_command(cmd, "npm run test")
 
     def run_pytest(self, args: str = "") -> str:
         """Executes 'uv run pytest' with optional arguments.
@@ -157,16 +128,9 @@ class BurntNoodlesBlueprint(BlueprintBase):
 
         Returns:
             str: Output of the pytest command.
-
-        Raises:
-            subprocess.CalledProcessError: If the pytest command fails.
         """
-        try:
-            cmd = ["uv", "run", "pytest"] + (args.split() if args else [])
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            return f"Error executing uv run pytest: {e.stderr}"
+        cmd = ["uv", "run", "pytest"] + (args.split() if args else [])
+        return self._run_command(cmd, "uv run pytest")
 
     def create_agents(self) -> Dict[str, Agent]:
         def create_agent(name: str, instructions: str, functions: list = []) -> Agent:
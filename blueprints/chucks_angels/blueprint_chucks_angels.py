@@ -5,12 +5,6 @@ from swarm.types import Agent
 from swarm.extensions.blueprint import BlueprintBase
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
 class TaskRiserBlueprint(BlueprintBase):
     """
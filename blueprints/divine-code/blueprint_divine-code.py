@@ -20,12 +20,6 @@ from swarm.extensions.blueprint import BlueprintBase
 from swarm.types import Agent
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not any(isinstance(h, logging.StreamHandler) for h in logger.handlers):
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(name)s - %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
 class DivineOpsBlueprint(BlueprintBase):
     """
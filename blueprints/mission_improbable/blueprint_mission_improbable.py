@@ -7,12 +7,6 @@ from swarm.types import Agent
 from swarm.extensions.blueprint import BlueprintBase
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 class MIMBlueprint(BlueprintBase):
     """Mission: Improbable - A cheeky team on a mission, led by JimFlimsy with support from CinnamonToast and RollinFumble."""
     @property
@@ -13,53 +13,44 @@ Tripitaka delegates based on role awareness, no memory tracking.
 
 import os
 import logging
-import subprocess
 from typing import Dict, Any
 
 from swarm.types import Agent
 from swarm.extensions.blueprint import BlueprintBase
+from swarm.utils.process import run_command
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(asctime)s] %(asctime)s - %(name)s - %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
 # Cloud CLI Functions
+def _run_cli(full_cmd: str, label: str) -> str:
+    """Runs a CLI command under the shared subprocess limits and returns its output or an error."""
+    try:
+        result = run_command(full_cmd, shell=True)
+    except OSError as e:
+        logger.error(f"{label} error: {e}")
+        return f"Error: {e}"
+    if not result.ok:
+        logger.error(f"{label} error: {result.error}")
+        return f"Error: {result.error}"
+    return result.stdout
+
 def aws_cli(command: str) -> str:
     """Executes an AWS CLI command and returns output."""
-    try:
-        full_cmd = f"aws {command}"
-        logger.debug(f"Executing AWS CLI: {full_cmd}")
-        result = subprocess.run(full_cmd, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        logger.error(f"AWS CLI error: {e.stderr}")
-        return f"Error: {e.stderr}"
+    full_cmd = f"aws {command}"
+    logger.debug(f"Executing AWS CLI: {full_cmd}")
+    return _run_cli(full_cmd, "AWS CLI")
 
 def fly_cli(command: str) -> str:
     """Executes a Fly.io CLI command and returns output."""
-    try:
-        full_cmd = f"flyctl {command}"
-        logger.debug(f"Executing Fly CLI: {full_cmd}")
-        result = subprocess.run(full_cmd, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Fly CLI error: {e.stderr}")
-        return f"Error: {e.stderr}"
+    full_cmd = f"flyctl {command}"
+    logger.debug(f"Executing Fly CLI: {full_cmd}")
+    return _run_cli(full_cmd, "Fly CLI")
 
 def vercel_cli(command: str) -> str:
     """Executes a Vercel CLI command and returns output."""
-    try:
-        full_cmd = f"vercel {command}"
-        logger.debug(f"Executing Vercel CLI: {full_cmd}")
-        result = subprocess.run(full_cmd, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Vercel CLI error: {e.stderr}")
-        return f"Error: {e.stderr}"
+    full_cmd = f"vercel {command}"
+    logger.debug(f"Executing Vercel CLI: {full_cmd}")
+    return _run_cli(full_cmd, "Vercel CLI")
 
 TOOLS = {
     "aws_cli": aws_cli,
@@ -7,14 +7,12 @@ from typing import Dict, Any, List, Optional
 
 from swarm.core import Swarm
 from swarm.extensions.config.config_loader import load_server_config
-from swarm.settings import DEBUG
 from swarm.types import Agent
 from swarm.utils.redact import redact_sensitive_data
 from dotenv import load_dotenv
 import argparse
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
 
 
 class OmniplexBlueprint(ABC):
@@ -64,12 +62,12 @@ class OmniplexBlueprint(ABC):
         if missing_vars:
             raise EnvironmentError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
+        # Generate agent awareness summaries before the agents are compiled
+        self.update_agent_awareness()
+
         # Discover tools asynchronously for agents
         asyncio.run(self.async_discover_agent_tools())
 
-        # Generate agent awareness summaries
-        self.update_agent_awareness()
-
         logger.debug("Omniplex initialization complete.")
 
     @property
@@ -145,9 +143,8 @@ class OmniplexBlueprint(ABC):
         )
 
     async def async_discover_agent_tools(self) -> None:
-        """Asynchronously discovers and registers tools for all agents."""
-        for agent in self.swarm.agents.values():
-            await self.swarm.discover_and_merge_agent_tools(agent)
+        """Asynchronously discovers tools for all agents and compiles the shared agent graph."""
+        self.swarm.publish_agent_graph(await self.swarm.compile_agent_graph())
 
     def update_agent_awareness(self) -> None:
         """
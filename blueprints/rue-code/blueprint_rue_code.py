@@ -9,49 +9,55 @@ This blueprint now includes full implementations of core functions from the prev
 import os
 import re
 import logging
-import subprocess
 from typing import Dict, Any, List
 
 from swarm.extensions.blueprint import BlueprintBase
 from swarm.types import Agent
+from swarm.utils.fileio import PatchError, apply_unified_diff, atomic_write, read_lines
+from swarm.utils.process import run_command
+from swarm.utils.workspace import DEFAULT_LIMIT as DEFAULT_SEARCH_LIMIT, get_workspace
 
 # Configure logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not any(isinstance(h, logging.StreamHandler) for h in logger.handlers):
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(name)s - %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
 # Core Functions Implementations
 
-def execute_command(command: str) -> None:
+def execute_command(command: str) -> str:
     """
-    Executes a CLI command and logs its output.
+    Executes a CLI command and returns its output.
+
+    The command runs in its own process group under the shared tool limits
+    (see swarm.utils.process); long output is truncated in the middle.
     """
     try:
         logger.debug(f"Executing command: {command}")
-        result = subprocess.run(command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        logger.debug(f"Command output: {result.stdout}")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Command failed with error: {e.stderr}")
-
-def read_file(path: str, include_line_numbers: bool = False) -> str:
+        result = run_command(command, shell=True)
+    except OSError as e:
+        logger.error(f"Command could not be started: {e}")
+        return f"Error: {e}"
+    if not result.ok:
+        logger.error(f"Command failed with error: {result.error}")
+        return f"Error: {result.error}"
+    logger.debug(f"Command output: {result.stdout}")
+    return result.stdout
+
+def read_file(path: str, include_line_numbers: bool = False, start_line: int = 1, end_line: int = 0,
+              if_hash: str = "") -> str:
     """
-    Reads the content of a file located at 'path'.
+    Reads lines 'start_line'..'end_line' (0 for the end) of the file at 'path', at most 2000 at a time.
+    The first line of the result gives the range returned and the file's sha256; pass that hash as
+    'if_hash' to get "[unchanged ...]" instead of content you already have.
     """
     try:
         logger.debug(f"Reading file at: {path}")
-        with open(path, "r", encoding="utf-8") as f:
-            if include_line_numbers:
-                content = ''.join(f'{i + 1}: {line}' for i, line in enumerate(f))
-            else:
-                content = f.read()
-            return content
+        file_slice = read_lines(path, start_line, end_line, line_numbers=include_line_numbers, if_hash=if_hash or None)
     except Exception as e:
         logger.error(f"Error reading file at {path}: {e}")
         return ""
+    if file_slice.unchanged:
+        return f"[unchanged, {file_slice.total_lines} lines, sha256 {file_slice.sha256}]"
+    header = f"[lines {file_slice.start}-{file_slice.end} of {file_slice.total_lines}, sha256 {file_slice.sha256}]"
+    return f"{header}\n{file_slice.text}"
 
 def write_to_file(path: str, content: str) -> None:
     """
@@ -59,9 +65,7 @@ def write_to_file(path: str, content: str) -> None:
     """
     try:
         logger.debug(f"Writing to file at: {path}")
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        atomic_write(path, content)
         logger.debug("Write successful.")
     except Exception as e:
         logger.error(f"Error writing to file at {path}: {e}")
@@ -81,56 +85,51 @@ def apply_diff(path: str, search: str, replace: str) -> None:
     """
     try:
         logger.debug(f"Applying diff in file at: {path}")
-        original = read_file(path)
+        with open(path, "r", encoding="utf-8") as f:
+            original = f.read()
         if not original:
             logger.error("Original content empty; diff not applied.")
             return
-        updated = original.replace(search, replace)
-        write_to_file(path, updated)
+        atomic_write(path, original.replace(search, replace))
         logger.debug("Diff applied successfully.")
     except Exception as e:
         logger.error(f"Error applying diff in file at {path}: {e}")
 
-def search_files(directory: str, pattern: str, recursive: bool = False, case_insensitive: bool = False) -> List[str]:
+def apply_patch(path: str, diff: str, expected_hash: str = "") -> str:
     """
-    Searches for files in 'directory' whose contents match the regex 'pattern'.
-    Returns a list of file paths that contain a match.
+    Applies a unified diff to the file at 'path' atomically. Pass the sha256 from read_file as
+    'expected_hash' to refuse the patch if the file changed since it was read.
+    """
+    try:
+        logger.debug(f"Applying patch to file at: {path}")
+        result = apply_unified_diff(path, diff, expected_hash=expected_hash or None)
+    except (PatchError, OSError) as e:
+        logger.error(f"Error applying patch to {path}: {e}")
+        return f"Error: {e}"
+    return f"Applied {result.hunks} hunk(s) (+{result.added} -{result.removed}); sha256 {result.sha256}"
+
+def search_files(directory: str, pattern: str, recursive: bool = False, case_insensitive: bool = False,
+                 limit: int = DEFAULT_SEARCH_LIMIT) -> List[str]:
+    """
+    Searches the files in 'directory' for lines matching the regex 'pattern'.
+    Returns up to 'limit' matches as "path:line: text"; .gitignore'd and binary files are skipped.
     """
-    matches = []
-    flags = re.IGNORECASE if case_insensitive else 0
-    regex = re.compile(pattern, flags=flags)
     logger.debug(f"Grep-like search for pattern: {pattern} in directory: {directory}, Recursive: {recursive}, Case Insensitive: {case_insensitive}")
-    for root, dirs, files in os.walk(directory):
-        if not recursive:
-            dirs.clear()
-
-        for file in files:
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                if regex.search(content):
-                    matches.append(file_path)
-                    logger.debug(f"Match found in: {file_path}")
-            except Exception as e:
-                logger.error(f"Error reading file {file_path}: {e}")
-    return matches
+    try:
+        matches = get_workspace(directory).search(
+            pattern, recursive=recursive, case_insensitive=case_insensitive, limit=limit,
+        )
+    except re.error as e:
+        logger.error(f"Invalid search pattern {pattern!r}: {e}")
+        return [f"Error: invalid pattern: {e}"]
+    return [f"{os.path.join(directory, match.path)}:{match.line}: {match.text}" for match in matches]
 
 def list_files(directory: str) -> List[str]:
-    ''' Lists all available test and lint commands for QualityAssurance. '''
-    available_commands = list_available_commands()
-    logger.info(f"Available test commands: {', '.join(available_commands['test_commands'])}")
-    logger.info(f"Available lint commands: {', '.join(available_commands['lint_commands'])}")
     """
-    Lists all file paths (relative to 'directory') recursively.
+    Lists all file paths (relative to 'directory') recursively, skipping .gitignore'd files.
     """
-    file_list = []
     logger.debug(f"Listing files in directory: {directory}")
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            relative_path = os.path.relpath(os.path.join(root, file), directory)
-            file_list.append(relative_path)
-    return file_list
+    return get_workspace(directory).files()
 
 
 def list_available_commands() -> dict:
@@ -140,7 +139,7 @@ def list_available_commands() -> dict:
         'lint_commands': ["eslint", "flake8", "uv run pylint"]
     }
 
-def run_commands(command: str) -> None:
+def run_commands(command: str) -> str:
     """
     Runs a test command, limited to 'npm test' and 'uv run pytest'.
     For 'uv run pytest', it appends flags to stop after the first error and to suppress warnings.
@@ -150,16 +149,16 @@ def run_commands(command: str) -> None:
     cmd = command.strip()
     if cmd not in allowed_commands:
         logger.error("QualityAssurance is limited to 'npm test' and 'uv run pytest'")
-        return
+        return "Error: QualityAssurance is limited to 'npm test' and 'uv run pytest'"
     # Modify command for uv run pytest to stop at first error and suppress warnings
     if cmd == "uv run pytest":
         cmd = "uv run pytest -x --disable-warnings"
     # For "npm test", you might add equivalent flags if supported. Uncomment the following line if needed.
     # elif cmd == "npm test":
     #     cmd = "npm test -- --bail"
-    execute_command(cmd)
+    return execute_command(cmd)
 
-def prepare_git_commit() -> None:
+def prepare_git_commit() -> str:
     """
     Runs git status and git diff, then prepares a one-line conventional commit message.
     Executes 'git add' and commits with a default conventional commit message.
@@ -168,21 +167,21 @@ def prepare_git_commit() -> None:
     execute_command("git status")
     execute_command("git diff")
     commit_message = "chore: update relevant files"
-    execute_command(f'git add . && git commit -m "{commit_message}"')
+    return execute_command(f'git add . && git commit -m "{commit_message}"')
     
-def run_test_command(command: str) -> None:
+def run_test_command(command: str) -> str:
     allowed = {"npm test", "uv run pytest"}
     if command in allowed:
-        run_commands(command)
-    else:
-        logger.error("Test command not allowed")
+        return run_commands(command)
+    logger.error("Test command not allowed")
+    return "Error: Test command not allowed"
 
-def run_lint_command(command: str) -> None:
+def run_lint_command(command: str) -> str:
     allowed = {"eslint", "flake8", "uv run pylint"}
     if command in allowed:
-        run_commands(command)
-    else:
-        logger.error("Lint command not allowed")
+        return run_commands(command)
+    logger.error("Lint command not allowed")
+    return "Error: Lint command not allowed"
 
 def pretty_print_markdown(markdown_text: str) -> None:
     """
@@ -230,6 +229,7 @@ TOOLS = {
     "write_to_file": write_to_file,       # Full write for Code agent.
     "write_md_file": write_md_file,         # Restricted write for Architect.
     "apply_diff": apply_diff,
+    "apply_patch": apply_patch,             # Unified diffs, applied atomically.
     "search_files": search_files,
     "list_files": list_files,
     "run_test_command": run_test_command,
@@ -293,7 +293,7 @@ class RueCodeBlueprint(BlueprintBase):
         # Code: full coding capability.
         code_instructions = (
             "You are the Code agent, responsible for writing, modifying, and analyzing code with full write access. "
-            "Use tools: execute_command, read_file (with optional line numbers), write_to_file, apply_diff, list_files, pretty_print_markdown, and pretty_print_diff. "
+            "Use tools: execute_command, read_file (with optional line numbers), write_to_file, apply_diff, apply_patch (unified diffs), list_files, pretty_print_markdown, and pretty_print_diff. "
             "Available agents: Architect (design, Markdown writing, web search), QualityAssurance (test execution), GitManager (revision management). Use line numbers in `read_file` for precise diff patches."
         )
         agents["Code"] = Agent(
@@ -381,6 +381,7 @@ class RueCodeBlueprint(BlueprintBase):
             "read_file": TOOLS["read_file"],
             "write_to_file": TOOLS["write_to_file"],
             "apply_diff": TOOLS["apply_diff"],
+            "apply_patch": TOOLS["apply_patch"],
             "list_files": TOOLS["list_files"],
         })
         object.__setattr__(agents["Architect"], "tools", { "grep": TOOLS["grep"],
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class UniversityConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "blueprints.university"  # Directory name
     label = "blueprints_university"  # App label with underscore
+
+    def ready(self):
+        # Connect the CourseStats maintenance signals.
+        from blueprints.university import stats  # noqa: F401
+        from blueprints.university.search import repair_after_migrate
+
+        post_migrate.connect(repair_after_migrate, sender=self)
@@ -9,9 +9,11 @@ import os
 import logging
 import json
 import jmespath
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, Iterator, List, Tuple, Optional
 
+from swarm.events import StreamEvent
 from swarm.types import Agent
+from swarm.utils.logger_setup import lazy_json
 from swarm.extensions.blueprint.blueprint_base import BlueprintBase as Blueprint
 
 # Import model_queries for live DB access
@@ -20,15 +22,9 @@ from blueprints.university.model_queries import (
     search_learning_objectives, search_subtopics, search_enrollments,
     search_assessment_items, extended_comprehensive_search, comprehensive_search
 )
-from blueprints.university.models import Topic, LearningObjective, Subtopic, Course, TeachingUnit
+from blueprints.university.prompts import PromptBundle, prompt_cache
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(name)s:%(lineno)d - %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
 class UniversitySupportBlueprint(Blueprint):
     @property
@@ -42,21 +38,25 @@ class UniversitySupportBlueprint(Blueprint):
             "env_vars": ["SQLITE_DB_PATH", "SUPPORT_EMAIL"]
         }
 
+    def prepare_context(self, messages: List[Dict[str, str]], context_variables: dict) -> dict:
+        """Validate a request and add its channel_id and user_name to the context."""
+        if not isinstance(messages, list):
+            logger.error(f"Invalid messages type: {type(messages)}. Expected list.")
+            raise ValueError("Messages must be a list")
+        if not isinstance(context_variables, dict):
+            logger.error(f"Invalid context_variables type: {type(context_variables)}. Expected dict.")
+            raise ValueError("context_variables must be a dictionary")
+
+        channel_id, user_name = self.extract_metadata(context_variables, messages)
+        context_variables["channel_id"] = channel_id
+        context_variables["user_name"] = user_name
+        logger.debug(f"Set context variables: channel_id={channel_id}, user_name={user_name}")
+        return context_variables
+
     def run_with_context(self, messages: List[Dict[str, str]], context_variables: dict) -> dict:
-        logger.debug(f"Running with context. Messages: {json.dumps(messages, indent=2) if messages else 'None'}, Context: {json.dumps(context_variables, indent=2) if context_variables else 'None'}")
+        logger.debug("Running with context. Messages: %s, Context: %s", lazy_json(messages), lazy_json(context_variables, redact=True))
         try:
-            if not isinstance(messages, list):
-                logger.error(f"Invalid messages type: {type(messages)}. Expected list.")
-                raise ValueError("Messages must be a list")
-            if not isinstance(context_variables, dict):
-                logger.error(f"Invalid context_variables type: {type(context_variables)}. Expected dict.")
-                raise ValueError("context_variables must be a dictionary")
-
-            channel_id, user_name = self.extract_metadata(context_variables, messages)
-            context_variables["channel_id"] = channel_id
-            context_variables["user_name"] = user_name
-            logger.debug(f"Set context variables: channel_id={channel_id}, user_name={user_name}")
-
+            context_variables = self.prepare_context(messages, context_variables)
             result = super().run_with_context(messages, context_variables)
             logger.debug(f"run_with_context completed successfully, result type: {type(result)}")
             return result
@@ -64,9 +64,13 @@ class UniversitySupportBlueprint(Blueprint):
             logger.error(f"Failed in run_with_context: {str(e)}", exc_info=True)
             return {"error": f"Failed to process request: {str(e)}"}
 
+    def run_with_context_stream(self, messages: List[Dict[str, str]], context_variables: dict) -> Iterator[StreamEvent]:
+        context_variables = self.prepare_context(messages, context_variables)
+        yield from super().run_with_context_stream(messages, context_variables)
+
     def extract_metadata(self, context_variables: dict, messages: List[Dict[str, Any]]) -> Tuple[str, Optional[str]]:
         """Extract channel_id and user_name with robust fallback."""
-        logger.debug(f"Extracting metadata. Context: {json.dumps(context_variables, indent=2) if context_variables else 'None'}")
+        logger.debug("Extracting metadata. Context: %s", lazy_json(context_variables, redact=True))
         default_channel_id = None
         default_user_name = None
 
@@ -114,147 +118,33 @@ class UniversitySupportBlueprint(Blueprint):
             logger.error(f"Metadata extraction failed: {str(e)}", exc_info=True)
             return default_channel_id, default_user_name
 
+    def get_prompt_bundle(self, channel_id: str) -> PromptBundle:
+        """Return the cached teaching, related and learning-objective prompts for a channel."""
+        if not isinstance(channel_id, str):
+            logger.warning(f"Invalid channel_id type: {type(channel_id)}. Using None as fallback.")
+            channel_id = None
+        return prompt_cache.get(channel_id)
+
     def get_teaching_prompt(self, channel_id: str) -> str:
         """Retrieve teaching prompt for units, focusing on teaching_prompt field."""
-        logger.debug(f"Fetching teaching prompt for channel_id: {channel_id}")
         try:
-            if not isinstance(channel_id, str):
-                logger.warning(f"Invalid channel_id type: {type(channel_id)}. Using None as fallback.")
-                channel_id = None
-
-            units = search_teaching_units(channel_id)
-            logger.debug(f"Search results for channel_id {channel_id}: {units}")
-            if not units or not isinstance(units, list):
-                logger.debug("No units found, attempting null channel_id fallback")
-                units = search_teaching_units(None)
-                if not units or not isinstance(units, list):
-                    logger.debug("No units with NULL channel_id, falling back to all units")
-                    units = TeachingUnit.objects.all().values("code", "name", "channel_id", "teaching_prompt", "id")
-                    units = list(units)
-
-            all_prompts = []
-            teaching_unit_ids = []
-            for unit in units:
-                if not isinstance(unit, dict):
-                    logger.warning(f"Skipping invalid unit format: {type(unit)}")
-                    continue
-                prompt = unit.get("teaching_prompt")
-                name = unit.get("name", "Unnamed Unit")
-                unit_id = unit.get("id")
-                if prompt:
-                    all_prompts.append(f"- **Teaching Unit ({name}):** {prompt}")
-                else:
-                    logger.debug(f"No teaching_prompt for unit: {name}")
-                if unit_id:
-                    teaching_unit_ids.append(unit_id)
-
-            prompt = "\n".join(all_prompts) if all_prompts else "No specific teaching prompts found."
-            logger.debug(f"Constructed teaching prompt: {prompt}")
-            return prompt
+            return self.get_prompt_bundle(channel_id).teaching_prompt
         except Exception as e:
             logger.error(f"Failed to fetch teaching prompt: {str(e)}", exc_info=True)
             return "Failed to retrieve teaching prompt due to an unexpected error."
 
     def get_related_prompts(self, channel_id: str) -> str:
         """Retrieve related prompts (courses, topics, subtopics) with enhanced durability."""
-        logger.debug(f"Fetching related prompts for channel_id: {channel_id}")
         try:
-            if not isinstance(channel_id, str):
-                logger.warning(f"Invalid channel_id type: {type(channel_id)}. Using None as fallback.")
-                channel_id = None
-
-            teaching_units = search_teaching_units(channel_id)
-            logger.debug(f"Teaching units for channel_id {channel_id}: {teaching_units}")
-            if not teaching_units or not isinstance(teaching_units, list):
-                logger.debug("No units found, attempting null channel_id fallback")
-                teaching_units = search_teaching_units(None)
-                if not teaching_units or not isinstance(teaching_units, list):
-                    logger.debug("No units with NULL channel_id, falling back to all units")
-                    teaching_units = TeachingUnit.objects.all().values("code", "name", "channel_id", "teaching_prompt", "id")
-                    teaching_units = list(teaching_units)
-
-            all_prompts = []
-            for teaching_unit in teaching_units:
-                if not isinstance(teaching_unit, dict) or "id" not in teaching_unit:
-                    logger.warning(f"Skipping invalid teaching unit format: {teaching_unit}")
-                    continue
-                teaching_unit_id = teaching_unit["id"]
-                logger.debug(f"Processing teaching unit ID: {teaching_unit_id}")
-
-                # Courses
-                related_courses = Course.objects.filter(teaching_units__id=teaching_unit_id)
-                courses_prompts = [
-                    f"- **Course: {course.name}**: {course.teaching_prompt}"
-                    for course in related_courses if hasattr(course, "teaching_prompt") and course.teaching_prompt
-                ]
-                all_prompts.extend(courses_prompts)
-                logger.debug(f"Courses for unit {teaching_unit_id}: {len(courses_prompts)} found")
-
-                # Topics
-                related_topics = Topic.objects.filter(teaching_unit__id=teaching_unit_id)
-                topics_prompts = [
-                    f"- **Topic: {topic.name}**: {topic.teaching_prompt}"
-                    for topic in related_topics if hasattr(topic, "teaching_prompt") and topic.teaching_prompt
-                ]
-                all_prompts.extend(topics_prompts)
-                logger.debug(f"Topics for unit {teaching_unit_id}: {len(topics_prompts)} found")
-
-                # Subtopics
-                related_subtopics = Subtopic.objects.filter(topic__in=related_topics)
-                subtopics_prompts = [
-                    f"  - **Subtopic: {subtopic.name}**: {subtopic.teaching_prompt}"
-                    for subtopic in related_subtopics if hasattr(subtopic, "teaching_prompt") and subtopic.teaching_prompt
-                ]
-                all_prompts.extend(subtopics_prompts)
-                logger.debug(f"Subtopics for unit {teaching_unit_id}: {len(subtopics_prompts)} found")
-
-            if not all_prompts:
-                logger.warning("No related prompts constructed across all units")
-                return "No related teaching content (courses, topics, subtopics) found."
-            formatted_prompts = "\n".join(all_prompts)
-            logger.debug(f"Final related prompts: {formatted_prompts}")
-            return formatted_prompts
+            return self.get_prompt_bundle(channel_id).related_prompts
         except Exception as e:
             logger.error(f"Failed to fetch related prompts: {str(e)}", exc_info=True)
             return "Failed to retrieve related information due to an unexpected error."
 
     def get_learning_objectives(self, channel_id: str) -> str:
         """Retrieve learning objectives separately for explicit inclusion in agent instructions."""
-        logger.debug(f"Fetching learning objectives for channel_id: {channel_id}")
         try:
-            if not isinstance(channel_id, str):
-                logger.warning(f"Invalid channel_id type: {type(channel_id)}. Using None as fallback.")
-                channel_id = None
-
-            units = search_teaching_units(channel_id)
-            logger.debug(f"Teaching units for channel_id {channel_id}: {units}")
-            if not units or not isinstance(units, list):
-                logger.debug("No units found, attempting null channel_id fallback")
-                units = search_teaching_units(None)
-                if not units or not isinstance(units, list):
-                    logger.debug("No units with NULL channel_id, falling back to all units")
-                    units = TeachingUnit.objects.all().values("code", "name", "channel_id", "teaching_prompt", "id")
-                    units = list(units)
-
-            teaching_unit_ids = [unit.get("id") for unit in units if isinstance(unit, dict) and "id" in unit]
-            logger.debug(f"Extracted teaching unit IDs: {teaching_unit_ids}")
-            if not teaching_unit_ids:
-                logger.warning("No valid teaching unit IDs found")
-                return "No learning objectives found."
-
-            related_topics = Topic.objects.filter(teaching_unit__id__in=teaching_unit_ids)
-            related_learning_objectives = LearningObjective.objects.filter(topic__in=related_topics)
-            learning_objectives_text = [
-                f"  - **Learning Objective:** {objective.description}"
-                for objective in related_learning_objectives if hasattr(objective, "description")
-            ]
-
-            if not learning_objectives_text:
-                logger.warning("No learning objectives constructed")
-                return "No learning objectives found."
-            formatted_objectives = "\n".join(learning_objectives_text)
-            logger.debug(f"Final learning objectives: {formatted_objectives}")
-            return formatted_objectives
+            return self.get_prompt_bundle(channel_id).learning_objectives
         except Exception as e:
             logger.error(f"Failed to fetch learning objectives: {str(e)}", exc_info=True)
             return "Failed to retrieve learning objectives due to an unexpected error."
@@ -0,0 +1,116 @@
+import logging
+
+from django.db import migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+# Frozen copy of the search index definitions as of this migration. Do not import
+# them from blueprints.university.search: edits there must not change history.
+SEARCH_INDEXES = {
+    "swarm_course": ("name", "code", "coordinator"),
+    "swarm_student": ("name",),
+    "swarm_teachingunit": ("code", "name"),
+    "swarm_topic": ("name",),
+    "swarm_learningobjective": ("description",),
+    "swarm_subtopic": ("name",),
+    "swarm_assessmentitem": ("title",),
+}
+
+
+def sqlite_index_sql(table, columns):
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_drop_sql(table):
+    fts = f"{table}_fts"
+    return [
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+
+
+def postgres_index_sql(table, columns):
+    return [
+        f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+        f'ON {table} USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        for column in columns
+    ]
+
+
+def postgres_drop_sql(table, columns):
+    return [f"DROP INDEX IF EXISTS {table}_{column}_trgm" for column in columns]
+
+
+def sqlite_supports_fts(connection):
+    """True if this SQLite build has FTS5 with the trigram tokenizer (3.34+)."""
+    from django.db.backends.sqlite3.base import Database
+
+    if Database.sqlite_version_info < (3, 34, 0):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        if not sqlite_supports_fts(schema_editor.connection):
+            logger.warning("SQLite FTS5 trigram tokenizer unavailable; university search uses icontains.")
+            return
+        for table, columns in SEARCH_INDEXES.items():
+            for statement in sqlite_index_sql(table, columns):
+                schema_editor.execute(statement)
+    elif vendor == "postgresql":
+        try:
+            # Creating the extension needs privileges the app role may lack; search then falls back to icontains.
+            with transaction.atomic(using=schema_editor.connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception as e:
+            logger.warning("Skipping trigram search indexes: %s", e)
+            return
+        for table, columns in SEARCH_INDEXES.items():
+            for statement in postgres_index_sql(table, columns):
+                schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, columns in SEARCH_INDEXES.items():
+        if vendor == "sqlite":
+            statements = sqlite_drop_sql(table)
+        elif vendor == "postgresql":
+            statements = postgres_drop_sql(table, columns)
+        else:
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blueprints_university", "0001_initial_with_channel_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blueprints_university", "0002_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CourseStats",
+            fields=[
+                (
+                    "course",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="blueprints_university.course",
+                    ),
+                ),
+                ("enrolled_students", models.PositiveIntegerField(default=0)),
+                ("average_gpa", models.FloatField(default=0.0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Course Statistics",
+                "verbose_name_plural": "Course Statistics",
+                "db_table": "swarm_coursestats",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(fields=["teaching_unit", "status"], name="swarm_enroll_unit_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="student",
+            index=models.Index(fields=["status"], name="swarm_student_status_idx"),
+        ),
+    ]
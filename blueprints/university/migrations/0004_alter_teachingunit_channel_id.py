@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+# Frozen trigger definitions for swarm_teachingunit's search index (see 0002).
+# On SQLite the AlterField below rebuilds the table, which drops its triggers.
+TEACHINGUNIT_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS swarm_teachingunit_fts_ai",
+    "DROP TRIGGER IF EXISTS swarm_teachingunit_fts_ad",
+    "DROP TRIGGER IF EXISTS swarm_teachingunit_fts_au",
+    "CREATE TRIGGER swarm_teachingunit_fts_ai AFTER INSERT ON swarm_teachingunit BEGIN "
+    "INSERT INTO swarm_teachingunit_fts(rowid, code, name) VALUES (new.id, new.code, new.name); END",
+    "CREATE TRIGGER swarm_teachingunit_fts_ad AFTER DELETE ON swarm_teachingunit BEGIN "
+    "INSERT INTO swarm_teachingunit_fts(swarm_teachingunit_fts, rowid, code, name) "
+    "VALUES ('delete', old.id, old.code, old.name); END",
+    "CREATE TRIGGER swarm_teachingunit_fts_au AFTER UPDATE ON swarm_teachingunit BEGIN "
+    "INSERT INTO swarm_teachingunit_fts(swarm_teachingunit_fts, rowid, code, name) "
+    "VALUES ('delete', old.id, old.code, old.name); "
+    "INSERT INTO swarm_teachingunit_fts(rowid, code, name) VALUES (new.id, new.code, new.name); END",
+    "INSERT INTO swarm_teachingunit_fts(swarm_teachingunit_fts) VALUES ('rebuild')",
+]
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'swarm_teachingunit_fts'")
+        if cursor.fetchone() is None:
+            return
+    for statement in TEACHINGUNIT_TRIGGER_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blueprints_university", "0003_coursestats_and_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="teachingunit",
+            name="channel_id",
+            field=models.CharField(
+                blank=True,
+                help_text="Slack channel ID associated with this teaching unit (e.g., C123456).",
+                max_length=20,
+                null=True,
+                unique=True,
+            ),
+        ),
+        migrations.RunPython(reinstall_search_triggers, migrations.RunPython.noop),
+    ]
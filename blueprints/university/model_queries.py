@@ -1,24 +1,21 @@
 import logging
-import json
 from typing import Dict, Any, List, Optional
 import django
 from django.db.models import Q
 
 from blueprints.university.models import Course, Student, TeachingUnit, Topic, LearningObjective, Subtopic, Enrollment, AssessmentItem
+from blueprints.university.search import paginate, search
 
-# Configure logging with detailed debug information for troubleshooting
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
-def search_courses(query: str) -> List[Dict[str, Any]]:
+# Tool calls return at most this many rows per model unless a limit is given (<= 0 for no limit).
+DEFAULT_SEARCH_LIMIT = 50
+
+def search_courses(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the Course model with a meticulous search process, logging every detail of the query,
     result set, and potential failures to ensure comprehensive tracking and auditing, using Django ORM.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching courses with query: {query}")
     if not isinstance(query, str):
@@ -29,19 +26,17 @@ def search_courses(query: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        qs = Course.objects.filter(
-            Q(name__icontains=query) | Q(code__icontains=query) | Q(coordinator__icontains=query)
-        )
-        results = list(qs.values("code", "name", "coordinator"))
-        logger.debug(f"Course search results for query '{query}': {json.dumps(results, indent=4)}")
+        results = search(Course.objects.all(), "course", query, ("code", "name", "coordinator"), limit, offset)
+        logger.debug("Course search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching courses for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def search_students(query: str) -> List[Dict[str, Any]]:
+def search_students(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the Student model with a detailed search process, logging operations and potential failures.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching students with query: {query}")
     if not isinstance(query, str):
@@ -52,18 +47,18 @@ def search_students(query: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        qs = Student.objects.filter(Q(name__icontains=query))
-        results = list(qs.values("name", "gpa", "status"))
-        logger.debug(f"Student search results for query '{query}': {json.dumps(results, indent=4)}")
+        results = search(Student.objects.all(), "student", query, ("name", "gpa", "status"), limit, offset)
+        logger.debug("Student search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching students for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def search_teaching_units(query: Optional[str]) -> List[Dict[str, Any]]:
+def search_teaching_units(query: Optional[str], limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the TeachingUnit model, allowing None to search for units with undefined (NULL) channel_id.
     Logs every operation and potential failure for comprehensive auditing, using Django ORM.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching teaching units with query: {query}")
     if query is not None and not isinstance(query, str):
@@ -71,26 +66,26 @@ def search_teaching_units(query: Optional[str]) -> List[Dict[str, Any]]:
         raise ValueError("Query must be a string or None, ensuring strict type safety")
     
     try:
+        fields = ("code", "name", "channel_id", "teaching_prompt", "id")
         if query is None:
             logger.debug("Query is None, searching for teaching units with NULL channel_id")
-            qs = TeachingUnit.objects.filter(channel_id__isnull=True)
+            qs = TeachingUnit.objects.filter(channel_id__isnull=True).order_by("pk")
+            results = list(paginate(qs.values(*fields), limit, offset))
         elif not query:
             logger.warning("Empty query provided for teaching unit search, returning an empty result set")
             return []
         else:
-            logger.debug(f"Performing standard search with query: {query}")
-            qs = TeachingUnit.objects.filter(Q(code__icontains=query) | Q(name__icontains=query))
-
-        results = list(qs.values("code", "name", "channel_id", "teaching_prompt", "id"))
-        logger.debug(f"Teaching unit search results for query '{query}': {json.dumps(results, indent=4)}")
+            results = search(TeachingUnit.objects.all(), "teachingunit", query, fields, limit, offset)
+        logger.debug("Teaching unit search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching teaching units for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def search_topics(query: str) -> List[Dict[str, Any]]:
+def search_topics(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the Topic model with a detailed search process, logging operations and potential failures.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching topics with query: {query}")
     if not isinstance(query, str):
@@ -101,17 +96,17 @@ def search_topics(query: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        qs = Topic.objects.filter(Q(name__icontains=query))
-        results = list(qs.values("name"))
-        logger.debug(f"Topic search results for query '{query}': {json.dumps(results, indent=4)}")
+        results = search(Topic.objects.all(), "topic", query, ("name",), limit, offset)
+        logger.debug("Topic search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching topics for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def search_learning_objectives(query: str) -> List[Dict[str, Any]]:
+def search_learning_objectives(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the LearningObjective model with a meticulous search process, logging operations and failures.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching learning objectives with query: {query}")
     if not isinstance(query, str):
@@ -122,17 +117,17 @@ def search_learning_objectives(query: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        qs = LearningObjective.objects.filter(Q(description__icontains=query))
-        results = list(qs.values("description"))
-        logger.debug(f"Learning objective search results for query '{query}': {json.dumps(results, indent=4)}")
+        results = search(LearningObjective.objects.all(), "learningobjective", query, ("description",), limit, offset)
+        logger.debug("Learning objective search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching learning objectives for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def search_subtopics(query: str) -> List[Dict[str, Any]]:
+def search_subtopics(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the Subtopic model with a detailed search process, logging operations and potential failures.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching subtopics with query: {query}")
     if not isinstance(query, str):
@@ -143,17 +138,17 @@ def search_subtopics(query: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        qs = Subtopic.objects.filter(Q(name__icontains=query))
-        results = list(qs.values("name"))
-        logger.debug(f"Subtopic search results for query '{query}': {json.dumps(results, indent=4)}")
+        results = search(Subtopic.objects.all(), "subtopic", query, ("name",), limit, offset)
+        logger.debug("Subtopic search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching subtopics for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def search_enrollments(query: str) -> List[Dict[str, Any]]:
+def search_enrollments(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the Enrollment model with a meticulous search process, logging operations and failures.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching enrollments with query: {query}")
     if not isinstance(query, str):
@@ -164,17 +159,19 @@ def search_enrollments(query: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        qs = Enrollment.objects.filter(Q(status__icontains=query))
-        results = list(qs.values("status", "enrollment_date"))
-        logger.debug(f"Enrollment search results for query '{query}': {json.dumps(results, indent=4)}")
+        # Status is a short choice field; it has no search index.
+        qs = Enrollment.objects.filter(Q(status__icontains=query)).order_by("pk")
+        results = list(paginate(qs.values("status", "enrollment_date"), limit, offset))
+        logger.debug("Enrollment search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching enrollments for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def search_assessment_items(query: str) -> List[Dict[str, Any]]:
+def search_assessment_items(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> List[Dict[str, Any]]:
     """
     Query the AssessmentItem model with a detailed search process, logging operations and failures.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Searching assessment items with query: {query}")
     if not isinstance(query, str):
@@ -185,17 +182,17 @@ def search_assessment_items(query: str) -> List[Dict[str, Any]]:
         return []
 
     try:
-        qs = AssessmentItem.objects.filter(Q(title__icontains=query))
-        results = list(qs.values("title", "status", "due_date"))
-        logger.debug(f"Assessment item search results for query '{query}': {json.dumps(results, indent=4)}")
+        results = search(AssessmentItem.objects.all(), "assessmentitem", query, ("title", "status", "due_date"), limit, offset)
+        logger.debug("Assessment item search for %r returned %d rows", query, len(results))
         return results
     except Exception as e:
         logger.error(f"Error searching assessment items for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def extended_comprehensive_search(query: str) -> Dict[str, List[Dict[str, Any]]]:
+def extended_comprehensive_search(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> Dict[str, List[Dict[str, Any]]]:
     """
     Perform an extended comprehensive search across all university models, logging every detail.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Performing extended comprehensive search with query: {query}")
     if not isinstance(query, str):
@@ -216,24 +213,25 @@ def extended_comprehensive_search(query: str) -> Dict[str, List[Dict[str, Any]]]
 
     try:
         results = {
-            "courses": search_courses(query),
-            "students": search_students(query),
-            "teaching_units": search_teaching_units(query),
-            "topics": search_topics(query),
-            "learning_objectives": search_learning_objectives(query),
-            "subtopics": search_subtopics(query),
-            "enrollments": search_enrollments(query),
-            "assessment_items": search_assessment_items(query),
+            "courses": search_courses(query, limit, offset),
+            "students": search_students(query, limit, offset),
+            "teaching_units": search_teaching_units(query, limit, offset),
+            "topics": search_topics(query, limit, offset),
+            "learning_objectives": search_learning_objectives(query, limit, offset),
+            "subtopics": search_subtopics(query, limit, offset),
+            "enrollments": search_enrollments(query, limit, offset),
+            "assessment_items": search_assessment_items(query, limit, offset),
         }
-        logger.debug(f"Extended search results for query '{query}': {json.dumps(results, indent=4)}")
+        logger.debug("Extended search for %r returned %s", query, {name: len(rows) for name, rows in results.items()})
         return results
     except Exception as e:
         logger.error(f"Error in extended comprehensive search for query '{query}': {str(e)}", exc_info=True)
         raise
 
-def comprehensive_search(query: str) -> Dict[str, List[Dict[str, Any]]]:
+def comprehensive_search(query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0) -> Dict[str, List[Dict[str, Any]]]:
     """
     Perform a comprehensive search across courses and students, logging every detail.
+    Best matches come first; `limit` (<= 0 for all) and `offset` page through the results.
     """
     logger.debug(f"Performing comprehensive search with query: {query}")
     if not isinstance(query, str):
@@ -245,10 +243,10 @@ def comprehensive_search(query: str) -> Dict[str, List[Dict[str, Any]]]:
 
     try:
         results = {
-            "courses": search_courses(query),
-            "students": search_students(query)
+            "courses": search_courses(query, limit, offset),
+            "students": search_students(query, limit, offset)
         }
-        logger.debug(f"Comprehensive search results for query '{query}': {json.dumps(results, indent=4)}")
+        logger.debug("Comprehensive search for %r returned %s", query, {name: len(rows) for name, rows in results.items()})
         return results
     except Exception as e:
         logger.error(f"Error in comprehensive search for query '{query}': {str(e)}", exc_info=True)
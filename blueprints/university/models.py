@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.db import models
 from typing import TYPE_CHECKING
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Count, F, FloatField, Func, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
 
 if TYPE_CHECKING:
     from django.db.models.manager import RelatedManager
@@ -88,6 +90,46 @@ class Subtopic(models.Model):
         return self.name
 
 
+def course_stats_table_enabled() -> bool:
+    """True if course statistics are read from (and maintained in) the `CourseStats` table."""
+    return bool(getattr(settings, "UNIVERSITY_COURSE_STATS_TABLE", False))
+
+
+class CourseQuerySet(models.QuerySet):
+    def with_stats(self, materialized=None):
+        """
+        Annotate each course with `enrolled_students` and `gpa_average`.
+
+        Both are computed per row in SQL, so listing courses costs one query
+        instead of two aggregate queries per course.
+
+        Args:
+            materialized (Optional[bool]): Read from the `CourseStats` table instead of
+                aggregating enrollments. Defaults to `UNIVERSITY_COURSE_STATS_TABLE`.
+        """
+        if materialized is None:
+            materialized = course_stats_table_enabled()
+        if materialized:
+            return self.annotate(
+                enrolled_students=Coalesce(F("stats__enrolled_students"), 0),
+                gpa_average=Coalesce(F("stats__average_gpa"), 0.0, output_field=FloatField()),
+            )
+        # Students enrolled in any of the course's units, each counted once.
+        students = Student.objects.filter(
+            pk__in=Enrollment.objects.filter(teaching_unit__courses=OuterRef(OuterRef("pk"))).values("student_id")
+        ).order_by()
+        return self.annotate(
+            enrolled_students=Coalesce(
+                Subquery(students.annotate(n=Func(F("pk"), function="COUNT")).values("n")[:1], output_field=IntegerField()),
+                0,
+            ),
+            gpa_average=Coalesce(
+                Subquery(students.annotate(a=Func(F("gpa"), function="AVG")).values("a")[:1], output_field=FloatField()),
+                Value(0.0),
+            ),
+        )
+
+
 class Course(models.Model):
     """Represents a course program."""
     name = models.CharField(max_length=255, help_text="Name of the course (e.g., Bachelor of Science).")
@@ -104,6 +146,8 @@ class Course(models.Model):
         blank=True, null=True, help_text="Instructions or guidelines for teaching this course."
     )
 
+    objects = CourseQuerySet.as_manager()
+
     class Meta:
         app_label = "blueprints_university"
         db_table = "swarm_course"
@@ -115,12 +159,16 @@ class Course(models.Model):
 
     @property
     def enrolled_students_count(self):
-        """Dynamically calculates the number of enrolled students."""
+        """Dynamically calculates the number of enrolled students (uses the `with_stats` annotation if present)."""
+        if "enrolled_students" in self.__dict__:
+            return self.enrolled_students
         return Student.objects.filter(enrollments__teaching_unit__in=self.teaching_units.all()).distinct().count()
 
     @property
     def average_gpa(self):
-        """Dynamically calculates the average GPA for the course."""
+        """Dynamically calculates the average GPA for the course (uses the `with_stats` annotation if present)."""
+        if "gpa_average" in self.__dict__:
+            return self.gpa_average
         students_in_course = Student.objects.filter(enrollments__teaching_unit__in=self.teaching_units.all()).distinct()
         if students_in_course.exists():
             return students_in_course.aggregate(Avg('gpa'))['gpa__avg']
@@ -151,6 +199,7 @@ class Student(models.Model):
     class Meta:
         app_label = "blueprints_university"
         db_table = "swarm_student"
+        indexes = [models.Index(fields=["status"], name="swarm_student_status_idx")]
         verbose_name = "Student"
         verbose_name_plural = "Students"
 
@@ -169,8 +218,9 @@ def filter_students(name=None, status=None, unit_codes=None):
     if status and status != 'all':
         q &= Q(status=status)
     if unit_codes and 'all' not in unit_codes:
-        q &= Q(enrollments__teaching_unit__code__in=unit_codes)
-    return Student.objects.filter(q).distinct()
+        # A semi-join on the indexed unit code; no DISTINCT over joined enrollment rows needed.
+        q &= Q(pk__in=Enrollment.objects.filter(teaching_unit__code__in=unit_codes).values("student_id"))
+    return Student.objects.filter(q)
 
 
 class Enrollment(models.Model):
@@ -197,6 +247,7 @@ class Enrollment(models.Model):
         app_label = "blueprints_university"
         db_table = "swarm_enrollment"
         unique_together = ('student', 'teaching_unit')
+        indexes = [models.Index(fields=["teaching_unit", "status"], name="swarm_enroll_unit_status_idx")]
         verbose_name = "Enrollment"
         verbose_name_plural = "Enrollments"
 
@@ -245,3 +296,26 @@ class AssessmentItem(models.Model):
     def formatted_weight(self):
         """Formats the weight as a percentage string."""
         return f"{self.weight}%"
+
+
+class CourseStats(models.Model):
+    """
+    Materialised enrollment statistics for a Course.
+
+    Only used when `UNIVERSITY_COURSE_STATS_TABLE` is enabled; rows are then
+    refreshed for the affected courses whenever enrollments, student GPAs or
+    course units change (see `blueprints.university.stats`).
+    """
+    course = models.OneToOneField(Course, primary_key=True, related_name="stats", on_delete=models.CASCADE)
+    enrolled_students = models.PositiveIntegerField(default=0)
+    average_gpa = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "blueprints_university"
+        db_table = "swarm_coursestats"
+        verbose_name = "Course Statistics"
+        verbose_name_plural = "Course Statistics"
+
+    def __str__(self):
+        return f"{self.course_id}: {self.enrolled_students} students, GPA {self.average_gpa:.2f}"
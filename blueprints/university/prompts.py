@@ -0,0 +1,173 @@
+"""
+Per-channel prompt bundles for the university agents.
+
+The agents' instruction callables need the teaching prompts, the related
+course/topic/subtopic prompts and the learning objectives of the teaching
+units behind a channel. `build_prompt_bundle` loads all of that with one
+fixed query plan (the unit lookup plus one prefetch per relation, however
+many units match), and `PromptBundleCache` keeps the rendered text per
+channel until one of the underlying models changes.
+
+Signals only reach the process that made the change, so cached bundles also
+expire after `UNIVERSITY_PROMPT_CACHE_TTL` seconds (default 300; 0 disables
+caching).
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from blueprints.university.model_queries import search_teaching_units
+from blueprints.university.models import Course, LearningObjective, Subtopic, TeachingUnit, Topic
+
+logger = logging.getLogger(__name__)
+
+NO_TEACHING_PROMPTS = "No specific teaching prompts found."
+NO_RELATED_PROMPTS = "No related teaching content (courses, topics, subtopics) found."
+NO_LEARNING_OBJECTIVES = "No learning objectives found."
+
+
+class PromptBundle:
+    """The rendered instruction sections for one channel."""
+
+    __slots__ = ("teaching_prompt", "related_prompts", "learning_objectives")
+
+    def __init__(self, teaching_prompt: str, related_prompts: str, learning_objectives: str):
+        self.teaching_prompt = teaching_prompt
+        self.related_prompts = related_prompts
+        self.learning_objectives = learning_objectives
+
+
+def resolve_unit_ids(channel_id: Optional[str]) -> List[int]:
+    """
+    Teaching units for a channel: those matching `channel_id`, else those with no
+    channel, else all units.
+    """
+    units = search_teaching_units(channel_id, limit=0)
+    if not units:
+        logger.debug("No units found for channel_id %s, attempting null channel_id fallback", channel_id)
+        units = search_teaching_units(None, limit=0)
+    if units:
+        return [unit["id"] for unit in units]
+    logger.debug("No units with NULL channel_id, falling back to all units")
+    return list(TeachingUnit.objects.order_by("pk").values_list("id", flat=True))
+
+
+def _load_units(unit_ids: List[int]) -> List[TeachingUnit]:
+    topics = Topic.objects.order_by("pk").prefetch_related(
+        Prefetch("subtopics", queryset=Subtopic.objects.order_by("pk")),
+        Prefetch("learning_objectives", queryset=LearningObjective.objects.order_by("pk")),
+    )
+    units = TeachingUnit.objects.filter(id__in=unit_ids).prefetch_related(
+        Prefetch("courses", queryset=Course.objects.order_by("pk")),
+        Prefetch("topics", queryset=topics),
+    )
+    by_id = {unit.id: unit for unit in units}
+    return [by_id[unit_id] for unit_id in unit_ids if unit_id in by_id]
+
+
+def build_prompt_bundle(channel_id: Optional[str]) -> PromptBundle:
+    """
+    Render the instruction sections for `channel_id` from the database.
+
+    Args:
+        channel_id (Optional[str]): The Slack channel ID, or None.
+
+    Returns:
+        PromptBundle: The teaching prompts, related prompts and learning objectives.
+    """
+    units = _load_units(resolve_unit_ids(channel_id))
+
+    teaching, related, objectives = [], [], []
+    for unit in units:
+        if unit.teaching_prompt:
+            teaching.append(f"- **Teaching Unit ({unit.name}):** {unit.teaching_prompt}")
+        topics = list(unit.topics.all())
+        related.extend(
+            f"- **Course: {course.name}**: {course.teaching_prompt}"
+            for course in unit.courses.all() if course.teaching_prompt
+        )
+        related.extend(
+            f"- **Topic: {topic.name}**: {topic.teaching_prompt}"
+            for topic in topics if topic.teaching_prompt
+        )
+        subtopics = sorted((s for topic in topics for s in topic.subtopics.all()), key=lambda s: s.pk)
+        related.extend(
+            f"  - **Subtopic: {subtopic.name}**: {subtopic.teaching_prompt}"
+            for subtopic in subtopics if subtopic.teaching_prompt
+        )
+        objectives.extend(o for topic in topics for o in topic.learning_objectives.all())
+
+    objectives.sort(key=lambda o: o.pk)
+    return PromptBundle(
+        teaching_prompt="\n".join(teaching) if teaching else NO_TEACHING_PROMPTS,
+        related_prompts="\n".join(related) if related else NO_RELATED_PROMPTS,
+        learning_objectives="\n".join(
+            f"  - **Learning Objective:** {o.description}" for o in objectives
+        ) if objectives else NO_LEARNING_OBJECTIVES,
+    )
+
+
+class PromptBundleCache:
+    """
+    Bundles by channel ID, dropped wholesale when any university content changes.
+
+    Any change can move a channel between the fallbacks in `resolve_unit_ids`,
+    so invalidation clears every entry. A generation counter keeps a bundle that
+    was being built during an invalidation from being stored.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, clock=time.monotonic):
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: Dict[Optional[str], Tuple[float, PromptBundle]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        return float(getattr(settings, "UNIVERSITY_PROMPT_CACHE_TTL", 300))
+
+    def get(self, channel_id: Optional[str]) -> PromptBundle:
+        ttl = self.ttl
+        entry = self._entries.get(channel_id)
+        if entry is not None and entry[0] > self._clock():
+            return entry[1]
+        generation = self._generation
+        bundle = build_prompt_bundle(channel_id)
+        if ttl > 0:
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[channel_id] = (self._clock() + ttl, bundle)
+        return bundle
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+prompt_cache = PromptBundleCache()
+
+
+@receiver(post_save, sender=TeachingUnit, dispatch_uid="university_prompts_unit_saved")
+@receiver(post_delete, sender=TeachingUnit, dispatch_uid="university_prompts_unit_deleted")
+@receiver(post_save, sender=Course, dispatch_uid="university_prompts_course_saved")
+@receiver(post_delete, sender=Course, dispatch_uid="university_prompts_course_deleted")
+@receiver(m2m_changed, sender=Course.teaching_units.through, dispatch_uid="university_prompts_course_units_changed")
+@receiver(post_save, sender=Topic, dispatch_uid="university_prompts_topic_saved")
+@receiver(post_delete, sender=Topic, dispatch_uid="university_prompts_topic_deleted")
+@receiver(post_save, sender=Subtopic, dispatch_uid="university_prompts_subtopic_saved")
+@receiver(post_delete, sender=Subtopic, dispatch_uid="university_prompts_subtopic_deleted")
+@receiver(post_save, sender=LearningObjective, dispatch_uid="university_prompts_objective_saved")
+@receiver(post_delete, sender=LearningObjective, dispatch_uid="university_prompts_objective_deleted")
+def _invalidate_prompts(sender, **kwargs):
+    prompt_cache.invalidate()
@@ -0,0 +1,274 @@
+"""
+Indexed, ranked search over the university models.
+
+The search indexes are created by migration 0002 for the active database
+(`DJANGO_DATABASE`):
+
+* SQLite: an external-content FTS5 table per model, using the `trigram`
+  tokenizer so a phrase match is a case-insensitive substring match (the
+  same semantics as `icontains`). Triggers keep each table in sync with its
+  model table, and results are ranked by `bm25`.
+* Postgres: `pg_trgm` GIN indexes on `UPPER(column::text)`, which is the
+  expression Django's `icontains` compiles to, so the existing filter becomes
+  an index scan. Results are ranked by trigram similarity.
+
+When an index is unavailable (no FTS5/pg_trgm, or a query shorter than one
+trigram) the search falls back to the plain `icontains` filter, ordered by
+primary key so pagination stays stable.
+
+Note that on SQLite, Django rebuilds a table for most `AlterField` operations
+and the triggers are dropped with it. A migration that alters an indexed table
+should re-create them with frozen SQL (as 0004 does); as a safety net,
+`repair_search_triggers` runs after every `migrate` and re-installs the
+triggers of any FTS table that lost them.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.db import connections, router
+from django.db.models import Q, QuerySet
+
+logger = logging.getLogger(__name__)
+
+# Trigram indexes cannot match anything shorter than this.
+MIN_INDEXED_QUERY_LENGTH = 3
+
+
+class SearchIndex:
+    """The searchable columns of one model table."""
+
+    __slots__ = ("table", "columns")
+
+    def __init__(self, table: str, columns: Sequence[str]):
+        self.table = table
+        self.columns = tuple(columns)
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+
+# Keyed by model name; the tables are those declared in models.py.
+SEARCH_INDEXES: Dict[str, SearchIndex] = {
+    "course": SearchIndex("swarm_course", ("name", "code", "coordinator")),
+    "student": SearchIndex("swarm_student", ("name",)),
+    "teachingunit": SearchIndex("swarm_teachingunit", ("code", "name")),
+    "topic": SearchIndex("swarm_topic", ("name",)),
+    "learningobjective": SearchIndex("swarm_learningobjective", ("description",)),
+    "subtopic": SearchIndex("swarm_subtopic", ("name",)),
+    "assessmentitem": SearchIndex("swarm_assessmentitem", ("title",)),
+}
+
+
+def sqlite_index_sql(index: SearchIndex) -> List[str]:
+    """Statements creating the FTS5 table and sync triggers for `index`, and filling it."""
+    fts, table = index.fts_table, index.table
+    cols = ", ".join(index.columns)
+    new = ", ".join(f"new.{c}" for c in index.columns)
+    old = ", ".join(f"old.{c}" for c in index.columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_drop_sql(index: SearchIndex) -> List[str]:
+    fts = index.fts_table
+    return [
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+
+
+def postgres_index_sql(index: SearchIndex) -> List[str]:
+    return [
+        f'CREATE INDEX IF NOT EXISTS {index.table}_{column}_trgm '
+        f'ON {index.table} USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        for column in index.columns
+    ]
+
+
+def postgres_drop_sql(index: SearchIndex) -> List[str]:
+    return [f"DROP INDEX IF EXISTS {index.table}_{column}_trgm" for column in index.columns]
+
+
+def sqlite_supports_fts(connection) -> bool:
+    """True if this SQLite build has FTS5 with the trigram tokenizer (3.34+)."""
+    from django.db.backends.sqlite3.base import Database
+
+    if Database.sqlite_version_info < (3, 34, 0):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def install_sqlite_index(schema_editor, index: SearchIndex) -> bool:
+    """Create (or re-create) the FTS5 index for `index`; returns False if FTS5 is unavailable."""
+    if not sqlite_supports_fts(schema_editor.connection):
+        logger.warning("SQLite FTS5 trigram tokenizer unavailable; %s search uses icontains.", index.table)
+        return False
+    for statement in sqlite_index_sql(index):
+        schema_editor.execute(statement)
+    return True
+
+
+def sqlite_trigger_names(index: SearchIndex) -> Tuple[str, ...]:
+    fts = index.fts_table
+    return (f"{fts}_ai", f"{fts}_ad", f"{fts}_au")
+
+
+def repair_search_triggers(connection) -> List[str]:
+    """
+    Re-install the sync triggers of SQLite FTS tables whose triggers are missing.
+
+    Args:
+        connection: The database connection to check.
+
+    Returns:
+        List[str]: The model tables whose index was repaired (and rebuilt).
+    """
+    if connection.vendor != "sqlite":
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {(kind, name) for kind, name in cursor.fetchall()}
+    repaired = []
+    for index in SEARCH_INDEXES.values():
+        if ("table", index.fts_table) not in existing:
+            continue
+        if all(("trigger", name) in existing for name in sqlite_trigger_names(index)):
+            continue
+        logger.warning("Search triggers of %s were missing (table rebuilt?); re-installing them.", index.table)
+        with connection.cursor() as cursor:
+            for statement in sqlite_index_sql(index):
+                cursor.execute(statement)
+        repaired.append(index.table)
+    return repaired
+
+
+def repair_after_migrate(sender, using: str = "default", **kwargs) -> None:
+    """`post_migrate` receiver: repair dropped search triggers and forget cached index availability."""
+    repair_search_triggers(connections[using])
+    availability.clear()
+
+
+class _Availability:
+    """Per-database cache of which search indexes exist, checked once per connection settings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[Tuple[str, str], Any] = {}
+
+    def get(self, connection) -> Any:
+        key = (connection.alias, str(connection.settings_dict.get("NAME")))
+        state = self._state.get(key)
+        if state is None:
+            with self._lock:
+                state = self._state.get(key)
+                if state is None:
+                    state = self._probe(connection)
+                    self._state[key] = state
+        return state
+
+    def clear(self) -> None:
+        with self._lock:
+            self._state.clear()
+
+    @staticmethod
+    def _probe(connection) -> Any:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%_fts'")
+                return frozenset(row[0] for row in cursor.fetchall())
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                return cursor.fetchone() is not None
+        return False
+
+
+availability = _Availability()
+
+
+def _fts_phrase(query: str) -> str:
+    # A quoted FTS5 string is a phrase; with the trigram tokenizer that means "contains".
+    return '"' + query.replace('"', '""') + '"'
+
+
+def paginate(qs: QuerySet, limit: Optional[int], offset: int) -> QuerySet:
+    """Slice `qs` to one page; a `limit` of None or <= 0 means no limit."""
+    offset = max(offset or 0, 0)
+    if limit is not None and limit > 0:
+        return qs[offset:offset + limit]
+    return qs[offset:] if offset else qs
+
+
+def search(
+    qs: QuerySet,
+    key: str,
+    query: str,
+    fields: Sequence[str],
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Search `qs` for rows whose indexed columns contain `query`, best matches first.
+
+    Args:
+        qs (QuerySet): The model queryset to search.
+        key (str): The `SEARCH_INDEXES` entry for the model.
+        query (str): The text to look for (case-insensitive substring).
+        fields (Sequence[str]): Fields to return for each row.
+        limit (Optional[int]): Maximum number of rows; None or <= 0 for all.
+        offset (int): Number of rows to skip.
+
+    Returns:
+        List[Dict[str, Any]]: One dict per row with the requested fields.
+    """
+    index = SEARCH_INDEXES[key]
+    connection = connections[router.db_for_read(qs.model)]
+    table = qs.model._meta.db_table
+    pk = qs.model._meta.pk.column
+
+    if len(query) >= MIN_INDEXED_QUERY_LENGTH:
+        if connection.vendor == "sqlite" and index.fts_table in availability.get(connection):
+            fts = index.fts_table
+            qs = qs.extra(
+                tables=[fts],
+                where=[f"{fts}.rowid = {table}.{pk}", f"{fts} MATCH %s"],
+                params=[_fts_phrase(query)],
+                select={"search_rank": f"{fts}.rank"},
+                order_by=["search_rank", "pk"],
+            )
+            return list(paginate(qs.values(*fields), limit, offset))
+
+        if connection.vendor == "postgresql" and availability.get(connection):
+            from django.contrib.postgres.search import TrigramSimilarity
+            from django.db.models.functions import Greatest
+
+            similarities = [TrigramSimilarity(column, query) for column in index.columns]
+            rank = similarities[0] if len(similarities) == 1 else Greatest(*similarities)
+            qs = _contains(qs, index, query).annotate(search_rank=rank).order_by("-search_rank", "pk")
+            return list(paginate(qs.values(*fields), limit, offset))
+
+    return list(paginate(_contains(qs, index, query).order_by("pk").values(*fields), limit, offset))
+
+
+def _contains(qs: QuerySet, index: SearchIndex, query: str) -> QuerySet:
+    condition = Q()
+    for column in index.columns:
+        condition |= Q(**{f"{column}__icontains": query})
+    return qs.filter(condition)
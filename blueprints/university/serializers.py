@@ -25,7 +25,8 @@ class SubtopicSerializer(serializers.ModelSerializer):
 
 from blueprints.university.models import TeachingUnit
 class CourseSerializer(serializers.ModelSerializer):
-    enrolled_students = serializers.IntegerField(read_only=True)
+    # Filled from `Course.objects.with_stats()` annotations, or per instance otherwise.
+    enrolled_students = serializers.IntegerField(source="enrolled_students_count", read_only=True)
     average_gpa = serializers.FloatField(read_only=True)
     teaching_units = serializers.PrimaryKeyRelatedField(queryset=TeachingUnit.objects.all(), many=True)
     
@@ -46,7 +47,7 @@ class StudentSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "gpa", "status", "courses")
     def get_courses(self, obj):
         if hasattr(obj, 'enrollments'):
-            return [enrollment.teaching_unit.id for enrollment in obj.enrollments.all()]
+            return [enrollment.teaching_unit_id for enrollment in obj.enrollments.all()]
         return []
 
 class EnrollmentSerializer(serializers.ModelSerializer):
@@ -0,0 +1,127 @@
+"""
+Incremental maintenance of the materialised `CourseStats` table.
+
+When `UNIVERSITY_COURSE_STATS_TABLE` is enabled, changes to enrollments,
+student GPAs and course units refresh the stats of the affected courses only.
+Refreshes run once per transaction, after it commits, so cascades and bulk
+changes inside one transaction are recomputed together from their final state.
+
+After enabling the setting on an existing database, call
+`refresh_course_stats()` once to backfill every course.
+"""
+
+import logging
+from typing import Iterable, Optional, Set
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from blueprints.university.models import (
+    Course, CourseStats, Enrollment, Student, TeachingUnit, course_stats_table_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+CourseUnits = Course.teaching_units.through
+
+
+def refresh_course_stats(course_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the `CourseStats` rows for `course_ids` (all courses if None).
+
+    Returns:
+        int: The number of courses refreshed.
+    """
+    courses = Course.objects.all()
+    if course_ids is not None:
+        courses = courses.filter(pk__in=list(course_ids))
+    rows = [
+        CourseStats(course_id=pk, enrolled_students=count, average_gpa=gpa)
+        for pk, count, gpa in courses.with_stats(materialized=False).values_list("pk", "enrolled_students", "gpa_average")
+    ]
+    CourseStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["course"],
+        update_fields=["enrolled_students", "average_gpa", "updated_at"],
+    )
+    logger.debug("Refreshed stats for %d courses", len(rows))
+    return len(rows)
+
+
+def courses_for_units(unit_ids: Iterable[int]) -> Set[int]:
+    return set(CourseUnits.objects.filter(teachingunit_id__in=list(unit_ids)).values_list("course_id", flat=True))
+
+
+class _PendingRefresh:
+    """An on-commit callback that later signals in the same transaction add courses to."""
+
+    def __init__(self, course_ids: Set[int]):
+        self.course_ids = course_ids
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        refresh_course_stats(self.course_ids)
+
+
+def schedule_refresh(course_ids: Iterable[int]) -> None:
+    """Refresh `course_ids` once the current transaction commits (immediately outside one)."""
+    course_ids = set(course_ids)
+    if not course_ids:
+        return
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        # Rolled-back callbacks are discarded by Django, so only live ones are found here.
+        for _, callback, *_ in connection.run_on_commit:
+            if isinstance(callback, _PendingRefresh) and not callback.done:
+                callback.course_ids.update(course_ids)
+                return
+    transaction.on_commit(_PendingRefresh(course_ids))
+
+
+@receiver(pre_save, sender=Enrollment, dispatch_uid="university_stats_enrollment_moving")
+def _remember_enrollment_unit(sender, instance, raw=False, **kwargs):
+    if raw or not instance.pk or not course_stats_table_enabled():
+        return
+    instance._previous_unit_id = (
+        Enrollment.objects.filter(pk=instance.pk).values_list("teaching_unit_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Enrollment, dispatch_uid="university_stats_enrollment_saved")
+@receiver(post_delete, sender=Enrollment, dispatch_uid="university_stats_enrollment_deleted")
+def _enrollment_changed(sender, instance, raw=False, **kwargs):
+    if raw or not course_stats_table_enabled():
+        return
+    unit_ids = {instance.teaching_unit_id, getattr(instance, "_previous_unit_id", None)} - {None}
+    schedule_refresh(courses_for_units(unit_ids))
+
+
+@receiver(post_save, sender=Student, dispatch_uid="university_stats_student_saved")
+def _student_changed(sender, instance, created=False, raw=False, **kwargs):
+    # A new student has no enrollments yet; a saved one may have a new GPA.
+    if raw or created or not course_stats_table_enabled():
+        return
+    unit_ids = Enrollment.objects.filter(student=instance).values_list("teaching_unit_id", flat=True)
+    schedule_refresh(courses_for_units(unit_ids))
+
+
+@receiver(pre_delete, sender=TeachingUnit, dispatch_uid="university_stats_unit_deleting")
+def _unit_deleting(sender, instance, **kwargs):
+    # The unit's course links are gone by the time post_delete runs.
+    if course_stats_table_enabled():
+        schedule_refresh(courses_for_units([instance.pk]))
+
+
+@receiver(m2m_changed, sender=CourseUnits, dispatch_uid="university_stats_course_units_changed")
+def _course_units_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not course_stats_table_enabled() or action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        schedule_refresh([instance.pk])
+    elif action == "pre_clear":
+        schedule_refresh(courses_for_units([instance.pk]))
+    else:
+        schedule_refresh(pk_set or ())
@@ -70,8 +70,12 @@ class CourseViewSet(UniversityBaseViewSet):
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
 
+    def get_queryset(self):
+        # Aggregates come from the same query and units from one prefetch, not per course.
+        return super().get_queryset().with_stats().prefetch_related("teaching_units")
+
 class StudentViewSet(UniversityBaseViewSet):
-    queryset = Student.objects.all()
+    queryset = Student.objects.prefetch_related("enrollments")
     serializer_class = StudentSerializer
 
     def get_queryset(self):
@@ -81,7 +85,7 @@ class StudentViewSet(UniversityBaseViewSet):
         if unit_codes:
             unit_codes = unit_codes.split(',')
         if name or status or unit_codes:
-            return filter_students(name=name, status=status, unit_codes=unit_codes)
+            return filter_students(name=name, status=status, unit_codes=unit_codes).prefetch_related("enrollments")
         return super().get_queryset()
 
 class EnrollmentViewSet(UniversityBaseViewSet):
@@ -10,15 +10,10 @@ import sqlite3
 from typing import Dict, Any
 
 from swarm.types import Agent
+from swarm.db.sqlite import get_pool
 from swarm.extensions.blueprint import BlueprintBase
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
-if not logger.handlers:
-    stream_handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(asctime)s] [%(levelname)s] %(message)s")
-    stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
 
 class WhiskeyTangoFoxtrotBlueprint(BlueprintBase):
     """
@@ -76,13 +71,11 @@ class WhiskeyTangoFoxtrotBlueprint(BlueprintBase):
             sqlite3.Error: If there's an error connecting to or initializing the database.
         """
         try:
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='services';")
-            if not cursor.fetchone():
+            pool = get_pool(db_path)
+            if not pool.query_one("SELECT name FROM sqlite_master WHERE type='table' AND name='services';"):
                 logger.info("Initializing 'services' table in SQLite database.")
-                cursor.execute("""
-                    CREATE TABLE services (
+                pool.execute("""
+                    CREATE TABLE IF NOT EXISTS services (
                         id INTEGER PRIMARY KEY,
                         name TEXT NOT NULL,
                         type TEXT NOT NULL,
@@ -92,8 +85,6 @@ class WhiskeyTangoFoxtrotBlueprint(BlueprintBase):
                         documentation_link TEXT
                     );
                 """)
-                conn.commit()
-            conn.close()
         except sqlite3.Error as e:
             logger.error(f"Error initializing SQLite database: {e}")
             raise
@@ -0,0 +1,30 @@
+# src/swarm/asgi.py
+
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+from django.core.asgi import get_asgi_application
+
+# Define the base directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Load environment variables from .env file
+load_dotenv(dotenv_path=BASE_DIR / '.env')
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'swarm.settings')
+
+# Set up Django before importing anything that touches models.
+django_asgi_app = get_asgi_application()
+
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+
+from swarm.routing import websocket_urlpatterns  # noqa: E402
+from swarm.utils.process import CancelOnDisconnect  # noqa: E402
+
+application = ProtocolTypeRouter({
+    # Cancel tool subprocesses of requests whose client has gone away.
+    "http": CancelOnDisconnect(django_asgi_app),
+    "websocket": AllowedHostsOriginValidator(AuthMiddlewareStack(URLRouter(websocket_urlpatterns))),
+})
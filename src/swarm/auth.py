@@ -1,8 +1,19 @@
+import hashlib
+import hmac
 import os
 import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from rest_framework.authentication import TokenAuthentication  # type: ignore
 from rest_framework.exceptions import AuthenticationFailed  # type: ignore
+from rest_framework.permissions import BasePermission  # type: ignore
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +23,111 @@ class EnvAuthenticatedUser(AnonymousUser):
     def is_authenticated(self) -> bool:  # type: ignore[override]
         return True  # Ensure Django recognizes this user as authenticated
 
+class IsOperator(BasePermission):
+    """ Operators only: the `API_AUTH_TOKEN` holder (everyone while API auth is disabled) and staff users. """
+    def has_permission(self, request, view) -> bool:
+        user = request.user
+        return isinstance(user, EnvAuthenticatedUser) or bool(getattr(user, "is_staff", False))
+
+class EnvAuthSettings:
+    """ `ENABLE_API_AUTH` / `API_AUTH_TOKEN` parsed once per distinct pair of raw values. """
+
+    __slots__ = ("raw", "enabled", "token")
+
+    def __init__(self, enable_raw: Optional[str], token_raw: Optional[str]):
+        self.raw = (enable_raw, token_raw)
+        self.enabled = (enable_raw or "false").lower() in ("true", "1", "t")
+        self.token = token_raw.encode() if token_raw else None
+
+_env_settings = EnvAuthSettings(None, None)
+
+def get_env_auth_settings() -> EnvAuthSettings:
+    """
+    Return the parsed env auth settings, re-parsing only when the variables change.
+
+    Two dictionary lookups per request decide whether the cached snapshot is
+    still current, so tests and reloads that change the environment still apply.
+    """
+    global _env_settings
+    raw = (os.environ.get("ENABLE_API_AUTH"), os.environ.get("API_AUTH_TOKEN"))
+    snapshot = _env_settings
+    if snapshot.raw != raw:
+        snapshot = EnvAuthSettings(*raw)
+        _env_settings = snapshot
+        logger.debug(f"API authentication {'enabled' if snapshot.enabled else 'disabled'}"
+                     f"{' with API_AUTH_TOKEN' if snapshot.token else ''}.")
+    return snapshot
+
+class TokenCache:
+    """
+    Bounded TTL/LRU cache of validated DRF tokens.
+
+    Entries are keyed by a digest of the token key, so raw tokens are not kept
+    in memory, and are dropped when the token or its user changes (see the
+    signal receivers below).
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Any, Any]]:
+        digest = self._digest(key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return entry[1], entry[2]
+
+    def set(self, key: str, user: Any, token: Any) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        digest = self._digest(key)
+        with self._lock:
+            self._entries[digest] = (self._clock() + self.ttl, user, token)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[str] = None, user_pk: Any = None) -> None:
+        """ Drop the entry for token `key` and/or every entry belonging to `user_pk`. """
+        with self._lock:
+            if key is not None:
+                self._entries.pop(self._digest(key), None)
+            if user_pk is not None:
+                for digest in [d for d, (_, user, _) in self._entries.items() if user.pk == user_pk]:
+                    del self._entries[digest]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+token_cache = TokenCache(
+    max_size=getattr(settings, "SWARM_AUTH_CACHE_SIZE", 1024),
+    ttl=getattr(settings, "SWARM_AUTH_CACHE_TTL", 60.0),
+)
+
+@receiver(post_save, sender="authtoken.Token", dispatch_uid="swarm_auth_token_saved")
+@receiver(post_delete, sender="authtoken.Token", dispatch_uid="swarm_auth_token_deleted")
+def _invalidate_token(sender, instance, **kwargs):
+    token_cache.invalidate(key=instance.key, user_pk=instance.user_id)
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid="swarm_auth_user_saved")
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL, dispatch_uid="swarm_auth_user_deleted")
+def _invalidate_user(sender, instance, **kwargs):
+    token_cache.invalidate(user_pk=instance.pk)
+
 class EnvOrTokenAuthentication(TokenAuthentication):
     """
     Custom authentication that allows:
@@ -20,17 +136,15 @@ class EnvOrTokenAuthentication(TokenAuthentication):
     3. Otherwise, falls back to Django's TokenAuthentication.
     """
     def authenticate(self, request):
-        auth_header = request.headers.get("Authorization", "")
-        env_token = os.getenv("API_AUTH_TOKEN", None)
-        enable_auth = os.getenv("ENABLE_API_AUTH", "false").lower() in ("true", "1", "t")
+        env = get_env_auth_settings()
 
         # If API authentication is disabled, allow unrestricted access
-        if not enable_auth:
-            logger.info("Authentication is disabled (ENABLE_API_AUTH not set or False). Allowing all users.")
+        if not env.enabled:
             return (EnvAuthenticatedUser(), None)
 
         # If API_AUTH_TOKEN is set, enforce token validation
-        if env_token:
+        if env.token:
+            auth_header = request.headers.get("Authorization", "")
             if not auth_header:
                 raise AuthenticationFailed("Authentication credentials were not provided.")
             if not auth_header.startswith("Bearer "):
@@ -38,19 +152,20 @@ class EnvOrTokenAuthentication(TokenAuthentication):
 
             token = auth_header.split("Bearer ")[-1].strip()
 
-            if token == env_token:
-                logger.info("Authenticated using API_AUTH_TOKEN.")
+            if hmac.compare_digest(token.encode(), env.token):
                 return (EnvAuthenticatedUser(), None)  # Allow access
-            else:
-                raise AuthenticationFailed("Invalid token.")
-
-        # If API authentication is disabled, allow unrestricted access
-        if not enable_auth:
-            logger.info("Authentication is disabled (ENABLE_API_AUTH not set or False). Allowing all users.")
-            return (EnvAuthenticatedUser(), None)
+            raise AuthenticationFailed("Invalid token.")
 
         # Fallback to Django's TokenAuthentication
         return super().authenticate(request)
 
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return (user, token)
+
     def authenticate_header(self, request):
         return "Bearer"
@@ -1,29 +1,149 @@
+# src/swarm/consumers.py
+
+"""
+Websocket Chat
+
+`DjangoChatConsumer` serves the htmx chat page on `ws/<blueprint>/<conversation_id>/`.
+Every message runs the blueprint's event stream (`run_with_context_stream`);
+each step of the run executes in a worker thread, so a blocking model or tool
+call never stalls the event loop that serves the other sockets. Steps go
+through `database_sync_to_async`, which closes the connections blueprint ORM
+work opens there, and the run is closed once the reply ends or fails.
+
+Text deltas are not sent one frame per token: they are coalesced into one HTML
+fragment per SWARM_WS_FLUSH_INTERVAL seconds or SWARM_WS_FLUSH_BYTES bytes,
+whichever comes first. Tool calls and handoffs show up in the response as they
+happen. The partial templates are compiled once per process.
+"""
+
+import asyncio
+import functools
 import json
-import os
+import logging
+import math
+import time
 import uuid
-from channels.generic.websocket import AsyncWebsocketConsumer
-from openai import AsyncOpenAI
-from django.template.loader import render_to_string
+from typing import Any, Callable, Dict, List, Optional
+
 from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+from django.template.loader import get_template
+from django.utils.html import escape
+from rest_framework.response import Response
+
+from swarm.events import DeltaEvent, FinalEvent, HandoffEvent, MessageEvent, ToolStartEvent
+from swarm.messages import to_wire
 from swarm.models import ChatConversation, ChatMessage
+from swarm.throttling import AdmissionRejected, RateLimited, get_admission_controller, tenant_key
+from swarm.utils.process import CancellationToken, cancel_scope
+from swarm.views import get_blueprint_instance
+
+logger = logging.getLogger(__name__)
 
 # In-memory conversation storage (populated lazily)
 IN_MEMORY_CONVERSATIONS = {}
 
+# Roles kept in the stored history; tool traffic only matters within a run.
+HISTORY_ROLES = ("user", "assistant")
+
+CHUNK_FRAME = '<div hx-swap-oob="beforeend:#{target}">{text}</div>'
+
+
+@functools.lru_cache(maxsize=None)
+def partial(name: str) -> Any:
+    """The compiled `websocket_partials/<name>.html` template, loaded once."""
+    return get_template(f"websocket_partials/{name}.html")
+
+
+def render_partial(name: str, context: Dict[str, Any]) -> str:
+    return partial(name).render(context)
+
+
+class FrameCoalescer:
+    """
+    Buffers the text deltas of one response until a frame is due.
+
+    Args:
+        interval (float): Seconds after the first buffered delta at which a frame is due.
+        max_bytes (int): Buffered size at which a frame is due at once.
+        clock (Callable[[], float]): Monotonic clock, replaceable in tests.
+    """
+
+    __slots__ = ("interval", "max_bytes", "clock", "parts", "size", "since")
+
+    def __init__(self, interval: float, max_bytes: int, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.parts: List[str] = []
+        self.size = 0
+        self.since = 0.0
+
+    def add(self, text: str) -> bool:
+        """Buffer `text`; returns True if the buffer is full and should be sent now."""
+        if not self.parts:
+            self.since = self.clock()
+        self.parts.append(text)
+        self.size += len(text.encode("utf-8"))
+        return self.size >= self.max_bytes
+
+    def timeout(self) -> Optional[float]:
+        """Seconds until the buffered text is due, or None if nothing is buffered."""
+        if not self.parts:
+            return None
+        return max(0.0, self.since + self.interval - self.clock())
+
+    def take(self) -> str:
+        """Return the buffered text and empty the buffer."""
+        text = "".join(self.parts)
+        self.parts = []
+        self.size = 0
+        return text
+
+
+def response_text(response: Any) -> str:
+    """The assistant text of a final response that was not streamed as deltas."""
+    if isinstance(response, str):
+        return response
+    if isinstance(response, dict) and "messages" not in response:
+        return str(response.get("message") or "")
+    messages = response.get("messages") if isinstance(response, dict) else getattr(response, "messages", None)
+    return "\n\n".join(
+        message.get("content") for message in messages or ()
+        if message.get("role") == "assistant" and message.get("content")
+    )
+
+
 class DjangoChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope["user"]
-        self.conversation_id = self.scope['url_route']['kwargs']['conversation_id']
+        kwargs = self.scope['url_route']['kwargs']
+        self.conversation_id = kwargs['conversation_id']
+        self.blueprint_name = kwargs.get('blueprint_name', 'default')
 
-        if self.user.is_authenticated:
-            self.messages = await self.fetch_conversation(self.conversation_id)
-            await self.accept()
-        else:
+        if not self.user.is_authenticated:
             await self.close()
+            return
+
+        self.messages = await self.fetch_conversation(self.conversation_id)
+        self.saved = len(self.messages)
+        self.context_variables = {}
+        self.cancellation = CancellationToken()
+        await self.accept()
+
+        # Building a blueprint discovers its tools, which may block; keep it off the loop.
+        blueprint = await database_sync_to_async(get_blueprint_instance, thread_sensitive=False)(self.blueprint_name, {})
+        if isinstance(blueprint, Response):
+            await self.send(text_data=render_partial("error_message", {"message": blueprint.data.get("error")}))
+            await self.close(code=4404)
+            return
+        self.blueprint = blueprint
 
     async def disconnect(self, close_code):
         if self.user.is_authenticated:
-            await self.save_conversation(self.conversation_id, self.messages)
+            self.cancellation.cancel("websocket disconnected")
+            await self.save_conversation(self.conversation_id, self.messages[self.saved:])
 
             # Delete conversation from DB and memory if empty
             if not self.messages:
@@ -37,61 +157,119 @@ class DjangoChatConsumer(AsyncWebsocketConsumer):
         text_data_json = json.loads(text_data)
         message_text = text_data_json["message"]
 
-        if not message_text.strip():
+        if not message_text.strip() or not hasattr(self, "blueprint"):
             return
 
-        self.messages.append(
-            {
-                "role": "user",
-                "content": message_text,
-            }
-        )
+        controller = get_admission_controller()
+        try:
+            wait = await database_sync_to_async(controller.check_rate, thread_sensitive=False)(self.tenant())
+            if wait > 0:
+                raise RateLimited("Too many messages, slow down.", retry_after=wait)
+            lease = await controller.acquire_async()
+        except AdmissionRejected as e:
+            await self.send_rejection(e)
+            return
 
-        user_message_html = render_to_string(
-            "websocket_partials/user_message.html",
-            {"message_text": message_text},
-        )
-        await self.send(text_data=user_message_html)
+        try:
+            await self.respond(message_text)
+        finally:
+            await database_sync_to_async(controller.release, thread_sensitive=False)(lease)
 
-        message_id = uuid.uuid4().hex
-        contents_div_id = f"message-response-{message_id}"
-        system_message_html = render_to_string(
-            "websocket_partials/system_message.html",
-            {"contents_div_id": contents_div_id},
-        )
-        await self.send(text_data=system_message_html)
+    def tenant(self):
+        client = self.scope.get("client") or ("", 0)
+        return tenant_key(self.user, remote_addr=client[0])
 
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        stream = await client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL"),
-            messages=self.messages,
-            stream=True,
-        )
+    async def send_rejection(self, error):
+        retry_after = max(1, math.ceil(error.retry_after))
+        html = render_partial("error_message", {"message": f"{error} Try again in {retry_after}s."})
+        await self.send(text_data=html)
 
-        full_message = ""
-        async for chunk in stream:
-            message_chunk = chunk.choices[0].delta.content
-            if message_chunk:
-                full_message += message_chunk
-                chunk_html = f'<div hx-swap-oob="beforeend:#{contents_div_id}">{message_chunk}</div>'
-                await self.send(text_data=chunk_html)
-
-        self.messages.append(
-            {
-                "role": "assistant",
-                "content": full_message,
-            }
-        )
+    async def respond(self, message_text):
+        """
+        Run the blueprint on the conversation and stream its reply as HTML fragments.
+
+        Args:
+            message_text (str): The user's message.
+        """
+        self.messages.append({"role": "user", "content": message_text})
+        await self.send(text_data=render_partial("user_message", {"message_text": message_text}))
 
-        final_message = render_to_string(
-            "websocket_partials/final_system_message.html",
-            {
-                "contents_div_id": contents_div_id,
-                "message": full_message,
-            },
+        contents_div_id = f"message-response-{uuid.uuid4().hex}"
+        await self.send(text_data=render_partial("system_message", {"contents_div_id": contents_div_id}))
+
+        coalescer = FrameCoalescer(
+            getattr(settings, "SWARM_WS_FLUSH_INTERVAL", 0.03),
+            getattr(settings, "SWARM_WS_FLUSH_BYTES", 1024),
         )
-        await client.close()
-        await self.send(text_data=final_message)
+        events = self.blueprint.run_with_context_stream(list(self.messages), dict(self.context_variables))
+
+        def step() -> Any:
+            with cancel_scope(self.cancellation):
+                return next(events, None)
+
+        async def flush() -> None:
+            if coalescer.parts:
+                text = escape(coalescer.take())
+                await self.send(text_data=CHUNK_FRAME.format(target=contents_div_id, text=text))
+
+        async def notice(text: str) -> None:
+            await flush()
+            await self.send(text_data=render_partial("event_notice", {"contents_div_id": contents_div_id, "text": text}))
+
+        shown = []
+        texts = []
+        final = None
+        run_step = database_sync_to_async(step, thread_sensitive=False)
+        pending = asyncio.ensure_future(run_step())
+        try:
+            while True:
+                done, _ = await asyncio.wait({pending}, timeout=coalescer.timeout())
+                if not done:
+                    await flush()
+                    continue
+                event = pending.result()
+                if event is None:
+                    break
+                # The next step runs while this event is being sent.
+                pending = asyncio.ensure_future(run_step())
+                if isinstance(event, DeltaEvent):
+                    shown.append(event.content)
+                    if coalescer.add(event.content):
+                        await flush()
+                elif isinstance(event, MessageEvent):
+                    if event.message.content:
+                        texts.append(event.message.content)
+                elif isinstance(event, ToolStartEvent):
+                    await notice(f"{event.agent} is calling {event.name}")
+                elif isinstance(event, HandoffEvent):
+                    await notice(f"{event.from_agent} handed off to {event.to_agent}")
+                elif isinstance(event, FinalEvent):
+                    final = event
+            await flush()
+        except Exception as e:
+            logger.error(f"Error during websocket run: {e}", exc_info=True)
+            await self.send(text_data=render_partial(
+                "final_system_message", {"contents_div_id": contents_div_id, "message": "".join(shown)},
+            ))
+            await self.send(text_data=render_partial("error_message", {"message": f"Error: {e}"}))
+            return
+        finally:
+            # A step may still be running in its thread; the generator can only be closed once it returns.
+            await asyncio.gather(pending, return_exceptions=True)
+            await database_sync_to_async(events.close, thread_sensitive=False)()
+
+        response = final.response if final is not None else None
+        full_message = "\n\n".join(texts) or response_text(response)
+        if final is not None:
+            self.context_variables = dict(final.context_variables or {})
+            if isinstance(getattr(response, "messages", None), list):
+                self.messages.extend(to_wire(response.messages))
+            else:
+                self.messages.append({"role": "assistant", "content": full_message})
+
+        await self.send(text_data=render_partial(
+            "final_system_message", {"contents_div_id": contents_div_id, "message": full_message},
+        ))
 
     @database_sync_to_async
     def fetch_conversation(self, conversation_id):
@@ -102,8 +280,11 @@ class DjangoChatConsumer(AsyncWebsocketConsumer):
             return IN_MEMORY_CONVERSATIONS[conversation_id]
 
         try:
-            chat = ChatConversation.objects.get(conversation_id=conversation_id, user=self.user)
-            messages = list(chat.messages.values("sender", "content", "timestamp"))
+            chat = ChatConversation.objects.get(conversation_id=conversation_id, student=self.user)
+            messages = [
+                {"role": sender, "content": content}
+                for sender, content in chat.messages.filter(sender__in=HISTORY_ROLES).values_list("sender", "content")
+            ]
             IN_MEMORY_CONVERSATIONS[conversation_id] = messages  # Cache it
             return messages
         except ChatConversation.DoesNotExist:
@@ -112,19 +293,23 @@ class DjangoChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
     def save_conversation(self, conversation_id, new_messages):
         """
-        Save messages to the DB and update in-memory cache.
+        Save the messages added since the conversation was loaded and update in-memory cache.
         """
-        chat, _ = ChatConversation.objects.get_or_create(conversation_id=conversation_id, user=self.user)
+        chat, _ = ChatConversation.objects.get_or_create(conversation_id=conversation_id, student=self.user)
 
-        for message in new_messages:
-            ChatMessage.objects.create(
+        ChatMessage.objects.bulk_create([
+            ChatMessage(
                 conversation=chat,
                 sender=message["role"],
-                content=message["content"]
+                content=message["content"],
+                content_hash=ChatMessage.hash_content(message["content"]),
             )
+            for message in new_messages
+            if message.get("role") in HISTORY_ROLES and message.get("content")
+        ])
 
         # Sync in-memory store
-        IN_MEMORY_CONVERSATIONS[conversation_id] = new_messages
+        IN_MEMORY_CONVERSATIONS[conversation_id] = self.messages
 
     @database_sync_to_async
     def delete_conversation(self, conversation_id):
@@ -132,7 +317,7 @@ class DjangoChatConsumer(AsyncWebsocketConsumer):
         Delete the conversation from DB if empty.
         """
         try:
-            chat = ChatConversation.objects.get(conversation_id=conversation_id, user=self.user)
+            chat = ChatConversation.objects.get(conversation_id=conversation_id, student=self.user)
             if not chat.messages.exists():  # Check if there are any messages before deleting
                 chat.delete()
                 if conversation_id in IN_MEMORY_CONVERSATIONS:
@@ -0,0 +1,286 @@
+# src/swarm/context.py
+
+"""
+Copy-on-Write Context Variables
+
+`ContextVariables` is the mapping that a run's tools and instructions see as
+`context_variables`. It is a stack of layers, highest priority first: a
+writable overlay on top of read-only layers (a request's context, blueprint
+defaults, earlier snapshots). Writes and deletions only ever touch the
+overlay, so layering a run over a large context costs nothing and the
+caller's dicts are never modified.
+
+Mutable values (dicts, lists, sets) that live in a lower layer are copied into
+the overlay the first time they are read with `[]` or `get()`, so in-place
+edits stay local as well; only the values a run actually touches are copied.
+`peek()` and `DefaultView` read without copying.
+
+`snapshot()` freezes the overlay into a shared layer in O(1); tool calls and
+handoffs work on snapshots, and `changes()` is the log of what was written on
+top of one. Writes are bounded by a key count and a per-value size limit.
+"""
+
+import copy
+import json
+import logging
+import os
+import sys
+from collections.abc import Mapping, MutableMapping
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _env_limit(name: str, default: int) -> Optional[int]:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return int(raw) or None
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}: {raw!r}")
+        return default
+
+
+# Limits on what a run may write; 0 disables a limit. Layers are not checked.
+DEFAULT_MAX_KEYS = _env_limit("SWARM_CONTEXT_MAX_KEYS", 1024)
+DEFAULT_MAX_VALUE_BYTES = _env_limit("SWARM_CONTEXT_MAX_VALUE_BYTES", 1024 * 1024)
+# Frozen layers are flattened into one once a context is this deep.
+MAX_DEPTH = 8
+
+_MUTABLE_TYPES = (dict, list, set, bytearray)
+_MISSING = object()
+
+
+class _Removed:
+    """Marks a key deleted on top of the layers below; see `ContextVariables.changes`."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "REMOVED"
+
+
+REMOVED = _Removed()
+
+
+class ContextSizeError(ValueError):
+    """A write to a context would exceed its key count or value size limit."""
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate serialized size of a context value in bytes."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return 8
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+
+class ContextVariables(MutableMapping):
+    """
+    A layered, copy-on-write mapping of context variables.
+
+    Args:
+        *layers (Optional[Mapping]): Read-only mappings to layer under the overlay,
+            highest priority first; None entries are skipped. Another
+            ContextVariables contributes a snapshot of its current state.
+        max_keys (Optional[int]): Maximum number of keys a write may grow the context to.
+        max_value_bytes (Optional[int]): Maximum estimated size of a written value.
+
+    Layers are read, never written; they must not change while the context is in use.
+    """
+
+    __slots__ = ("_overlay", "_layers", "_copied", "max_keys", "max_value_bytes")
+
+    def __init__(
+        self,
+        *layers: Optional[Mapping],
+        max_keys: Optional[int] = DEFAULT_MAX_KEYS,
+        max_value_bytes: Optional[int] = DEFAULT_MAX_VALUE_BYTES,
+    ):
+        stack = []
+        for layer in layers:
+            if layer is None:
+                continue
+            if isinstance(layer, ContextVariables):
+                layer._freeze()
+                stack.extend(layer._layers)
+            else:
+                stack.append(layer)
+        self._overlay: Dict[str, Any] = {}
+        self._layers: Tuple[Mapping, ...] = tuple(stack)
+        self._copied = set()
+        self.max_keys = max_keys
+        self.max_value_bytes = max_value_bytes
+
+    # -------------------------------------------------------------------------
+    # Mapping protocol
+    # -------------------------------------------------------------------------
+
+    def _find(self, key: Any) -> Any:
+        """The raw value of `key` in the layers (ignoring the overlay), or _MISSING."""
+        for layer in self._layers:
+            value = layer.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+        return _MISSING
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self._overlay.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._find(key)
+            if isinstance(value, _MUTABLE_TYPES):
+                value = copy.deepcopy(value)
+                self._overlay[key] = value
+                self._copied.add(key)
+        if value is _MISSING or value is REMOVED:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._check_limits(key, value)
+        self._overlay[key] = value
+        self._copied.discard(key)
+
+    def __delitem__(self, key: Any) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if self._find(key) is _MISSING:
+            del self._overlay[key]
+        else:
+            self._overlay[key] = REMOVED
+        self._copied.discard(key)
+
+    def __contains__(self, key: Any) -> bool:
+        value = self._overlay.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._find(key)
+        return value is not _MISSING and value is not REMOVED
+
+    def __iter__(self) -> Iterator[Any]:
+        seen = set()
+        for layer in (self._overlay, *self._layers):
+            for key, value in layer.items():
+                if key not in seen:
+                    seen.add(key)
+                    if value is not REMOVED:
+                        yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def peek(self, key: Any, default: Any = None) -> Any:
+        """Read `key` without copying it into the overlay; the result must not be modified."""
+        value = self._overlay.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._find(key)
+        return default if value is _MISSING or value is REMOVED else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A flat dict of the current state; values are shared with the layers, not copied."""
+        return {key: self.peek(key) for key in self}
+
+    # -------------------------------------------------------------------------
+    # Layers
+    # -------------------------------------------------------------------------
+
+    def _freeze(self) -> None:
+        """Move the overlay into the read-only layers and start a fresh one."""
+        if not self._overlay:
+            return
+        self._layers = (MappingProxyType(self._overlay), *self._layers)
+        self._overlay = {}
+        self._copied = set()
+        if len(self._layers) > MAX_DEPTH:
+            flat = {}
+            for layer in reversed(self._layers):
+                flat.update(layer)
+            self._layers = (MappingProxyType({k: v for k, v in flat.items() if v is not REMOVED}),)
+
+    def snapshot(self) -> "ContextVariables":
+        """
+        Return a new context that starts from the current state, in O(1).
+
+        Both contexts share the frozen layers and keep separate overlays, so
+        neither sees the other's later writes.
+        """
+        return ContextVariables(self, max_keys=self.max_keys, max_value_bytes=self.max_value_bytes)
+
+    def changes(self) -> Dict[Any, Any]:
+        """
+        The change log of this context: every key written or deleted on top of its layers.
+
+        Deleted keys map to `REMOVED`. Mutable values that were only copied up by
+        a read are included if they were modified in place.
+        """
+        changes = {}
+        for key, value in self._overlay.items():
+            if key in self._copied and value == self._find(key):
+                continue
+            changes[key] = value
+        return changes
+
+    def apply(self, changes: Mapping) -> None:
+        """
+        Write `changes` (e.g. another context's `changes()`) into this context.
+
+        `REMOVED` values delete their key; values that already are the current
+        value of their key (the same object) are skipped, so applying a full copy
+        of the context only writes what differs.
+        """
+        for key, value in changes.items():
+            if value is REMOVED:
+                self.pop(key, None)
+            elif self.peek(key, _MISSING) is not value:
+                self[key] = value
+
+    def _check_limits(self, key: Any, value: Any) -> None:
+        if self.max_value_bytes:
+            size = estimate_size(value)
+            if size > self.max_value_bytes:
+                raise ContextSizeError(
+                    f"Context variable {key!r} is {size} bytes; the limit is {self.max_value_bytes}."
+                )
+        if self.max_keys and len(self._overlay) + sum(len(layer) for layer in self._layers) >= self.max_keys:
+            if key not in self and len(self) >= self.max_keys:
+                raise ContextSizeError(f"Context already holds {self.max_keys} variables; cannot add {key!r}.")
+
+
+class DefaultView(Mapping):
+    """
+    A read-only view of a context that returns `default` for missing keys.
+
+    Replaces `defaultdict(str, context_variables)` for rendering instructions:
+    nothing is copied, neither the mapping nor the values it reads.
+    """
+
+    __slots__ = ("_source", "_default")
+
+    def __init__(self, source: Mapping, default: Any = ""):
+        self._source = source
+        self._default = default
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.get(key, self._default)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if isinstance(self._source, ContextVariables):
+            return self._source.peek(key, default)
+        return self._source.get(key, default)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._source
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._source)
+
+    def __len__(self) -> int:
+        return len(self._source)
@@ -9,14 +9,14 @@ of conversations between agents and MCP servers.
 
 # Standard library imports
 import os
-import copy
 import datetime
 import inspect
 import json
 import logging
+import threading
 import uuid
-from collections import defaultdict
-from typing import List, Optional, Dict, Any
+from concurrent.futures import Future
+from typing import List, Optional, Dict, Any, Iterator, Union
 from types import SimpleNamespace
 from nemoguardrails.rails.llm.options import GenerationOptions
 
@@ -25,31 +25,43 @@ import asyncio
 from openai import OpenAI
 
 # Local imports
-from .util import function_to_json, merge_chunk
+from .util import function_to_json
 from .types import (
     Agent,
     AgentFunction,
     ChatCompletionMessage,
     ChatCompletionMessageToolCall,
-    Function,
     Response,
     Result,
 )
+from .router import get_router, llm_backend
+from .context import ContextVariables, DefaultView
+from .events import (
+    DeltaEvent,
+    FinalEvent,
+    HandoffEvent,
+    MessageEvent,
+    StreamEvent,
+    ToolCallDeltaEvent,
+    ToolEndEvent,
+    ToolStartEvent,
+)
+from .streaming import StreamAssembler
+from .graph import AgentGraph, CompiledAgent, RunContext, find_handoff_targets, handoff_order
+from .messages import Message, ToolCall, as_messages
 from .extensions.config.config_loader import load_llm_config
 from .extensions.mcp.mcp_tool_provider import MCPToolProvider
-from .settings import DEBUG
+from .extensions.mcp.native import NativeToolProvider, create_native_provider, is_native
+from .utils.logger_setup import TraceSampler, lazy_json
 from .utils.redact import redact_sensitive_data
+from .utils.resilience import ResilienceError, RetryPolicy, call_with_resilience
 
 __CTX_VARS_NAME__ = "context_variables"
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
-stream_handler = logging.StreamHandler()
-formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(name)s - %(message)s")
-stream_handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(stream_handler)
+# Picks the runs whose per-turn debug traces (payloads, completions) are logged.
+trace_sampler = TraceSampler()
 
 
 def serialize_datetime(obj):
@@ -169,8 +181,13 @@ class Swarm:
         self.tool_choice = "auto"
         self.parallel_tool_calls = False
         self.agents: Dict[str, Agent] = {}
-        self.mcp_tool_providers: Dict[str, MCPToolProvider] = {}  # Cache for MCPToolProvider instances
+        self.agent_graph: Optional[AgentGraph] = None  # Compiled snapshot shared by concurrent runs
+        self._clients: Dict[tuple, Any] = {}  # OpenAI clients keyed by (base_url, api_key)
+        self._graph_lock = threading.Lock()  # Serializes writers swapping self.agent_graph
+        self._pending_compiles: Dict[str, Future] = {}  # Background compiles by agent name
+        self.mcp_tool_providers: Dict[str, Union[MCPToolProvider, NativeToolProvider]] = {}  # Cache for tool providers
         self.config = config or {}
+        self.router = get_router(self.config.get("llm"))  # Shared endpoint pools for logical model names
         try:
             self.current_llm_config = load_llm_config(self.config, self.model)
         except ValueError:
@@ -189,14 +206,43 @@ class Swarm:
                 client_kwargs["api_key"] = self.current_llm_config["api_key"]
             if "base_url" in self.current_llm_config:
                 client_kwargs["base_url"] = self.current_llm_config["base_url"]
+            client_kwargs["max_retries"] = 0
 
             redacted_kwargs = redact_sensitive_data(client_kwargs, sensitive_keys=["api_key"])
             logger.debug(f"Initializing OpenAI client with kwargs: {redacted_kwargs}")
 
             client = OpenAI(**client_kwargs)
         self.client = client
+        self._clients[self._client_key(self.current_llm_config)] = client
 
         logger.info("Swarm initialized successfully.")
+
+    @staticmethod
+    def _client_key(llm_config: dict) -> tuple:
+        return (llm_config.get("base_url"), llm_config.get("api_key"))
+
+    def _get_client(self, llm_config: dict):
+        """
+        Return the OpenAI client for the given LLM profile, creating it on first use.
+
+        Clients are cached per (base_url, api_key) instead of replacing `self.client`,
+        so concurrent runs using different profiles never swap clients under each other.
+        """
+        key = self._client_key(llm_config)
+        client = self._clients.get(key)
+        if client is None:
+            client_kwargs = {}
+            if "api_key" in llm_config:
+                client_kwargs["api_key"] = llm_config["api_key"]
+            if "base_url" in llm_config:
+                client_kwargs["base_url"] = llm_config["base_url"]
+            # Retries are handled by `call_with_resilience`, not stacked inside the SDK.
+            client_kwargs["max_retries"] = 0
+            redacted_kwargs = redact_sensitive_data(client_kwargs, sensitive_keys=["api_key"])
+            logger.debug(f"Initializing OpenAI client with kwargs: {redacted_kwargs}")
+            client = OpenAI(**client_kwargs)
+            self._clients[key] = client
+        return client
         
     def register_agent_functions_with_nemo(self, agent: Agent) -> None:
         """
@@ -243,6 +289,27 @@ class Swarm:
             except Exception as e:
                 logger.error(f"Error registering function '{action_name}': {e}")
 
+    def _create_tool_provider(self, server_name: str, server_config: Dict[str, Any]):
+        """
+        Create the tool provider for an MCP server.
+
+        Servers configured with `"mode": "native"` are served in-process when a
+        native implementation exists; everything else runs over stdio.
+
+        Args:
+            server_name (str): The name of the server in `mcpServers`.
+            server_config (dict): The server's configuration.
+
+        Returns:
+            Union[MCPToolProvider, NativeToolProvider]: The provider.
+        """
+        if is_native(server_config):
+            provider = create_native_provider(server_name, server_config)
+            if provider is not None:
+                return provider
+            logger.warning(f"No native implementation for MCP server '{server_name}'; using stdio.")
+        return MCPToolProvider(server_name, server_config)
+
     async def discover_and_merge_agent_tools(self, agent: Agent, debug: bool = False) -> List[AgentFunction]:
         """
         Discover and merge tools for the given agent from assigned MCP servers.
@@ -270,9 +337,9 @@ class Swarm:
 
             if server_name not in self.mcp_tool_providers:
                 try:
-                    tool_provider = MCPToolProvider(server_name, server_config)
+                    tool_provider = self._create_tool_provider(server_name, server_config)
                     self.mcp_tool_providers[server_name] = tool_provider
-                    logger.debug(f"Initialized MCPToolProvider for server '{server_name}'.")
+                    logger.debug(f"Initialized {type(tool_provider).__name__} for server '{server_name}'.")
                 except Exception as e:
                     logger.error(f"Failed to initialize MCPToolProvider for server '{server_name}': {e}", exc_info=True)
                     if debug:
@@ -303,6 +370,230 @@ class Swarm:
         
         return all_functions
 
+    async def compile_agent(self, agent: Agent, agent_names=None, debug: bool = False) -> CompiledAgent:
+        """
+        Discover the agent's MCP tools and freeze them into a `CompiledAgent`.
+
+        Args:
+            agent (Agent): The agent to compile. It is not modified.
+            agent_names (Iterable[str], optional): Agents that handoff functions may target.
+                Defaults to the agents registered on this Swarm.
+            debug (bool): Whether to enable additional debug logging.
+
+        Returns:
+            CompiledAgent: The compiled agent.
+        """
+        functions = await self.discover_and_merge_agent_tools(agent, debug=debug)
+        names = set(agent_names if agent_names is not None else self.agents)
+        names.add(agent.name)
+        handoffs = find_handoff_targets(agent.functions, names)
+        return CompiledAgent(agent, functions, handoffs)
+
+    async def compile_agent_graph(
+        self,
+        agents: Optional[Dict[str, Agent]] = None,
+        debug: bool = False,
+        agent_names=None,
+    ) -> AgentGraph:
+        """
+        Compile an immutable agent graph (agents, tool manifests, handoff edges).
+
+        Agents are compiled concurrently, so servers shared by several agents are
+        discovered once per graph rather than once per agent in sequence.
+
+        Args:
+            agents (Optional[Dict[str, Agent]]): Agents to compile. Defaults to `self.agents`.
+            debug (bool): Whether to enable additional debug logging.
+            agent_names (Iterable[str], optional): Agents that handoff functions may target.
+                Defaults to the names in `agents`.
+
+        Returns:
+            AgentGraph: The compiled graph, safe to share between concurrent runs.
+        """
+        agents = dict(agents if agents is not None else self.agents)
+        names = set(agent_names if agent_names is not None else agents)
+        compiled = await asyncio.gather(
+            *(self.compile_agent(agent, agent_names=names, debug=debug) for agent in agents.values())
+        )
+        graph = AgentGraph({c.name: c for c in compiled})
+        logger.debug(f"Compiled agent graph: {graph}")
+        return graph
+
+    def publish_agent_graph(self, graph: AgentGraph) -> AgentGraph:
+        """
+        Merge the compiled agents of `graph` into `self.agent_graph`.
+
+        The merged graph replaces `self.agent_graph` by reference; runs already holding
+        the previous graph keep using it unchanged.
+
+        Args:
+            graph (AgentGraph): Newly compiled agents.
+
+        Returns:
+            AgentGraph: The graph now published on this Swarm.
+        """
+        with self._graph_lock:
+            current = self.agent_graph
+            if current is None:
+                self.agent_graph = graph
+                return graph
+            merged = dict(current.agents)
+            for name, compiled in graph.agents.items():
+                existing = merged.get(name)
+                if existing is None or existing.source is not compiled.source:
+                    merged[name] = compiled
+            self.agent_graph = AgentGraph(merged)
+            return self.agent_graph
+
+    def prefetch_agent_graph(
+        self,
+        start_agent: Agent,
+        agents: Optional[Dict[str, Agent]] = None,
+        debug: bool = False,
+        max_concurrency: int = 4,
+    ) -> Optional[threading.Thread]:
+        """
+        Compile every agent reachable from `start_agent` in a background thread.
+
+        Handoff edges are resolved statically from the agents' handoff functions, then
+        targets are compiled nearest-first and published into `self.agent_graph` as soon
+        as each one is ready. Tool discovery also spawns each MCP server once, which
+        installs and warms it before the first real call. A handoff that arrives before
+        its target is ready waits for the in-flight compile instead of starting another.
+
+        Args:
+            start_agent (Agent): The agent runs start from; it is assumed to be compiled already.
+            agents (Optional[Dict[str, Agent]]): Agents to consider. Defaults to `self.agents`.
+            debug (bool): Whether to enable additional debug logging.
+            max_concurrency (int): Maximum number of agents compiled at the same time.
+
+        Returns:
+            Optional[threading.Thread]: The prefetch thread, or None if nothing needs compiling.
+        """
+        agents = dict(agents if agents is not None else self.agents)
+        names = set(agents) | {start_agent.name}
+        edges = {name: find_handoff_targets(agent.functions, names) for name, agent in agents.items()}
+        reachable = handoff_order(edges, start_agent.name)
+        # Reachable agents first, then anything only reachable via explicit set_active_agent.
+        order = reachable + sorted(name for name in agents if name not in reachable and name != start_agent.name)
+        logger.debug(f"Handoff graph from '{start_agent.name}': {dict(edges)}; prefetch order: {order}")
+
+        graph = self.agent_graph or AgentGraph({})
+        pending = {}
+        for name in order:
+            compiled = graph.get(name)
+            if compiled is not None and compiled.matches(agents[name]):
+                continue
+            if name in self._pending_compiles:
+                continue
+            pending[name] = Future()
+            self._pending_compiles[name] = pending[name]
+        if not pending:
+            return None
+
+        async def compile_one(name: str, semaphore: asyncio.Semaphore) -> None:
+            future = pending[name]
+            try:
+                async with semaphore:
+                    compiled = await self.compile_agent(agents[name], agent_names=names, debug=debug)
+                self.publish_agent_graph(AgentGraph({compiled.name: compiled}))
+                future.set_result(compiled)
+                logger.debug(f"Prefetched tools for agent '{name}'.")
+            except Exception as e:
+                logger.error(f"Failed to prefetch tools for agent '{name}': {e}")
+                future.set_exception(e)
+            finally:
+                if self._pending_compiles.get(name) is future:
+                    del self._pending_compiles[name]
+
+        async def prefetch() -> None:
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            await asyncio.gather(*(compile_one(name, semaphore) for name in pending))
+
+        thread = threading.Thread(target=asyncio.run, args=(prefetch(),), name="swarm-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def _graph_for(self, agent: Agent, agent_graph: Optional[AgentGraph], debug: bool) -> AgentGraph:
+        """
+        Return a graph containing a compiled version of `agent`.
+
+        Agents missing from the graph are taken from the latest `self.agent_graph`, from an
+        in-flight background prefetch, or compiled once on demand. New graphs are swapped
+        into `self.agent_graph` by reference so in-flight runs are unaffected.
+        """
+        graph = agent_graph or self.agent_graph or AgentGraph({})
+        compiled = graph.get(agent.name)
+        if compiled is not None and compiled.matches(agent):
+            return graph
+
+        latest = self.agent_graph.get(agent.name) if self.agent_graph is not None else None
+        pending = self._pending_compiles.get(agent.name)
+        if latest is not None and latest.matches(agent):
+            compiled = latest
+        elif pending is not None:
+            logger.debug(f"Waiting for background prefetch of agent '{agent.name}'.")
+            try:
+                compiled = pending.result()
+            except Exception:
+                compiled = None
+            if compiled is not None and not compiled.matches(agent):
+                compiled = None
+
+        if compiled is None or not compiled.matches(agent):
+            logger.debug(f"Agent '{agent.name}' is not in the compiled graph; compiling it now.")
+            compiled = asyncio.run(self.compile_agent(agent, agent_names=set(graph) | set(self.agents), debug=debug))
+            if agent_graph is None:
+                return self.publish_agent_graph(AgentGraph({compiled.name: compiled}))
+        return graph.with_agent(compiled)
+
+    def create_run_context(
+        self,
+        agent: Agent,
+        context_variables: dict,
+        model_override: Optional[str] = None,
+        debug: bool = False,
+        agent_graph: Optional[AgentGraph] = None,
+    ) -> RunContext:
+        """
+        Build the per-run execution state for a conversation starting at `agent`.
+
+        Args:
+            agent (Agent): The starting agent.
+            context_variables (dict): Context variables for the run; layered under the run's
+                own writes, never modified or deep-copied.
+            model_override (Optional[str]): Model override if any.
+            debug (bool): Whether to enable debug logging.
+            agent_graph (Optional[AgentGraph]): Compiled graph to run against.
+                Defaults to `self.agent_graph`, compiling missing agents on demand.
+
+        Returns:
+            RunContext: The execution context for a single run.
+        """
+        graph = self._graph_for(agent, agent_graph, debug)
+        return RunContext(
+            graph=graph,
+            active=graph[agent.name],
+            context_variables=ContextVariables(context_variables),
+            model_override=model_override,
+            debug=debug,
+            trace=debug or trace_sampler.sample(logger),
+        )
+
+    def _resolve_handoff(self, agent: Agent, run_context: Optional[RunContext], debug: bool) -> Optional[CompiledAgent]:
+        """Return the compiled target of a handoff, or None if the agent is unknown."""
+        graph = run_context.graph if run_context else self.agent_graph
+        if graph is not None:
+            compiled = graph.get(agent.name)
+            if compiled is not None:
+                return compiled
+        if agent.name not in self.agents:
+            return None
+        graph = self._graph_for(agent, run_context.graph if run_context else None, debug)
+        if run_context:
+            run_context.graph = graph
+        return graph[agent.name]
+
     def get_chat_completion(
         self,
         agent: Agent,
@@ -311,54 +602,45 @@ class Swarm:
         model_override: Optional[str],
         stream: bool,
         debug: bool,
+        tools: Optional[List[Dict[str, Any]]] = None,
     ) -> ChatCompletionMessage:
-        """Prepare and send a chat completion request to the OpenAI API."""
-        new_llm_config = self.config.get("llm", {}).get(agent.model or "default")
-        if new_llm_config is None:
-            logger.warning(f"LLM config for model '{agent.model}' not found. Falling back to 'default'.")
-            new_llm_config = self.config.get("llm", {}).get("default", {})
-
-        if not new_llm_config.get("api_key"):
-            if not os.getenv("SUPPRESS_DUMMY_KEY"):
-                new_llm_config["api_key"] = "sk-DUMMYKEY"
-            else:
-                logger.debug("SUPPRESS_DUMMY_KEY is set; leaving API key empty.")
+        """
+        Prepare and send a chat completion request to the OpenAI API.
 
-        old_llm_config = self.current_llm_config.copy() if self.current_llm_config else {}
-        if not self.current_llm_config or \
-           old_llm_config.get("base_url") != new_llm_config.get("base_url") or \
-           old_llm_config.get("api_key") != new_llm_config.get("api_key"):
-            client_kwargs = {}
-            if "api_key" in new_llm_config:
-                client_kwargs["api_key"] = new_llm_config["api_key"]
-            if "base_url" in new_llm_config:
-                client_kwargs["base_url"] = new_llm_config["base_url"]
-            redacted_kwargs = redact_sensitive_data(client_kwargs, sensitive_keys=["api_key"])
-            logger.debug(f"Reinitializing OpenAI client with kwargs: {redacted_kwargs}")
-            self.client = OpenAI(**client_kwargs)
-        self.current_llm_config = new_llm_config.copy()
+        `tools` is the pre-serialized tool manifest of a compiled agent; when omitted
+        it is built from `agent.functions`.
+        """
+        llm_name = agent.model or "default"
+        llm_config = self.config.get("llm", {}).get(llm_name)
+        if llm_config is None:
+            logger.warning(f"LLM config for model '{agent.model}' not found. Falling back to 'default'.")
+            llm_name = "default"
+            llm_config = self.config.get("llm", {}).get("default", {})
+        pool = self.router.pool(llm_name)
 
-        context_variables = defaultdict(str, context_variables)
+        context_variables = DefaultView(context_variables)
 
         instructions = (agent.instructions(context_variables) if callable(agent.instructions) else agent.instructions)
 
         messages = [{"role": "system", "content": instructions}]
         
+        # History messages are immutable and hashable; identical ones are sent once.
         seen_message_ids = set()
         for msg in history:
-            msg_id = msg.get("id", hash(json.dumps(msg, sort_keys=True, default=serialize_datetime)))
+            msg = Message.coerce(msg)
+            msg_id = msg.get("id", msg)
             if msg_id in seen_message_ids:
                 continue
             seen_message_ids.add(msg_id)
-            messages.append(msg)
+            messages.append(msg.to_dict())
 
         messages = filter_duplicate_system_messages(messages)
 
-        serialized_functions = [function_to_json(f) for f in agent.functions]
-        tools = [func_dict for func_dict in serialized_functions]
+        if tools is None:
+            tools = [function_to_json(f) for f in agent.functions]
 
         create_params = {
-            "model": model_override or new_llm_config.get("model"),
+            "model": model_override or llm_config.get("model"),
             "messages": messages,
             "stream": stream,
         }
@@ -372,17 +654,15 @@ class Swarm:
         if hasattr(agent, "response_format") and agent.response_format:
             create_params["response_format"] = agent.response_format
 
-        if "temperature" in new_llm_config:
-            create_params["temperature"] = new_llm_config["temperature"]
+        if "temperature" in llm_config:
+            create_params["temperature"] = llm_config["temperature"]
 
         # Ensure `response_format` is passed if agent specifies it
         if agent.response_format:
             create_params["response_format"] = agent.response_format
 
-        try:
-            logger.debug(f"[DEBUG] Chat completion payload: {json.dumps(create_params, indent=2, default=serialize_datetime)}")
-        except Exception as e:
-            logger.error(f"⚠️ Failed to serialize chat completion payload: {e}")
+        if debug:
+            logger.debug("Chat completion payload: %s", lazy_json(create_params, default=serialize_datetime))
 
         try:
             if agent.nemo_guardrails_instance and messages[-1].get('content'):
@@ -401,21 +681,74 @@ class Swarm:
 
                 logger.debug(f"🔹 Using NeMo Guardrails for agent: {agent.name}")
                 response = agent.nemo_guardrails_instance.generate(messages=update_null_content(messages), options=options)
-                logger.debug(f"[DEBUG] Chat completion reesponse: {response}")
+                logger.debug("Chat completion response: %s", response)
                 return response
-            else:
+            elif pool is None:
                 logger.debug(f"🔹 Using OpenAI Completion for agent: {agent.name}")
-                return self.client.chat.completions.create(**json.loads(json.dumps(create_params, default=serialize_datetime)))
+                return self._send_completion(llm_config, create_params, stream)
+            else:
+                logger.debug(f"🔹 Routing completion for agent {agent.name} through LLM pool '{pool.name}'")
+
+                def send(endpoint):
+                    params = dict(create_params)
+                    if not model_override:
+                        params["model"] = endpoint.config.get("model")
+                    if "temperature" in endpoint.config:
+                        params["temperature"] = endpoint.config["temperature"]
+                    return self._send_completion(endpoint.config, params, stream, pooled=True)
+
+                return pool.call(send, stream=stream)
         except Exception as e:
             logger.debug(f"Error in chat completion request: {e}")
             raise
 
+    def _send_completion(self, llm_config: dict, create_params: Dict[str, Any], stream: bool, pooled: bool = False):
+        """
+        Send one completion request to the endpoint of `llm_config`, with retries and circuit breaking.
+
+        Args:
+            llm_config (dict): The endpoint's LLM profile.
+            create_params (dict): Parameters for `chat.completions.create`.
+            stream (bool): Whether a streaming response is requested.
+            pooled (bool): True when called by an endpoint pool, which fails over to another
+                endpoint instead of retrying this one.
+
+        Returns:
+            The completion (or stream) returned by the OpenAI client.
+        """
+        llm_config = dict(llm_config)
+        if not llm_config.get("api_key"):
+            if not os.getenv("SUPPRESS_DUMMY_KEY"):
+                llm_config["api_key"] = "sk-DUMMYKEY"
+            else:
+                logger.debug("SUPPRESS_DUMMY_KEY is set; leaving API key empty.")
+
+        client = self._get_client(llm_config)
+        payload = json.loads(json.dumps(create_params, default=serialize_datetime))
+
+        def create(timeout: Optional[float]):
+            if timeout is None:
+                return client.chat.completions.create(**payload)
+            return client.chat.completions.create(**payload, timeout=timeout)
+
+        policy_defaults = {"timeout": llm_config.get("timeout")}
+        if pooled:
+            policy_defaults["max_attempts"] = 1
+        return call_with_resilience(
+            create,
+            backend=llm_backend(llm_config),
+            policy=RetryPolicy.from_config(llm_config.get("retry"), **policy_defaults),
+            breaker_config=llm_config.get("circuit_breaker"),
+            # Streams cannot be hedged; a duplicate would be consumed by nobody.
+            hedge_after=None if stream else llm_config.get("hedge_after"),
+        )
+
     def get_chat_completion_message(self, **kwargs):
         # Call the get_chat_completion method with kwargs
         completion = self.get_chat_completion(**kwargs)
 
         # Log the completion object for debugging
-        logger.debug(f"Completion object: {completion}")
+        logger.debug("Completion object: %s", completion)
 
         # Check if choices exists and has at least one element
         if hasattr(completion, 'choices') and len(completion.choices) > 0:
@@ -424,7 +757,7 @@ class Swarm:
                 return completion.choices[0].message
 
         # If any of the checks fail, treat the entire completion object as the message
-        logger.debug(f"Treating entire completion object as message: {completion}")
+        logger.debug("Treating entire completion object as message: %s", completion)
         return ChatMessage(content=json.dumps(completion.get("content")))
 
     def handle_function_result(self, result, debug) -> Result:
@@ -459,24 +792,31 @@ class Swarm:
 
     def handle_tool_calls(
         self,
-        tool_calls: List[ChatCompletionMessageToolCall],
+        tool_calls: List[Union[ToolCall, ChatCompletionMessageToolCall]],
         functions: List[AgentFunction],
         context_variables: dict,
         debug: bool,
+        run_context: Optional[RunContext] = None,
     ) -> Response:
         """
         Handles tool calls, executing functions and processing results.
 
         Args:
-            tool_calls (List[ChatCompletionMessageToolCall]): The list of tool calls to process.
+            tool_calls (List[ToolCall]): The tool calls to process (SDK tool call objects also work).
             functions (List[AgentFunction]): The list of available functions (tools).
-            context_variables (dict): Shared context variables for tools.
+            context_variables (dict): Context variables of the run. With `ContextVariables`,
+                each tool gets a snapshot whose changes are applied when it succeeds.
             debug (bool): Whether to enable debug logging.
+            run_context (Optional[RunContext]): Execution context of the current run, used to
+                resolve handoff targets from the compiled agent graph.
 
         Returns:
-            Response: A Response object with tool results.
+            Response: A Response object with the tool result `Message`s.
         """
-        function_map = {f.__name__: f for f in functions}
+        if run_context is not None and functions is run_context.active.functions:
+            function_map = run_context.active.function_map
+        else:
+            function_map = {f.__name__: f for f in functions}
         partial_response = Response(messages=[], agent=None, context_variables={})
 
         for tool_call in tool_calls:
@@ -486,19 +826,20 @@ class Swarm:
             if name not in function_map:
                 error_msg = f"Tool {name} not found in function map."
                 logger.error(error_msg)
-                partial_response.messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call_id,
-                    "tool_name": name,
-                    "content": f"Error: {error_msg}",
-                })
+                partial_response.messages.append(Message(
+                    role="tool", tool_call_id=tool_call_id, tool_name=name, content=f"Error: {error_msg}",
+                ))
                 continue
 
             func = function_map[name]
             args = json.loads(tool_call.function.arguments)
 
+            # A tool works on a snapshot; its changes are applied only if it succeeds.
+            scope = context_variables
             if __CTX_VARS_NAME__ in func.__code__.co_varnames:
-                args[__CTX_VARS_NAME__] = context_variables
+                if isinstance(context_variables, ContextVariables):
+                    scope = context_variables.snapshot()
+                args[__CTX_VARS_NAME__] = scope
 
             try:
                 if getattr(func, "dynamic", False):
@@ -510,38 +851,67 @@ class Swarm:
                         raw_result = asyncio.run(raw_result)
 
                 result = self.handle_function_result(raw_result, debug)
-                partial_response.messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call_id,
-                    "tool_name": name,
-                    "content": json.dumps(result.value),
-                })
+                if isinstance(context_variables, ContextVariables):
+                    if scope is not context_variables:
+                        changes = scope.changes()
+                        if changes:
+                            logger.debug(f"Tool {name} changed context variables: {sorted(map(str, changes))}")
+                            context_variables.apply(changes)
+                    context_variables.apply(result.context_variables)
+                partial_response.messages.append(Message(
+                    role="tool", tool_call_id=tool_call_id, tool_name=name, content=json.dumps(result.value),
+                ))
                 partial_response.context_variables.update(result.context_variables)
 
                 if result.agent:
-                    new_agent_name = result.agent.name
-                    if new_agent_name and new_agent_name in self.agents:
-                        partial_response.agent = result.agent
-                        context_variables["active_agent_name"] = new_agent_name
-                        logger.debug(f"🔄 Active agent updated to: {new_agent_name}")
-
-                        new_agent = self.agents[new_agent_name]
-                        new_agent.functions = asyncio.run(self.discover_and_merge_agent_tools(new_agent, debug=debug))
-                        logger.debug(f"✅ Reloaded tools for new agent: {new_agent_name}")
+                    compiled = self._resolve_handoff(result.agent, run_context, debug)
+                    if compiled is not None:
+                        partial_response.agent = compiled.agent
+                        context_variables["active_agent_name"] = compiled.name
+                        logger.debug(f"🔄 Active agent updated to: {compiled.name}")
 
             except Exception as e:
                 error_msg = f"Error executing tool {name}: {str(e)}"
                 logger.error(error_msg)
-                partial_response.messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call_id,
-                    "tool_name": name,
-                    "content": f"Error: {error_msg}",
-                })
+                partial_response.messages.append(Message(
+                    role="tool", tool_call_id=tool_call_id, tool_name=name, content=f"Error: {error_msg}",
+                ))
 
         return partial_response
 
-    def run_and_stream(
+    def _apply_partial_response(self, run_context: RunContext, partial_response: Response) -> None:
+        """Merge tool results into the run state and follow any handoff."""
+        run_context.context_variables.update(partial_response.context_variables)
+        if partial_response.agent:
+            run_context.switch_to(run_context.graph[partial_response.agent.name])
+            if run_context.debug:
+                logger.debug(f"Active agent switched to: {run_context.active.name}")
+
+    def _stream_tool_calls(
+        self, tool_calls: List[ToolCall], active: CompiledAgent, run_context: RunContext, debug: bool
+    ) -> Iterator[StreamEvent]:
+        """
+        Run one assistant message's tool calls, yielding tool and handoff events.
+
+        Returns (as the generator's value) the combined `Response` of all the calls.
+        """
+        combined = Response(messages=[], agent=None, context_variables={})
+        for tool_call in tool_calls:
+            yield ToolStartEvent(active.name, tool_call.id, tool_call.function.name, tool_call.function.arguments)
+            partial_response = self.handle_tool_calls(
+                [tool_call], active.functions, run_context.context_variables, debug, run_context=run_context
+            )
+            for message in partial_response.messages:
+                yield ToolEndEvent(active.name, message.tool_call_id, message.tool_name, message.content)
+            combined.messages.extend(partial_response.messages)
+            combined.context_variables.update(partial_response.context_variables)
+            if partial_response.agent:
+                combined.agent = partial_response.agent
+        if combined.agent and combined.agent.name != active.name:
+            yield HandoffEvent(active.name, combined.agent.name)
+        return combined
+
+    def run_stream(
         self,
         agent: Agent,
         messages: List[Dict[str, Any]],
@@ -550,9 +920,16 @@ class Swarm:
         debug: bool = False,
         max_turns: int = float("inf"),
         execute_tools: bool = True,
-    ):
+        agent_graph: Optional[AgentGraph] = None,
+    ) -> Iterator[StreamEvent]:
         """
-        Generator to run the conversation with streaming responses.
+        Run the conversation, yielding typed events as it progresses.
+
+        Text and tool-call fragments arrive as `DeltaEvent`s and `ToolCallDeltaEvent`s
+        while the model streams them, followed by a `MessageEvent` per assistant
+        message; each tool call is bracketed by `ToolStartEvent`/`ToolEndEvent`, a
+        handoff yields a `HandoffEvent`, and the run ends with a `FinalEvent` holding
+        the same `Response` that `run` returns. See `swarm.events` for the schema.
 
         Args:
             agent (Agent): The agent to run.
@@ -562,105 +939,123 @@ class Swarm:
             debug (bool): Whether to enable debug logging.
             max_turns (int): Maximum number of turns to execute.
             execute_tools (bool): Whether to execute tools.
+            agent_graph (Optional[AgentGraph]): Compiled agent graph to run against.
 
         Yields:
-            dict: Chunks of the response.
+            StreamEvent: The events of the run.
         """
-        active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
+        run_context = self.create_run_context(agent, context_variables, model_override, debug, agent_graph)
+        history = as_messages(messages)
         init_len = len(messages)
 
-        context_variables["active_agent_name"] = active_agent.name
-        if debug:
-            logger.debug(f"Initial active_agent_name set to: {active_agent.name}")
-
-        all_functions = asyncio.run(self.discover_and_merge_agent_tools(agent, debug=debug))
-        active_agent.functions = all_functions
-
         while len(history) - init_len < max_turns:
-            message = {
-                "content": "",
-                "sender": active_agent.name,
-                "role": "assistant",
-                "function_call": None,
-                "tool_calls": defaultdict(lambda: {"function": {"arguments": "", "name": ""}, "id": "", "type": ""}),
-            }
-
+            active = run_context.active
             try:
                 completion = self.get_chat_completion(
-                    agent=active_agent,
+                    agent=active.agent,
                     history=history,
-                    context_variables=context_variables,
+                    context_variables=run_context.context_variables,
                     model_override=model_override,
                     stream=True,
-                    debug=debug,
+                    debug=run_context.trace,
+                    tools=active.tool_manifest(),
                 )
+            except ResilienceError:
+                raise
             except Exception as e:
                 logger.error(f"Failed to get chat completion: {e}")
-                if debug:
-                    logger.debug(f"[DEBUG] Exception during get_chat_completion: {e}")
                 break
 
-            yield {"delim": "start"}
+            assembler = StreamAssembler(active.name)
             for chunk in completion:
-                try:
-                    delta = chunk.choices[0].delta
-                except Exception as e:
-                    logger.debug(f"[ERROR] Failed to process chunk: {e}")
-                    continue
-
-                if delta.get("role") == "assistant":
-                    message["role"] = "assistant"
-                if "sender" not in message:
-                    message["sender"] = active_agent.name
-                yield delta
-
-                merge_chunk(message, delta)
-            yield {"delim": "end"}
-
-            message["tool_calls"] = list(message.get("tool_calls", {}).values())
-            if not message["tool_calls"]:
-                message["tool_calls"] = None
-            logger.debug(f"Received completion: {message}")
+                # Chunks without choices (e.g. a trailing usage chunk) carry no delta.
+                choices = getattr(chunk, "choices", None)
+                if choices:
+                    yield from assembler.add(choices[0].delta)
+
+            message = assembler.message()
+            if run_context.trace:
+                logger.debug("Received completion: %s", message)
             history.append(message)
+            yield MessageEvent(active.name, message)
 
-            if not message["tool_calls"] or not execute_tools:
-                logger.debug("No tool calls or tool execution disabled. Ending turn.")
+            if not message.tool_calls or not execute_tools:
                 break
 
-            tool_calls = []
-            for tool_call in message["tool_calls"]:
-                function = Function(
-                    arguments=tool_call["function"]["arguments"],
-                    name=tool_call["function"]["name"],
-                )
-                tool_call_object = ChatCompletionMessageToolCall(
-                    id=tool_call["id"],
-                    function=function,
-                    type=tool_call["type"]
-                )
-                tool_calls.append(tool_call_object)
-
-            partial_response = self.handle_tool_calls(
-                tool_calls, active_agent.functions, context_variables, debug
-            )
+            partial_response = yield from self._stream_tool_calls(message.tool_calls, active, run_context, debug)
             history.extend(partial_response.messages)
-            context_variables.update(partial_response.context_variables)
+            self._apply_partial_response(run_context, partial_response)
 
-            if partial_response.agent:
-                active_agent = partial_response.agent
-                context_variables["active_agent_name"] = active_agent.name
-                if debug:
-                    logger.debug(f"Active agent switched to: {active_agent.name}")
+        yield FinalEvent(Response(
+            messages=history[init_len:],
+            agent=run_context.agent,
+            context_variables=run_context.context_variables.to_dict(),
+        ))
 
-        yield {
-            "response": Response(
-                messages=history[init_len:],
-                agent=active_agent,
-                context_variables=context_variables,
-            )
-        }
+    def run_and_stream(
+        self,
+        agent: Agent,
+        messages: List[Dict[str, Any]],
+        context_variables: dict = {},
+        model_override: Optional[str] = None,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+        agent_graph: Optional[AgentGraph] = None,
+    ):
+        """
+        Generator to run the conversation with streaming responses, in the original Swarm chunk format.
+
+        Built on `run_stream`. Each assistant message is yielded as `{"delim": "start"}`,
+        its deltas as fresh dicts (`{"role", "sender", "content"}` or
+        `{"role", "sender", "tool_calls": [...]}`) and `{"delim": "end"}`; the run ends
+        with `{"response": Response}`.
+
+        Args:
+            agent (Agent): The agent to run.
+            messages (List[Dict[str, Any]]): Initial messages in the conversation.
+            context_variables (dict, optional): Context variables for the conversation.
+            model_override (Optional[str], optional): Model override if any.
+            debug (bool): Whether to enable debug logging.
+            max_turns (int): Maximum number of turns to execute.
+            execute_tools (bool): Whether to execute tools.
+            agent_graph (Optional[AgentGraph]): Compiled agent graph to run against.
+
+        Yields:
+            dict: Chunks of the response.
+        """
+        started = False
+        for event in self.run_stream(
+            agent=agent,
+            messages=messages,
+            context_variables=context_variables,
+            model_override=model_override,
+            debug=debug,
+            max_turns=max_turns,
+            execute_tools=execute_tools,
+            agent_graph=agent_graph,
+        ):
+            if isinstance(event, (DeltaEvent, ToolCallDeltaEvent, MessageEvent)) and not started:
+                yield {"delim": "start"}
+                started = True
+            if isinstance(event, DeltaEvent):
+                yield {"role": "assistant", "sender": event.agent, "content": event.content}
+            elif isinstance(event, ToolCallDeltaEvent):
+                yield {
+                    "role": "assistant",
+                    "sender": event.agent,
+                    "tool_calls": [{
+                        "index": event.index,
+                        "id": event.id,
+                        "type": "function",
+                        "function": {"name": event.name or "", "arguments": event.arguments},
+                    }],
+                }
+            elif isinstance(event, MessageEvent):
+                yield {"delim": "end"}
+                started = False
+            elif isinstance(event, FinalEvent):
+                yield {"response": event.response}
 
     def run(
         self,
@@ -672,12 +1067,16 @@ class Swarm:
         debug: bool = False,
         max_turns: int = float("inf"),
         execute_tools: bool = True,
+        agent_graph: Optional[AgentGraph] = None,
     ) -> Response:
         """
         Runs the conversation synchronously.
+
+        The shared agents are never mutated: tools come from the compiled `agent_graph`
+        (or `self.agent_graph`), and all per-run state lives in a `RunContext`.
+        Completion errors end the run, except `ResilienceError` (open circuit or
+        expired deadline), which is raised so callers can answer 503/504.
         """
-        all_functions = asyncio.run(self.discover_and_merge_agent_tools(agent, debug=debug))
-        agent.functions = all_functions
         if stream:
             return self.run_and_stream(
                 agent=agent,
@@ -687,55 +1086,53 @@ class Swarm:
                 debug=debug,
                 max_turns=max_turns,
                 execute_tools=execute_tools,
+                agent_graph=agent_graph,
             )
-        active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
+        run_context = self.create_run_context(agent, context_variables, model_override, debug, agent_graph)
+        history = as_messages(messages)
         init_len = len(messages)
 
-        context_variables["active_agent_name"] = active_agent.name
-
         turn_count = 0
-        while turn_count < max_turns and active_agent:
+        while turn_count < max_turns:
             turn_count += 1
+            active = run_context.active
 
             try:
 
                 message = self.get_chat_completion_message(
-                    agent=active_agent,
+                    agent=active.agent,
                     history=history,
-                    context_variables=context_variables,
+                    context_variables=run_context.context_variables,
                     model_override=model_override,
                     stream=stream,
-                    debug=debug,
+                    debug=run_context.trace,
+                    tools=active.tool_manifest(),
                 )
+            except ResilienceError:
+                raise
             except Exception as e:
                 logger.error(f"Failed to extract message from completion: {e}")
                 break
 
-            message.sender = active_agent.name
+            message.sender = active.name
+            message = Message.coerce(message)
 
             raw_content = message.content or ""
             has_tool_calls = bool(message.tool_calls) or (message.function_call is not None)
 
-            if debug:
+            if run_context.trace:
                 logger.debug(
-                    f"[DEBUG] Received message from {message.sender}, raw_content={raw_content!r}, has_tool_calls={has_tool_calls}"
+                    "Received message from %s, raw_content=%r, has_tool_calls=%s", message.sender, raw_content, has_tool_calls
                 )
 
-            history.append(json.loads(message.model_dump_json()))
+            history.append(message)
 
             if has_tool_calls and execute_tools:
                 partial_response = self.handle_tool_calls(
-                    message.tool_calls, active_agent.functions, context_variables, debug
+                    message.tool_calls, active.functions, run_context.context_variables, debug, run_context=run_context
                 )
                 history.extend(partial_response.messages)
-                context_variables.update(partial_response.context_variables)
-
-                if partial_response.agent:
-                    active_agent = partial_response.agent
-                    context_variables["active_agent_name"] = active_agent.name
-                    logger.debug(f"Switched active agent to: {active_agent.name}")
+                self._apply_partial_response(run_context, partial_response)
                 continue
 
             if raw_content.strip():
@@ -749,8 +1146,8 @@ class Swarm:
         return Response(
             id=f"response-{uuid.uuid4()}",
             messages=final_messages,
-            agent=active_agent,
-            context_variables=context_variables,
+            agent=run_context.agent,
+            context_variables=run_context.context_variables.to_dict(),
         )
 
     def validate_message_sequence(self, messages):
@@ -865,9 +1262,6 @@ class Swarm:
             i += 1
 
         if debug:
-            try:
-                logger.debug("[DEBUG] Repaired message payload:\n" + json.dumps(final_sequence, indent=2, default=str))
-            except Exception as e:
-                logger.error(f"⚠️ Debug JSON serialization failed: {e}")
+            logger.debug("Repaired message payload:\n%s", lazy_json(final_sequence))
 
         return final_sequence
@@ -0,0 +1,13 @@
+"""
+Database configuration and connection pooling for Open Swarm.
+
+`database_settings` builds the `DATABASES["default"]` entry from the
+`DJANGO_DATABASE` / `POSTGRES_*` environment variables. The
+`swarm.db.postgresql_pool` engine adds a psycopg 3 connection pool
+(`psycopg_pool`) to Django's PostgreSQL backend. `swarm.db.sqlite` gives
+blueprint tools pooled in-process access to their own SQLite files.
+"""
+
+from .config import database_settings, env_flag
+
+__all__ = ["database_settings", "env_flag"]
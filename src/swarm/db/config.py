@@ -0,0 +1,79 @@
+"""
+Builds the default database settings from environment variables.
+
+PostgreSQL connections are persistent by default (`POSTGRES_CONN_MAX_AGE`,
+60 seconds) and health-checked before reuse (`POSTGRES_CONN_HEALTH_CHECKS`).
+
+With `POSTGRES_POOL=true` the `swarm.db.postgresql_pool` engine keeps a
+psycopg 3 pool per process instead. Closing a Django connection then returns
+it to the pool, so `CONN_MAX_AGE` is forced to 0: connections are reused
+across requests and across the threads ASGI handlers and
+`database_sync_to_async` run in, which per-thread persistent connections
+cannot do. Enable the pool for ASGI deployments.
+
+Pool sizing: `POSTGRES_POOL_MIN_SIZE` (2), `POSTGRES_POOL_MAX_SIZE` (10),
+`POSTGRES_POOL_TIMEOUT` (seconds to wait for a free connection, 10),
+`POSTGRES_POOL_MAX_IDLE` (600) and `POSTGRES_POOL_MAX_LIFETIME` (3600).
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+
+def env_flag(value: Optional[str], default: bool = False) -> bool:
+    if value is None or value == "":
+        return default
+    return value.lower() in ("true", "1", "t", "yes")
+
+
+def _postgres_settings(env: Mapping[str, str]) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if env.get("POSTGRES_CONNECT_TIMEOUT"):
+        options["connect_timeout"] = int(env["POSTGRES_CONNECT_TIMEOUT"])
+
+    pooled = env_flag(env.get("POSTGRES_POOL"))
+    if pooled:
+        options["pool"] = {
+            "min_size": int(env.get("POSTGRES_POOL_MIN_SIZE", "2")),
+            "max_size": int(env.get("POSTGRES_POOL_MAX_SIZE", "10")),
+            "timeout": float(env.get("POSTGRES_POOL_TIMEOUT", "10")),
+            "max_idle": float(env.get("POSTGRES_POOL_MAX_IDLE", "600")),
+            "max_lifetime": float(env.get("POSTGRES_POOL_MAX_LIFETIME", "3600")),
+        }
+
+    return {
+        "ENGINE": "swarm.db.postgresql_pool" if pooled else "django.db.backends.postgresql",
+        "NAME": env.get("POSTGRES_DB", "swarm"),
+        "USER": env.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": env.get("POSTGRES_PASSWORD", ""),
+        "HOST": env.get("POSTGRES_HOST", "localhost"),
+        "PORT": env.get("POSTGRES_PORT", "5432"),
+        # The pool owns connection lifetime; Django must hand connections back after each request.
+        "CONN_MAX_AGE": 0 if pooled else int(env.get("POSTGRES_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": env_flag(env.get("POSTGRES_CONN_HEALTH_CHECKS"), default=True),
+        "OPTIONS": options,
+    }
+
+
+def database_settings(base_dir: Path, env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    Return the `DATABASES["default"]` entry for `DJANGO_DATABASE` ("sqlite" or "postgres").
+
+    Args:
+        base_dir (Path): Project root, used for the default SQLite path.
+        env (Optional[Mapping[str, str]]): Environment to read; defaults to `os.environ`.
+
+    Returns:
+        Dict[str, Any]: The database settings.
+    """
+    env = os.environ if env is None else env
+    backend = env.get("DJANGO_DATABASE", "sqlite").lower()
+    if backend == "postgres":
+        return _postgres_settings(env)
+    if backend == "sqlite":
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": env.get("SQLITE_DB_PATH", str(base_dir / "db.sqlite3")),
+        }
+    raise ValueError(f"Invalid value for DJANGO_DATABASE: {backend}. Must be 'sqlite' or 'postgres'.")
@@ -0,0 +1,147 @@
+"""
+PostgreSQL backend with a per-process psycopg 3 connection pool.
+
+Django 4.2 has no built-in pooling, so this engine extends the stock backend:
+new connections are checked out of a `psycopg_pool.ConnectionPool` and
+closing a connection returns it. Configure it through `OPTIONS["pool"]`
+(a dict of `ConnectionPool` arguments, or True for the defaults); see
+`swarm.db.config` for the environment variables that build it.
+
+Exported metrics: `swarm_db_pool_connections{alias,state}` (in_use / idle),
+`swarm_db_pool_waiting{alias}`, and the checkout counters
+`swarm_db_pool_checkouts_total{alias}` and
+`swarm_db_pool_wait_seconds_total{alias}` (their ratio is the mean wait).
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base as postgresql_base
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+from swarm.utils.metrics import registry as metrics
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError:  # pragma: no cover - depends on the optional dependency
+    ConnectionPool = None
+
+# Keyed by (alias, dbname): the test runner renames the database of an existing alias.
+_pools: Dict[Tuple[str, str], Any] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, conn_params: Dict[str, Any], options: Dict[str, Any]):
+    """Return the pool for `alias` and its database, creating and opening it on first use."""
+    key = (alias, conn_params.get("dbname", ""))
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            if ConnectionPool is None or not is_psycopg3:
+                raise ImproperlyConfigured(
+                    "The swarm.db.postgresql_pool engine requires psycopg 3 and psycopg_pool "
+                    "(pip install 'psycopg[binary,pool]')."
+                )
+            options = dict(options)
+            if "check" not in options and hasattr(ConnectionPool, "check_connection"):
+                # Health-check connections as they are checked out (psycopg_pool >= 3.2).
+                options["check"] = ConnectionPool.check_connection
+            pool = ConnectionPool(kwargs=conn_params, name=f"swarm-{alias}", open=True, **options)
+            _pools[key] = pool
+        return pool
+
+
+def close_pools() -> None:
+    """Close every pool (for shutdown hooks and tests)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _pool_stats() -> List[Tuple[str, Dict[str, int]]]:
+    return [(alias, pool.get_stats()) for (alias, _), pool in list(_pools.items())]
+
+
+def _collect_connections() -> List[Tuple[str, Dict[str, str], float]]:
+    samples = []
+    for alias, stats in _pool_stats():
+        size, idle = stats.get("pool_size", 0), stats.get("pool_available", 0)
+        samples.append(("swarm_db_pool_connections", {"alias": alias, "state": "in_use"}, size - idle))
+        samples.append(("swarm_db_pool_connections", {"alias": alias, "state": "idle"}, idle))
+    return samples
+
+
+def _collect_waiting() -> List[Tuple[str, Dict[str, str], float]]:
+    return [("swarm_db_pool_waiting", {"alias": alias}, stats.get("requests_waiting", 0)) for alias, stats in _pool_stats()]
+
+
+metrics.register_collector(
+    "swarm_db_pool_connections", "Pooled database connections by state (in_use, idle).", _collect_connections,
+)
+metrics.register_collector(
+    "swarm_db_pool_waiting", "Requests waiting for a pooled database connection.", _collect_waiting,
+)
+
+
+class _PoolConnector:
+    """
+    Stands in for the psycopg module on a pooled wrapper, so Django's own
+    connection setup (isolation level, time zone, role) runs on connections
+    checked out of the pool.
+    """
+
+    def __init__(self, wrapper: "DatabaseWrapper"):
+        self._wrapper = wrapper
+
+    def connect(self, **conn_params):
+        wrapper = self._wrapper
+        pool = get_pool(wrapper.alias, conn_params, wrapper.pool_options)
+        started = time.perf_counter()
+        connection = pool.getconn()
+        labels = {"alias": wrapper.alias}
+        metrics.inc("swarm_db_pool_checkouts_total", labels=labels,
+                    help_text="Connections checked out of the database pool.")
+        metrics.inc("swarm_db_pool_wait_seconds_total", time.perf_counter() - started, labels=labels,
+                    help_text="Time spent waiting for pooled database connections.")
+        return connection
+
+    def __getattr__(self, name):
+        return getattr(postgresql_base.Database, name)
+
+
+class DatabaseWrapper(postgresql_base.DatabaseWrapper):
+    def __init__(self, settings_dict, alias="default"):
+        super().__init__(settings_dict, alias)
+        pool_options = self.settings_dict["OPTIONS"].get("pool", True)
+        self.pool_options = {} if pool_options is True else dict(pool_options)
+        # Connections to the maintenance database (test setup, createdb) are not pooled.
+        if self.settings_dict["NAME"]:
+            self.Database = _PoolConnector(self)
+
+    @property
+    def pooled(self) -> bool:
+        return isinstance(self.Database, _PoolConnector)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    def _close(self):
+        if self.connection is None or not self.pooled:
+            return super()._close()
+        with self.wrap_database_errors:
+            connection, self.connection = self.connection, None
+            pool = getattr(connection, "_pool", None)
+            if pool is None:
+                # The pool was closed since the checkout.
+                return connection.close()
+            # The pool rolls back or discards connections returned mid-transaction.
+            pool.putconn(connection)
@@ -0,0 +1,285 @@
+"""
+In-process SQLite access for blueprint-local databases.
+
+`SQLitePool` hands each thread its own connection to a database file,
+opened once with the same pragmas Django's own SQLite connections get (WAL
+journal, NORMAL sync, memory temp store, mmap, busy timeout) and a larger
+prepared-statement cache, so repeated queries skip both the connect and the
+SQL compile. Writes run in explicit `BEGIN IMMEDIATE` transactions and
+`executemany` commits bulk inserts in batches.
+
+`SQLiteTools` implements the tools of the sqlite MCP server
+(`read_query`, `write_query`, `create_table`, `list_tables`,
+`describe_table`, `append_insight`) on top of a pool, with the same
+arguments and result text, for blueprints that would otherwise spawn the
+server to reach a local file.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Applied to every connection; shared with swarm.settings.set_sqlite_optimizations.
+SQLITE_PRAGMAS: Tuple[Tuple[str, str], ...] = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("temp_store", "MEMORY"),
+    ("mmap_size", "30000000000"),
+    ("cache_size", "-5000"),
+    ("busy_timeout", "5000"),
+)
+
+DEFAULT_CACHED_STATEMENTS = 256
+DEFAULT_BATCH_SIZE = 500
+
+
+def apply_pragmas(cursor, pragmas: Sequence[Tuple[str, str]] = SQLITE_PRAGMAS) -> None:
+    for name, value in pragmas:
+        cursor.execute(f"PRAGMA {name}={value};")
+
+
+class SQLitePool:
+    """
+    Per-thread connections to one SQLite database file.
+
+    Args:
+        path (str): Database file (created if missing).
+        pragmas (Sequence[Tuple[str, str]]): Pragmas run on each new connection.
+        cached_statements (int): Prepared statements kept per connection.
+        timeout (float): Seconds to wait for a lock held by another connection.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pragmas: Sequence[Tuple[str, str]] = SQLITE_PRAGMAS,
+        cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+        timeout: float = 5.0,
+    ):
+        self.path = path
+        self.pragmas = tuple(pragmas)
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            # Autocommit; writes open their own transactions.
+            isolation_level=None,
+            # Each connection is only used by its thread, but close() may run elsewhere.
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        try:
+            apply_pragmas(cursor, self.pragmas)
+        finally:
+            cursor.close()
+        self._local.conn = conn
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.get_ident()] = conn
+        return conn
+
+    def _prune_dead_threads(self) -> None:
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._connections.pop(ident).close()
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        """Run a read query and return all rows."""
+        return self.connection().execute(sql, params).fetchall()
+
+    def query_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return self.connection().execute(sql, params).fetchone()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run the block in a write transaction on this thread's connection.
+
+        `BEGIN IMMEDIATE` takes the write lock up front, so concurrent writers
+        wait (up to the busy timeout) instead of failing mid-transaction.
+        Nested use joins the enclosing transaction.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Run one write statement in a transaction; return the affected row count."""
+        with self.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def executemany(self, sql: str, rows: Iterable[Sequence[Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """
+        Run `sql` for every row, committing every `batch_size` rows.
+
+        Args:
+            sql (str): A parameterised statement, usually an INSERT.
+            rows (Iterable[Sequence[Any]]): Parameters per statement; consumed lazily.
+            batch_size (int): Rows per transaction.
+
+        Returns:
+            int: Total rows affected.
+        """
+        total, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                total += self._write_batch(sql, batch)
+                batch = []
+        if batch:
+            total += self._write_batch(sql, batch)
+        return total
+
+    def _write_batch(self, sql: str, batch: List[Sequence[Any]]) -> int:
+        with self.transaction() as conn:
+            return conn.executemany(sql, batch).rowcount
+
+    def executescript(self, script: str) -> None:
+        """Run several statements (e.g. a schema) in one transaction."""
+        with self.transaction() as conn:
+            for statement in _split_statements(script):
+                conn.execute(statement)
+
+    def close(self) -> None:
+        """Close every connection of this pool."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+
+def _split_statements(script: str) -> List[str]:
+    statements, current = [], ""
+    for line in script.splitlines(True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path: str, **options) -> SQLitePool:
+    """
+    Return the process-wide pool for the database at `path`.
+
+    Args:
+        path (str): Database file; ":memory:" gets a pool of its own each call.
+        **options: `SQLitePool` options, used when the pool is created.
+
+    Returns:
+        SQLitePool: The shared pool.
+    """
+    if path == ":memory:":
+        return SQLitePool(path, **options)
+    key = os.path.realpath(path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = SQLitePool(key, **options)
+        return pool
+
+
+def close_pools() -> None:
+    """Close every shared pool (for shutdown hooks and tests)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+class SQLiteTools:
+    """
+    The sqlite MCP server's tools, run in-process against a `SQLitePool`.
+
+    Results are the text the server returns: `str()` of a list of row dicts,
+    or an error message starting with "Database error:" or "Error:".
+    """
+
+    def __init__(self, pool: SQLitePool):
+        self.pool = pool
+        self.insights: List[str] = []
+
+    def _run(self, func, *args) -> str:
+        try:
+            return func(*args)
+        except sqlite3.Error as e:
+            return f"Database error: {e}"
+        except Exception as e:
+            return f"Error: {e}"
+
+    def read_query(self, query: str) -> str:
+        """Execute a SELECT query on the SQLite database."""
+        def run(query):
+            if not query.strip().upper().startswith("SELECT"):
+                raise ValueError("Only SELECT queries are allowed for read_query")
+            return str([dict(row) for row in self.pool.query(query)])
+        return self._run(run, query)
+
+    def write_query(self, query: str) -> str:
+        """Execute an INSERT, UPDATE, or DELETE query on the SQLite database."""
+        def run(query):
+            if query.strip().upper().startswith("SELECT"):
+                raise ValueError("SELECT queries are not allowed for write_query")
+            return str([{"affected_rows": self.pool.execute(query)}])
+        return self._run(run, query)
+
+    def create_table(self, query: str) -> str:
+        """Create a new table in the SQLite database."""
+        def run(query):
+            if not query.strip().upper().startswith("CREATE TABLE"):
+                raise ValueError("Only CREATE TABLE statements are allowed")
+            self.pool.execute(query)
+            return "Table created successfully"
+        return self._run(run, query)
+
+    def list_tables(self) -> str:
+        """List all tables in the SQLite database."""
+        return self._run(lambda: str([dict(row) for row in self.pool.query(
+            "SELECT name FROM sqlite_master WHERE type='table'"
+        )]))
+
+    def describe_table(self, table_name: str) -> str:
+        """Get the schema information for a specific table."""
+        def run(table_name):
+            quoted = '"' + table_name.replace('"', '""') + '"'
+            return str([dict(row) for row in self.pool.query(f"PRAGMA table_info({quoted})")])
+        return self._run(run, table_name)
+
+    def append_insight(self, insight: str) -> str:
+        """Add a business insight to the memo."""
+        self.insights.append(insight)
+        return "Insight added to memo"
@@ -0,0 +1,152 @@
+# src/swarm/events.py
+
+"""
+Streaming Run Events
+
+`Swarm.run_stream` and `BlueprintBase.run_with_context_stream` yield these
+events while a conversation runs, so the CLI, the REST API (as server-sent
+events) and websockets can show text, tool activity and handoffs as they
+happen instead of waiting for the final `Response`.
+
+Every event has a `type` and a JSON-serializable `to_dict()`:
+
+    delta            text produced by an agent                  {agent, content}
+    tool_call_delta  a fragment of a tool call the model makes  {agent, index, id, name, arguments}
+    message          an assistant message is complete           {agent, message}
+    tool_start       a tool call is about to run                {agent, tool_call_id, name, arguments}
+    tool_end         a tool call finished                       {agent, tool_call_id, name, content}
+    handoff          the active agent changed                   {from_agent, to_agent}
+    final            the run is over                            {agent, messages, context_variables}
+
+Per assistant turn the order is: `delta` and `tool_call_delta` events as the
+provider streams them, one `message`, then for each tool call a `tool_start`
+and a `tool_end`, and a `handoff` if a tool switched agents. `final` comes
+last, once. Concatenating a turn's `delta` contents gives the message's text;
+concatenating the `arguments` of the `tool_call_delta`s with the same `index`
+gives that call's arguments (`id` and `name` are set on the fragments that carry
+them, normally the first).
+Events are created fresh by the Swarm; provider deltas are never passed on.
+"""
+
+from typing import Any, Dict, Optional
+
+from .messages import to_wire
+
+
+class StreamEvent:
+    """Base class of the events of a streamed run."""
+
+    __slots__ = ()
+    type = "event"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"type": self.type}
+        data.update((name, getattr(self, name)) for name in self.__slots__)
+        return data
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class DeltaEvent(StreamEvent):
+    """A piece of assistant text, in the order the model produced it."""
+
+    __slots__ = ("agent", "content")
+    type = "delta"
+
+    def __init__(self, agent: str, content: str):
+        self.agent = agent
+        self.content = content
+
+
+class ToolCallDeltaEvent(StreamEvent):
+    """A fragment of a tool call as the model streams it; `id` and `name` are None unless this fragment carries them."""
+
+    __slots__ = ("agent", "index", "id", "name", "arguments")
+    type = "tool_call_delta"
+
+    def __init__(self, agent: str, index: int, id: Optional[str], name: Optional[str], arguments: str):
+        self.agent = agent
+        self.index = index
+        self.id = id
+        self.name = name
+        self.arguments = arguments
+
+
+class MessageEvent(StreamEvent):
+    """An assistant message is complete; `message` is the `Message` added to the history."""
+
+    __slots__ = ("agent", "message")
+    type = "message"
+
+    def __init__(self, agent: str, message: Any):
+        self.agent = agent
+        self.message = message
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "agent": self.agent, "message": self.message.to_dict()}
+
+
+class ToolStartEvent(StreamEvent):
+    """A tool call requested by the model is about to run."""
+
+    __slots__ = ("agent", "tool_call_id", "name", "arguments")
+    type = "tool_start"
+
+    def __init__(self, agent: str, tool_call_id: str, name: str, arguments: str):
+        self.agent = agent
+        self.tool_call_id = tool_call_id
+        self.name = name
+        self.arguments = arguments
+
+
+class ToolEndEvent(StreamEvent):
+    """A tool call finished; `content` is the tool message sent back to the model."""
+
+    __slots__ = ("agent", "tool_call_id", "name", "content")
+    type = "tool_end"
+
+    def __init__(self, agent: str, tool_call_id: str, name: str, content: Any):
+        self.agent = agent
+        self.tool_call_id = tool_call_id
+        self.name = name
+        self.content = content
+
+
+class HandoffEvent(StreamEvent):
+    """A tool handed the conversation to another agent."""
+
+    __slots__ = ("from_agent", "to_agent")
+    type = "handoff"
+
+    def __init__(self, from_agent: str, to_agent: str):
+        self.from_agent = from_agent
+        self.to_agent = to_agent
+
+
+class FinalEvent(StreamEvent):
+    """
+    The run is over.
+
+    Args:
+        response (Response): The same `Response` the non-streaming run returns.
+        context_variables (Optional[Dict[str, Any]]): Context after the run;
+            defaults to the response's.
+    """
+
+    __slots__ = ("response", "context_variables")
+    type = "final"
+
+    def __init__(self, response: Any, context_variables: Optional[Dict[str, Any]] = None):
+        self.response = response
+        self.context_variables = response.context_variables if context_variables is None else context_variables
+
+    def to_dict(self) -> Dict[str, Any]:
+        agent = getattr(self.response, "agent", None)
+        return {
+            "type": self.type,
+            "agent": getattr(agent, "name", None),
+            "messages": to_wire(getattr(self.response, "messages", [])),
+            "context_variables": self.context_variables,
+        }
@@ -4,19 +4,20 @@ import logging
 import os
 import importlib.util
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from collections.abc import Mapping
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from nemoguardrails import LLMRails, RailsConfig  # type: ignore
 
+from swarm.context import ContextVariables
 from swarm.core import Swarm
+from swarm.events import DeltaEvent, FinalEvent, HandoffEvent, StreamEvent, ToolStartEvent
 from swarm.extensions.config.config_loader import load_server_config
 from swarm.repl import run_demo_loop
-from swarm.settings import DEBUG
 from swarm.utils.redact import redact_sensitive_data
 from dotenv import load_dotenv
 import argparse
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
 
 class BlueprintBase(ABC):
     """
@@ -163,18 +164,33 @@ class BlueprintBase(ABC):
         """
         raise NotImplementedError
 
+    @property
+    def agent_graph(self):
+        """The compiled agent graph shared by this blueprint's runs, if compiled."""
+        return getattr(self.swarm, "agent_graph", None)
+
     async def async_discover_agent_tools(self) -> None:
         """
-        Discover and register tools for each agent asynchronously.
+        Discover tools for the starting agent and compile the blueprint's agent graph.
+
+        Only the starting agent is compiled before the blueprint is ready; every agent
+        reachable from it through handoffs is prefetched in the background, so a later
+        handoff does not wait on tool discovery. Without a starting agent, all agents
+        are compiled up front.
         """
         logger.debug("Discovering tools for agents...")
-        for agent_name, agent in self.swarm.agents.items():
-            logger.debug(f"Discovering tools for agent: {agent_name}")
-            try:
-                tools = await self.swarm.discover_and_merge_agent_tools(agent)
-                logger.debug(f"Discovered tools for agent '{agent_name}': {tools}")
-            except Exception as e:
-                logger.error(f"Failed to discover tools for agent '{agent_name}': {e}")
+        agents = dict(self.swarm.agents)
+        start = self.starting_agent
+        try:
+            if start is not None and agents.get(getattr(start, "name", None)) is start:
+                graph = await self.swarm.compile_agent_graph({start.name: start}, agent_names=agents.keys())
+                self.swarm.publish_agent_graph(graph)
+                self.swarm.prefetch_agent_graph(start, agents)
+            else:
+                self.swarm.publish_agent_graph(await self.swarm.compile_agent_graph(agents))
+            logger.debug(f"Compiled agent graph: {self.agent_graph}")
+        except Exception as e:
+            logger.error(f"Failed to compile agent graph: {e}")
 
     def set_starting_agent(self, agent: Any) -> None:
         """
@@ -198,51 +214,102 @@ class BlueprintBase(ABC):
         logger.debug("Falling back to the starting agent as active agent.")
         return self.starting_agent
 
-    def run_with_context(self, messages: List[Dict[str, str]], context_variables: dict) -> dict:
+    def _request_context(self, context_variables: Mapping[str, Any]) -> Tuple[ContextVariables, Any]:
         """
-        Execute a task with the given messages and context variables.
+        Layer a request's context over the blueprint's own context variables and pick the agent to run.
 
-        Args:
-            messages (list): Conversation history.
-            context_variables (dict): Variables to maintain conversation context.
-
-        Returns:
-            dict: Response from Swarm and updated context variables.
+        Neither mapping is modified, so nothing leaks between requests.
         """
-        self.context_variables.update(context_variables)
-        logger.debug(f"Context variables before execution: {self.context_variables}")
+        context = ContextVariables(context_variables, self.context_variables)
+        logger.debug(f"Context variables before execution: {context}")
 
-        if "active_agent_name" not in self.context_variables:
+        if "active_agent_name" not in context:
             if self.starting_agent:
-                self.context_variables["active_agent_name"] = self.starting_agent.name
+                context["active_agent_name"] = self.starting_agent.name
                 logger.debug(f"active_agent_name not found, using starting agent: {self.starting_agent.name}")
             else:
                 logger.error("No starting agent set and active_agent_name is missing.")
                 raise ValueError("No active agent or starting agent available.")
 
-        active_agent = self.determine_active_agent()
+        active_agent = self.swarm.agents.get(context["active_agent_name"]) or self.determine_active_agent()
         logger.debug(f"Running with active agent: {active_agent.name}")
+        return context, active_agent
 
-        response = self.swarm.run(            
+    def _finish_request(self, context: ContextVariables, response: Any) -> Dict[str, Any]:
+        """Fold a finished run's context and active agent into the request context."""
+        response_context = getattr(response, "context_variables", None)
+        if isinstance(response_context, Mapping):
+            context.apply(response_context)
+
+        if response.agent:
+            context["active_agent_name"] = response.agent.name
+            logger.debug(f"Active agent updated to: {response.agent.name}")
+        return context.to_dict()
+
+    def run_with_context(self, messages: List[Dict[str, str]], context_variables: dict) -> dict:
+        """
+        Execute a task with the given messages and context variables.
+
+        The request's context is layered over the blueprint's own context variables
+        (its defaults); neither is modified, so nothing leaks between requests.
+
+        Args:
+            messages (list): Conversation history.
+            context_variables (dict): Variables to maintain conversation context.
+
+        Returns:
+            dict: Response from Swarm and updated context variables.
+        """
+        context, active_agent = self._request_context(context_variables)
+
+        response = self.swarm.run(
             agent=active_agent,
             messages=messages,
-            context_variables=self.context_variables,
+            context_variables=context,
             stream=False,
-            debug=True,
+            debug=False,
         )
 
-        logger.debug(f"Swarm response: {response}")
+        logger.debug("Swarm response: %s", response)
 
         # Ensure the response has the expected structure
         if not hasattr(response, 'messages'):
             logger.error("Response does not have 'messages' attribute.")
             response.messages = []
 
-        if response.agent:
-            self.context_variables["active_agent_name"] = response.agent.name
-            logger.debug(f"Active agent updated to: {response.agent.name}")
+        return {"response": response, "context_variables": self._finish_request(context, response)}
+
+    def run_with_context_stream(self, messages: List[Dict[str, str]], context_variables: dict) -> Iterator[StreamEvent]:
+        """
+        Streaming variant of `run_with_context`.
+
+        Yields the run's events (see `swarm.events`) as they happen. The last one is
+        a `FinalEvent` whose `response` and `context_variables` are what
+        `run_with_context` would have returned.
+
+        Args:
+            messages (list): Conversation history.
+            context_variables (dict): Variables to maintain conversation context.
+
+        Blueprints that override `run_with_context` but not this method keep their
+        behaviour: the run goes through their `run_with_context` and is reported as a
+        single final event.
+
+        Yields:
+            StreamEvent: Text deltas, tool starts and ends, handoffs, then the final event.
+        """
+        cls = type(self)
+        if cls.run_with_context is not BlueprintBase.run_with_context and cls.run_with_context_stream is BlueprintBase.run_with_context_stream:
+            result = self.run_with_context(messages, context_variables)
+            yield FinalEvent(result["response"], result["context_variables"])
+            return
 
-        return {"response": response, "context_variables": self.context_variables}
+        context, active_agent = self._request_context(context_variables)
+
+        for event in self.swarm.run_stream(agent=active_agent, messages=messages, context_variables=context):
+            if isinstance(event, FinalEvent):
+                event = FinalEvent(event.response, self._finish_request(context, event.response))
+            yield event
 
     def set_active_agent(self, agent_name: str) -> None:
         """
@@ -350,7 +417,6 @@ class BlueprintBase(ABC):
 
         print("Blueprint Interactive Mode 🐝")
         messages: List[Dict[str, str]] = []
-        agent = self.starting_agent
         first_user_input = True
 
         # Counter for updating the user goal
@@ -370,16 +436,8 @@ class BlueprintBase(ABC):
             messages.append({"role": "user", "content": user_input})
             message_count += 1
 
-            result = self.run_with_context(messages, self.context_variables or {})
-            swarm_response = result["response"]
-
-            if stream:
-                self._process_and_print_streaming_response(swarm_response)
-            else:
-                self._pretty_print_response(swarm_response.messages)
-
+            swarm_response = self._run_interactive_turn(messages, stream)
             messages.extend(swarm_response.messages)
-            agent = swarm_response.agent
 
             # Update user goal only if update_user_goal is enabled and the message count exceeds frequency
             if self.update_user_goal and (message_count - self.last_goal_update_count) >= self.update_user_goal_frequency:
@@ -402,14 +460,8 @@ class BlueprintBase(ABC):
                     conversation_summary,
                     last_assistant
                 ):
-                    result2 = self.run_with_context(messages, self.context_variables or {})
-                    swarm_response = result2["response"]
-                    if stream:
-                        self._process_and_print_streaming_response(swarm_response)
-                    else:
-                        self._pretty_print_response(swarm_response.messages)
+                    swarm_response = self._run_interactive_turn(messages, stream)
                     messages.extend(swarm_response.messages)
-                    agent = swarm_response.agent
 
                     conversation_summary = " ".join(
                         [msg["content"] for msg in messages[-4:] if msg.get("content")]
@@ -421,33 +473,46 @@ class BlueprintBase(ABC):
 
                 print("\033[93m[System]\033[0m: Task is complete.")
 
-    def _process_and_print_streaming_response(self, response):
-        """
-        Process and display the streaming response from Swarm.
-        """
-        content = ""
-        last_sender = ""
-        for chunk in response:
-            if "sender" in chunk:
-                last_sender = chunk["sender"]
-            if "content" in chunk and chunk["content"] is not None:
-                if not content and last_sender:
-                    print(f"\033[94m{last_sender}:\033[0m", end=" ", flush=True)
-                    last_sender = ""
-                print(chunk["content"], end="", flush=True)
-                content += chunk["content"]
-            if "tool_calls" in chunk and chunk["tool_calls"] is not None:
-                for tool_call in chunk["tool_calls"]:
-                    tool_function = tool_call["function"]
-                    name = getattr(tool_function, "name", None)
-                    if not name:
-                        name = tool_function.get("__name__", "Unnamed Tool")
-                    print(f"\033[94m{last_sender}: \033[95m{name}\033[0m()")
-            if "delim" in chunk and chunk["delim"] == "end" and content:
+    def _run_interactive_turn(self, messages: List[Dict[str, Any]], stream: bool) -> Any:
+        """Run one REPL turn, print it, and return the Swarm response."""
+        if stream:
+            result = self._process_and_print_streaming_response(
+                self.run_with_context_stream(messages, self.context_variables or {})
+            )
+        else:
+            result = self.run_with_context(messages, self.context_variables or {})
+            self._pretty_print_response(result["response"].messages)
+        # The interactive session owns the blueprint, so its context carries over between turns.
+        self.context_variables.update(result["context_variables"])
+        return result["response"]
+
+    def _process_and_print_streaming_response(self, events: Iterator[StreamEvent]) -> Dict[str, Any]:
+        """
+        Print the events of a streamed run as they arrive.
+
+        Returns:
+            dict: The final response and context variables, as `run_with_context` returns them.
+        """
+        speaker = None
+        for event in events:
+            if isinstance(event, DeltaEvent):
+                if speaker != event.agent:
+                    if speaker is not None:
+                        print()
+                    print(f"\033[94m{event.agent}:\033[0m", end=" ", flush=True)
+                    speaker = event.agent
+                print(event.content, end="", flush=True)
+                continue
+            if speaker is not None:
                 print()
-                content = ""
-            if "response" in chunk:
-                return chunk["response"]
+                speaker = None
+            if isinstance(event, ToolStartEvent):
+                print(f"\033[94m{event.agent}: \033[95m{event.name}\033[0m()")
+            elif isinstance(event, HandoffEvent):
+                print(f"\033[93m[System]\033[0m: {event.from_agent} handed off to {event.to_agent}.")
+            elif isinstance(event, FinalEvent):
+                return {"response": event.response, "context_variables": event.context_variables}
+        raise RuntimeError("Stream ended without a final event.")
 
     def _register_module(self, module_key: str, module_description: str) -> None:
         module_path = self.metadata.get(module_key)
@@ -18,16 +18,11 @@ import logging
 from typing import Any, Dict, List, Tuple, Optional
 from dotenv import load_dotenv
 from .server_config import save_server_config
-from swarm.settings import DEBUG
-from swarm.utils.redact import redact_sensitive_data
+from swarm.utils.logger_setup import Lazy, lazy_json
+from swarm.utils.redact import collect_secrets, redact_sensitive_data, register_secrets
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
-stream_handler = logging.StreamHandler()
-formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(name)s - %(message)s")
-stream_handler.setFormatter(formatter)
-logger.addHandler(stream_handler)
 config = {}
 
 # Load environment variables from .env
@@ -41,8 +36,9 @@ def process_config(config: dict) -> dict:
     """
     try:
         resolved_config = resolve_placeholders(config)
-        import json
-        logger.debug("Configuration after resolving placeholders: " + json.dumps(redact_sensitive_data(resolved_config)))
+        # Resolved keys and tokens are redacted wherever they show up in logs, not only under their own key.
+        register_secrets(collect_secrets(resolved_config))
+        logger.debug("Configuration after resolving placeholders: %s", lazy_json(resolved_config, indent=None, redact=True))
         disable_merge = os.getenv("DISABLE_MCP_MERGE", "false").lower() in ("true", "1", "yes")
         if not disable_merge:
             if os.name == "nt":
@@ -53,7 +49,7 @@ def process_config(config: dict) -> dict:
                 try:
                     with open(external_mcp_path, "r") as mcp_file:
                         mcp_config = json.load(mcp_file)
-                    logger.debug("Loaded external MCP settings: " + json.dumps(redact_sensitive_data(mcp_config)))
+                    logger.debug("Loaded external MCP settings: %s", lazy_json(mcp_config, indent=None, redact=True))
                     main_mcp = resolved_config.get("mcpServers", {})
                     external_mcp = mcp_config.get("mcpServers", {})
                     # Main config takes precedence over external MCP settings.
@@ -66,7 +62,7 @@ def process_config(config: dict) -> dict:
                             continue
                         merged_mcp[server] = server_config
                     resolved_config["mcpServers"] = merged_mcp
-                    logger.debug("Merged MCP servers configuration: " + json.dumps(merged_mcp))
+                    logger.debug("Merged MCP servers configuration: %s", lazy_json(merged_mcp, indent=None, redact=True))
                 except Exception as e:
                     logger.error(f"Failed to load or merge MCP settings from '{external_mcp_path}': {e}")
             else:
@@ -107,7 +103,7 @@ def resolve_placeholders(obj: Any) -> Any:
                 logger.warning(f"Environment variable '{var}' is not set but is referenced in the configuration. Placeholder will be left unresolved.")
                 # Do not replace the placeholder if the env variable is not set
                 continue
-            logger.debug(f"Resolved placeholder '${{{var}}}' with value '{redact_sensitive_data(env_value)}'")
+            logger.debug("Resolved placeholder '${%s}' with value '%s'", var, Lazy(redact_sensitive_data, env_value))
             obj = obj.replace(f'${{{var}}}', env_value)
         return obj
     else:
@@ -150,7 +146,7 @@ def load_server_config(file_path: Optional[str] = None) -> dict:
     try:
         with open(file_path, "r") as file:
             config = json.load(file)
-            logger.debug(f"Raw configuration loaded: {redact_sensitive_data(config)}")
+            logger.debug("Raw configuration loaded: %s", Lazy(redact_sensitive_data, config))
     except FileNotFoundError:
         logger.error(f"Configuration file not found at {file_path}")
         raise
@@ -161,6 +157,7 @@ def load_server_config(file_path: Optional[str] = None) -> dict:
     # Resolve placeholders recursively
     try:
         resolved_config = resolve_placeholders(config)
+        register_secrets(collect_secrets(resolved_config))
         # logger.debug(f"Configuration after resolving placeholders: {redact_sensitive_data(resolved_config)}")
 
         # Merge external MCP settings if merge is not disabled by env var
@@ -175,7 +172,7 @@ def load_server_config(file_path: Optional[str] = None) -> dict:
                 try:
                     with open(external_mcp_path, "r") as mcp_file:
                         mcp_config = json.load(mcp_file)
-                    logger.debug("Loaded external MCP settings: " + json.dumps(redact_sensitive_data(mcp_config)))
+                    logger.debug("Loaded external MCP settings: %s", lazy_json(mcp_config, indent=None, redact=True))
                     main_mcp = resolved_config.get("mcpServers", {})
                     external_mcp = mcp_config.get("mcpServers", {})
                     merged_mcp = main_mcp.copy()
@@ -186,7 +183,7 @@ def load_server_config(file_path: Optional[str] = None) -> dict:
                             continue
                         merged_mcp[server] = server_config
                     resolved_config["mcpServers"] = merged_mcp
-                    logger.debug("Merged MCP servers configuration: " + json.dumps(merged_mcp))
+                    logger.debug("Merged MCP servers configuration: %s", lazy_json(merged_mcp, indent=None, redact=True))
                 except Exception as e:
                     logger.error(f"Failed to load or merge MCP settings from '{external_mcp_path}': {e}")
             else:
@@ -220,7 +217,7 @@ def validate_mcp_server_env(mcp_servers: Dict[str, Any], required_servers: Optio
         logger.debug(f"Validating environment variables for MCP server '{server_name}'.")
         env_vars = server_config.get("env", {})
         for env_key, env_value in env_vars.items():
-            logger.debug(f"Checking environment variable '{env_key}' for server '{server_name}' with value '{redact_sensitive_data(env_value)}'")
+            logger.debug("Checking environment variable '%s' for server '%s' with value '%s'", env_key, server_name, Lazy(redact_sensitive_data, env_value))
             if env_value == "":
                 logger.debug(f"Environment variable '{env_key}' for MCP server '{server_name}' is optional and set to empty string.")
                 # Optional: Do not raise error if env_value is empty string
@@ -375,7 +372,7 @@ def load_llm_config(config: Optional[Dict[str, Any]] = None, llm_name: Optional[
         logger.error(error_message)
         raise ValueError(error_message)
     
-    logger.debug(f"Loaded LLM configuration for '{llm_name}': {redact_sensitive_data(llm_config)}")
+    logger.debug("Loaded LLM configuration for '%s': %s", llm_name, Lazy(redact_sensitive_data, llm_config))
     return llm_config
 
 def get_llm_model(config: Dict[str, Any], llm_name: Optional[str] = None) -> str:
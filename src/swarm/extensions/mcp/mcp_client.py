@@ -1,16 +1,16 @@
 import asyncio
 import logging
 import os
-from typing import Any, Dict, List, Callable
+from typing import Any, Dict, List, Callable, Optional
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from swarm.types import Tool
+from swarm.utils.resilience import RetryPolicy, async_call_with_resilience
 
 from .cache_utils import get_cache
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
 
 class MCPClient:
@@ -18,19 +18,30 @@ class MCPClient:
     Manages connections and interactions with MCP servers using the MCP Python SDK.
     """
 
-    def __init__(self, server_config: Dict[str, Any], timeout: int = 30):
+    def __init__(self, server_config: Dict[str, Any], timeout: int = 30, server_name: Optional[str] = None):
         """
         Initialize the MCPClient with server configuration.
 
+        Besides `command`, `args` and `env`, `server_config` may carry resilience settings:
+        `retry` (see `RetryPolicy.from_config`), `circuit_breaker`, `hedge_after` (seconds
+        before a duplicate request is sent) and `idempotent_tools`, the names of tools that
+        are safe to retry and hedge. Other tool calls are attempted once.
+
         Args:
             server_config (dict): Configuration dictionary for the MCP server.
             timeout (int): Timeout for operations in seconds.
+            server_name (Optional[str]): Name of the server, used to key its circuit breaker.
         """
         self.command = server_config.get("command", "npx")
         self.args = server_config.get("args", [])
         self.env = {**os.environ.copy(), **server_config.get("env", {})}
         self.timeout = timeout
         self._tool_cache: Dict[str, Tool] = {}
+        self.backend = f"mcp:{server_name or ' '.join([self.command, *self.args])}"
+        self.retry_policy = RetryPolicy.from_config(server_config.get("retry"), timeout=timeout)
+        self.breaker_config = server_config.get("circuit_breaker")
+        self.hedge_after = server_config.get("hedge_after")
+        self.idempotent_tools = frozenset(server_config.get("idempotent_tools", ()))
 
         # Initialize cache using the helper
         self.cache = get_cache()
@@ -67,48 +78,87 @@ class MCPClient:
         #     f"Starting tool discovery from MCP server '{self.server_name}' for agent '{agent.name}'."
         # )
 
-        # Otherwise, fetch tools from the server
+        # Otherwise, fetch tools from the server. Listing is idempotent, so it is retried and may be hedged.
+        try:
+            tools_response = await async_call_with_resilience(
+                self._request_tool_list,
+                backend=self.backend,
+                policy=self.retry_policy,
+                breaker_config=self.breaker_config,
+                hedge_after=self.hedge_after,
+            )
+
+            # Serialize tools for caching
+            serialized_tools = [
+                {
+                    'name': tool.name,
+                    'description': tool.description,
+                    'input_schema': tool.inputSchema,
+                }
+                for tool in tools_response.tools
+            ]
+
+            # Cache tools for 1 hour (no-op if DummyCache)
+            self.cache.set(cache_key, serialized_tools, 3600)
+            logger.debug(f"Cached {len(serialized_tools)} tools.")
+
+            tools = []
+            for tool in tools_response.tools:
+                input_schema = tool.inputSchema or {}
+                # Add tool with schema to the cache
+                cached_tool = Tool(
+                    name=tool.name,
+                    description=tool.description,
+                    input_schema=input_schema,
+                    func=self._create_tool_callable(tool.name),
+                )
+                self._tool_cache[tool.name] = cached_tool
+                tools.append(cached_tool)
+
+                logger.debug("Discovered tool: %s with schema: %s", tool.name, input_schema)
+
+            return tools
+
+        except Exception as e:
+            logger.error(f"Error listing tools: {e}")
+            raise RuntimeError("Failed to list tools.") from e
+
+    async def _request_tool_list(self, timeout: Optional[float]):
+        """
+        Start the server and request its tool list (a single attempt).
+
+        Args:
+            timeout (Optional[float]): Time budget for the attempt in seconds.
+
+        Returns:
+            The MCP `list_tools` response.
+        """
+        server_params = StdioServerParameters(command=self.command, args=self.args, env=self.env)
+        async with stdio_client(server_params) as (read, write):
+            async with ClientSession(read, write) as session:
+                logger.info("Requesting tool list from MCP server...")
+                return await asyncio.wait_for(session.list_tools(), timeout=timeout)
+
+    async def _call_tool_once(self, tool_name: str, kwargs: Dict[str, Any], timeout: Optional[float]) -> Any:
+        """
+        Start the server and invoke `tool_name` (a single attempt).
+
+        Args:
+            tool_name (str): The name of the tool.
+            kwargs (dict): Arguments for the tool.
+            timeout (Optional[float]): Time budget for the attempt in seconds.
+
+        Returns:
+            Any: The result of the tool execution.
+        """
         server_params = StdioServerParameters(command=self.command, args=self.args, env=self.env)
         async with stdio_client(server_params) as (read, write):
             async with ClientSession(read, write) as session:
-                try:
-                    logger.info("Requesting tool list from MCP server...")
-                    tools_response = await asyncio.wait_for(session.list_tools(), timeout=self.timeout)
-
-                    # Serialize tools for caching
-                    serialized_tools = [
-                        {
-                            'name': tool.name,
-                            'description': tool.description,
-                            'input_schema': tool.inputSchema,
-                        }
-                        for tool in tools_response.tools
-                    ]
-                    
-                    # Cache tools for 1 hour (no-op if DummyCache)
-                    self.cache.set(cache_key, serialized_tools, 3600)
-                    logger.debug(f"Cached {len(serialized_tools)} tools.")
-
-                    tools = []
-                    for tool in tools_response.tools:
-                        input_schema = tool.inputSchema or {}
-                        # Add tool with schema to the cache
-                        cached_tool = Tool(
-                            name=tool.name,
-                            description=tool.description,
-                            input_schema=input_schema,
-                            func=self._create_tool_callable(tool.name),
-                        )
-                        self._tool_cache[tool.name] = cached_tool
-                        tools.append(cached_tool)
-
-                        logger.debug(f"Discovered tool: {tool.name} with schema: {input_schema}")
-
-                    return tools
-
-                except Exception as e:
-                    logger.error(f"Error listing tools: {e}")
-                    raise RuntimeError("Failed to list tools.") from e
+                # Initialize session explicitly
+                await session.initialize()
+                logger.info("Calling tool '%s'", tool_name)
+                logger.debug("Tool '%s' arguments: %s", tool_name, kwargs)
+                return await asyncio.wait_for(session.call_tool(tool_name, kwargs), timeout=timeout)
 
     def _create_tool_callable(self, tool_name: str) -> Callable[..., Any]:
         """
@@ -130,26 +180,28 @@ class MCPClient:
             Returns:
                 Any: The result of the tool execution.
             """
-            server_params = StdioServerParameters(command=self.command, args=self.args, env=self.env)
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    try:
-                        # Initialize session explicitly
-                        await session.initialize()
-
-                        # Validate input schema if available
-                        if tool_name in self._tool_cache:
-                            tool = self._tool_cache[tool_name]
-                            self._validate_input_schema(tool.input_schema, kwargs)
-
-                        logger.info(f"Calling tool '{tool_name}' with arguments: {kwargs}")
-                        result = await asyncio.wait_for(session.call_tool(tool_name, kwargs), timeout=self.timeout)
-                        logger.info(f"Tool '{tool_name}' executed successfully: {result}")
-                        return result
-
-                    except Exception as e:
-                        logger.error(f"Failed to execute tool '{tool_name}': {e}")
-                        raise RuntimeError(f"Tool execution failed: {e}") from e
+            try:
+                # Validate input schema if available
+                if tool_name in self._tool_cache:
+                    tool = self._tool_cache[tool_name]
+                    self._validate_input_schema(tool.input_schema, kwargs)
+
+                # Tool calls may have side effects: only tools declared idempotent are retried or hedged.
+                idempotent = tool_name in self.idempotent_tools
+                result = await async_call_with_resilience(
+                    lambda timeout: self._call_tool_once(tool_name, kwargs, timeout),
+                    backend=self.backend,
+                    policy=self.retry_policy if idempotent else RetryPolicy(max_attempts=1, timeout=self.timeout),
+                    breaker_config=self.breaker_config,
+                    hedge_after=self.hedge_after if idempotent else None,
+                )
+                logger.info("Tool '%s' executed successfully", tool_name)
+                logger.debug("Tool '%s' result: %s", tool_name, result)
+                return result
+
+            except Exception as e:
+                logger.error(f"Failed to execute tool '{tool_name}': {e}")
+                raise RuntimeError(f"Tool execution failed: {e}") from e
 
         dynamic_tool_func.dynamic = True
         return dynamic_tool_func
@@ -174,4 +226,4 @@ class MCPClient:
             if param not in kwargs:
                 raise ValueError(f"Missing required parameter: '{param}'")
 
-        logger.debug(f"Validated input against schema: {schema} with arguments: {kwargs}")
+        logger.debug("Validated input against schema: %s with arguments: %s", schema, kwargs)
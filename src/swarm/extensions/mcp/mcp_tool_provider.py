@@ -7,10 +7,10 @@ communication with MCP servers, constructs callable functions for dynamic tools,
 ensures that these tools are properly validated and integrated into the agent's function list.
 """
 
+import asyncio
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
-from swarm.settings import DEBUG
 from swarm.types import Tool, Agent
 from swarm.extensions.mcp.mcp_client import MCPClient
 
@@ -18,12 +18,6 @@ from .cache_utils import get_cache  # <-- Import the cache helper
 
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
-stream_handler = logging.StreamHandler()
-formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(name)s - %(message)s")
-stream_handler.setFormatter(formatter)
-if not logger.handlers:
-    logger.addHandler(stream_handler)
 
 
 class MCPToolProvider:
@@ -44,8 +38,10 @@ class MCPToolProvider:
         self.client = MCPClient(
             server_config=server_config,
             timeout=server_config.get("timeout", 30),
+            server_name=server_name,
         )
         self.cache = get_cache()  # <-- Initialize cache using the helper
+        self._inflight: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = None
         logger.debug(f"Initialized MCPToolProvider for server '{self.server_name}'.")
 
     async def discover_tools(self, agent: Agent) -> List[Tool]:
@@ -82,6 +78,30 @@ class MCPToolProvider:
 
             return tools
 
+        # Agents sharing this server are compiled concurrently; join an in-flight
+        # discovery on the same event loop instead of spawning the server again.
+        loop = asyncio.get_running_loop()
+        if self._inflight is not None:
+            inflight_loop, inflight_task = self._inflight
+            if inflight_loop is loop and not inflight_task.done():
+                logger.debug(f"Joining in-flight tool discovery for server '{self.server_name}'.")
+                return list(await asyncio.shield(inflight_task))
+
+        task = loop.create_task(self._discover_from_server(agent, cache_key))
+        self._inflight = (loop, task)
+        return list(await task)
+
+    async def _discover_from_server(self, agent: Agent, cache_key: str) -> List[Tool]:
+        """
+        Discover tools directly from the MCP server and cache their metadata.
+
+        Args:
+            agent (Agent): The agent for which tools are being discovered.
+            cache_key (str): Cache key for the server's tool metadata.
+
+        Returns:
+            List[Tool]: A list of discovered `Tool` instances.
+        """
         logger.debug(
             f"Starting tool discovery from MCP server '{self.server_name}' for agent '{agent.name}'."
         )
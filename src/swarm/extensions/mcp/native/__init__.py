@@ -0,0 +1,40 @@
+"""
+Native (in-process) implementations of well-known local MCP servers.
+
+A server configured with `"mode": "native"` in `mcpServers` is served by the
+matching provider here instead of a child process, e.g.:
+
+    "filesystem": {
+        "command": "npx",
+        "args": ["-y", "@modelcontextprotocol/server-filesystem", "${ALLOWED_PATH}"],
+        "mode": "native"
+    }
+
+The implementation is found by the package name in `args`, by the server
+name, or explicitly with `"native": "<provider>"`. Providers exist for the
+filesystem, memory, sqlite and sequential-thinking servers; other servers
+configured as native fall back to stdio.
+"""
+
+from .base import (
+    NativeTool,
+    NativeToolProvider,
+    create_native_provider,
+    find_native_provider,
+    is_native,
+    native_providers,
+    register_native_provider,
+    text_result,
+)
+from . import filesystem, memory, sequential_thinking, sqlite  # noqa: F401  (registers the providers)
+
+__all__ = [
+    "NativeTool",
+    "NativeToolProvider",
+    "create_native_provider",
+    "find_native_provider",
+    "is_native",
+    "native_providers",
+    "register_native_provider",
+    "text_result",
+]
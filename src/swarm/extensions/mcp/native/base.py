@@ -0,0 +1,207 @@
+"""
+Registry and base class for native (in-process) MCP tool providers.
+
+A native provider implements the tools of a well-known, purely local MCP
+server in Python: same tool names, input schemas and result text, but called
+directly instead of through a child process speaking JSON-RPC over stdio.
+"""
+
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Type
+
+from mcp.types import CallToolResult, TextContent
+
+from swarm.types import Agent, Tool
+
+logger = logging.getLogger(__name__)
+
+_ENV_VAR = re.compile(r"\$(?:\{(\w+)\}|(\w+))")
+
+
+def text_result(text: str, is_error: bool = False) -> CallToolResult:
+    """Wrap tool output in the result type an MCP session returns."""
+    return CallToolResult(content=[TextContent(type="text", text=text)], isError=is_error)
+
+
+def object_schema(properties: Dict[str, Any], required: Sequence[str] = ()) -> Dict[str, Any]:
+    """Build a tool input schema for an object with the given properties."""
+    schema: Dict[str, Any] = {"type": "object", "properties": properties}
+    if required:
+        schema["required"] = list(required)
+    return schema
+
+
+class NativeTool:
+    """
+    One tool of a native provider.
+
+    Args:
+        name (str): Tool name, as listed by the server.
+        description (str): Tool description, as listed by the server.
+        input_schema (dict): JSON schema of the tool arguments.
+        handler (Callable[..., str]): Called with the tool arguments; returns the result text.
+    """
+
+    __slots__ = ("name", "description", "input_schema", "handler")
+
+    def __init__(self, name: str, description: str, input_schema: Dict[str, Any], handler: Callable[..., str]):
+        self.name = name
+        self.description = description
+        self.input_schema = input_schema
+        self.handler = handler
+
+
+class NativeToolProvider:
+    """
+    Base class for in-process implementations of an MCP server.
+
+    Subclasses set `name` (the server they replace), `packages` (the package
+    names that identify it in a server's `args`) and implement `tools()`.
+    `discover_tools` has the same signature as `MCPToolProvider.discover_tools`,
+    but the returned tools are plain synchronous callables: the core calls them
+    directly, with no event loop, subprocess or serialisation in between.
+
+    Args:
+        server_name (str): The name of the server in `mcpServers`.
+        server_config (dict): The server's configuration.
+    """
+
+    name: str = ""
+    packages: Sequence[str] = ()
+    # Errors raised by a handler are reported with isError set, as the
+    # TypeScript servers do; the Python sqlite server reports them as plain text.
+    errors_are_flagged: bool = True
+
+    def __init__(self, server_name: str, server_config: Dict[str, Any]):
+        self.server_name = server_name
+        self.server_config = server_config
+        self.env = {**os.environ, **server_config.get("env", {})}
+        self._tools: Optional[Dict[str, Tool]] = None
+
+    def tools(self) -> List[NativeTool]:
+        raise NotImplementedError
+
+    def server_args(self) -> List[str]:
+        """The server's `args` after its package name, with environment variables expanded."""
+        args = list(self.server_config.get("args", []))
+        for index, arg in enumerate(args):
+            if _names_package(arg, self.packages):
+                args = args[index + 1:]
+                break
+        return [self.expand(arg) for arg in args]
+
+    def expand(self, value: str) -> str:
+        """Expand `$VAR` and `${VAR}` from the server env, then the process env."""
+        return _ENV_VAR.sub(lambda m: self.env.get(m.group(1) or m.group(2), m.group(0)), value)
+
+    async def discover_tools(self, agent: Agent) -> List[Tool]:
+        """
+        Return the provider's tools as `Tool` instances.
+
+        Args:
+            agent (Agent): The agent for which tools are being discovered.
+
+        Returns:
+            List[Tool]: The server's tools, bound to this provider.
+        """
+        return list(self._bound_tools().values())
+
+    def _bound_tools(self) -> Dict[str, Tool]:
+        if self._tools is None:
+            self._tools = {
+                tool.name: Tool(
+                    name=tool.name,
+                    description=tool.description,
+                    input_schema=tool.input_schema,
+                    func=self._create_tool_callable(tool),
+                )
+                for tool in self.tools()
+            }
+            logger.debug(f"Native provider '{self.name}' serves {len(self._tools)} tools for server '{self.server_name}'.")
+        return self._tools
+
+    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """Call a tool by name, as `ClientSession.call_tool` would."""
+        tool = self._bound_tools().get(tool_name)
+        if tool is None:
+            return text_result(f"Unknown tool: {tool_name}", is_error=True)
+        return tool.func(**arguments)
+
+    def format_error(self, error: Exception) -> str:
+        """The text the server reports for a failed call."""
+        return f"Error: {error}"
+
+    def _create_tool_callable(self, tool: NativeTool) -> Callable[..., CallToolResult]:
+        required = tuple(tool.input_schema.get("required", ()))
+
+        def native_tool_func(**kwargs) -> CallToolResult:
+            missing = [name for name in required if name not in kwargs]
+            try:
+                if missing:
+                    raise ValueError(f"Invalid arguments for {tool.name}: missing {', '.join(missing)}")
+                return text_result(tool.handler(**kwargs))
+            except Exception as e:
+                logger.debug(f"Native tool '{tool.name}' failed: {e}")
+                return text_result(self.format_error(e), is_error=self.errors_are_flagged)
+
+        native_tool_func.__name__ = tool.name
+        return native_tool_func
+
+
+def _names_package(arg: str, packages: Sequence[str]) -> bool:
+    return any(arg == package or arg.startswith(package + "@") for package in packages)
+
+
+_registry: Dict[str, Type[NativeToolProvider]] = {}
+
+
+def register_native_provider(cls: Type[NativeToolProvider]) -> Type[NativeToolProvider]:
+    """Class decorator registering a native provider under its `name`."""
+    _registry[cls.name] = cls
+    return cls
+
+
+def native_providers() -> Dict[str, Type[NativeToolProvider]]:
+    return dict(_registry)
+
+
+def find_native_provider(server_name: str, server_config: Dict[str, Any]) -> Optional[Type[NativeToolProvider]]:
+    """
+    Find the native implementation of a configured server.
+
+    The server's `native` key names the implementation explicitly; otherwise
+    it is matched by a known package name in `args`, then by server name.
+
+    Returns:
+        Optional[Type[NativeToolProvider]]: The provider class, or None if there is none.
+    """
+    explicit = server_config.get("native")
+    if explicit:
+        return _registry.get(explicit)
+    args: Iterable[str] = server_config.get("args", [])
+    for cls in _registry.values():
+        if any(_names_package(arg, cls.packages) for arg in args):
+            return cls
+    return _registry.get(server_name)
+
+
+def is_native(server_config: Dict[str, Any]) -> bool:
+    """Whether the server is configured with `"mode": "native"`."""
+    return server_config.get("mode") == "native"
+
+
+def create_native_provider(server_name: str, server_config: Dict[str, Any]) -> Optional[NativeToolProvider]:
+    """
+    Instantiate the native provider for a server, if one is registered.
+
+    Args:
+        server_name (str): The name of the server in `mcpServers`.
+        server_config (dict): The server's configuration.
+
+    Returns:
+        Optional[NativeToolProvider]: The provider, or None if the server has no native implementation.
+    """
+    cls = find_native_provider(server_name, server_config)
+    return cls(server_name, server_config) if cls else None
@@ -0,0 +1,370 @@
+"""
+Native provider for `@modelcontextprotocol/server-filesystem`.
+
+Access is limited to the allowed directories given as the server's arguments
+(after the package name); every path is resolved, symlinks included, and
+checked against them before use. Writes go through `atomic_write`.
+"""
+
+import difflib
+import fnmatch
+import json
+import os
+import stat
+import time
+from typing import Any, Dict, List, Optional
+
+from swarm.utils.fileio import atomic_write
+
+from .base import NativeTool, NativeToolProvider, object_schema, register_native_provider
+
+PATH = {"path": {"type": "string"}}
+DIFF_CONTEXT = 4
+
+
+def _expand_home(path: str) -> str:
+    return os.path.expanduser(path) if path == "~" or path.startswith("~/") else path
+
+
+def _normalize_lines(text: str) -> str:
+    return text.replace("\r\n", "\n")
+
+
+def _split_lines(text: str):
+    """Split into lines without terminators; also report whether the text ends with a newline."""
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+        return lines, True
+    return lines, False
+
+
+def _unified_patch(path: str, original: str, modified: str) -> str:
+    """A patch in the format of jsdiff's `createTwoFilesPatch`, which the server returns."""
+    old_lines, old_eof = _split_lines(original)
+    new_lines, new_eof = _split_lines(modified)
+    out = [f"Index: {path}", "=" * 67, f"--- {path}\toriginal", f"+++ {path}\tmodified"]
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for group in matcher.get_grouped_opcodes(DIFF_CONTEXT):
+        old_start, old_end = group[0][1], group[-1][2]
+        new_start, new_end = group[0][3], group[-1][4]
+        old_count, new_count = old_end - old_start, new_end - new_start
+        out.append(f"@@ -{old_start + (1 if old_count else 0)},{old_count} "
+                   f"+{new_start + (1 if new_count else 0)},{new_count} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for i in range(i1, i2):
+                    out.append(" " + old_lines[i])
+                    if i == len(old_lines) - 1 and not old_eof:
+                        out.append("\\ No newline at end of file")
+                continue
+            for i in range(i1, i2):
+                out.append("-" + old_lines[i])
+                if i == len(old_lines) - 1 and not old_eof:
+                    out.append("\\ No newline at end of file")
+            for j in range(j1, j2):
+                out.append("+" + new_lines[j])
+                if j == len(new_lines) - 1 and not new_eof:
+                    out.append("\\ No newline at end of file")
+    return "\n".join(out) + "\n"
+
+
+def _leading_whitespace(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def apply_edits(content: str, edits: List[Dict[str, str]]) -> str:
+    """
+    Apply `edit_file` edits the way the server does.
+
+    Each `oldText` replaces its first exact occurrence; failing that, a run of
+    lines equal to it up to surrounding whitespace, re-indented to match.
+    """
+    modified = content
+    for edit in edits:
+        old_text, new_text = _normalize_lines(edit["oldText"]), _normalize_lines(edit["newText"])
+        if old_text in modified:
+            modified = modified.replace(old_text, new_text, 1)
+            continue
+        old_lines = old_text.split("\n")
+        content_lines = modified.split("\n")
+        for i in range(len(content_lines) - len(old_lines) + 1):
+            window = content_lines[i:i + len(old_lines)]
+            if all(old.strip() == line.strip() for old, line in zip(old_lines, window)):
+                indent = _leading_whitespace(content_lines[i])
+                new_lines = []
+                for j, line in enumerate(new_text.split("\n")):
+                    if j == 0:
+                        new_lines.append(indent + line.lstrip())
+                        continue
+                    old_indent = _leading_whitespace(old_lines[j]) if j < len(old_lines) else ""
+                    new_indent = _leading_whitespace(line)
+                    if old_indent and new_indent:
+                        relative = max(0, len(new_indent) - len(old_indent))
+                        line = indent + " " * relative + line.lstrip()
+                    new_lines.append(line)
+                content_lines[i:i + len(old_lines)] = new_lines
+                modified = "\n".join(content_lines)
+                break
+        else:
+            raise ValueError(f"Could not find exact match for edit:\n{edit['oldText']}")
+    return modified
+
+
+def _js_date(timestamp: float) -> str:
+    return time.strftime("%a %b %d %Y %H:%M:%S GMT%z (%Z)", time.localtime(timestamp))
+
+
+@register_native_provider
+class FilesystemProvider(NativeToolProvider):
+    """The filesystem server's tools, restricted to its allowed directories."""
+
+    name = "filesystem"
+    packages = ("@modelcontextprotocol/server-filesystem",)
+
+    def __init__(self, server_name: str, server_config: Dict[str, Any]):
+        super().__init__(server_name, server_config)
+        directories = server_config.get("allowed_directories") or self.server_args()
+        self.allowed_directories = [
+            os.path.normpath(os.path.abspath(_expand_home(self.expand(d)))) for d in directories
+        ]
+        for directory in self.allowed_directories:
+            if not os.path.isdir(directory):
+                raise ValueError(f"Allowed directory {directory} is not a directory or does not exist.")
+        self._real_allowed = [os.path.realpath(d) for d in self.allowed_directories]
+
+    def _is_allowed(self, path: str, directories: Optional[List[str]] = None) -> bool:
+        for directory in directories or self.allowed_directories:
+            if path == directory or path.startswith(directory.rstrip(os.sep) + os.sep):
+                return True
+        return False
+
+    def validate_path(self, requested: str) -> str:
+        """
+        Resolve a requested path and check it against the allowed directories.
+
+        Returns:
+            str: The real path, or the absolute path of a file yet to be created.
+
+        Raises:
+            PermissionError: If the path, its symlink target or its parent is outside them.
+        """
+        absolute = os.path.normpath(os.path.abspath(_expand_home(requested)))
+        if not self._is_allowed(absolute):
+            raise PermissionError(
+                f"Access denied - path outside allowed directories: {absolute} "
+                f"not in {', '.join(self.allowed_directories)}"
+            )
+        if os.path.lexists(absolute):
+            real = os.path.realpath(absolute)
+            if not self._is_allowed(real, self._real_allowed):
+                raise PermissionError("Access denied - symlink target outside allowed directories")
+            return real
+        parent = os.path.dirname(absolute)
+        if not os.path.isdir(parent):
+            raise FileNotFoundError(f"Parent directory does not exist: {parent}")
+        if not self._is_allowed(os.path.realpath(parent), self._real_allowed):
+            raise PermissionError("Access denied - parent directory outside allowed directories")
+        return absolute
+
+    # -- tools ---------------------------------------------------------------
+
+    def read_file(self, path: str) -> str:
+        with open(self.validate_path(path), encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def read_multiple_files(self, paths: List[str]) -> str:
+        results = []
+        for path in paths:
+            try:
+                results.append(f"{path}:\n{self.read_file(path)}\n")
+            except Exception as e:
+                results.append(f"{path}: Error - {e}")
+        return "\n---\n".join(results)
+
+    def write_file(self, path: str, content: str) -> str:
+        atomic_write(self.validate_path(path), content)
+        return f"Successfully wrote to {path}"
+
+    def edit_file(self, path: str, edits: List[Dict[str, str]], dryRun: bool = False) -> str:
+        valid_path = self.validate_path(path)
+        with open(valid_path, encoding="utf-8", newline="") as f:
+            content = _normalize_lines(f.read())
+        modified = apply_edits(content, edits)
+        diff = _unified_patch(valid_path, content, modified)
+        fence = "```"
+        while fence in diff:
+            fence += "`"
+        if not dryRun:
+            atomic_write(valid_path, modified)
+        return f"{fence}diff\n{diff}{fence}\n\n"
+
+    def create_directory(self, path: str) -> str:
+        os.makedirs(self.validate_path(path), exist_ok=True)
+        return f"Successfully created directory {path}"
+
+    def list_directory(self, path: str) -> str:
+        with os.scandir(self.validate_path(path)) as entries:
+            listing = sorted((entry.name, entry.is_dir()) for entry in entries)
+        return "\n".join(f"{'[DIR]' if is_dir else '[FILE]'} {name}" for name, is_dir in listing)
+
+    def directory_tree(self, path: str) -> str:
+        def build(directory: str) -> List[Dict[str, Any]]:
+            with os.scandir(self.validate_path(directory)) as entries:
+                listing = sorted(entries, key=lambda entry: entry.name)
+            tree = []
+            for entry in listing:
+                if entry.is_dir():
+                    tree.append({"name": entry.name, "type": "directory", "children": build(entry.path)})
+                else:
+                    tree.append({"name": entry.name, "type": "file"})
+            return tree
+
+        return json.dumps(build(path), indent=2, ensure_ascii=False)
+
+    def move_file(self, source: str, destination: str) -> str:
+        os.rename(self.validate_path(source), self.validate_path(destination))
+        return f"Successfully moved {source} to {destination}"
+
+    def search_files(self, path: str, pattern: str, excludePatterns: Optional[List[str]] = None) -> str:
+        root = self.validate_path(path)
+        needle = pattern.lower()
+        excludes = [p if "*" in p else f"**/{p}/**" for p in excludePatterns or ()]
+        results = []
+
+        def search(directory: str) -> None:
+            with os.scandir(directory) as entries:
+                listing = sorted(entries, key=lambda entry: entry.name)
+            for entry in listing:
+                try:
+                    self.validate_path(entry.path)
+                except Exception:
+                    continue
+                relative = os.path.relpath(entry.path, root)
+                if any(fnmatch.fnmatch(relative, p) or fnmatch.fnmatch("/" + relative, p) for p in excludes):
+                    continue
+                if needle in entry.name.lower():
+                    results.append(entry.path)
+                if entry.is_dir():
+                    search(entry.path)
+
+        search(root)
+        return "\n".join(results) if results else "No matches found"
+
+    def get_file_info(self, path: str) -> str:
+        info = os.stat(self.validate_path(path))
+        created = getattr(info, "st_birthtime", info.st_ctime)
+        fields = {
+            "size": info.st_size,
+            "created": _js_date(created),
+            "modified": _js_date(info.st_mtime),
+            "accessed": _js_date(info.st_atime),
+            "isDirectory": "true" if stat.S_ISDIR(info.st_mode) else "false",
+            "isFile": "true" if stat.S_ISREG(info.st_mode) else "false",
+            "permissions": oct(info.st_mode)[-3:],
+        }
+        return "\n".join(f"{key}: {value}" for key, value in fields.items())
+
+    def list_allowed_directories(self) -> str:
+        return "Allowed directories:\n" + "\n".join(self.allowed_directories)
+
+    def tools(self) -> List[NativeTool]:
+        within = " Only works within allowed directories."
+        return [
+            NativeTool(
+                "read_file",
+                "Read the complete contents of a file from the file system. Handles various text encodings and "
+                "provides detailed error messages if the file cannot be read. Use this tool when you need to "
+                "examine the contents of a single file." + within,
+                object_schema(PATH, ["path"]), self.read_file,
+            ),
+            NativeTool(
+                "read_multiple_files",
+                "Read the contents of multiple files simultaneously. This is more efficient than reading files one "
+                "by one when you need to analyze or compare multiple files. Each file's content is returned with "
+                "its path as a reference. Failed reads for individual files won't stop the entire operation."
+                + within,
+                object_schema({"paths": {"type": "array", "items": {"type": "string"}}}, ["paths"]),
+                self.read_multiple_files,
+            ),
+            NativeTool(
+                "write_file",
+                "Create a new file or completely overwrite an existing file with new content. Use with caution as "
+                "it will overwrite existing files without warning. Handles text content with proper encoding."
+                + within,
+                object_schema({**PATH, "content": {"type": "string"}}, ["path", "content"]), self.write_file,
+            ),
+            NativeTool(
+                "edit_file",
+                "Make line-based edits to a text file. Each edit replaces exact line sequences with new content. "
+                "Returns a git-style diff showing the changes made." + within,
+                object_schema({
+                    **PATH,
+                    "edits": {"type": "array", "items": object_schema({
+                        "oldText": {"type": "string", "description": "Text to search for - must match exactly"},
+                        "newText": {"type": "string", "description": "Text to replace with"},
+                    }, ["oldText", "newText"])},
+                    "dryRun": {"type": "boolean", "default": False,
+                               "description": "Preview changes using git-style diff format"},
+                }, ["path", "edits"]),
+                self.edit_file,
+            ),
+            NativeTool(
+                "create_directory",
+                "Create a new directory or ensure a directory exists. Can create multiple nested directories in one "
+                "operation. If the directory already exists, this operation will succeed silently. Perfect for "
+                "setting up directory structures for projects or ensuring required paths exist." + within,
+                object_schema(PATH, ["path"]), self.create_directory,
+            ),
+            NativeTool(
+                "list_directory",
+                "Get a detailed listing of all files and directories in a specified path. Results clearly "
+                "distinguish between files and directories with [FILE] and [DIR] prefixes. This tool is essential "
+                "for understanding directory structure and finding specific files within a directory." + within,
+                object_schema(PATH, ["path"]), self.list_directory,
+            ),
+            NativeTool(
+                "directory_tree",
+                "Get a recursive tree view of files and directories as a JSON structure. Each entry includes "
+                "'name', 'type' (file/directory), and 'children' for directories. Files have no children array, "
+                "while directories always have a children array (which may be empty). The output is formatted "
+                "with 2-space indentation for readability." + within,
+                object_schema(PATH, ["path"]), self.directory_tree,
+            ),
+            NativeTool(
+                "move_file",
+                "Move or rename files and directories. Can move files between directories and rename them in a "
+                "single operation. If the destination exists, the operation will fail. Works across different "
+                "directories and can be used for simple renaming within the same directory. Both source and "
+                "destination must be within allowed directories.",
+                object_schema({"source": {"type": "string"}, "destination": {"type": "string"}},
+                              ["source", "destination"]),
+                self.move_file,
+            ),
+            NativeTool(
+                "search_files",
+                "Recursively search for files and directories matching a pattern. Searches through all "
+                "subdirectories from the starting path. The search is case-insensitive and matches partial names. "
+                "Returns full paths to all matching items. Great for finding files when you don't know their "
+                "exact location. Only searches within allowed directories.",
+                object_schema({
+                    **PATH,
+                    "pattern": {"type": "string"},
+                    "excludePatterns": {"type": "array", "items": {"type": "string"}, "default": []},
+                }, ["path", "pattern"]),
+                self.search_files,
+            ),
+            NativeTool(
+                "get_file_info",
+                "Retrieve detailed metadata about a file or directory. Returns comprehensive information including "
+                "size, creation time, last modified time, permissions, and type. This tool is perfect for "
+                "understanding file characteristics without reading the actual content." + within,
+                object_schema(PATH, ["path"]), self.get_file_info,
+            ),
+            NativeTool(
+                "list_allowed_directories",
+                "Returns the list of directories that this server is allowed to access. Use this to understand "
+                "which directories are available before trying to access them.",
+                object_schema({}), self.list_allowed_directories,
+            ),
+        ]
@@ -0,0 +1,279 @@
+"""
+Native provider for `@modelcontextprotocol/server-memory`, the knowledge-graph memory server.
+
+The graph is stored in the server's JSON Lines format, one entity or relation
+per line, at `MEMORY_FILE_PATH` (default `memory.json` in the working
+directory), so the native and stdio servers can share a file. The parsed graph
+is kept in memory and re-read only when the file changes on disk.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from swarm.utils.fileio import atomic_write
+
+from .base import NativeTool, NativeToolProvider, object_schema, register_native_provider
+
+Graph = Dict[str, List[Dict[str, Any]]]
+
+
+def _string_array(description: str) -> Dict[str, Any]:
+    return {"type": "array", "items": {"type": "string"}, "description": description}
+
+
+ENTITY_SCHEMA = object_schema(
+    {
+        "name": {"type": "string", "description": "The name of the entity"},
+        "entityType": {"type": "string", "description": "The type of the entity"},
+        "observations": _string_array("An array of observation contents associated with the entity"),
+    },
+    ["name", "entityType", "observations"],
+)
+
+RELATION_SCHEMA = object_schema(
+    {
+        "from": {"type": "string", "description": "The name of the entity where the relation starts"},
+        "to": {"type": "string", "description": "The name of the entity where the relation ends"},
+        "relationType": {"type": "string", "description": "The type of the relation"},
+    },
+    ["from", "to", "relationType"],
+)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, indent=2, ensure_ascii=False)
+
+
+def _relation_key(relation: Dict[str, Any]) -> Tuple[str, str, str]:
+    return relation["from"], relation["to"], relation["relationType"]
+
+
+class KnowledgeGraph:
+    """
+    The memory server's knowledge graph, backed by a JSON Lines file.
+
+    Args:
+        path (str): The graph file; created on the first write.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._graph: Optional[Graph] = None
+        self._signature: Optional[Tuple[int, int]] = None
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> Graph:
+        """Return the graph, re-reading the file only if it changed."""
+        with self._lock:
+            signature = self._file_signature()
+            if self._graph is not None and signature == self._signature:
+                return self._graph
+            graph: Graph = {"entities": [], "relations": []}
+            if signature is not None:
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        item = json.loads(line)
+                        kind = item.pop("type", None)
+                        if kind == "entity":
+                            graph["entities"].append(item)
+                        elif kind == "relation":
+                            graph["relations"].append(item)
+            self._graph, self._signature = graph, signature
+            return graph
+
+    def save(self, graph: Graph) -> None:
+        with self._lock:
+            lines = [json.dumps({"type": "entity", **e}, ensure_ascii=False, separators=(",", ":"))
+                     for e in graph["entities"]]
+            lines += [json.dumps({"type": "relation", **r}, ensure_ascii=False, separators=(",", ":"))
+                      for r in graph["relations"]]
+            atomic_write(self.path, "\n".join(lines))
+            self._graph, self._signature = graph, self._file_signature()
+
+    @contextmanager
+    def editing(self) -> Iterator[Graph]:
+        """Yield the graph for changes; save it afterwards, or drop the changes on error."""
+        with self._lock:
+            graph = self.load()
+            try:
+                yield graph
+            except BaseException:
+                self._graph = None
+                raise
+            self.save(graph)
+
+    def create_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self.editing() as graph:
+            names = {e["name"] for e in graph["entities"]}
+            created = []
+            for entity in entities:
+                if entity["name"] not in names:
+                    names.add(entity["name"])
+                    created.append(entity)
+            graph["entities"].extend(created)
+            return created
+
+    def create_relations(self, relations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self.editing() as graph:
+            keys = {_relation_key(r) for r in graph["relations"]}
+            created = []
+            for relation in relations:
+                if _relation_key(relation) not in keys:
+                    keys.add(_relation_key(relation))
+                    created.append(relation)
+            graph["relations"].extend(created)
+            return created
+
+    def add_observations(self, observations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self.editing() as graph:
+            entities = {e["name"]: e for e in graph["entities"]}
+            results = []
+            for item in observations:
+                entity = entities.get(item["entityName"])
+                if entity is None:
+                    raise ValueError(f"Entity with name {item['entityName']} not found")
+                added = [c for c in item["contents"] if c not in entity["observations"]]
+                entity["observations"].extend(added)
+                results.append({"entityName": item["entityName"], "addedObservations": added})
+            return results
+
+    def delete_entities(self, entity_names: List[str]) -> None:
+        with self.editing() as graph:
+            names = set(entity_names)
+            graph["entities"] = [e for e in graph["entities"] if e["name"] not in names]
+            graph["relations"] = [r for r in graph["relations"] if r["from"] not in names and r["to"] not in names]
+
+    def delete_observations(self, deletions: List[Dict[str, Any]]) -> None:
+        with self.editing() as graph:
+            entities = {e["name"]: e for e in graph["entities"]}
+            for item in deletions:
+                entity = entities.get(item["entityName"])
+                if entity is not None:
+                    removed = set(item["observations"])
+                    entity["observations"] = [o for o in entity["observations"] if o not in removed]
+
+    def delete_relations(self, relations: List[Dict[str, Any]]) -> None:
+        with self.editing() as graph:
+            keys = {_relation_key(r) for r in relations}
+            graph["relations"] = [r for r in graph["relations"] if _relation_key(r) not in keys]
+
+    def _subgraph(self, graph: Graph, entities: List[Dict[str, Any]]) -> Graph:
+        names = {e["name"] for e in entities}
+        relations = [r for r in graph["relations"] if r["from"] in names and r["to"] in names]
+        return {"entities": entities, "relations": relations}
+
+    def search_nodes(self, query: str) -> Graph:
+        graph = self.load()
+        needle = query.lower()
+        entities = [
+            e for e in graph["entities"]
+            if needle in e["name"].lower()
+            or needle in e["entityType"].lower()
+            or any(needle in o.lower() for o in e["observations"])
+        ]
+        return self._subgraph(graph, entities)
+
+    def open_nodes(self, names: List[str]) -> Graph:
+        graph = self.load()
+        wanted = set(names)
+        return self._subgraph(graph, [e for e in graph["entities"] if e["name"] in wanted])
+
+
+@register_native_provider
+class MemoryProvider(NativeToolProvider):
+    """The memory server's knowledge-graph tools on a `KnowledgeGraph`."""
+
+    name = "memory"
+    packages = ("@modelcontextprotocol/server-memory",)
+
+    def __init__(self, server_name: str, server_config: Dict[str, Any]):
+        super().__init__(server_name, server_config)
+        path = self.expand(self.env.get("MEMORY_FILE_PATH") or "memory.json")
+        self.graph = KnowledgeGraph(os.path.abspath(path))
+
+    def tools(self) -> List[NativeTool]:
+        graph = self.graph
+
+        def create_entities(entities):
+            return _dumps(graph.create_entities(entities))
+
+        def create_relations(relations):
+            return _dumps(graph.create_relations(relations))
+
+        def add_observations(observations):
+            return _dumps(graph.add_observations(observations))
+
+        def delete_entities(entityNames):
+            graph.delete_entities(entityNames)
+            return "Entities deleted successfully"
+
+        def delete_observations(deletions):
+            graph.delete_observations(deletions)
+            return "Observations deleted successfully"
+
+        def delete_relations(relations):
+            graph.delete_relations(relations)
+            return "Relations deleted successfully"
+
+        return [
+            NativeTool("create_entities", "Create multiple new entities in the knowledge graph",
+                       object_schema({"entities": {"type": "array", "items": ENTITY_SCHEMA}}, ["entities"]),
+                       create_entities),
+            NativeTool("create_relations",
+                       "Create multiple new relations between entities in the knowledge graph. "
+                       "Relations should be in active voice",
+                       object_schema({"relations": {"type": "array", "items": RELATION_SCHEMA}}, ["relations"]),
+                       create_relations),
+            NativeTool("add_observations", "Add new observations to existing entities in the knowledge graph",
+                       object_schema({"observations": {"type": "array", "items": object_schema(
+                           {
+                               "entityName": {"type": "string",
+                                              "description": "The name of the entity to add the observations to"},
+                               "contents": _string_array("An array of observation contents to add"),
+                           },
+                           ["entityName", "contents"],
+                       )}}, ["observations"]),
+                       add_observations),
+            NativeTool("delete_entities",
+                       "Delete multiple entities and their associated relations from the knowledge graph",
+                       object_schema({"entityNames": _string_array("An array of entity names to delete")},
+                                     ["entityNames"]),
+                       delete_entities),
+            NativeTool("delete_observations", "Delete specific observations from entities in the knowledge graph",
+                       object_schema({"deletions": {"type": "array", "items": object_schema(
+                           {
+                               "entityName": {"type": "string",
+                                              "description": "The name of the entity containing the observations"},
+                               "observations": _string_array("An array of observations to delete"),
+                           },
+                           ["entityName", "observations"],
+                       )}}, ["deletions"]),
+                       delete_observations),
+            NativeTool("delete_relations", "Delete multiple relations from the knowledge graph",
+                       object_schema({"relations": {"type": "array", "items": RELATION_SCHEMA,
+                                                    "description": "An array of relations to delete"}},
+                                     ["relations"]),
+                       delete_relations),
+            NativeTool("read_graph", "Read the entire knowledge graph",
+                       object_schema({}), lambda: _dumps(graph.load())),
+            NativeTool("search_nodes", "Search for nodes in the knowledge graph based on a query",
+                       object_schema({"query": {"type": "string", "description": (
+                           "The search query to match against entity names, types, and observation content")}},
+                           ["query"]),
+                       lambda query: _dumps(graph.search_nodes(query))),
+            NativeTool("open_nodes", "Open specific nodes in the knowledge graph by their names",
+                       object_schema({"names": _string_array("An array of entity names to retrieve")}, ["names"]),
+                       lambda names: _dumps(graph.open_nodes(names))),
+        ]
@@ -0,0 +1,135 @@
+"""
+Native provider for `@modelcontextprotocol/server-sequential-thinking`.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from .base import NativeTool, NativeToolProvider, object_schema, register_native_provider
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = """A detailed tool for dynamic and reflective problem-solving through thoughts.
+This tool helps analyze problems through a flexible thinking process that can adapt and evolve.
+Each thought can build on, question, or revise previous insights as understanding deepens.
+
+When to use this tool:
+- Breaking down complex problems into steps
+- Planning and design with room for revision
+- Analysis that might need course correction
+- Problems where the full scope might not be clear initially
+- Problems that require a multi-step solution
+- Tasks that need to maintain context over multiple steps
+- Situations where irrelevant information needs to be filtered out
+
+Key features:
+- You can adjust total_thoughts up or down as you progress
+- You can question or revise previous thoughts
+- You can add more thoughts even after reaching what seemed like the end
+- You can express uncertainty and explore alternative approaches
+- Not every thought needs to build linearly - you can branch or backtrack
+- Generates a solution hypothesis
+- Verifies the hypothesis based on the Chain of Thought steps
+- Repeats the process until satisfied
+- Provides a correct answer
+
+You should:
+1. Start with an initial estimate of needed thoughts, but be ready to adjust
+2. Feel free to question or revise previous thoughts
+3. Don't hesitate to add more thoughts if needed, even at the "end"
+4. Express uncertainty when present
+5. Mark thoughts that revise previous thinking or branch into new paths
+6. Ignore information that is irrelevant to the current step
+7. Generate a solution hypothesis when appropriate
+8. Verify the hypothesis based on the Chain of Thought steps
+9. Repeat the process until satisfied with the solution
+10. Provide a single, ideally correct answer as the final output
+11. Only set next_thought_needed to false when truly done and a satisfactory answer is reached"""
+
+INPUT_SCHEMA = object_schema(
+    {
+        "thought": {"type": "string", "description": "Your current thinking step"},
+        "nextThoughtNeeded": {"type": "boolean", "description": "Whether another thought step is needed"},
+        "thoughtNumber": {"type": "integer", "description": "Current thought number", "minimum": 1},
+        "totalThoughts": {"type": "integer", "description": "Estimated total thoughts needed", "minimum": 1},
+        "isRevision": {"type": "boolean", "description": "Whether this revises previous thinking"},
+        "revisesThought": {"type": "integer", "description": "Which thought is being reconsidered", "minimum": 1},
+        "branchFromThought": {"type": "integer", "description": "Branching point thought number", "minimum": 1},
+        "branchId": {"type": "string", "description": "Branch identifier"},
+        "needsMoreThoughts": {"type": "boolean", "description": "If more thoughts are needed"},
+    },
+    ["thought", "nextThoughtNeeded", "thoughtNumber", "totalThoughts"],
+)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@register_native_provider
+class SequentialThinkingProvider(NativeToolProvider):
+    """
+    The `sequentialthinking` tool, keeping the thought history and branches
+    for the lifetime of the provider, as a long-running server process would.
+    """
+
+    name = "sequential-thinking"
+    packages = ("@modelcontextprotocol/server-sequential-thinking",)
+
+    def __init__(self, server_name: str, server_config: Dict[str, Any]):
+        super().__init__(server_name, server_config)
+        self.thought_history: List[Dict[str, Any]] = []
+        self.branches: Dict[str, List[Dict[str, Any]]] = {}
+
+    def tools(self) -> List[NativeTool]:
+        return [NativeTool("sequentialthinking", DESCRIPTION, INPUT_SCHEMA, self.process_thought)]
+
+    def format_error(self, error: Exception) -> str:
+        return json.dumps({"error": str(error), "status": "failed"}, indent=2, ensure_ascii=False)
+
+    def process_thought(
+        self,
+        thought: str,
+        nextThoughtNeeded: bool,
+        thoughtNumber: int,
+        totalThoughts: int,
+        isRevision: Optional[bool] = None,
+        revisesThought: Optional[int] = None,
+        branchFromThought: Optional[int] = None,
+        branchId: Optional[str] = None,
+        needsMoreThoughts: Optional[bool] = None,
+    ) -> str:
+        if not thought or not isinstance(thought, str):
+            raise ValueError("Invalid thought: must be a string")
+        if not _is_number(thoughtNumber):
+            raise ValueError("Invalid thoughtNumber: must be a number")
+        if not _is_number(totalThoughts):
+            raise ValueError("Invalid totalThoughts: must be a number")
+        if not isinstance(nextThoughtNeeded, bool):
+            raise ValueError("Invalid nextThoughtNeeded: must be a boolean")
+
+        totalThoughts = max(totalThoughts, thoughtNumber)
+        data = {
+            "thought": thought,
+            "thoughtNumber": thoughtNumber,
+            "totalThoughts": totalThoughts,
+            "nextThoughtNeeded": nextThoughtNeeded,
+            "isRevision": isRevision,
+            "revisesThought": revisesThought,
+            "branchFromThought": branchFromThought,
+            "branchId": branchId,
+            "needsMoreThoughts": needsMoreThoughts,
+        }
+        self.thought_history.append(data)
+        if branchFromThought and branchId:
+            self.branches.setdefault(branchId, []).append(data)
+        logger.debug(f"Thought {thoughtNumber}/{totalThoughts}: {thought}")
+
+        return json.dumps({
+            "thoughtNumber": thoughtNumber,
+            "totalThoughts": totalThoughts,
+            "nextThoughtNeeded": nextThoughtNeeded,
+            "branches": list(self.branches),
+            "thoughtHistoryLength": len(self.thought_history),
+        }, indent=2, ensure_ascii=False)
@@ -0,0 +1,63 @@
+"""
+Native provider for the sqlite MCP server (`mcp-server-sqlite`, `mcp-server-sqlite-npx`).
+"""
+
+from typing import List, Optional
+
+from swarm.db.sqlite import SQLiteTools, get_pool
+
+from .base import NativeTool, NativeToolProvider, object_schema, register_native_provider
+
+
+def _query(description: str):
+    return object_schema({"query": {"type": "string", "description": description}}, ["query"])
+
+
+@register_native_provider
+class SQLiteProvider(NativeToolProvider):
+    """
+    The sqlite server's tools on a shared `SQLitePool`.
+
+    The database is the `--db-path` argument (uvx server), the first argument
+    after the package name (npx server) or `SQLITE_DB_PATH`.
+    """
+
+    name = "sqlite"
+    packages = ("mcp-server-sqlite", "mcp-server-sqlite-npx")
+    # The reference server returns database errors as ordinary text results.
+    errors_are_flagged = False
+
+    def db_path(self) -> Optional[str]:
+        args = self.server_args()
+        if "--db-path" in args:
+            index = args.index("--db-path")
+            return args[index + 1] if index + 1 < len(args) else None
+        positional = [arg for arg in args if not arg.startswith("-")]
+        if positional:
+            return positional[0]
+        return self.env.get("SQLITE_DB_PATH")
+
+    def tools(self) -> List[NativeTool]:
+        path = self.db_path()
+        if not path:
+            raise ValueError(f"No database path configured for server '{self.server_name}'.")
+        sqlite = SQLiteTools(get_pool(path))
+        return [
+            NativeTool("read_query", "Execute a SELECT query on the SQLite database",
+                       _query("SELECT SQL query to execute"), sqlite.read_query),
+            NativeTool("write_query", "Execute an INSERT, UPDATE, or DELETE query on the SQLite database",
+                       _query("SQL query to execute"), sqlite.write_query),
+            NativeTool("create_table", "Create a new table in the SQLite database",
+                       _query("CREATE TABLE SQL statement"), sqlite.create_table),
+            NativeTool("list_tables", "List all tables in the SQLite database",
+                       object_schema({}), sqlite.list_tables),
+            NativeTool("describe_table", "Get the schema information for a specific table",
+                       object_schema({"table_name": {"type": "string", "description": "Name of the table to describe"}},
+                                     ["table_name"]),
+                       sqlite.describe_table),
+            NativeTool("append_insight", "Add a business insight to the memo",
+                       object_schema({"insight": {"type": "string",
+                                                  "description": "Business insight discovered from data analysis"}},
+                                     ["insight"]),
+                       sqlite.append_insight),
+        ]
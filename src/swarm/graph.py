@@ -0,0 +1,316 @@
+# src/swarm/graph.py
+
+"""
+Compiled Agent Graph
+
+Provides an immutable snapshot of a blueprint's agents, their merged tool
+manifests and the handoff edges between them, plus the lightweight per-run
+state object used by `Swarm.run`. Compiling once and sharing the result lets
+many concurrent runs use a single Swarm without locks or re-discovery.
+"""
+
+import inspect
+import logging
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, MutableMapping, Optional, Tuple
+
+from .types import Agent, AgentFunction, Tool
+from .util import function_to_json
+
+logger = logging.getLogger(__name__)
+
+# Name prefixes that identify zero-argument handoff functions in blueprints.
+HANDOFF_PREFIXES = ("handoff_", "delegate_", "transfer_")
+
+
+def _is_handoff_candidate(func: Any) -> bool:
+    """Return True if `func` looks like a zero-argument function returning an Agent."""
+    if isinstance(func, Tool):
+        return False
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return False
+
+    name = getattr(func, "__name__", "")
+    annotated = signature.return_annotation in (Agent, "Agent")
+    if not annotated and not name.startswith(HANDOFF_PREFIXES):
+        return False
+
+    for param in signature.parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        if param.default is inspect.Parameter.empty:
+            return False
+    return True
+
+
+def handoff(*targets: str, resolve: bool = False):
+    """
+    Declare the agents a handoff function returns, so the graph reads its edges without calling it.
+
+    Args:
+        *targets (str): Names of the agents the function can hand off to.
+        resolve (bool): Let the graph call the function (without arguments) to
+            learn its target; only for functions that are cheap and side-effect free.
+
+    Returns:
+        Callable: A decorator that marks the function and returns it unchanged.
+    """
+    def decorate(func: AgentFunction) -> AgentFunction:
+        func.handoff_targets = frozenset(targets)
+        func.resolve_handoff = resolve
+        return func
+    return decorate
+
+
+def _code_references(func: Any) -> Tuple[FrozenSet[str], List[Any]]:
+    """
+    The string constants and referenced objects (closure cells and globals) of `func`'s code.
+
+    Only the function's code object and namespaces are read; nothing is executed.
+    """
+    func = inspect.unwrap(getattr(func, "__func__", func))
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return frozenset(), []
+
+    strings = set()
+    pending = [code]
+    while pending:
+        current = pending.pop()
+        for const in current.co_consts:
+            if isinstance(const, str):
+                strings.add(const)
+            elif inspect.iscode(const):
+                pending.append(const)
+
+    objects = []
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            objects.append(cell.cell_contents)
+        except ValueError:  # empty cell
+            continue
+    namespace = getattr(func, "__globals__", {})
+    objects.extend(namespace[name] for name in code.co_names if name in namespace)
+    return frozenset(strings), objects
+
+
+def find_handoff_targets(functions: Iterable[AgentFunction], agent_names: Iterable[str]) -> FrozenSet[str]:
+    """
+    Resolve the agents reachable through the handoff functions in `functions`.
+
+    Targets are read without running blueprint code. A function decorated with
+    `handoff(...)` declares them; otherwise a handoff function (`handoff_to_*`,
+    `delegate_to_*`, or anything annotated `-> Agent` without required
+    parameters) is inspected: known agent names among its string constants (as
+    in `return agents["Helper"]`) and agents it references through its closure or
+    globals are its targets. Only functions marked `handoff(resolve=True)` are called.
+
+    Args:
+        functions (Iterable[AgentFunction]): The functions of a single agent.
+        agent_names (Iterable[str]): Names of the agents known to the graph.
+
+    Returns:
+        FrozenSet[str]: Names of the agents this agent can hand off to.
+    """
+    known = set(agent_names)
+    targets = set()
+    for func in functions:
+        if isinstance(func, Tool):
+            continue
+        declared = getattr(func, "handoff_targets", None)
+        if declared is not None:
+            targets.update(name for name in declared if name in known)
+            if not getattr(func, "resolve_handoff", False):
+                continue
+            try:
+                target = func()
+            except Exception as e:
+                logger.debug(f"Could not resolve handoff target of '{getattr(func, '__name__', func)}': {e}")
+                continue
+            target_name = getattr(target, "name", None)
+            if isinstance(target_name, str) and target_name in known:
+                targets.add(target_name)
+            continue
+
+        if not _is_handoff_candidate(func):
+            continue
+        strings, objects = _code_references(func)
+        targets.update(strings & known)
+        targets.update(obj.name for obj in objects if isinstance(obj, Agent) and obj.name in known)
+    return frozenset(targets)
+
+
+def handoff_order(edges: Mapping[str, Iterable[str]], start: str) -> List[str]:
+    """
+    Return the agents reachable from `start` in breadth-first order (nearest handoffs first).
+
+    Args:
+        edges (Mapping[str, Iterable[str]]): Handoff edges by agent name.
+        start (str): Name of the starting agent, which is not included in the result.
+
+    Returns:
+        List[str]: Reachable agent names ordered by handoff distance.
+    """
+    order: List[str] = []
+    seen = {start}
+    frontier = [start]
+    while frontier:
+        next_frontier = []
+        for name in frontier:
+            for target in sorted(edges.get(name, ())):
+                if target not in seen:
+                    seen.add(target)
+                    order.append(target)
+                    next_frontier.append(target)
+        frontier = next_frontier
+    return order
+
+
+class CompiledAgent:
+    """
+    Read-only view of an agent with its discovered tools merged in.
+
+    `agent` is a private copy of the source agent carrying the merged
+    function list, so the source agent registered on the Swarm is never
+    mutated by discovery.
+    """
+
+    __slots__ = ("name", "source", "agent", "functions", "function_map", "tools", "handoffs")
+
+    def __init__(
+        self,
+        source: Any,
+        functions: Iterable[AgentFunction],
+        handoffs: Iterable[str] = (),
+    ):
+        functions = tuple(functions)
+        object.__setattr__(self, "name", source.name)
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "agent", _snapshot_agent(source, functions))
+        object.__setattr__(self, "functions", functions)
+        object.__setattr__(self, "function_map", MappingProxyType({f.__name__: f for f in functions}))
+        object.__setattr__(self, "tools", tuple(function_to_json(f) for f in functions))
+        object.__setattr__(self, "handoffs", frozenset(handoffs))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def matches(self, agent: Any) -> bool:
+        """Return True if `agent` is the source agent or its compiled copy."""
+        return agent is self.source or agent is self.agent
+
+    def tool_manifest(self) -> List[Dict[str, Any]]:
+        """Return the serialized tool list as a fresh list for a completion request."""
+        return list(self.tools)
+
+    def __repr__(self) -> str:
+        return f"CompiledAgent(name={self.name!r}, functions={len(self.functions)}, handoffs={sorted(self.handoffs)})"
+
+
+def _snapshot_agent(agent: Any, functions: Tuple[AgentFunction, ...]) -> Any:
+    """Return a copy of `agent` whose `functions` is `functions`, sharing everything else."""
+    current = getattr(agent, "functions", None) or []
+    if len(current) == len(functions) and all(a is b for a, b in zip(current, functions)):
+        return agent
+    if isinstance(agent, Agent):
+        snapshot = agent.model_copy()
+        object.__setattr__(snapshot, "functions", list(functions))
+        return snapshot
+    logger.debug(f"Agent '{getattr(agent, 'name', agent)}' cannot be copied; discovered tools are used per run only.")
+    return agent
+
+
+class AgentGraph:
+    """
+    Immutable mapping of agent name to `CompiledAgent`, with handoff edges.
+
+    Graphs are never modified in place; `with_agent` returns a new graph so a
+    reference can be swapped atomically while other runs keep using the old one.
+    """
+
+    __slots__ = ("_agents",)
+
+    def __init__(self, agents: Mapping[str, CompiledAgent]):
+        object.__setattr__(self, "_agents", MappingProxyType(dict(agents)))
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._agents
+
+    def __getitem__(self, name: str) -> CompiledAgent:
+        return self._agents[name]
+
+    def __iter__(self):
+        return iter(self._agents)
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def get(self, name: str) -> Optional[CompiledAgent]:
+        return self._agents.get(name)
+
+    @property
+    def agents(self) -> Mapping[str, CompiledAgent]:
+        return self._agents
+
+    @property
+    def edges(self) -> Mapping[str, FrozenSet[str]]:
+        """Handoff edges as a mapping of agent name to target agent names."""
+        return MappingProxyType({name: compiled.handoffs for name, compiled in self._agents.items()})
+
+    def reachable_from(self, name: str) -> FrozenSet[str]:
+        """Return every agent reachable from `name` through handoffs, excluding `name` itself."""
+        return frozenset(handoff_order(self.edges, name))
+
+    def with_agent(self, compiled: CompiledAgent) -> "AgentGraph":
+        """Return a new graph containing `compiled` in addition to the current agents."""
+        agents = dict(self._agents)
+        agents[compiled.name] = compiled
+        return AgentGraph(agents)
+
+    def __repr__(self) -> str:
+        return f"AgentGraph({dict(self.edges)!r})"
+
+
+class RunContext:
+    """
+    Per-run execution state for `Swarm.run` and `Swarm.run_and_stream`.
+
+    Holds everything a single conversation run may change (the active agent and
+    the run's context variables) so the shared Swarm and graph stay untouched.
+    `context_variables` is a `ContextVariables` layered over the caller's context.
+    """
+
+    __slots__ = ("graph", "active", "context_variables", "model_override", "debug", "trace")
+
+    def __init__(
+        self,
+        graph: AgentGraph,
+        active: CompiledAgent,
+        context_variables: MutableMapping,
+        model_override: Optional[str] = None,
+        debug: bool = False,
+        trace: Optional[bool] = None,
+    ):
+        self.graph = graph
+        self.active = active
+        self.context_variables = context_variables
+        self.model_override = model_override
+        self.debug = debug
+        # Whether this run logs its per-turn debug traces; see `TraceSampler`.
+        self.trace = debug if trace is None else trace
+        self.context_variables["active_agent_name"] = active.name
+
+    @property
+    def agent(self) -> Any:
+        """The active agent, with its merged tools."""
+        return self.active.agent
+
+    def switch_to(self, compiled: CompiledAgent) -> None:
+        """Make `compiled` the active agent for the rest of this run."""
+        self.active = compiled
+        self.context_variables["active_agent_name"] = compiled.name
@@ -0,0 +1,277 @@
+# src/swarm/messages.py
+
+"""
+Compact Conversation Messages
+
+`Message` is the in-memory form of one conversation message: an immutable
+object with `__slots__`, interned role/sender/tool names, and tool calls held
+as shared immutable `ToolCall` tuples. Because nothing can change a message,
+histories share message objects between turns and between runs instead of
+deep-copying them; a history is just a list of references.
+
+Messages read like the OpenAI wire dicts they replace (`msg["role"]`,
+`msg.get("tool_calls")`, `tc["function"]["name"]`), and are converted to real
+dicts only at the boundary, when a request is sent or a response serialized.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Message fields in wire order; anything else a message carries goes to `extra`.
+FIELDS = ("role", "content", "sender", "name", "tool_calls", "tool_call_id", "tool_name", "function_call")
+_FIELD_SET = frozenset(FIELDS)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _freeze(value: Any) -> Any:
+    """A hashable stand-in for nested content (multi-part content lists, extras)."""
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class _Frozen(Mapping):
+    """Immutable base for the message types: attribute writes fail after construction."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, _Frozen):
+            return type(other) is type(self) and hash(self) == hash(other) and self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class FunctionCall(_Frozen):
+    """The `function` part of a tool call (or a legacy `function_call`)."""
+
+    __slots__ = ("name", "arguments")
+
+    def __init__(self, name: str, arguments: str = ""):
+        object.__setattr__(self, "name", _intern(name))
+        object.__setattr__(self, "arguments", arguments or "")
+
+    @classmethod
+    def coerce(cls, value: Any) -> "FunctionCall":
+        if isinstance(value, FunctionCall):
+            return value
+        if isinstance(value, Mapping):
+            return cls(value.get("name") or "", value.get("arguments") or "")
+        return cls(getattr(value, "name", "") or "", getattr(value, "arguments", "") or "")
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "name":
+            return self.name
+        if key == "arguments":
+            return self.arguments
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("name", "arguments"))
+
+    def __len__(self) -> int:
+        return 2
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.arguments))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "arguments": self.arguments}
+
+
+class ToolCall(_Frozen):
+    """One tool call of an assistant message; attribute access matches the OpenAI SDK type."""
+
+    __slots__ = ("id", "type", "function")
+
+    def __init__(self, id: str, function: FunctionCall, type: str = "function"):
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "type", _intern(type or "function"))
+        object.__setattr__(self, "function", FunctionCall.coerce(function))
+
+    @classmethod
+    def coerce(cls, value: Any) -> "ToolCall":
+        """Build a tool call from a wire dict or an SDK object; tool calls pass through unchanged."""
+        if isinstance(value, ToolCall):
+            return value
+        if isinstance(value, Mapping):
+            return cls(value.get("id") or "", FunctionCall.coerce(value.get("function") or {}), value.get("type"))
+        return cls(getattr(value, "id", "") or "", FunctionCall.coerce(value.function), getattr(value, "type", None))
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "id":
+            return self.id
+        if key == "type":
+            return self.type
+        if key == "function":
+            return self.function
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("id", "type", "function"))
+
+    def __len__(self) -> int:
+        return 3
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.type, self.function))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "function": self.function.to_dict()}
+
+
+class Message(_Frozen):
+    """
+    An immutable conversation message.
+
+    Args:
+        role (str): "system", "user", "assistant" or "tool".
+        content (Any): Text, or a list of content parts (kept as a tuple).
+        sender (Optional[str]): Name of the agent that produced an assistant message.
+        name (Optional[str]): Optional participant name.
+        tool_calls (Iterable): Tool calls of an assistant message.
+        tool_call_id (Optional[str]): The call a tool message answers.
+        tool_name (Optional[str]): The tool that produced a tool message.
+        function_call (Any): Legacy function call of an assistant message.
+        extra (Optional[Dict[str, Any]]): Any other keys (ids, timestamps, ...).
+    """
+
+    __slots__ = FIELDS + ("extra", "_hash")
+
+    def __init__(
+        self,
+        role: str,
+        content: Any = None,
+        sender: Optional[str] = None,
+        name: Optional[str] = None,
+        tool_calls: Iterable[Any] = (),
+        tool_call_id: Optional[str] = None,
+        tool_name: Optional[str] = None,
+        function_call: Any = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        setter = object.__setattr__
+        setter(self, "role", _intern(role))
+        setter(self, "content", tuple(content) if isinstance(content, list) else content)
+        setter(self, "sender", _intern(sender))
+        setter(self, "name", _intern(name))
+        setter(self, "tool_calls", tuple(ToolCall.coerce(tc) for tc in tool_calls or ()))
+        setter(self, "tool_call_id", tool_call_id)
+        setter(self, "tool_name", _intern(tool_name))
+        setter(self, "function_call", FunctionCall.coerce(function_call) if function_call else None)
+        setter(self, "extra", tuple(extra.items()) if extra else ())
+        setter(self, "_hash", None)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "Message":
+        """Build a message from a wire dict; None-valued extra keys are dropped."""
+        extra = {k: v for k, v in data.items() if k not in _FIELD_SET and v is not None}
+        return cls(
+            role=data.get("role") or "user",
+            content=data.get("content"),
+            sender=data.get("sender"),
+            name=data.get("name"),
+            tool_calls=data.get("tool_calls") or (),
+            tool_call_id=data.get("tool_call_id"),
+            tool_name=data.get("tool_name"),
+            function_call=data.get("function_call"),
+            extra=extra,
+        )
+
+    @classmethod
+    def coerce(cls, value: Any) -> "Message":
+        """
+        Return `value` as a Message.
+
+        Messages are returned unchanged (that is what makes sharing free);
+        dicts and SDK message objects (pydantic models, namespaces) are converted.
+        """
+        if isinstance(value, Message):
+            return value
+        if isinstance(value, Mapping):
+            return cls.from_dict(value)
+        data = dict(getattr(value, "__dict__", {}))
+        extra = getattr(value, "model_extra", None)
+        if extra:
+            data.update(extra)
+        return cls.from_dict(data)
+
+    def replace(self, **changes: Any) -> "Message":
+        """Return a copy with some fields changed; unchanged fields are shared."""
+        fields = {field: getattr(self, field) for field in FIELDS}
+        fields["extra"] = dict(self.extra)
+        fields.update(changes)
+        return Message(**fields)
+
+    def _present(self) -> Iterator[Tuple[str, Any]]:
+        yield "role", self.role
+        yield "content", self.content
+        for field in FIELDS[2:]:
+            value = getattr(self, field)
+            if value is not None and value != ():
+                yield field, value
+        yield from self.extra
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+            if key in ("role", "content") or (value is not None and value != ()):
+                return value
+            raise KeyError(key)
+        for extra_key, value in self.extra:
+            if extra_key == key:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self._present())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._present())
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(tuple((key, _freeze(value)) for key, value in self._present())))
+        return self._hash
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The OpenAI wire form: a fresh dict the caller may modify."""
+        data = {}
+        for key, value in self._present():
+            if key == "tool_calls":
+                value = [tc.to_dict() for tc in value]
+            elif key == "function_call":
+                value = value.to_dict()
+            elif key == "content" and isinstance(value, tuple):
+                value = list(value)
+            data[key] = value
+        return data
+
+
+def as_messages(messages: Iterable[Any]) -> List[Message]:
+    """Convert a history to Messages; items that already are Messages are shared, not copied."""
+    return [Message.coerce(message) for message in messages]
+
+
+def to_wire(messages: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Convert a history to OpenAI wire dicts."""
+    return [message.to_dict() if isinstance(message, Message) else dict(message) for message in messages]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('swarm', '0010_initial_chat_models'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['conversation', 'timestamp', 'id'], name='swarm_chatmsg_conv_ts_idx'),
+        ),
+    ]
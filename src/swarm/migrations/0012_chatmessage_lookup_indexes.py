@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:41
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_hashes(apps, schema_editor):
+    ChatMessage = apps.get_model("swarm", "ChatMessage")
+    batch = []
+    for message in ChatMessage.objects.only("id", "content").iterator(chunk_size=2000):
+        message.content_hash = hashlib.sha256((message.content or "").encode("utf-8")).hexdigest()
+        batch.append(message)
+        if len(batch) >= 2000:
+            ChatMessage.objects.bulk_update(batch, ["content_hash"])
+            batch = []
+    if batch:
+        ChatMessage.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('swarm', '0011_chatmessage_conversation_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatmessage',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hashes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['conversation', 'tool_call_id', 'timestamp'], name='swarm_chatmsg_conv_tool_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatmessage',
+            index=models.Index(fields=['conversation', 'content_hash'], name='swarm_chatmsg_conv_hash_idx'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import hashlib
+
 from django.db import models
 
 class ChatConversation(models.Model):
@@ -25,15 +27,34 @@ class ChatMessage(models.Model):
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     tool_call_id = models.CharField(max_length=255, blank=True, null=True)
+    # SHA-256 of `content`, so duplicate checks are index lookups instead of content scans.
+    content_hash = models.CharField(max_length=64, blank=True, default="", editable=False)
 
     class Meta:
         ordering = ["timestamp"]
+        indexes = [
+            # Backs per-conversation history reads and cursor pagination in (timestamp, id) order.
+            models.Index(fields=["conversation", "timestamp", "id"], name="swarm_chatmsg_conv_ts_idx"),
+            models.Index(fields=["conversation", "tool_call_id", "timestamp"], name="swarm_chatmsg_conv_tool_idx"),
+            models.Index(fields=["conversation", "content_hash"], name="swarm_chatmsg_conv_hash_idx"),
+        ]
         verbose_name = "Chat Message"
         verbose_name_plural = "Chat Messages"
 
     def __str__(self):
         return self.content[:50]
 
+    @staticmethod
+    def hash_content(content: str) -> str:
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.hash_content(self.content or "")
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
 __all__ = [
     "ChatConversation",
     "ChatMessage",
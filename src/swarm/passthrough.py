@@ -0,0 +1,334 @@
+# src/swarm/passthrough.py
+
+"""
+Passthrough LLM proxy
+
+Proxies chat completion requests for `llm` entries marked `passthrough` to
+their upstream OpenAI-compatible endpoint, or to the endpoints of a routed
+pool (see `swarm.router`). The upstream response body is streamed back
+byte for byte without being parsed or re-serialised; only a small rolling
+tail is kept to pick up the `usage` block for accounting. Streamed requests
+that did not set `stream_options` are sent with `include_usage` so they can be
+accounted too, and the usage-only chunk this adds is dropped from the relay.
+
+Under ASGI the upstream connection is opened on the server's event loop
+with a pooled `httpx.AsyncClient` and the body is relayed as an async
+iterator; under WSGI a pooled synchronous client streams it instead.
+"""
+
+import asyncio
+import collections
+import json
+import logging
+import re
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from asgiref.sync import async_to_sync
+
+from .router import get_router, llm_backend
+from .utils.metrics import registry as metrics
+from .utils.resilience import RETRYABLE_STATUS, RetryPolicy, call_with_resilience
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Bytes kept from the end of a response to find its `usage` block.
+USAGE_TAIL_BYTES = 8192
+_USAGE_PATTERN = re.compile(rb'"usage"\s*:\s*(\{(?:[^{}]|\{[^{}]*\})*\})')
+
+_clients: Dict[str, httpx.Client] = {}
+_async_clients: "weakref.WeakKeyDictionary[Any, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+class UpstreamError(Exception):
+    """An upstream endpoint answered with a retryable HTTP status (429, 5xx, ...)."""
+
+    def __init__(self, status_code: int, content: bytes, content_type: str):
+        super().__init__(f"Upstream returned HTTP {status_code}")
+        self.status_code = status_code
+        self.content = content
+        self.content_type = content_type
+
+
+class UsageMeter:
+    """Keeps the tail of a response body and extracts its token `usage` once it is complete."""
+
+    def __init__(self):
+        self._tail = collections.deque()
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self._tail.append(chunk)
+        self._size += len(chunk)
+        while self._size - len(self._tail[0]) >= USAGE_TAIL_BYTES:
+            self._size -= len(self._tail.popleft())
+
+    def usage(self) -> Optional[Dict[str, Any]]:
+        """Return the last `usage` object seen in the body, if any."""
+        matches = _USAGE_PATTERN.findall(b"".join(self._tail))
+        if not matches:
+            return None
+        try:
+            return json.loads(matches[-1])
+        except ValueError:
+            return None
+
+
+class UsageChunkFilter:
+    """
+    Drops the usage-only chunk (`"choices": []`) from an event stream.
+
+    Used when `stream_options.include_usage` was added for accounting, so the
+    client gets the stream it asked for. Other events pass through unchanged,
+    cut at event boundaries.
+    """
+
+    def __init__(self):
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Return the complete events of `chunk` to relay, keeping a partial event buffered."""
+        data = self._buffer + chunk
+        end = data.rfind(b"\n\n")
+        if end < 0:
+            self._buffer = data
+            return b""
+        self._buffer = data[end + 2:]
+        events = data[:end].split(b"\n\n")
+        return b"".join(event + b"\n\n" for event in events if not self._usage_only(event))
+
+    def flush(self) -> bytes:
+        """Return whatever is left buffered once the upstream body has ended."""
+        rest, self._buffer = self._buffer, b""
+        return rest
+
+    @staticmethod
+    def _usage_only(event: bytes) -> bool:
+        if b'"usage"' not in event:
+            return False
+        try:
+            payload = json.loads(event.partition(b"data:")[2])
+        except ValueError:
+            return False
+        return isinstance(payload, dict) and payload.get("choices") == [] and "usage" in payload
+
+
+def record_usage(model: str, user: str, usage: Dict[str, Any]) -> None:
+    """
+    Account the token usage of a proxied request.
+
+    Args:
+        model (str): Logical model name requested by the client.
+        user (str): Authenticated user the request belongs to.
+        usage (dict): The upstream `usage` block.
+    """
+    for kind in ("prompt_tokens", "completion_tokens"):
+        tokens = usage.get(kind)
+        if isinstance(tokens, (int, float)):
+            metrics.inc("swarm_llm_tokens_total", tokens, labels={"model": model, "user": user, "kind": kind},
+                        help_text="Tokens used by proxied passthrough requests.")
+    logger.info(f"Passthrough usage for model '{model}' by '{user}': {usage}")
+
+
+class ProxiedResponse:
+    """
+    An upstream response whose body is relayed as-is.
+
+    Iterate it (or `async for` it, for responses opened by the async client) to
+    receive the raw body chunks; the upstream connection is returned to the pool
+    and `on_usage` is called once the body has been relayed. With `strip_usage`,
+    a streamed body loses the usage-only chunk the proxy asked for.
+    """
+
+    def __init__(
+        self,
+        response: httpx.Response,
+        on_usage: Optional[Callable[[Dict[str, Any]], None]] = None,
+        strip_usage: bool = False,
+    ):
+        self.status_code = response.status_code
+        self.content_type = response.headers.get("content-type", "application/json")
+        self._response = response
+        self._on_usage = on_usage
+        self._meter = UsageMeter()
+        self._filter = UsageChunkFilter() if strip_usage and self.streaming else None
+
+    @property
+    def streaming(self) -> bool:
+        return self.content_type.startswith("text/event-stream")
+
+    def __iter__(self):
+        try:
+            for chunk in self._response.iter_raw():
+                self._meter.feed(chunk)
+                if self._filter is not None:
+                    chunk = self._filter.feed(chunk)
+                if chunk:
+                    yield chunk
+            if self._filter is not None and (rest := self._filter.flush()):
+                yield rest
+            self._account()
+        finally:
+            self._response.close()
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._response.aiter_raw():
+                self._meter.feed(chunk)
+                if self._filter is not None:
+                    chunk = self._filter.feed(chunk)
+                if chunk:
+                    yield chunk
+            if self._filter is not None and (rest := self._filter.flush()):
+                yield rest
+            self._account()
+        finally:
+            await self._response.aclose()
+
+    def close(self) -> None:
+        if isinstance(self._response.stream, httpx.SyncByteStream):
+            self._response.close()
+
+    def _account(self) -> None:
+        if self._on_usage is None:
+            return
+        usage = self._meter.usage()
+        if usage:
+            try:
+                self._on_usage(usage)
+            except Exception as e:
+                logger.error(f"Failed to record passthrough usage: {e}")
+
+
+def _base_url(llm_config: Dict[str, Any]) -> str:
+    return (llm_config.get("base_url") or DEFAULT_BASE_URL).rstrip("/") + "/"
+
+
+def _get_client(base_url: str) -> httpx.Client:
+    """Return the keep-alive HTTP client for `base_url`, shared by all requests."""
+    client = _clients.get(base_url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(base_url)
+            if client is None:
+                client = httpx.Client(base_url=base_url, timeout=None)
+                _clients[base_url] = client
+    return client
+
+
+def _get_async_client(base_url: str) -> httpx.AsyncClient:
+    """Return the keep-alive async HTTP client for `base_url` on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(base_url)
+        if client is None:
+            client = httpx.AsyncClient(base_url=base_url, timeout=None)
+            clients[base_url] = client
+    return client
+
+
+def _adds_usage_chunk(body: Dict[str, Any]) -> bool:
+    """True if the proxy asks upstream for a usage chunk the client did not request."""
+    return bool(body.get("stream")) and "stream_options" not in body
+
+
+def _request_parts(llm_config: Dict[str, Any], body: Dict[str, Any]) -> Dict[str, Any]:
+    payload = dict(body)
+    if llm_config.get("model"):
+        payload["model"] = llm_config["model"]
+    if _adds_usage_chunk(body):
+        # Ask for the final usage chunk so streamed requests can be accounted too; it is not relayed.
+        payload["stream_options"] = {"include_usage": True}
+    headers = {"Content-Type": "application/json", "Accept-Encoding": "identity"}
+    if llm_config.get("api_key"):
+        headers["Authorization"] = f"Bearer {llm_config['api_key']}"
+    return {"url": "chat/completions", "content": json.dumps(payload).encode(), "headers": headers}
+
+
+def _open(llm_config: Dict[str, Any], body: Dict[str, Any], timeout: Optional[float]) -> httpx.Response:
+    client = _get_client(_base_url(llm_config))
+    request = client.build_request("POST", timeout=timeout, **_request_parts(llm_config, body))
+    response = client.send(request, stream=True)
+    if response.status_code in RETRYABLE_STATUS:
+        content = response.read()
+        response.close()
+        raise UpstreamError(response.status_code, content, response.headers.get("content-type", "application/json"))
+    return response
+
+
+async def _open_async(llm_config: Dict[str, Any], body: Dict[str, Any], timeout: Optional[float]) -> httpx.Response:
+    client = _get_async_client(_base_url(llm_config))
+    request = client.build_request("POST", timeout=timeout, **_request_parts(llm_config, body))
+    response = await client.send(request, stream=True)
+    if response.status_code in RETRYABLE_STATUS:
+        content = await response.aread()
+        await response.aclose()
+        raise UpstreamError(response.status_code, content, response.headers.get("content-type", "application/json"))
+    return response
+
+
+def proxy_chat_completion(
+    model: str,
+    body: Dict[str, Any],
+    llm_profiles: Dict[str, Dict[str, Any]],
+    use_async: bool = False,
+    on_usage: Optional[Callable[[Dict[str, Any]], None]] = None,
+):
+    """
+    Open a proxied chat completion for the passthrough model `model`.
+
+    Pools fail over between endpoints on transient errors and keep the chosen
+    endpoint leased until the body has been relayed; a single profile is retried
+    with backoff. Must be called from synchronous code: with `use_async` the
+    upstream request runs on the outer event loop (the ASGI server's loop when
+    called from a sync view), and the result must be consumed there with `async for`.
+
+    Args:
+        model (str): Logical model name from the request.
+        body (dict): The parsed request body.
+        llm_profiles (dict): The `llm` configuration section.
+        use_async (bool): Use the pooled async client instead of the sync one.
+        on_usage (Optional[Callable]): Called with the upstream `usage` block once relayed.
+
+    Returns:
+        A `ProxiedResponse` (possibly wrapped in a pool lease) exposing `status_code`,
+        `content_type` and `streaming`, or an `UpstreamError` carrying the last retryable
+        upstream error response when every attempt failed.
+
+    Raises:
+        ResilienceError: If no endpoint can take the request (open circuits, saturation, deadline).
+    """
+    def open_endpoint(llm_config: Dict[str, Any], pooled: bool = False):
+        policy_defaults = {"timeout": llm_config.get("timeout")}
+        if pooled:
+            policy_defaults["max_attempts"] = 1
+
+        def attempt(timeout: Optional[float]) -> httpx.Response:
+            if use_async:
+                return async_to_sync(_open_async)(llm_config, body, timeout)
+            return _open(llm_config, body, timeout)
+
+        response = call_with_resilience(
+            attempt,
+            backend=llm_backend(llm_config),
+            policy=RetryPolicy.from_config(llm_config.get("retry"), **policy_defaults),
+            breaker_config=llm_config.get("circuit_breaker"),
+        )
+        return ProxiedResponse(response, on_usage, strip_usage=_adds_usage_chunk(body))
+
+    pool = get_router(llm_profiles).pool(model)
+    try:
+        if pool is None:
+            proxied = open_endpoint(llm_profiles[model])
+        else:
+            proxied = pool.call(lambda endpoint: open_endpoint(endpoint.config, pooled=True), stream=True)
+    except UpstreamError as e:
+        return e
+    logger.debug(f"Passthrough model '{model}' answered with HTTP {proxied.status_code}")
+    return proxied
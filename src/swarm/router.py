@@ -0,0 +1,374 @@
+# src/swarm/router.py
+
+"""
+Multi-LLM Router
+
+Lets a logical model name in the `llm` section of swarm_config.json map to a
+weighted pool of endpoints instead of a single profile:
+
+    "llm": {
+        "ollama-a": {"provider": "ollama", "model": "llama3", "base_url": "http://box-a:11434/v1"},
+        "ollama-b": {"provider": "ollama", "model": "llama3", "base_url": "http://box-b:11434/v1"},
+        "openai":   {"provider": "openai", "model": "gpt-4o-mini", "api_key": "${OPENAI_API_KEY}"},
+        "local": {
+            "strategy": "least_outstanding",
+            "endpoints": [
+                {"profile": "ollama-a", "weight": 2, "max_concurrency": 8},
+                {"profile": "ollama-b", "max_concurrency": 4},
+                {"profile": "openai", "weight": 0.5}
+            ]
+        }
+    }
+
+Each request goes to the endpoint with the best score (least outstanding
+requests per unit of weight, or latency EWMA scaled by load), skipping
+endpoints that are at their concurrency limit or whose circuit breaker is
+open, and fails over to the next endpoint on transient errors and 429s.
+Pools are shared process-wide so every Swarm instance balances against the
+same counters.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from .utils.metrics import registry as metrics
+from .utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilienceError,
+    current_deadline,
+    get_breaker,
+    is_retryable,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STRATEGIES = ("least_outstanding", "ewma")
+
+# Keys of a pool member that configure the member itself rather than the LLM profile.
+_MEMBER_KEYS = ("profile", "weight", "max_concurrency")
+
+
+def llm_backend(llm_config: Dict[str, Any]) -> str:
+    """Return the backend identifier (circuit breaker and metrics key) for an LLM profile."""
+    return f"llm:{llm_config.get('base_url') or 'default'}"
+
+
+def is_pool_config(llm_config: Optional[Dict[str, Any]]) -> bool:
+    """Return True if an `llm` entry defines an endpoint pool rather than a single endpoint."""
+    return bool(llm_config) and isinstance(llm_config.get("endpoints"), list)
+
+
+class NoEndpointAvailable(ResilienceError):
+    """Raised when no endpoint of a pool can take a request (all failed, open or saturated)."""
+
+    def __init__(self, pool: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"No endpoint available in LLM pool '{pool}': {reason}.")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class Endpoint:
+    """One member of an endpoint pool with its live load and latency statistics."""
+
+    __slots__ = ("name", "config", "weight", "max_concurrency", "backend", "outstanding", "ewma")
+
+    def __init__(self, name: str, config: Dict[str, Any], weight: float = 1.0, max_concurrency: Optional[int] = None):
+        self.name = name
+        self.config = config
+        self.weight = max(float(weight), 1e-6)
+        self.max_concurrency = int(max_concurrency) if max_concurrency else None
+        self.backend = llm_backend(config)
+        self.outstanding = 0
+        self.ewma: Optional[float] = None
+
+    @property
+    def saturated(self) -> bool:
+        return self.max_concurrency is not None and self.outstanding >= self.max_concurrency
+
+    def __repr__(self) -> str:
+        return f"Endpoint(name={self.name!r}, outstanding={self.outstanding}, ewma={self.ewma})"
+
+
+class EndpointPool:
+    """
+    Weighted pool of LLM endpoints behind one logical model name.
+
+    `call` leases an endpoint, runs a request against its profile and fails over
+    to the next best endpoint when the request fails with a transient error.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        endpoints: Iterable[Endpoint],
+        strategy: str = "least_outstanding",
+        ewma_alpha: float = 0.3,
+        queue_timeout: float = 30.0,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy '{strategy}' for LLM pool '{name}'; use one of {STRATEGIES}.")
+        self.name = name
+        self.endpoints: List[Endpoint] = list(endpoints)
+        if not self.endpoints:
+            raise ValueError(f"LLM pool '{name}' has no endpoints.")
+        self.strategy = strategy
+        self.ewma_alpha = float(ewma_alpha)
+        self.queue_timeout = float(queue_timeout)
+        self._cond = threading.Condition()
+
+    def _score(self, endpoint: Endpoint) -> float:
+        load = (endpoint.outstanding + 1) / endpoint.weight
+        if self.strategy == "ewma":
+            # Unmeasured endpoints score 0 so each gets probed once before latency takes over.
+            return (endpoint.ewma or 0.0) * load
+        return load
+
+    def _candidates(self, exclude: Iterable[str]) -> List[Endpoint]:
+        excluded = set(exclude)
+        return [
+            endpoint for endpoint in self.endpoints
+            if endpoint.name not in excluded and self.breaker(endpoint).state != CircuitBreaker.OPEN
+        ]
+
+    @staticmethod
+    def breaker(endpoint: Endpoint) -> CircuitBreaker:
+        """The endpoint's circuit breaker, created with its `circuit_breaker` settings if it is new."""
+        return get_breaker(endpoint.backend, endpoint.config.get("circuit_breaker"))
+
+    def acquire(self, exclude: Iterable[str] = (), timeout: Optional[float] = None) -> Endpoint:
+        """
+        Lease the best available endpoint, waiting while all candidates are at their concurrency limit.
+
+        Args:
+            exclude (Iterable[str]): Endpoint names that must not be used (already failed for this request).
+            timeout (Optional[float]): Seconds to wait for a free slot; defaults to the pool's `queue_timeout`.
+
+        Returns:
+            Endpoint: The leased endpoint; pass it to `release` when the request is done.
+
+        Raises:
+            NoEndpointAvailable: If every endpoint is excluded or open, or no slot frees up in time.
+        """
+        exclude = tuple(exclude)
+        wait_until = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        with self._cond:
+            while True:
+                candidates = self._candidates(exclude)
+                if not candidates:
+                    raise NoEndpointAvailable(self.name, "all endpoints failed or have open circuits")
+                available = [endpoint for endpoint in candidates if not endpoint.saturated]
+                if available:
+                    best = min(self._score(endpoint) for endpoint in available)
+                    endpoint = random.choice([e for e in available if self._score(e) == best])
+                    endpoint.outstanding += 1
+                    self._publish(endpoint)
+                    return endpoint
+                remaining = wait_until - time.monotonic()
+                if remaining <= 0:
+                    raise NoEndpointAvailable(self.name, "all endpoints are at their concurrency limit")
+                self._cond.wait(remaining)
+
+    def release(self, endpoint: Endpoint, latency: Optional[float] = None) -> None:
+        """
+        Return a leased endpoint to the pool.
+
+        Args:
+            endpoint (Endpoint): The endpoint returned by `acquire`.
+            latency (Optional[float]): Duration of a successful request, folded into the EWMA.
+        """
+        with self._cond:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if latency is not None:
+                if endpoint.ewma is None:
+                    endpoint.ewma = latency
+                else:
+                    endpoint.ewma += self.ewma_alpha * (latency - endpoint.ewma)
+            self._publish(endpoint)
+            self._cond.notify()
+
+    def _publish(self, endpoint: Endpoint) -> None:
+        labels = {"pool": self.name, "endpoint": endpoint.name}
+        metrics.set("swarm_llm_endpoint_outstanding", endpoint.outstanding, labels,
+                    help_text="In-flight requests per pooled LLM endpoint.")
+        if endpoint.ewma is not None:
+            metrics.set("swarm_llm_endpoint_latency_ewma_seconds", endpoint.ewma, labels,
+                        help_text="Latency EWMA per pooled LLM endpoint.")
+
+    def call(self, func: Callable[[Endpoint], T], stream: bool = False) -> T:
+        """
+        Run `func` against the best endpoint, failing over on transient errors.
+
+        Args:
+            func (Callable[[Endpoint], T]): Sends the request using `endpoint.config`.
+            stream (bool): If True, the result is an iterable stream and the endpoint stays
+                leased until the stream is exhausted or closed.
+
+        Returns:
+            The result of the first endpoint that succeeds.
+
+        Raises:
+            NoEndpointAvailable: If no endpoint could take the request.
+            Exception: A non-transient error from `func`, or the last transient one once all
+                endpoints have been tried.
+        """
+        tried: List[str] = []
+        last_error: Optional[BaseException] = None
+        while True:
+            deadline = current_deadline()
+            try:
+                endpoint = self.acquire(tried, None if deadline is None else deadline.cap(self.queue_timeout))
+            except NoEndpointAvailable:
+                if last_error is not None:
+                    raise last_error
+                raise
+            start = time.monotonic()
+            try:
+                result = func(endpoint)
+            except Exception as e:
+                self.release(endpoint)
+                if not (is_retryable(e) or isinstance(e, CircuitOpenError)):
+                    raise
+                tried.append(endpoint.name)
+                last_error = e
+                metrics.inc("swarm_llm_failovers_total", labels={"pool": self.name, "endpoint": endpoint.name},
+                            help_text="Requests moved to another endpoint after a transient failure.")
+                logger.warning(f"LLM endpoint '{endpoint.name}' in pool '{self.name}' failed ({e}); failing over.")
+                continue
+            if stream:
+                return _LeasedStream(result, lambda: self.release(endpoint, time.monotonic() - start))
+            self.release(endpoint, time.monotonic() - start)
+            return result
+
+    def __repr__(self) -> str:
+        return f"EndpointPool(name={self.name!r}, strategy={self.strategy!r}, endpoints={self.endpoints!r})"
+
+
+class _LeasedStream:
+    """Iterates a (sync or async) streaming response and releases its endpoint lease when done."""
+
+    def __init__(self, stream: Any, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        finally:
+            self.close()
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+            close = getattr(self._stream, "close", None)
+            if callable(close):
+                close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def __del__(self):
+        self.close()
+
+
+def build_pool(name: str, llm_profiles: Dict[str, Dict[str, Any]]) -> EndpointPool:
+    """
+    Build the endpoint pool for the `llm` entry `name`.
+
+    Args:
+        name (str): Name of the pool entry.
+        llm_profiles (Dict[str, Dict[str, Any]]): The full `llm` configuration section.
+
+    Returns:
+        EndpointPool: The pool.
+
+    Raises:
+        ValueError: If the entry is not a pool or references an unknown profile.
+    """
+    pool_config = llm_profiles.get(name)
+    if not is_pool_config(pool_config):
+        raise ValueError(f"LLM profile '{name}' does not define an endpoint pool.")
+
+    endpoints = []
+    for index, member in enumerate(pool_config["endpoints"]):
+        profile_name = member.get("profile")
+        if profile_name is not None:
+            profile = llm_profiles.get(profile_name)
+            if profile is None or is_pool_config(profile):
+                raise ValueError(f"LLM pool '{name}' references unknown or nested profile '{profile_name}'.")
+            config = dict(profile)
+        else:
+            config = {}
+        config.update({k: v for k, v in member.items() if k not in _MEMBER_KEYS})
+        endpoints.append(Endpoint(
+            name=profile_name or f"{name}[{index}]",
+            config=config,
+            weight=member.get("weight", 1.0),
+            max_concurrency=member.get("max_concurrency", config.get("max_concurrency")),
+        ))
+
+    return EndpointPool(
+        name,
+        endpoints,
+        strategy=pool_config.get("strategy", "least_outstanding"),
+        ewma_alpha=pool_config.get("ewma_alpha", 0.3),
+        queue_timeout=pool_config.get("queue_timeout", 30.0),
+    )
+
+
+class LLMRouter:
+    """Resolves logical model names to shared endpoint pools."""
+
+    def __init__(self, llm_profiles: Dict[str, Dict[str, Any]]):
+        self.pools: Dict[str, EndpointPool] = {
+            name: build_pool(name, llm_profiles)
+            for name, profile in llm_profiles.items()
+            if is_pool_config(profile)
+        }
+
+    def pool(self, name: Optional[str]) -> Optional[EndpointPool]:
+        """Return the pool for the logical model `name`, or None if it is a single endpoint."""
+        return self.pools.get(name) if name else None
+
+
+_routers: Dict[str, LLMRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_router(llm_profiles: Optional[Dict[str, Dict[str, Any]]]) -> LLMRouter:
+    """
+    Return the process-wide router for an `llm` configuration section.
+
+    Routers are cached by configuration content, so Swarm instances built per
+    request share pool state while a changed configuration gets fresh pools.
+
+    Args:
+        llm_profiles (Optional[dict]): The `llm` configuration section.
+
+    Returns:
+        LLMRouter: The shared router.
+    """
+    llm_profiles = llm_profiles or {}
+    key = json.dumps(llm_profiles, sort_keys=True, default=str)
+    router = _routers.get(key)
+    if router is None:
+        with _routers_lock:
+            router = _routers.get(key)
+            if router is None:
+                router = LLMRouter(llm_profiles)
+                _routers[key] = router
+    return router
@@ -0,0 +1,13 @@
+# src/swarm/routing.py
+
+"""
+Websocket routes, served by `swarm.asgi` next to the HTTP application.
+"""
+
+from django.urls import re_path
+
+from swarm.consumers import DjangoChatConsumer
+
+websocket_urlpatterns = [
+    re_path(r"^ws/(?P<blueprint_name>[\w.-]+)/(?P<conversation_id>[\w-]+)/$", DjangoChatConsumer.as_asgi()),
+]
@@ -1,12 +1,33 @@
 from rest_framework import serializers
 from swarm.models import ChatMessage, ChatConversation
 
-class ChatMessageSerializer(serializers.ModelSerializer):
+def requested_fields(request):
+    """The field names listed in a GET request's `fields` query parameter (empty if none)."""
+    if request is None or request.method != "GET":
+        return set()
+    raw = request.query_params.get("fields", "")
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+class SparseFieldsMixin:
+    """
+    Limits GET responses to the fields named in the `fields` query parameter
+    (e.g. `?fields=id,sender,content`). Unknown names are ignored; if none
+    are known, every field is returned.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = requested_fields(self.context.get("request")) & set(self.fields)
+        if selected:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+class ChatMessageSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ChatMessage
-        fields = '__all__'
+        exclude = ["content_hash"]
 
 class ChatConversationSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChatConversation
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
@@ -5,6 +5,9 @@ from django.dispatch import receiver
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
+from .db import database_settings
+from .db.sqlite import apply_pragmas
+from .utils.logger_setup import configure_logging
 
 # Disable CORS in Django for development purposes, allowing all origins.
 CORS_ALLOW_ALL_ORIGINS = True
@@ -12,10 +15,9 @@ CORS_ALLOW_ALL_ORIGINS = True
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
 
-logging.basicConfig(level=(logging.DEBUG if DEBUG else logging.INFO), format='%(levelname)s:%(message)s')
+configure_logging(level=(logging.DEBUG if DEBUG else logging.INFO))
 
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG if DEBUG else logging.INFO)
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 CUSTOM_BASE_DIR = os.getenv("SWARM_BASE_DIR")
@@ -112,26 +114,8 @@ ASGI_APPLICATION = 'swarm.asgi.application'
 
 # Database
 DJANGO_DATABASE = os.getenv("DJANGO_DATABASE", "sqlite").lower()
-if DJANGO_DATABASE == "postgres":
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': os.getenv("POSTGRES_DB", "swarm"),
-            'USER': os.getenv("POSTGRES_USER", "postgres"),
-            'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
-            'HOST': os.getenv("POSTGRES_HOST", "localhost"),
-            'PORT': os.getenv("POSTGRES_PORT", "5432"),
-        }
-    }
-elif DJANGO_DATABASE == "sqlite":
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': os.getenv("SQLITE_DB_PATH", str(BASE_DIR / "db.sqlite3")),
-        }
-    }
-else:
-    raise ValueError(f"Invalid value for DJANGO_DATABASE: {DJANGO_DATABASE}. Must be 'sqlite' or 'postgres'.")
+# Postgres: persistent, health-checked connections, or a psycopg 3 pool with POSTGRES_POOL=true (see swarm.db.config)
+DATABASES = {'default': database_settings(BASE_DIR)}
 
 if os.getenv("STATEFUL_CHAT_ID_PATH") and DJANGO_DATABASE != "postgres":
     logger.warning("⚠️ Stateful chat enabled with SQLite. Consider 'postgres' for scalability.")
@@ -140,12 +124,7 @@ if os.getenv("STATEFUL_CHAT_ID_PATH") and DJANGO_DATABASE != "postgres":
 def set_sqlite_optimizations(sender, connection, **kwargs):
     if connection.vendor == 'sqlite':
         cursor = connection.cursor()
-        cursor.execute('PRAGMA journal_mode=WAL;')
-        cursor.execute('PRAGMA synchronous=NORMAL;')
-        cursor.execute('PRAGMA temp_store=MEMORY;')
-        cursor.execute('PRAGMA mmap_size=30000000000;')
-        cursor.execute('PRAGMA cache_size=-5000;')
-        cursor.execute('PRAGMA busy_timeout=5000;')
+        apply_pragmas(cursor)
         cursor.close()
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -174,7 +153,12 @@ LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
-        'verbose': {'format': '[{asctime}] {levelname} {name}: {message}', 'style': '{'},
+        # SWARM_LOG_FORMAT=json switches every handler to one JSON object per line.
+        'verbose': (
+            {'()': 'swarm.utils.logger_setup.JsonFormatter'}
+            if os.getenv("SWARM_LOG_FORMAT", "text").lower() == "json"
+            else {'()': 'swarm.utils.logger_setup.StructuredFormatter', 'fmt': '[{asctime}] {levelname} {name}: {message}', 'style': '{'}
+        ),
     },
     'handlers': {
         'console': {'class': 'logging.StreamHandler', 'formatter': 'verbose'},
@@ -224,6 +208,27 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Validated DRF tokens are cached per process; saving or deleting a token or its user evicts it
+SWARM_AUTH_CACHE_SIZE = int(os.getenv("SWARM_AUTH_CACHE_SIZE", "1024"))
+SWARM_AUTH_CACHE_TTL = float(os.getenv("SWARM_AUTH_CACHE_TTL", "60"))  # 0 disables caching
+
+# Admission control for chat completions and the websocket chat (see swarm.throttling)
+SWARM_RATE_LIMIT = os.getenv("SWARM_RATE_LIMIT", "")  # per tenant, e.g. "60/minute"; empty disables
+SWARM_RATE_BURST = float(os.getenv("SWARM_RATE_BURST", "0"))  # 0 uses the rate's count
+SWARM_MAX_IN_FLIGHT = int(os.getenv("SWARM_MAX_IN_FLIGHT", "0"))  # 0 disables the global cap
+SWARM_MAX_QUEUE = int(os.getenv("SWARM_MAX_QUEUE", "16"))
+SWARM_QUEUE_TIMEOUT = float(os.getenv("SWARM_QUEUE_TIMEOUT", "5"))
+SWARM_ADMISSION_BACKEND = os.getenv("SWARM_ADMISSION_BACKEND", "memory").lower()  # memory or redis
+SWARM_ADMISSION_REDIS_URL = os.getenv("SWARM_ADMISSION_REDIS_URL", "redis://localhost:6379/0")
+SWARM_ADMISSION_REDIS_CLUSTER = os.getenv("SWARM_ADMISSION_REDIS_CLUSTER", "false").lower() in ("true", "1", "t")
+
+# Prometheus /metrics (backend URLs, breaker state, per-user token usage); operators only when enabled
+SWARM_METRICS_ENABLED = os.getenv("SWARM_METRICS_ENABLED", "false").lower() in ("true", "1", "t")
+
+# Websocket chat: streamed text is sent at most every FLUSH_INTERVAL seconds, or once FLUSH_BYTES are buffered
+SWARM_WS_FLUSH_INTERVAL = float(os.getenv("SWARM_WS_FLUSH_INTERVAL", "0.03"))
+SWARM_WS_FLUSH_BYTES = int(os.getenv("SWARM_WS_FLUSH_BYTES", "1024"))
+
 # Discover blueprint settings
 if not os.getenv("SWARM_CLI"):
     config_path = BASE_DIR / "swarm_config.json"
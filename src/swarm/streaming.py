@@ -0,0 +1,137 @@
+# src/swarm/streaming.py
+
+"""
+Streamed Message Assembly
+
+`StreamAssembler` turns the deltas of one streamed chat completion into
+`swarm.events` events and, at the end, into the finished `Message`.
+
+Every text field (content, refusal, tool-call names and arguments) is kept as a
+list of parts and joined once when the message is complete, so each chunk costs
+the same however long the answer grows. Tool-call fragments are accumulated by
+their `index`. Deltas may be dicts or OpenAI SDK objects; they are only read,
+never modified.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
+
+from .events import DeltaEvent, StreamEvent, ToolCallDeltaEvent
+from .messages import FunctionCall, Message, ToolCall
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Read `name` from a delta or a part of one, whether it is a dict or an SDK object."""
+    if obj is None:
+        return None
+    if isinstance(obj, Mapping):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+class _ToolCallParts:
+    """The fragments received so far for one tool call."""
+
+    __slots__ = ("id", "type", "name", "arguments")
+
+    def __init__(self):
+        self.id: Optional[str] = None
+        self.type: Optional[str] = None
+        self.name: List[str] = []
+        self.arguments: List[str] = []
+
+    def tool_call(self) -> ToolCall:
+        return ToolCall(self.id or "", FunctionCall("".join(self.name), "".join(self.arguments)), self.type)
+
+
+class StreamAssembler:
+    """
+    Accumulates one streamed assistant message.
+
+    Args:
+        agent (str): Name of the agent producing the message; becomes its `sender`
+            and the `agent` of the events.
+    """
+
+    __slots__ = ("agent", "content", "refusal", "tool_calls", "function_name", "function_arguments")
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.content: List[str] = []
+        self.refusal: List[str] = []
+        self.tool_calls: Dict[int, _ToolCallParts] = {}
+        self.function_name: List[str] = []
+        self.function_arguments: List[str] = []
+
+    def add(self, delta: Any) -> List[StreamEvent]:
+        """
+        Take in one delta and return the events it produces (usually zero or one).
+
+        Args:
+            delta (Any): `choices[0].delta` of a completion chunk, as a dict or SDK object.
+
+        Returns:
+            List[StreamEvent]: `DeltaEvent`s for text and `ToolCallDeltaEvent`s for tool-call fragments.
+        """
+        events = []
+        content = _field(delta, "content")
+        if content:
+            self.content.append(content)
+            events.append(DeltaEvent(self.agent, content))
+
+        refusal = _field(delta, "refusal")
+        if refusal:
+            self.refusal.append(refusal)
+
+        for fragment in _field(delta, "tool_calls") or ():
+            events.append(self._add_tool_call(fragment))
+
+        function_call = _field(delta, "function_call")
+        if function_call is not None:
+            name = _field(function_call, "name")
+            if name:
+                self.function_name.append(name)
+            arguments = _field(function_call, "arguments")
+            if arguments:
+                self.function_arguments.append(arguments)
+        return events
+
+    def _add_tool_call(self, fragment: Any) -> ToolCallDeltaEvent:
+        call_id = _field(fragment, "id")
+        index = _field(fragment, "index")
+        if index is None:
+            # Providers that omit `index` send one call at a time; a new id starts the next one.
+            last = max(self.tool_calls, default=-1)
+            index = last + 1 if call_id or last < 0 else last
+        parts = self.tool_calls.get(index)
+        if parts is None:
+            parts = self.tool_calls[index] = _ToolCallParts()
+        if call_id:
+            parts.id = call_id
+        call_type = _field(fragment, "type")
+        if call_type:
+            parts.type = call_type
+
+        function = _field(fragment, "function")
+        name = _field(function, "name")
+        if name:
+            parts.name.append(name)
+        arguments = _field(function, "arguments") or ""
+        if arguments:
+            parts.arguments.append(arguments)
+        return ToolCallDeltaEvent(self.agent, index, call_id, name or None, arguments)
+
+    def message(self) -> Message:
+        """The complete assistant message."""
+        function_call = None
+        if self.function_name or self.function_arguments:
+            function_call = FunctionCall("".join(self.function_name), "".join(self.function_arguments))
+        refusal = "".join(self.refusal)
+        return Message(
+            role="assistant",
+            content="".join(self.content) or None,
+            sender=self.agent,
+            tool_calls=[self.tool_calls[index].tool_call() for index in sorted(self.tool_calls)],
+            function_call=function_call,
+            extra={"refusal": refusal} if refusal else None,
+        )
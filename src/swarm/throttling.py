@@ -0,0 +1,468 @@
+# src/swarm/throttling.py
+
+"""
+Admission control for the chat endpoints.
+
+Two independent limits protect the REST API and the websocket chat:
+
+* a token bucket per tenant (the authenticated user, or a hash of the bearer
+  token for the shared `API_AUTH_TOKEN`), rejecting with 429 once a tenant
+  exceeds its rate;
+* a global cap on in-flight runs with a short, bounded wait queue, rejecting
+  with 503 as soon as the queue is full or the wait times out.
+
+Both report a `Retry-After` hint. State lives in memory by default, or in
+Redis (single node or cluster) so that limits hold across workers. Every
+Redis operation touches a single key, so the scripts are cluster-safe.
+
+Configured through Django settings (populated from the environment):
+
+    SWARM_RATE_LIMIT         "<count>/<second|minute|hour|day>", empty disables
+    SWARM_RATE_BURST         bucket size, defaults to <count>
+    SWARM_MAX_IN_FLIGHT      concurrent runs, 0 disables
+    SWARM_MAX_QUEUE          requests allowed to wait for a slot (not under ASGI, see `limit_in_flight`)
+    SWARM_QUEUE_TIMEOUT      seconds a queued request waits before 503
+    SWARM_ADMISSION_BACKEND  "memory" or "redis"
+    SWARM_ADMISSION_REDIS_URL, SWARM_ADMISSION_REDIS_CLUSTER
+"""
+
+import functools
+import hashlib
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+from .utils.metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "sec": 1, "second": 1, "m": 60, "min": 60, "minute": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+# Leases older than this are considered abandoned (crashed worker) and reclaimed.
+DEFAULT_LEASE_TTL = 900
+QUEUE_POLL_INTERVAL = 0.05
+
+
+class AdmissionRejected(Exception):
+    """A request was turned away; `retry_after` is a hint in seconds."""
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(AdmissionRejected):
+    status_code = 429
+
+
+class Overloaded(AdmissionRejected):
+    status_code = 503
+
+
+class ServiceOverloaded(APIException):
+    """DRF exception for a full in-flight queue; rendered as 503 with `Retry-After`."""
+
+    status_code = 503
+    default_detail = "Server is at capacity, retry later."
+    default_code = "overloaded"
+
+    def __init__(self, detail: Optional[str] = None, wait: Optional[float] = None):
+        super().__init__(detail)
+        self.wait = max(1, math.ceil(wait)) if wait is not None else None
+
+
+def parse_rate(rate: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    Parse a rate such as "60/minute" into `(tokens_per_second, count)`.
+
+    Returns:
+        None if `rate` is empty.
+
+    Raises:
+        ValueError: If the rate is malformed.
+    """
+    if not rate:
+        return None
+    count, _, period = str(rate).partition("/")
+    seconds = PERIODS.get(period.strip().lower())
+    if seconds is None or float(count) <= 0:
+        raise ValueError(f"Invalid rate '{rate}', expected '<count>/<second|minute|hour|day>'")
+    return float(count) / seconds, float(count)
+
+
+class MemoryAdmissionBackend:
+    """Process-local token buckets and in-flight leases."""
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._leases: Dict[str, Dict[str, float]] = {}
+        self._max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens from bucket `key`; return 0 if allowed, else seconds until they are available."""
+        now = self._clock()
+        with self._lock:
+            tokens, stamp = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def acquire_slot(self, key: str, limit: int, lease: str, ttl: float) -> bool:
+        now = self._clock()
+        with self._lock:
+            leases = self._leases.setdefault(key, {})
+            for stale in [name for name, expires in leases.items() if expires <= now]:
+                del leases[stale]
+            if len(leases) >= limit:
+                return False
+            leases[lease] = now + ttl
+            return True
+
+    def release_slot(self, key: str, lease: str) -> None:
+        with self._lock:
+            self._leases.get(key, {}).pop(lease, None)
+
+    def in_flight(self, key: str) -> int:
+        with self._lock:
+            return len(self._leases.get(key, {}))
+
+
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+_ACQUIRE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+  return 0
+end
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], math.ceil(ttl * 1000))
+return 1
+"""
+
+
+class RedisAdmissionBackend:
+    """
+    Token buckets and in-flight leases shared through Redis.
+
+    Buckets are hashes refilled by a Lua script using the server clock; leases
+    are members of a sorted set scored by expiry, so slots held by a crashed
+    worker are reclaimed after the lease TTL.
+    """
+
+    def __init__(self, client: Any, prefix: str = "swarm:admission:"):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, cluster: bool = False, **kwargs) -> "RedisAdmissionBackend":
+        """Connect to a single Redis node or, with `cluster`, a Redis Cluster."""
+        if cluster:
+            from redis.cluster import RedisCluster
+            client = RedisCluster.from_url(url)
+        else:
+            import redis
+            client = redis.Redis.from_url(url)
+        return cls(client, **kwargs)
+
+    def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> float:
+        return float(self._take(keys=[f"{self.prefix}bucket:{key}"], args=[rate, burst, cost]))
+
+    def acquire_slot(self, key: str, limit: int, lease: str, ttl: float) -> bool:
+        return bool(self._acquire(keys=[f"{self.prefix}slots:{key}"], args=[limit, ttl, lease]))
+
+    def release_slot(self, key: str, lease: str) -> None:
+        self.client.zrem(f"{self.prefix}slots:{key}", lease)
+
+    def in_flight(self, key: str) -> int:
+        slots = f"{self.prefix}slots:{key}"
+        self.client.zremrangebyscore(slots, "-inf", time.time())
+        return int(self.client.zcard(slots))
+
+
+class AdmissionController:
+    """
+    Applies the per-tenant rate limit and the global in-flight cap.
+
+    Waiting for a slot happens locally: at most `max_queue` requests per process
+    poll the backend until a slot frees up or `queue_timeout` expires. Backend
+    errors fail open, so an unreachable Redis never takes the API down with it.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        rate: Optional[str] = None,
+        burst: Optional[float] = None,
+        max_in_flight: int = 0,
+        max_queue: int = 0,
+        queue_timeout: float = 10.0,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        slot_key: str = "global",
+    ):
+        self.backend = backend
+        parsed = parse_rate(rate)
+        self.rate = parsed[0] if parsed else None
+        self.burst = float(burst) if burst else (parsed[1] if parsed else None)
+        self.max_in_flight = int(max_in_flight or 0)
+        self.max_queue = int(max_queue or 0)
+        self.queue_timeout = float(queue_timeout)
+        self.lease_ttl = float(lease_ttl)
+        self.slot_key = slot_key
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate is not None or self.max_in_flight > 0
+
+    def check_rate(self, tenant: str) -> float:
+        """
+        Take a token for `tenant`.
+
+        Returns:
+            float: 0 if the request may proceed, otherwise seconds until it could.
+        """
+        if self.rate is None:
+            return 0.0
+        try:
+            wait = self.backend.take(tenant, self.rate, self.burst)
+        except Exception as e:
+            logger.error(f"Rate limit backend error, admitting request: {e}")
+            return 0.0
+        if wait > 0:
+            metrics.inc("swarm_admission_rejected_total", labels={"reason": "rate_limited"},
+                        help_text="Requests rejected by admission control.")
+        return wait
+
+    def _try_acquire(self, lease: str) -> bool:
+        try:
+            return self.backend.acquire_slot(self.slot_key, self.max_in_flight, lease, self.lease_ttl)
+        except Exception as e:
+            logger.error(f"Admission backend error, admitting request: {e}")
+            return True
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Take an in-flight slot, waiting in the bounded queue if necessary.
+
+        Args:
+            timeout (Optional[float]): Maximum wait; defaults to `queue_timeout`. 0 rejects
+                at once instead of queueing.
+
+        Returns:
+            The lease to pass to `release`, or None when no cap is configured.
+
+        Raises:
+            Overloaded: If the queue is full or no slot freed up in time.
+        """
+        if self.max_in_flight <= 0:
+            return None
+        lease = uuid.uuid4().hex
+        if self._try_acquire(lease):
+            return lease
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._lock:
+            if timeout <= 0 or self._queued >= self.max_queue:
+                self._reject("queue_full")
+                raise Overloaded("Server is at capacity, retry later.", retry_after=1)
+            self._queued += 1
+        try:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                time.sleep(min(QUEUE_POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+                if self._try_acquire(lease):
+                    return lease
+        finally:
+            with self._lock:
+                self._queued -= 1
+        self._reject("queue_timeout")
+        raise Overloaded("Timed out waiting for capacity, retry later.", retry_after=max(1.0, self.queue_timeout / 2))
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Async variant of `acquire` that waits off the event loop."""
+        return await sync_to_async(self.acquire, thread_sensitive=False)(timeout)
+
+    def release(self, lease: Optional[str]) -> None:
+        if lease is None:
+            return
+        try:
+            self.backend.release_slot(self.slot_key, lease)
+        except Exception as e:
+            logger.error(f"Failed to release admission slot: {e}")
+
+    def in_flight(self) -> int:
+        return self.backend.in_flight(self.slot_key)
+
+    def _reject(self, reason: str) -> None:
+        metrics.inc("swarm_admission_rejected_total", labels={"reason": reason},
+                    help_text="Requests rejected by admission control.")
+        logger.warning(f"Rejecting request: {reason.replace('_', ' ')}")
+
+
+_controller: Optional[AdmissionController] = None
+_controller_key: Optional[Tuple] = None
+_controller_lock = threading.Lock()
+
+
+def _settings_key() -> Tuple:
+    return (
+        getattr(settings, "SWARM_RATE_LIMIT", ""),
+        getattr(settings, "SWARM_RATE_BURST", 0),
+        getattr(settings, "SWARM_MAX_IN_FLIGHT", 0),
+        getattr(settings, "SWARM_MAX_QUEUE", 0),
+        getattr(settings, "SWARM_QUEUE_TIMEOUT", 10.0),
+        getattr(settings, "SWARM_ADMISSION_BACKEND", "memory"),
+        getattr(settings, "SWARM_ADMISSION_REDIS_URL", ""),
+        getattr(settings, "SWARM_ADMISSION_REDIS_CLUSTER", False),
+    )
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide controller, rebuilt whenever the admission settings change."""
+    global _controller, _controller_key
+    key = _settings_key()
+    if _controller is not None and _controller_key == key:
+        return _controller
+    with _controller_lock:
+        if _controller is None or _controller_key != key:
+            rate, burst, max_in_flight, max_queue, queue_timeout, backend_name, redis_url, cluster = key
+            if backend_name == "redis":
+                backend = RedisAdmissionBackend.from_url(redis_url, cluster=cluster)
+            else:
+                backend = MemoryAdmissionBackend()
+            _controller = AdmissionController(backend, rate, burst, max_in_flight, max_queue, queue_timeout)
+            _controller_key = key
+            logger.debug(f"Admission control configured: {key[:6]}")
+    return _controller
+
+
+def tenant_key(user: Any, auth_header: str = "", remote_addr: str = "") -> str:
+    """
+    Identify the tenant a request is accounted to.
+
+    Database users are keyed by primary key. Requests authenticated with the
+    shared env token (or with auth disabled) are keyed by a hash of their bearer
+    token, falling back to the client address.
+    """
+    pk = getattr(user, "pk", None)
+    if pk is not None and getattr(user, "is_authenticated", False):
+        return f"user:{pk}"
+    if auth_header:
+        return "token:" + hashlib.sha256(auth_header.encode()).hexdigest()[:32]
+    return f"ip:{remote_addr or 'unknown'}"
+
+
+class TenantRateThrottle(BaseThrottle):
+    """DRF throttle applying the per-tenant token bucket; DRF answers 429 with `Retry-After`."""
+
+    def __init__(self):
+        self._wait = None
+
+    def allow_request(self, request, view) -> bool:
+        tenant = tenant_key(request.user, request.headers.get("Authorization", ""), self.get_ident(request))
+        wait = get_admission_controller().check_rate(tenant)
+        if wait > 0:
+            self._wait = wait
+            return False
+        return True
+
+    def wait(self) -> Optional[float]:
+        return self._wait
+
+
+def limit_in_flight(view_func: Callable) -> Callable:
+    """
+    Hold a global in-flight slot for the duration of a view.
+
+    Apply beneath `@api_view` so rejections are rendered by DRF. Streaming
+    responses keep their slot until the body has been sent.
+
+    Under ASGI, Django runs every sync view on one shared thread, so a request
+    waiting in the queue would stall all other sync endpoints; there a request
+    that finds no free slot is rejected at once instead of queueing.
+    """
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        controller = get_admission_controller()
+        under_asgi = isinstance(getattr(request, "_request", request), ASGIRequest)
+        try:
+            lease = controller.acquire(timeout=0 if under_asgi else None)
+        except Overloaded as e:
+            raise ServiceOverloaded(str(e), wait=e.retry_after)
+        try:
+            response = view_func(request, *args, **kwargs)
+        except BaseException:
+            controller.release(lease)
+            raise
+        if lease is not None and isinstance(response, StreamingHttpResponse):
+            response.streaming_content = _release_after(response, controller, lease)
+        else:
+            controller.release(lease)
+        return response
+    return wrapper
+
+
+def _release_after(response: StreamingHttpResponse, controller: AdmissionController, lease: str):
+    content = response.streaming_content
+    if response.is_async:
+        async def relay():
+            try:
+                async for chunk in content:
+                    yield chunk
+            finally:
+                await sync_to_async(controller.release, thread_sensitive=False)(lease)
+    else:
+        def relay():
+            try:
+                yield from content
+            finally:
+                controller.release(lease)
+    return relay()
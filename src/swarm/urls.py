@@ -24,6 +24,7 @@ router.register(r'v1/chat/messages', ChatMessageViewSet, basename='chatmessage')
 
 base_urlpatterns = [
     re_path(r'^health/?$', lambda request: HttpResponse("OK"), name='health_check'),
+    re_path(r'^metrics/?$', views.metrics, name='metrics'),
     re_path(r'^v1/chat/completions/?$', views.chat_completions, name='chat_completions'),
     re_path(r'^v1/models/?$', views.list_models, name='list_models'),
     path('v1/university/', include('blueprints.university.urls')),  # TODO isnt this dynamically registered?
@@ -3,20 +3,26 @@ from datetime import datetime
 from .types import Tool  # <-- Adjust import as needed if 'Tool' is in a different location
 
 def merge_fields(target, source):
+    """Append the string fields of `source` to those of `target`, recursing into dicts; `source` is not modified."""
     for key, value in source.items():
         if isinstance(value, str):
-            target[key] += value
+            target[key] = target.get(key, "") + value
         elif value is not None and isinstance(value, dict):
-            merge_fields(target[key], value)
+            merge_fields(target.setdefault(key, {}), value)
 
 def merge_chunk(final_response: dict, delta: dict) -> None:
-    delta.pop("role", None)
-    merge_fields(final_response, delta)
+    """
+    Merge a streamed delta dict into `final_response` without modifying the delta.
+
+    Kept for code written against the original Swarm; the Swarm itself assembles
+    streamed messages with `swarm.streaming.StreamAssembler`, which does not
+    re-copy the text on every chunk.
+    """
+    merge_fields(final_response, {k: v for k, v in delta.items() if k not in ("role", "tool_calls")})
 
-    tool_calls = delta.get("tool_calls")
-    if tool_calls and len(tool_calls) > 0:
-        index = tool_calls[0].pop("index")
-        merge_fields(final_response["tool_calls"][index], tool_calls[0])
+    for tool_call in delta.get("tool_calls") or ():
+        index = tool_call.get("index", 0)
+        merge_fields(final_response["tool_calls"][index], {k: v for k, v in tool_call.items() if k != "index"})
 
 def function_to_json(func) -> dict:
     """
@@ -0,0 +1,439 @@
+"""
+File I/O for filesystem tools: line-range reads and atomic patching.
+
+`read_lines` returns a range of lines without loading the rest of the file.
+It seeks straight to the range through a `LineIndex` of line start offsets,
+built in one pass (over `mmap` for large files) and cached per file until
+its mtime, size or inode changes. The same pass computes the file's SHA-256,
+so a caller that already holds the current content can pass `if_hash` and
+get back an empty "unchanged" slice instead of the text.
+
+`apply_unified_diff` applies a unified diff by streaming the untouched parts
+of the file into a temporary file next to it and renaming that over the
+original, so readers never see a half-written file. Hunks whose context has
+drifted are located within `PATCH_FUZZ_LINES` of their stated position, and
+`expected_hash` rejects a patch made against an older version of the file.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import accumulate
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_LINES = 2000
+# Files at least this large are indexed through mmap instead of being read whole.
+MMAP_THRESHOLD = 1024 * 1024
+CHUNK_BYTES = 4 * 1024 * 1024
+INDEX_CACHE_SIZE = 256
+# How far from its stated line a hunk's context is searched for.
+PATCH_FUZZ_LINES = 200
+
+
+class PatchError(ValueError):
+    """Raised when a diff is malformed or does not apply to the file."""
+
+
+class LineIndex:
+    """Start offsets of every line of a file, with the file's size and SHA-256."""
+
+    __slots__ = ("signature", "offsets", "size", "sha256", "newline")
+
+    def __init__(self, signature: Tuple[int, int, int], offsets: array, size: int, sha256: str, newline: bytes):
+        self.signature = signature
+        self.offsets = offsets
+        self.size = size
+        self.sha256 = sha256
+        self.newline = newline
+
+    @property
+    def line_count(self) -> int:
+        # The offset after a final newline starts no line.
+        return len(self.offsets) - (1 if self.offsets[-1] == self.size else 0)
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Byte range of lines `start`..`end` (1-based, inclusive)."""
+        stop = self.offsets[end] if end < len(self.offsets) else self.size
+        return self.offsets[start - 1], stop
+
+
+class FileSlice:
+    """Lines `start`..`end` of a file; `text` is empty when `unchanged`."""
+
+    __slots__ = ("path", "start", "end", "total_lines", "text", "sha256", "unchanged")
+
+    def __init__(self, path: str, start: int, end: int, total_lines: int, text: str, sha256: str,
+                 unchanged: bool = False):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.total_lines = total_lines
+        self.text = text
+        self.sha256 = sha256
+        self.unchanged = unchanged
+
+    @property
+    def complete(self) -> bool:
+        return self.start <= 1 and self.end >= self.total_lines
+
+    def __repr__(self) -> str:
+        return f"FileSlice({self.path!r}, lines {self.start}-{self.end} of {self.total_lines})"
+
+
+class PatchResult:
+    """Outcome of `apply_unified_diff`."""
+
+    __slots__ = ("path", "sha256", "hunks", "added", "removed")
+
+    def __init__(self, path: str, sha256: str, hunks: int, added: int, removed: int):
+        self.path = path
+        self.sha256 = sha256
+        self.hunks = hunks
+        self.added = added
+        self.removed = removed
+
+    def __repr__(self) -> str:
+        return f"PatchResult({self.path!r}, hunks={self.hunks}, +{self.added} -{self.removed})"
+
+
+# -----------------------------------------------------------------------------
+# Line index
+# -----------------------------------------------------------------------------
+
+_index_lock = threading.Lock()
+_index_cache: "OrderedDict[str, LineIndex]" = OrderedDict()
+
+
+def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _index_data(data: Union[bytes, mmap.mmap], size: int) -> Tuple[array, str, bytes]:
+    offsets = array("Q", [0])
+    digest = hashlib.sha256()
+    newline = b"\n"
+    for chunk_start in range(0, size, CHUNK_BYTES):
+        chunk = data[chunk_start:chunk_start + CHUNK_BYTES]
+        digest.update(chunk)
+        if chunk_start == 0:
+            first = chunk.find(b"\n")
+            if first > 0 and chunk[first - 1:first] == b"\r":
+                newline = b"\r\n"
+        lengths = map(len, chunk.split(b"\n")[:-1])
+        # Each line starts one byte (the newline) after the previous line's content ends.
+        starts = accumulate(map((1).__add__, lengths), initial=chunk_start)
+        next(starts)
+        offsets.extend(starts)
+    return offsets, digest.hexdigest(), newline
+
+
+def line_index(path: str) -> LineIndex:
+    """
+    Return the cached line index of `path`, rebuilding it if the file changed.
+
+    Args:
+        path (str): The file to index.
+
+    Returns:
+        LineIndex: Line offsets, size and SHA-256 of the current file.
+    """
+    key = os.path.realpath(path)
+    with open(key, "rb") as f:
+        signature = _signature(os.fstat(f.fileno()))
+        with _index_lock:
+            cached = _index_cache.get(key)
+            if cached is not None and cached.signature == signature:
+                _index_cache.move_to_end(key)
+                return cached
+        size = signature[1]
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offsets, sha256, newline = _index_data(data, size)
+        else:
+            offsets, sha256, newline = _index_data(f.read(), size)
+    index = LineIndex(signature, offsets, size, sha256, newline)
+    with _index_lock:
+        _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of the file's bytes, served from the line index cache."""
+    return line_index(path).sha256
+
+
+def read_lines(
+    path: str,
+    start: int = 1,
+    end: Optional[int] = None,
+    line_numbers: bool = False,
+    if_hash: Optional[str] = None,
+    max_lines: Optional[int] = DEFAULT_MAX_LINES,
+    encoding: str = "utf-8",
+) -> FileSlice:
+    """
+    Read lines `start`..`end` of a text file.
+
+    Args:
+        path (str): The file to read.
+        start (int): First line, 1-based.
+        end (Optional[int]): Last line, inclusive; None reads to the end of the file.
+        line_numbers (bool): Prefix each line with "<n>: ".
+        if_hash (Optional[str]): SHA-256 the caller already has; if the file still
+            matches, no text is returned.
+        max_lines (Optional[int]): Upper bound on the lines returned; None for no bound.
+        encoding (str): Text encoding; undecodable bytes are replaced.
+
+    Returns:
+        FileSlice: The lines read, the range actually returned and the file's hash.
+    """
+    index = line_index(path)
+    total = index.line_count
+    if if_hash and if_hash == index.sha256:
+        return FileSlice(path, 1, total, total, "", index.sha256, unchanged=True)
+
+    start = max(1, start)
+    end = total if end is None or end <= 0 else min(end, total)
+    if max_lines is not None and max_lines > 0:
+        end = min(end, start + max_lines - 1)
+    if start > end:
+        return FileSlice(path, start, start - 1, total, "", index.sha256)
+
+    begin, stop = index.span(start, end)
+    with open(path, "rb") as f:
+        f.seek(begin)
+        text = f.read(stop - begin).decode(encoding, errors="replace")
+    if line_numbers:
+        text = "".join(f"{number}: {line}" for number, line in enumerate(text.splitlines(True), start))
+    return FileSlice(path, start, end, total, text, index.sha256)
+
+
+# -----------------------------------------------------------------------------
+# Writing
+# -----------------------------------------------------------------------------
+
+def _replace_atomically(path: str, write) -> str:
+    """Write a temporary file beside `path` with `write(file, digest)`, then rename it over `path`."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            write(tmp, digest)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return digest.hexdigest()
+
+
+def atomic_write(path: str, content: Union[str, bytes], encoding: str = "utf-8") -> str:
+    """
+    Replace the contents of `path` atomically, creating it and its directory if needed.
+
+    Args:
+        path (str): The file to write.
+        content (Union[str, bytes]): New contents.
+        encoding (str): Encoding for text content.
+
+    Returns:
+        str: SHA-256 of the written bytes.
+    """
+    data = content.encode(encoding) if isinstance(content, str) else content
+
+    def write(tmp: BinaryIO, digest) -> None:
+        tmp.write(data)
+        digest.update(data)
+
+    return _replace_atomically(path, write)
+
+
+# -----------------------------------------------------------------------------
+# Unified diffs
+# -----------------------------------------------------------------------------
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class Hunk:
+    """One hunk of a unified diff; lines are (text, ends_with_newline) pairs."""
+
+    __slots__ = ("old_start", "old", "new", "added", "removed")
+
+    def __init__(self, old_start: int):
+        self.old_start = old_start
+        self.old: List[Tuple[str, bool]] = []
+        self.new: List[Tuple[str, bool]] = []
+        self.added = 0
+        self.removed = 0
+
+
+def parse_unified_diff(diff: str) -> List[Hunk]:
+    """
+    Parse the hunks of a single-file unified diff; file headers are ignored.
+
+    Raises:
+        PatchError: If the diff has no hunks or a hunk line is malformed.
+    """
+    hunks: List[Hunk] = []
+    hunk: Optional[Hunk] = None
+    last: Optional[str] = None
+    for line in diff.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            hunk = Hunk(int(header.group(1)))
+            hunks.append(hunk)
+            last = None
+            continue
+        if hunk is None:
+            continue
+        if line.startswith("\\"):
+            # "\ No newline at end of file" applies to the line just before it.
+            for side in ((hunk.old,) if last == "-" else (hunk.new,) if last == "+" else (hunk.old, hunk.new)):
+                if side:
+                    side[-1] = (side[-1][0], False)
+            continue
+        tag, text = (line[:1], line[1:]) if line else (" ", "")
+        if tag == " ":
+            hunk.old.append((text, True))
+            hunk.new.append((text, True))
+        elif tag == "-":
+            hunk.old.append((text, True))
+            hunk.removed += 1
+        elif tag == "+":
+            hunk.new.append((text, True))
+            hunk.added += 1
+        elif line.startswith(("--- ", "+++ ", "diff ", "index ")):
+            hunk = None
+            continue
+        else:
+            raise PatchError(f"Malformed diff line: {line!r}")
+        last = tag
+    if not hunks:
+        raise PatchError("Diff contains no hunks.")
+    return hunks
+
+
+def _read_span(f: BinaryIO, index: LineIndex, start: int, count: int, encoding: str) -> List[str]:
+    """Lines `start`..`start + count - 1` without their line endings."""
+    if count <= 0:
+        return []
+    begin, stop = index.span(start, start + count - 1)
+    f.seek(begin)
+    return [line.rstrip("\r") for line in f.read(stop - begin).decode(encoding, errors="replace").split("\n")[:count]]
+
+
+def _locate(f: BinaryIO, index: LineIndex, hunk: Hunk, floor: int, encoding: str) -> int:
+    """Return the 1-based line where the hunk's old lines start, searching outwards from its header."""
+    expected = [text for text, _ in hunk.old]
+    total = index.line_count
+    count = len(expected)
+    # A pure insertion's header names the line it goes after.
+    stated = hunk.old_start if count else hunk.old_start + 1
+    if not count:
+        if floor <= stated <= total + 1:
+            return stated
+        raise PatchError(f"Insertion point {hunk.old_start} is outside the file.")
+    for distance in range(PATCH_FUZZ_LINES + 1):
+        for candidate in ((stated,) if distance == 0 else (stated - distance, stated + distance)):
+            if candidate < floor or candidate + count - 1 > total:
+                continue
+            if _read_span(f, index, candidate, count, encoding) == expected:
+                return candidate
+    raise PatchError(f"Hunk at line {hunk.old_start} does not match the file.")
+
+
+def apply_unified_diff(path: str, diff: str, expected_hash: Optional[str] = None,
+                       encoding: str = "utf-8") -> PatchResult:
+    """
+    Apply a unified diff to `path` in place, atomically.
+
+    Args:
+        path (str): The file to patch.
+        diff (str): A unified diff for this one file.
+        expected_hash (Optional[str]): SHA-256 the diff was made against; the patch
+            is refused if the file has changed since.
+        encoding (str): Text encoding of the file.
+
+    Returns:
+        PatchResult: The new SHA-256 and what was changed.
+
+    Raises:
+        PatchError: If the diff is malformed, does not apply, or the file changed.
+    """
+    hunks = parse_unified_diff(diff)
+    index = line_index(path)
+    if expected_hash and expected_hash != index.sha256:
+        raise PatchError(f"{path} has changed since the diff was made.")
+
+    with open(path, "rb") as f:
+        placements: List[Tuple[int, Hunk]] = []
+        floor = 1
+        for hunk in hunks:
+            start = _locate(f, index, hunk, floor, encoding)
+            placements.append((start, hunk))
+            floor = start + len(hunk.old)
+
+        newline = index.newline
+
+        def write(tmp: BinaryIO, digest) -> None:
+            def emit(data: bytes) -> None:
+                tmp.write(data)
+                digest.update(data)
+
+            def copy(begin: int, stop: int) -> None:
+                f.seek(begin)
+                remaining = stop - begin
+                while remaining > 0:
+                    chunk = f.read(min(CHUNK_BYTES, remaining))
+                    if not chunk:
+                        break
+                    emit(chunk)
+                    remaining -= len(chunk)
+
+            position = 0
+            total = index.line_count
+            missing_final_newline = index.size > 0 and index.offsets[-1] != index.size
+            for start, hunk in placements:
+                begin = index.offsets[start - 1] if start - 1 < len(index.offsets) else index.size
+                copy(position, begin)
+                lines = hunk.new
+                if (missing_final_newline and lines and hunk.old and hunk.old[-1][1]
+                        and start + len(hunk.old) - 1 == total):
+                    # Diffs that omit "\ No newline at end of file" keep the file's missing newline.
+                    lines = lines[:-1] + [(lines[-1][0], False)]
+                for text, has_newline in lines:
+                    emit(text.encode(encoding) + (newline if has_newline else b""))
+                position = index.span(start, start + len(hunk.old) - 1)[1] if hunk.old else begin
+            copy(position, index.size)
+
+        # Validate against the index taken above; refuse if the file moved underneath us.
+        if _signature(os.fstat(f.fileno())) != index.signature:
+            raise PatchError(f"{path} changed while the diff was being applied.")
+        sha256 = _replace_atomically(path, write)
+
+    logger.debug(f"Patched {path}: {len(hunks)} hunk(s)")
+    return PatchResult(path, sha256, len(hunks), sum(h.added for h in hunks), sum(h.removed for h in hunks))
@@ -1,25 +1,202 @@
 # src/swarm/utils/logger_setup.py
 
+"""
+Logging facade for Open Swarm.
+
+Handlers are installed once, on the root logger, by `configure_logging`
+(Django's `LOGGING` setting does the same for the server). Modules only
+obtain loggers and never add handlers or force levels of their own.
+
+Expensive values are passed as lazy arguments, so nothing is serialised
+unless the record is actually emitted:
+
+    logger.debug("Payload: %s", lazy_json(create_params))
+
+Records may carry structured fields (`extra={"fields": {...}}`), which may be
+lazy too: `StructuredFormatter` renders them as `key=value` pairs after the
+message and `JsonFormatter` emits one JSON object per record. Per-turn debug
+traces can be sampled with `TraceSampler`.
+"""
+
+import json
 import logging
+import os
+import random
+import sys
+import threading
+from typing import Any, Callable, Optional
+
+from .redact import redact_sensitive_data
+
+_TEXT_FORMAT = "[%(levelname)s] %(asctime)s - %(name)s - %(message)s"
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class Lazy:
+    """A value computed only when a log record is rendered."""
+
+    __slots__ = ("func", "args", "kwargs")
+
+    def __init__(self, func: Callable[..., Any], *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def value(self) -> Any:
+        return self.func(*self.args, **self.kwargs)
+
+    def __str__(self) -> str:
+        try:
+            return str(self.value())
+        except Exception as e:
+            return f"<unrenderable: {e}>"
 
-def setup_logger(name: str, level=logging.DEBUG) -> logging.Logger:
+    __repr__ = __str__
+
+
+def _dumps(obj: Any, indent: Optional[int], default: Callable[[Any], Any], limit: Optional[int], redact: bool) -> str:
+    if redact:
+        obj = redact_sensitive_data(obj)
+    text = json.dumps(obj, indent=indent, default=default)
+    if limit is not None and len(text) > limit:
+        return text[:limit] + "..."
+    return text
+
+
+def lazy_json(
+    obj: Any,
+    indent: Optional[int] = 2,
+    default: Callable[[Any], Any] = str,
+    limit: Optional[int] = None,
+    redact: bool = False,
+) -> Lazy:
     """
-    Sets up and returns a logger with the specified name and level.
+    Defer `json.dumps(obj)` until the record is emitted.
+
+    Args:
+        obj: The object to serialise.
+        indent (Optional[int]): JSON indentation.
+        default (Callable): Fallback for objects JSON cannot encode.
+        limit (Optional[int]): Truncate the rendered text to this many characters.
+        redact (bool): Mask secrets with `redact_sensitive_data` before serialising.
+
+    Returns:
+        Lazy: A placeholder to pass as a log argument or field.
+    """
+    return Lazy(_dumps, obj, indent, default, limit, redact)
+
+
+def _field_value(value: Any) -> Any:
+    return value.value() if isinstance(value, Lazy) else value
+
+
+class StructuredFormatter(logging.Formatter):
+    """Text formatter appending a record's structured fields as `key=value` pairs."""
+
+    def __init__(self, fmt: Optional[str] = _TEXT_FORMAT, datefmt: Optional[str] = None, style: str = "%"):
+        super().__init__(fmt, datefmt, style)
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if not fields:
+            return text
+        rendered = " ".join(f"{key}={_field_value(value)}" for key, value in fields.items())
+        return f"{text} {rendered}"
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as a single-line JSON object, with structured fields as keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in (getattr(record, "fields", None) or {}).items():
+            entry[key] = _field_value(value)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def make_formatter(fmt: Optional[str] = None) -> logging.Formatter:
+    """Return the formatter selected by `fmt` or `SWARM_LOG_FORMAT` ("text" or "json")."""
+    fmt = (fmt or os.getenv("SWARM_LOG_FORMAT", "text")).lower()
+    return JsonFormatter() if fmt == "json" else StructuredFormatter()
+
+
+def configure_logging(level: Optional[int] = None, fmt: Optional[str] = None, force: bool = False) -> None:
+    """
+    Install the single root handler used outside Django's `LOGGING` config.
+
+    Safe to call repeatedly; only the first call (or a call with `force`) has
+    an effect, and it leaves a root logger that already has handlers alone. The level defaults to `SWARM_LOG_LEVEL`, else DEBUG when
+    `DEBUG` is set, else INFO.
+
+    Args:
+        level (Optional[int]): Root log level.
+        fmt (Optional[str]): "text" or "json"; defaults to `SWARM_LOG_FORMAT`.
+        force (bool): Replace handlers installed by an earlier call.
+    """
+    global _configured
+    if _configured and not force:
+        return
+    with _configure_lock:
+        if _configured and not force:
+            return
+        if level is None:
+            env_level = os.getenv("SWARM_LOG_LEVEL")
+            debug = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
+            level = logging.getLevelName(env_level.upper()) if env_level else (logging.DEBUG if debug else logging.INFO)
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(make_formatter(fmt))
+        # Without `force`, basicConfig leaves an already configured root (Django, pytest) alone.
+        logging.basicConfig(level=level, handlers=[handler], force=force)
+        _configured = True
+
+
+class TraceSampler:
+    """
+    Decides which runs emit their per-turn debug traces.
+
+    With `rate` 1.0 every run is traced when DEBUG is enabled; lower rates keep
+    debug logging affordable under load. The rate defaults to
+    `SWARM_LOG_TRACE_SAMPLE_RATE`.
+    """
+
+    def __init__(self, rate: Optional[float] = None, rng: Callable[[], float] = random.random):
+        if rate is None:
+            rate = float(os.getenv("SWARM_LOG_TRACE_SAMPLE_RATE", "1.0"))
+        self.rate = min(1.0, max(0.0, rate))
+        self._rng = rng
+
+    def sample(self, logger: Any) -> bool:
+        """Return True if a run logged through `logger` should be traced."""
+        if not logger.isEnabledFor(logging.DEBUG) or self.rate <= 0.0:
+            return False
+        return self.rate >= 1.0 or self._rng() < self.rate
+
+
+def setup_logger(name: str, level: Optional[int] = None) -> logging.Logger:
+    """
+    Returns the logger for `name`, making sure logging has been configured.
+
+    Handlers are shared through the root logger; none are added here.
 
     Args:
         name (str): Name of the logger.
-        level (int): Logging level (e.g., logging.DEBUG, logging.INFO).
+        level (Optional[int]): Explicit level for this logger; inherits the root level by default.
 
     Returns:
-        logging.Logger: Configured logger.
+        logging.Logger: The logger.
     """
+    if not logging.getLogger().handlers:
+        configure_logging()
     logger = logging.getLogger(name)
-    logger.setLevel(level)
-    
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter("[%(levelname)s] %(asctime)s - %(name)s - %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    
+    if level is not None:
+        logger.setLevel(level)
     return logger
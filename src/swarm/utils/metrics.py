@@ -0,0 +1,113 @@
+"""
+In-process metrics registry for Open Swarm.
+
+Keeps labelled counters and gauges in memory and renders them in the
+Prometheus text exposition format for the `/metrics` endpoint, without
+requiring a metrics client library.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in key
+    )
+    return "{" + escaped + "}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters, gauges and gauge callbacks.
+
+    Gauge callbacks are evaluated at render time, so components such as circuit
+    breakers can expose their live state without pushing updates.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._values: Dict[str, Dict[LabelKey, float]] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, Dict[str, str], float]]]] = []
+
+    def _declare(self, name: str, kind: str, help_text: str) -> None:
+        if name not in self._help:
+            self._help[name] = (kind, help_text)
+            self._values.setdefault(name, {})
+
+    def inc(self, name: str, amount: float = 1.0, labels: Optional[Dict[str, str]] = None, help_text: str = "") -> None:
+        """Increment the counter `name` for the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            self._declare(name, "counter", help_text)
+            series = self._values[name]
+            series[key] = series.get(key, 0.0) + amount
+
+    def set(self, name: str, value: float, labels: Optional[Dict[str, str]] = None, help_text: str = "") -> None:
+        """Set the gauge `name` for the given labels."""
+        key = _label_key(labels)
+        with self._lock:
+            self._declare(name, "gauge", help_text)
+            self._values[name][key] = float(value)
+
+    def register_collector(
+        self,
+        name: str,
+        help_text: str,
+        collector: Callable[[], List[Tuple[str, Dict[str, str], float]]],
+        kind: str = "gauge",
+    ) -> None:
+        """
+        Register a callback returning `(name, labels, value)` samples at render time.
+
+        Args:
+            name (str): Metric family name the collector reports under.
+            help_text (str): HELP text for the family.
+            collector (Callable): Returns the current samples.
+            kind (str): Prometheus metric type of the family.
+        """
+        with self._lock:
+            self._declare(name, kind, help_text)
+            self._collectors.append(collector)
+
+    def get(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        """Return the current value of a counter or gauge (0.0 if never recorded)."""
+        with self._lock:
+            return self._values.get(name, {}).get(_label_key(labels), 0.0)
+
+    def snapshot(self) -> Dict[str, Dict[LabelKey, float]]:
+        """Return every sample, including collector output, keyed by metric name."""
+        with self._lock:
+            data = {name: dict(series) for name, series in self._values.items()}
+            collectors = list(self._collectors)
+        for collector in collectors:
+            for name, labels, value in collector():
+                data.setdefault(name, {})[_label_key(labels)] = float(value)
+        return data
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        data = self.snapshot()
+        with self._lock:
+            help_map = dict(self._help)
+        lines: List[str] = []
+        for name in sorted(data):
+            kind, help_text = help_map.get(name, ("untyped", ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(data[name].items()):
+                lines.append(f"{name}{_format_labels(key)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,517 @@
+"""
+Async subprocess runtime for blueprint tools that shell out.
+
+`run_command_async` starts a command without blocking the event loop and
+streams its stdout and stderr into bounded `OutputBuffer`s, which keep the
+first and last bytes of each stream and drop the middle. The command is
+stopped, together with any children it spawned, when it runs past its
+wall-clock limit or the request deadline, when it writes more than its
+output limit, or when the request is cancelled. `run_command` is the
+synchronous entry point for tools that are plain functions.
+
+Cancellation follows the context the way request deadlines do: code serving
+a request opens `cancel_scope(token)` and every command started inside it is
+killed once `token.cancel()` is called. The `CancelOnDisconnect` ASGI wrapper
+creates that token for each HTTP request and cancels it when the client
+disconnects.
+
+Limits come from the environment: `SWARM_COMMAND_TIMEOUT` (seconds, 600),
+`SWARM_COMMAND_MAX_OUTPUT` (bytes over both streams, 10 MiB) and
+`SWARM_MAX_CONCURRENT_COMMANDS` (per process, 8). Commands are reported as
+`swarm_tool_commands_total{outcome}` and `swarm_tool_commands_running`.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .metrics import registry as metrics
+from .resilience import current_deadline
+
+logger = logging.getLogger(__name__)
+
+Command = Union[str, Sequence[str]]
+
+DEFAULT_TIMEOUT = 600.0
+DEFAULT_MAX_OUTPUT = 10 * 1024 * 1024
+DEFAULT_HEAD_BYTES = 16 * 1024
+DEFAULT_TAIL_BYTES = 48 * 1024
+DEFAULT_MAX_CONCURRENT = 8
+
+# How often a running command checks for cancellation and its output limit.
+POLL_INTERVAL = 0.1
+# Time a stopped command gets to exit after SIGTERM before it is killed.
+TERMINATE_GRACE = 2.0
+READ_CHUNK = 64 * 1024
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}: {raw!r}")
+        return default
+
+
+# -----------------------------------------------------------------------------
+# Cancellation
+# -----------------------------------------------------------------------------
+
+class CancellationToken:
+    """
+    A thread-safe flag shared by everything working on one request.
+
+    A token created inside another token's scope is also cancelled when its
+    parent is, so a request-wide cancellation reaches nested scopes.
+    """
+
+    __slots__ = ("_event", "reason", "parent")
+
+    def __init__(self, parent: Optional["CancellationToken"] = None):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+        self.parent = parent
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        token = self
+        while token is not None:
+            if token._event.is_set():
+                return True
+            token = token.parent
+        return False
+
+    def __repr__(self) -> str:
+        return f"CancellationToken(cancelled={self.cancelled}, reason={self.reason!r})"
+
+
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "swarm_cancellation", default=None,
+)
+
+
+def current_cancellation() -> Optional[CancellationToken]:
+    """Return the cancellation token of the request being served, if any."""
+    return _current_token.get()
+
+
+@contextmanager
+def cancel_scope(token: Optional[CancellationToken] = None) -> Iterator[CancellationToken]:
+    """
+    Make `token` the cancellation token for commands started in this context.
+
+    Args:
+        token (Optional[CancellationToken]): Token to install; a new child of the
+            current token is created when omitted.
+
+    Yields:
+        CancellationToken: The token in effect inside the scope.
+    """
+    outer = _current_token.get()
+    if token is None:
+        token = CancellationToken(parent=outer)
+    elif token.parent is None and outer is not None and outer is not token:
+        token.parent = outer
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+class CancelOnDisconnect:
+    """
+    ASGI wrapper that cancels a request's work when the HTTP client disconnects.
+
+    Django 4.2 stops reading from the connection once the request body has
+    arrived, so this wrapper keeps listening for `http.disconnect` while the
+    response is produced and cancels `scope["swarm.cancellation"]`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = CancellationToken()
+        scope = dict(scope, **{"swarm.cancellation": token})
+        disconnected = asyncio.Event()
+        watcher: Optional[asyncio.Task] = None
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    token.cancel("client disconnected")
+                    disconnected.set()
+                    return
+
+        async def app_receive():
+            nonlocal watcher
+            if watcher is not None or disconnected.is_set():
+                # The body was fully read; only a disconnect can follow.
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                token.cancel("client disconnected")
+                disconnected.set()
+            elif not message.get("more_body", False):
+                watcher = asyncio.ensure_future(watch())
+            return message
+
+        try:
+            await self.app(scope, app_receive, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+def request_cancellation(request) -> Optional[CancellationToken]:
+    """Return the token `CancelOnDisconnect` attached to an ASGI request, if any."""
+    request = getattr(request, "_request", request)
+    scope = getattr(request, "scope", None)
+    return scope.get("swarm.cancellation") if scope else None
+
+
+# -----------------------------------------------------------------------------
+# Output capture
+# -----------------------------------------------------------------------------
+
+class OutputBuffer:
+    """
+    Bounded capture of one output stream.
+
+    The first `head_bytes` are kept as written; after that only the most
+    recent `tail_bytes` are, so memory stays constant however much a command
+    prints while both the start (usually the command's banner or first error)
+    and the end (its summary) survive.
+    """
+
+    __slots__ = ("head_bytes", "tail_bytes", "head", "tail", "total")
+
+    def __init__(self, head_bytes: int = DEFAULT_HEAD_BYTES, tail_bytes: int = DEFAULT_TAIL_BYTES):
+        self.head_bytes = max(0, int(head_bytes))
+        self.tail_bytes = max(0, int(tail_bytes))
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_bytes:
+            self.tail += data
+            excess = len(self.tail) - self.tail_bytes
+            if excess > 0:
+                del self.tail[:excess]
+
+    @property
+    def dropped(self) -> int:
+        """Bytes written but no longer held."""
+        return self.total - len(self.head) - len(self.tail)
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped > 0
+
+    def text(self, encoding: str = "utf-8") -> str:
+        head = self.head.decode(encoding, errors="replace")
+        tail = self.tail.decode(encoding, errors="replace")
+        if not self.truncated:
+            return head + tail
+        return f"{head}\n... [{self.dropped} bytes truncated] ...\n{tail}"
+
+
+class CommandResult:
+    """
+    Outcome of a command run through `run_command_async`.
+
+    `reason` is None when the command exited on its own, otherwise one of
+    "timeout", "output_limit" or "cancelled"; `returncode` is then the status
+    of the killed process.
+    """
+
+    __slots__ = ("command", "returncode", "stdout", "stderr", "duration", "reason", "truncated")
+
+    def __init__(self, command: Command, returncode: Optional[int], stdout: str, stderr: str,
+                 duration: float, reason: Optional[str] = None, truncated: bool = False):
+        self.command = command
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.reason = reason
+        self.truncated = truncated
+
+    @property
+    def ok(self) -> bool:
+        return self.reason is None and self.returncode == 0
+
+    @property
+    def error(self) -> str:
+        """A message for a failed command: why it stopped, then its stderr (or stdout)."""
+        output = self.stderr or self.stdout
+        if self.reason == "timeout":
+            message = f"Command timed out after {self.duration:.1f}s."
+        elif self.reason == "output_limit":
+            message = "Command stopped after exceeding its output limit."
+        elif self.reason == "cancelled":
+            message = "Command cancelled."
+        else:
+            return output or f"Command exited with status {self.returncode}."
+        return f"{message}\n{output}" if output else message
+
+    def __repr__(self) -> str:
+        return (f"CommandResult(command={self.command!r}, returncode={self.returncode}, "
+                f"reason={self.reason!r}, duration={self.duration:.2f})")
+
+
+# -----------------------------------------------------------------------------
+# Concurrency
+# -----------------------------------------------------------------------------
+
+_slots_lock = threading.Lock()
+_slots: Optional[threading.BoundedSemaphore] = None
+_running = 0
+
+
+def _get_slots() -> threading.BoundedSemaphore:
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                limit = int(_env_number("SWARM_MAX_CONCURRENT_COMMANDS", DEFAULT_MAX_CONCURRENT))
+                _slots = threading.BoundedSemaphore(max(1, limit))
+    return _slots
+
+
+def reset_command_limits() -> None:
+    """Re-read `SWARM_MAX_CONCURRENT_COMMANDS` on the next command (for tests)."""
+    global _slots
+    with _slots_lock:
+        _slots = None
+
+
+def _collect_running() -> List[Tuple[str, Dict[str, str], float]]:
+    return [("swarm_tool_commands_running", {}, _running)]
+
+
+metrics.register_collector(
+    "swarm_tool_commands_running", "Tool subprocesses currently running.", _collect_running,
+)
+
+
+async def _acquire_slot(slots: threading.BoundedSemaphore, token: Optional[CancellationToken],
+                        expires_at: Optional[float]) -> Optional[str]:
+    """Wait for a free command slot; return the reason if the wait was abandoned."""
+    # The semaphore is shared by every event loop and thread in the process, so poll it.
+    while not slots.acquire(blocking=False):
+        if token is not None and token.cancelled:
+            return "cancelled"
+        if expires_at is not None and time.monotonic() >= expires_at:
+            return "timeout"
+        await asyncio.sleep(POLL_INTERVAL)
+    return None
+
+
+# -----------------------------------------------------------------------------
+# Running commands
+# -----------------------------------------------------------------------------
+
+def _signal_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _stop(process: asyncio.subprocess.Process) -> None:
+    """SIGTERM the command's process group, then SIGKILL it if it lingers."""
+    if process.returncode is not None:
+        return
+    _signal_group(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), TERMINATE_GRACE)
+    except asyncio.TimeoutError:
+        _signal_group(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+        await process.wait()
+
+
+async def run_command_async(
+    command: Command,
+    *,
+    shell: bool = False,
+    cwd: Optional[str] = None,
+    env: Optional[Mapping[str, str]] = None,
+    timeout: Optional[float] = None,
+    max_output: Optional[int] = None,
+    head_bytes: int = DEFAULT_HEAD_BYTES,
+    tail_bytes: int = DEFAULT_TAIL_BYTES,
+    token: Optional[CancellationToken] = None,
+) -> CommandResult:
+    """
+    Run a command, capturing bounded output, within time, size and cancellation limits.
+
+    Args:
+        command (Command): An argument list, or a string run by the shell when `shell` is True.
+        shell (bool): Run `command` through the system shell.
+        cwd (Optional[str]): Working directory.
+        env (Optional[Mapping[str, str]]): Environment; inherits the server's when omitted.
+        timeout (Optional[float]): Wall-clock limit in seconds; defaults to `SWARM_COMMAND_TIMEOUT`
+            and is shortened to the request deadline.
+        max_output (Optional[int]): Bytes over both streams after which the command is stopped;
+            defaults to `SWARM_COMMAND_MAX_OUTPUT`.
+        head_bytes (int): Bytes kept from the start of each stream.
+        tail_bytes (int): Bytes kept from the end of each stream.
+        token (Optional[CancellationToken]): Cancels the command; defaults to the current scope's token.
+
+    Returns:
+        CommandResult: Exit status, captured output and the reason the command was stopped, if any.
+    """
+    global _running
+    token = token if token is not None else current_cancellation()
+    if timeout is None:
+        timeout = _env_number("SWARM_COMMAND_TIMEOUT", DEFAULT_TIMEOUT)
+    deadline = current_deadline()
+    if deadline is not None:
+        timeout = deadline.cap(timeout)
+    if max_output is None:
+        max_output = int(_env_number("SWARM_COMMAND_MAX_OUTPUT", DEFAULT_MAX_OUTPUT))
+
+    started = time.monotonic()
+    expires_at = started + timeout if timeout and timeout > 0 else None
+    slots = _get_slots()
+    reason = await _acquire_slot(slots, token, expires_at)
+    if reason is not None:
+        metrics.inc("swarm_tool_commands_total", labels={"outcome": reason},
+                    help_text="Tool subprocesses run, by outcome.")
+        return CommandResult(command, None, "", "", time.monotonic() - started, reason)
+
+    stdout, stderr = OutputBuffer(head_bytes, tail_bytes), OutputBuffer(head_bytes, tail_bytes)
+    process = None
+    with _slots_lock:
+        _running += 1
+    try:
+        options: Dict[str, Any] = {
+            "stdin": asyncio.subprocess.DEVNULL,
+            "stdout": asyncio.subprocess.PIPE,
+            "stderr": asyncio.subprocess.PIPE,
+            "cwd": cwd,
+            "env": dict(env) if env is not None else None,
+        }
+        if os.name == "posix":
+            # Own process group, so stopping the command also stops what it spawned.
+            options["start_new_session"] = True
+        if shell:
+            process = await asyncio.create_subprocess_shell(command, **options)
+        else:
+            process = await asyncio.create_subprocess_exec(*command, **options)
+
+        over_limit = asyncio.Event()
+
+        async def pump(stream: asyncio.StreamReader, buffer: OutputBuffer) -> None:
+            while True:
+                chunk = await stream.read(READ_CHUNK)
+                if not chunk:
+                    return
+                buffer.write(chunk)
+                if max_output and stdout.total + stderr.total > max_output:
+                    # Keep draining until the command is stopped, so it never blocks on a full pipe.
+                    over_limit.set()
+
+        async def finish() -> int:
+            await asyncio.gather(pump(process.stdout, stdout), pump(process.stderr, stderr))
+            return await process.wait()
+
+        finished = asyncio.ensure_future(finish())
+        while not finished.done():
+            if token is not None and token.cancelled:
+                reason = "cancelled"
+            elif over_limit.is_set():
+                reason = "output_limit"
+            elif expires_at is not None and time.monotonic() >= expires_at:
+                reason = "timeout"
+            if reason is not None:
+                break
+            wait = POLL_INTERVAL if expires_at is None else min(POLL_INTERVAL, max(0.0, expires_at - time.monotonic()))
+            await asyncio.wait({finished}, timeout=wait)
+
+        if reason is not None:
+            logger.warning(f"Stopping command {command!r}: {reason}")
+            await _stop(process)
+            try:
+                # Pipes close once the process group is gone.
+                await asyncio.wait_for(finished, TERMINATE_GRACE)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                finished.cancel()
+        else:
+            finished.result()
+        returncode = process.returncode
+    finally:
+        with _slots_lock:
+            _running -= 1
+        slots.release()
+        if process is not None and process.returncode is None:
+            # The caller was cancelled (e.g. its task); do not leave the command running.
+            await asyncio.shield(_stop(process))
+
+    duration = time.monotonic() - started
+    outcome = reason or ("ok" if returncode == 0 else "error")
+    metrics.inc("swarm_tool_commands_total", labels={"outcome": outcome},
+                help_text="Tool subprocesses run, by outcome.")
+    logger.debug(f"Command {command!r} finished in {duration:.2f}s: {outcome} ({returncode})")
+    return CommandResult(
+        command, returncode, stdout.text(), stderr.text(), duration, reason,
+        truncated=stdout.truncated or stderr.truncated,
+    )
+
+
+def run_command(command: Command, **kwargs) -> CommandResult:
+    """
+    Synchronous `run_command_async` for tools that are plain functions.
+
+    Outside an event loop the command runs on a private loop; when called from
+    a thread that is already running one, it runs on a worker thread instead so
+    the caller's loop is not re-entered. The current deadline and cancellation
+    token carry over either way.
+
+    Args:
+        command (Command): See `run_command_async`.
+        **kwargs: Options for `run_command_async`.
+
+    Returns:
+        CommandResult: The outcome of the command.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_command_async(command, **kwargs))
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="swarm-command") as executor:
+        return executor.submit(context.run, asyncio.run, run_command_async(command, **kwargs)).result()
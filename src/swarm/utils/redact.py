@@ -3,10 +3,227 @@ Utility for redacting sensitive data from logs or outputs.
 
 This module provides a function to redact sensitive keys in dictionaries or lists
 for logging purposes, with support for partial reveals.
+
+Secret values are taken from a snapshot of the environment (plus any values
+registered from the configuration with `register_secrets`) and compiled once
+into a set for whole-string matches and a single regex for secrets embedded in
+longer strings. The snapshot is rebuilt only when the environment changes.
 """
 
 import os
-from typing import Any, List
+import re
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+DEFAULT_SENSITIVE_KEYS = ("api_key", "token")
+
+# Environment variables whose name contains one of these are treated as secrets
+# and are also searched for inside longer strings.
+SECRET_NAME_MARKERS = ("KEY", "TOKEN", "SECRET", "PASSWORD", "PASSWD", "CREDENTIAL", "AUTH")
+
+# Shorter values are only matched as whole strings; searching for them inside
+# arbitrary text would mostly hit unrelated substrings.
+MIN_EMBEDDED_SECRET_LENGTH = 8
+
+
+class SecretMatcher:
+    """Precompiled lookups for a fixed set of secret values."""
+
+    __slots__ = ("exact", "pattern")
+
+    def __init__(self, exact: Iterable[str], embedded: Iterable[str]):
+        self.exact: FrozenSet[str] = frozenset(v for v in exact if v)
+        embedded = sorted({v for v in embedded if len(v) >= MIN_EMBEDDED_SECRET_LENGTH}, key=len, reverse=True)
+        # Longest first, so a secret that contains another one is masked whole.
+        self.pattern: Optional[Pattern[str]] = re.compile("|".join(map(re.escape, embedded))) if embedded else None
+
+    @classmethod
+    def from_environment(cls, env: Dict[str, str], extra_secrets: Iterable[str] = ()) -> "SecretMatcher":
+        extra_secrets = tuple(extra_secrets)
+        secret_env = [value for name, value in env.items() if any(m in name.upper() for m in SECRET_NAME_MARKERS)]
+        return cls(exact=[*env.values(), *extra_secrets], embedded=[*secret_env, *extra_secrets])
+
+
+class Redactor:
+    """
+    A compiled redactor for one set of sensitive keys and masking options.
+
+    Dictionary values are redacted when their key is sensitive (case-insensitive).
+    Other strings, such as list items, are redacted when they equal a known
+    secret, and any known secret embedded in them is masked in place. Values
+    under other dictionary keys get only the embedded-secret masking, so a
+    setting that merely equals some environment value is left alone.
+    """
+
+    def __init__(
+        self,
+        matcher: SecretMatcher,
+        sensitive_keys: Optional[Iterable[str]] = None,
+        mask: str = "****",
+        reveal_chars: int = 4,
+    ):
+        self.matcher = matcher
+        self.sensitive_keys = frozenset(k.casefold() for k in (sensitive_keys or DEFAULT_SENSITIVE_KEYS))
+        self.mask = mask
+        self.reveal_chars = reveal_chars
+
+    def partially_redact(self, value: str) -> str:
+        if len(value) <= self.reveal_chars * 2:
+            return self.mask
+        return f"{value[:self.reveal_chars]}{self.mask}{value[-self.reveal_chars:]}"
+
+    def redact_string(self, value: str) -> str:
+        if value in self.matcher.exact:
+            return self.partially_redact(value)
+        return self.redact_embedded(value)
+
+    def redact_embedded(self, value: str) -> str:
+        if self.matcher.pattern is not None:
+            return self.matcher.pattern.sub(lambda m: self.partially_redact(m.group(0)), value)
+        return value
+
+    def _redact_leaf(self, value: str, key: Any, in_dict: bool) -> str:
+        if in_dict:
+            if isinstance(key, str) and key.casefold() in self.sensitive_keys:
+                return self.partially_redact(value)
+            return self.redact_embedded(value)
+        return self.redact_string(value)
+
+    def redact(self, data: Any) -> Any:
+        """
+        Return `data` with sensitive values redacted.
+
+        The walk is iterative, and containers are copied only when something
+        inside them changed; unchanged subtrees are returned as-is (shared with
+        the input), so treat the result as read-only.
+        """
+        if isinstance(data, str):
+            return self.redact_string(data)
+        if not isinstance(data, (dict, list)):
+            return data
+
+        # Each frame: (container, item iterator, changes, parent frame, key in parent).
+        root = (data, _items(data), {}, None, None)
+        stack = [root]
+        while stack:
+            container, items, changes, parent, parent_key = frame = stack[-1]
+            in_dict = isinstance(container, dict)
+            for key, value in items:
+                if isinstance(value, (dict, list)):
+                    stack.append((value, _items(value), {}, frame, key))
+                    break
+                if isinstance(value, str):
+                    redacted = self._redact_leaf(value, key, in_dict)
+                    if redacted != value:
+                        changes[key] = redacted
+            else:
+                stack.pop()
+                result = _rebuild(container, changes)
+                if parent is None:
+                    return result
+                if result is not container:
+                    parent[2][parent_key] = result
+        return data
+
+
+def _items(container: Any):
+    return iter(container.items()) if isinstance(container, dict) else enumerate(container)
+
+
+def _rebuild(container: Any, changes: Dict[Any, Any]) -> Any:
+    if not changes:
+        return container
+    if isinstance(container, dict):
+        copy = dict(container)
+    else:
+        copy = list(container)
+    for key, value in changes.items():
+        copy[key] = value
+    return copy
+
+
+_lock = threading.Lock()
+_registered_secrets: set = set()
+_matcher: Optional[SecretMatcher] = None
+_matcher_key: Optional[Tuple[Tuple[str, str], ...]] = None
+_redactors: Dict[Tuple, Redactor] = {}
+
+
+def _environ_state() -> Tuple[Tuple[str, str], ...]:
+    """A snapshot of the environment to tell whether it changed since the matcher was built."""
+    return tuple(os.environ.items())
+
+
+def register_secrets(values: Iterable[Any]) -> None:
+    """
+    Add secret values that do not come from the environment (e.g. resolved config entries).
+
+    Args:
+        values (Iterable): Candidate values; non-strings and empty strings are ignored.
+    """
+    new = {v for v in values if isinstance(v, str) and v}
+    with _lock:
+        if not new <= _registered_secrets:
+            _registered_secrets.update(new)
+            _invalidate()
+
+
+def clear_registered_secrets() -> None:
+    """Forget every value added with `register_secrets` (e.g. between tests or config reloads)."""
+    with _lock:
+        _registered_secrets.clear()
+        _invalidate()
+
+
+def collect_secrets(data: Any, sensitive_keys: Optional[Iterable[str]] = None) -> List[str]:
+    """Return the string values stored under sensitive keys anywhere in `data`."""
+    keys = frozenset(k.casefold() for k in (sensitive_keys or DEFAULT_SENSITIVE_KEYS))
+    found, stack = [], [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, str) and isinstance(key, str) and key.casefold() in keys:
+                    found.append(value)
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+    return found
+
+
+def _invalidate() -> None:
+    global _matcher, _matcher_key
+    _matcher = None
+    _matcher_key = None
+    _redactors.clear()
+
+
+def get_matcher() -> SecretMatcher:
+    """Return the matcher for the current environment, rebuilding it only if the environment changed."""
+    global _matcher, _matcher_key
+    state = _environ_state()
+    matcher, key = _matcher, _matcher_key
+    if matcher is not None and key == state:
+        return matcher
+    with _lock:
+        if _matcher is None or _matcher_key != state:
+            _matcher = SecretMatcher.from_environment(dict(os.environ), _registered_secrets)
+            _matcher_key = state
+            _redactors.clear()
+        return _matcher
+
+
+def get_redactor(sensitive_keys: Optional[List[str]] = None, mask: str = "****", reveal_chars: int = 4) -> Redactor:
+    """Return a cached `Redactor` for these options and the current environment."""
+    matcher = get_matcher()
+    options = (tuple(sensitive_keys) if sensitive_keys is not None else None, mask, reveal_chars)
+    redactor = _redactors.get(options)
+    if redactor is None or redactor.matcher is not matcher:
+        redactor = Redactor(matcher, sensitive_keys, mask, reveal_chars)
+        _redactors[options] = redactor
+    return redactor
+
 
 def redact_sensitive_data(data: Any, sensitive_keys: List[str] = None, mask: str = "****", reveal_chars: int = 4) -> Any:
     """
@@ -19,44 +236,7 @@ def redact_sensitive_data(data: Any, sensitive_keys: List[str] = None, mask: str
         reveal_chars (int): Number of characters to reveal at the start and end of sensitive values.
 
     Returns:
-        Any: Data with sensitive keys redacted with partial reveal.
+        Any: Data with sensitive keys redacted with partial reveal. Unchanged
+        subtrees are shared with `data`.
     """
-    if sensitive_keys is None:
-        sensitive_keys = ["api_key", "token"]
-
-    def partially_redact(value: str) -> str:
-        """Helper function to partially redact sensitive strings."""
-        if len(value) <= reveal_chars * 2:
-            return mask
-        return f"{value[:reveal_chars]}{mask}{value[-reveal_chars:]}"
-
-    def is_sensitive_key(key: str) -> bool:
-        """Helper function to check if a key is sensitive (case-insensitive)."""
-        return any(sensitive_key.lower() == key.lower() for sensitive_key in sensitive_keys)
-
-    def is_sensitive_value(value: str, key: str) -> bool:
-        """Helper function to check if a value matches the environment variable corresponding to the key."""
-        env_var_name = key.upper().replace('_', '')
-        return value == os.getenv(env_var_name)
-
-    if isinstance(data, dict):
-        new_dict = {}
-        for key, value in data.items():
-            if isinstance(value, dict) or isinstance(value, list):
-                new_dict[key] = redact_sensitive_data(value, sensitive_keys, mask, reveal_chars)
-            elif isinstance(value, str):
-                if is_sensitive_key(key):
-                    new_dict[key] = partially_redact(value)
-                else:
-                    new_dict[key] = value
-            else:
-                new_dict[key] = value
-        return new_dict
-    elif isinstance(data, list):
-        return [redact_sensitive_data(item, sensitive_keys, mask, reveal_chars) for item in data]
-    elif isinstance(data, str):
-        for env_var_name, env_var_value in os.environ.items():
-            if data == env_var_value:
-                return partially_redact(data)
-        return data
-    return data
\ No newline at end of file
+    return get_redactor(sensitive_keys, mask, reveal_chars).redact(data)
@@ -0,0 +1,540 @@
+"""
+Resilience primitives for calls to LLM endpoints and MCP servers.
+
+Provides exponential backoff with full jitter, request deadlines that
+propagate through `contextvars`, per-backend circuit breakers with
+half-open probing, and hedged requests for idempotent calls. Breaker
+state, retries and hedges are reported through `swarm.utils.metrics`.
+
+Typical use wraps a single backend call:
+
+    result = call_with_resilience(
+        lambda timeout: client.chat.completions.create(..., timeout=timeout),
+        backend="llm:https://api.openai.com/v1",
+        policy=RetryPolicy.from_config(llm_config.get("retry")),
+    )
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .metrics import registry as metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses that indicate a transient backend problem worth retrying.
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+
+class ResilienceError(Exception):
+    """Base class for errors raised by the resilience layer itself."""
+
+
+class CircuitOpenError(ResilienceError):
+    """Raised when a call is rejected because the backend's circuit is open."""
+
+    def __init__(self, backend: str, retry_after: float):
+        super().__init__(f"Circuit for backend '{backend}' is open; retry in {retry_after:.1f}s.")
+        self.backend = backend
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(ResilienceError, TimeoutError):
+    """Raised when the request deadline expires before a backend call can complete."""
+
+
+class RetryPolicy:
+    """
+    Retry settings for a backend call.
+
+    Delays use "full jitter": attempt `n` sleeps a random time between zero and
+    `min(max_delay, base_delay * 2 ** n)`, which spreads retries from many
+    workers instead of having them hit a recovering backend in lockstep.
+    """
+
+    __slots__ = ("max_attempts", "base_delay", "max_delay", "timeout")
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 8.0,
+        timeout: Optional[float] = None,
+    ):
+        self.max_attempts = max(1, int(max_attempts))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max(0.0, float(max_delay))
+        self.timeout = float(timeout) if timeout else None
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], **defaults) -> "RetryPolicy":
+        """
+        Build a policy from a `retry` configuration block.
+
+        Args:
+            config (Optional[dict]): Keys `max_attempts`, `base_delay`, `max_delay` and `timeout`.
+            **defaults: Values used for keys missing from `config`.
+
+        Returns:
+            RetryPolicy: The resulting policy.
+        """
+        settings = dict(defaults)
+        settings.update({k: v for k, v in (config or {}).items() if k in cls.__slots__})
+        return cls(**settings)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the jittered delay to sleep after failed attempt number `attempt` (0-based)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryPolicy(max_attempts={self.max_attempts}, base_delay={self.base_delay}, "
+            f"max_delay={self.max_delay}, timeout={self.timeout})"
+        )
+
+
+# -----------------------------------------------------------------------------
+# Deadlines
+# -----------------------------------------------------------------------------
+
+class Deadline:
+    """An absolute point in (monotonic) time by which a request must finish."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, timeout: float):
+        self.expires_at = time.monotonic() + max(0.0, float(timeout))
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def cap(self, timeout: Optional[float]) -> float:
+        """Return `timeout` shortened to the time left before the deadline."""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("swarm_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the request being served, if any."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Apply a deadline `timeout` seconds from now to every resilient call in this context.
+
+    Nested scopes never extend an enclosing deadline; the earlier one wins. The
+    deadline follows the context into coroutines and tasks started inside it.
+
+    Args:
+        timeout (Optional[float]): Seconds until the deadline; None keeps the current deadline.
+
+    Yields:
+        Optional[Deadline]: The deadline in effect inside the scope.
+    """
+    outer = _current_deadline.get()
+    if timeout is None:
+        yield outer
+        return
+    deadline = Deadline(timeout)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+# -----------------------------------------------------------------------------
+# Circuit breakers
+# -----------------------------------------------------------------------------
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    fail fast with `CircuitOpenError`. Once `recovery_timeout` seconds have
+    passed the circuit is half-open: up to `half_open_max_calls` probe calls
+    are let through, and the first result decides whether it closes again or
+    re-opens for another recovery period.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_timeout = max(0.0, float(recovery_timeout))
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+            logger.info(f"Circuit for backend '{self.name}' is half-open; probing.")
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit will admit a probe call."""
+        with self._lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+
+    def before_call(self) -> None:
+        """
+        Admit or reject a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all probe slots taken.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            retry_after = self.recovery_timeout - (self._clock() - self._opened_at) if state == self.OPEN else 0.0
+        metrics.inc("swarm_backend_rejected_total", labels={"backend": self.name},
+                    help_text="Calls rejected by an open circuit breaker.")
+        raise CircuitOpenError(self.name, max(0.0, retry_after))
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for backend '{self.name}' closed after a successful probe.")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit for backend '{self.name}' opened after {self._failures} failure(s).")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probes = 0
+
+    def __repr__(self) -> str:
+        return f"CircuitBreaker(name={self.name!r}, state={self.state!r})"
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(backend: str, config: Optional[Dict[str, Any]] = None) -> CircuitBreaker:
+    """
+    Return the shared circuit breaker for `backend`, creating it on first use.
+
+    Args:
+        backend (str): Backend identifier, e.g. `llm:<base_url>` or `mcp:<server>`.
+        config (Optional[dict]): `circuit_breaker` settings used when the breaker is created.
+
+    Returns:
+        CircuitBreaker: The breaker for the backend.
+    """
+    breaker = _breakers.get(backend)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(backend)
+            if breaker is None:
+                allowed = ("failure_threshold", "recovery_timeout", "half_open_max_calls")
+                settings = {k: v for k, v in (config or {}).items() if k in allowed}
+                breaker = CircuitBreaker(backend, **settings)
+                _breakers[backend] = breaker
+    return breaker
+
+
+def breaker_states() -> Dict[str, str]:
+    """Return the current state of every known circuit breaker by backend."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+def reset_breakers() -> None:
+    """Forget all circuit breakers (used by tests and configuration reloads)."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def _collect_breaker_states() -> List[Tuple[str, Dict[str, str], float]]:
+    return [
+        ("swarm_circuit_breaker_state", {"backend": name}, CircuitBreaker.STATE_VALUES[state])
+        for name, state in breaker_states().items()
+    ]
+
+
+metrics.register_collector(
+    "swarm_circuit_breaker_state",
+    "Circuit breaker state per backend (0=closed, 1=half_open, 2=open).",
+    _collect_breaker_states,
+)
+
+
+# -----------------------------------------------------------------------------
+# Calls
+# -----------------------------------------------------------------------------
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Return True if `exc` signals a transient backend failure.
+
+    Timeouts, connection errors and retryable HTTP statuses (429, 5xx, ...)
+    qualify; the cause chain is followed so wrapped errors are recognised.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, ResilienceError):
+            return False
+        if isinstance(exc, (TimeoutError, ConnectionError, asyncio.TimeoutError)):
+            return True
+        status = getattr(exc, "status_code", None)
+        if isinstance(status, int):
+            return status in RETRYABLE_STATUS
+        if type(exc).__name__ in ("APIConnectionError", "APITimeoutError"):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _attempt_timeout(policy: RetryPolicy, deadline: Optional[Deadline], backend: str) -> Optional[float]:
+    if deadline is None:
+        return policy.timeout
+    if deadline.expired:
+        raise DeadlineExceeded(f"Deadline exceeded before calling backend '{backend}'.")
+    return deadline.cap(policy.timeout)
+
+
+def _record_outcome(breaker: CircuitBreaker, backend: str, exc: Optional[BaseException]) -> bool:
+    """Update the breaker for an attempt's outcome; return True if the error should be retried."""
+    if exc is None:
+        breaker.record_success()
+        return False
+    if is_retryable(exc):
+        breaker.record_failure()
+        metrics.inc("swarm_backend_failures_total", labels={"backend": backend},
+                    help_text="Transient backend failures seen by the resilience layer.")
+        return True
+    # The backend answered (e.g. a 400); that says nothing bad about its health.
+    breaker.record_success()
+    return False
+
+
+def _sleep_budget(policy: RetryPolicy, attempt: int, deadline: Optional[Deadline]) -> Optional[float]:
+    """Return the backoff delay before the next attempt, or None if no attempt is left."""
+    if attempt + 1 >= policy.max_attempts:
+        return None
+    delay = policy.backoff(attempt)
+    if deadline is not None and deadline.remaining() <= delay:
+        return None
+    return delay
+
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_executor_lock = threading.Lock()
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="swarm-hedge")
+    return _hedge_executor
+
+
+def _hedged_call(func: Callable[[Optional[float]], T], timeout: Optional[float], hedge_after: float, backend: str) -> T:
+    executor = _get_hedge_executor()
+    pending = {executor.submit(func, timeout)}
+    done, pending = wait(pending, timeout=hedge_after)
+    if not done:
+        metrics.inc("swarm_backend_hedges_total", labels={"backend": backend},
+                    help_text="Hedged duplicate requests sent to slow backends.")
+        logger.debug(f"Backend '{backend}' slower than {hedge_after}s; sending hedged request.")
+        pending.add(executor.submit(func, None if timeout is None else max(0.0, timeout - hedge_after)))
+    error: Optional[BaseException] = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+def call_with_resilience(
+    func: Callable[[Optional[float]], T],
+    backend: str,
+    policy: Optional[RetryPolicy] = None,
+    breaker_config: Optional[Dict[str, Any]] = None,
+    hedge_after: Optional[float] = None,
+) -> T:
+    """
+    Call `func` with retries, the current deadline and the backend's circuit breaker.
+
+    Args:
+        func (Callable): Performs one attempt; receives the attempt timeout in seconds (or None).
+        backend (str): Backend identifier used for the circuit breaker and metrics.
+        policy (Optional[RetryPolicy]): Retry settings; defaults to `RetryPolicy()`.
+        breaker_config (Optional[dict]): Settings for the backend's breaker when first created.
+        hedge_after (Optional[float]): For idempotent calls only, send a duplicate request if the
+            first has not completed after this many seconds and use whichever finishes first.
+
+    Returns:
+        The result of the first successful attempt.
+
+    Raises:
+        CircuitOpenError: If the backend's circuit is open.
+        DeadlineExceeded: If the request deadline expires before an attempt can start.
+        Exception: The last error from `func` once retries are exhausted or it is not retryable.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_breaker(backend, breaker_config)
+    deadline = current_deadline()
+    attempt = 0
+    while True:
+        timeout = _attempt_timeout(policy, deadline, backend)
+        breaker.before_call()
+        try:
+            if hedge_after is not None and (timeout is None or hedge_after < timeout):
+                result = _hedged_call(func, timeout, hedge_after, backend)
+            else:
+                result = func(timeout)
+        except Exception as e:
+            if not _record_outcome(breaker, backend, e):
+                raise
+            delay = _sleep_budget(policy, attempt, deadline)
+            if delay is None:
+                raise
+            metrics.inc("swarm_backend_retries_total", labels={"backend": backend},
+                        help_text="Retried backend calls.")
+            logger.warning(f"Call to backend '{backend}' failed ({e}); retry {attempt + 1} in {delay:.2f}s.")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        _record_outcome(breaker, backend, None)
+        return result
+
+
+async def _async_attempt(func: Callable[[Optional[float]], Awaitable[T]], timeout: Optional[float]) -> T:
+    if timeout is None:
+        return await func(None)
+    return await asyncio.wait_for(func(timeout), timeout=timeout)
+
+
+async def _async_hedged_call(
+    func: Callable[[Optional[float]], Awaitable[T]], timeout: Optional[float], hedge_after: float, backend: str
+) -> T:
+    pending = {asyncio.ensure_future(_async_attempt(func, timeout))}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_after)
+        if not done:
+            metrics.inc("swarm_backend_hedges_total", labels={"backend": backend},
+                        help_text="Hedged duplicate requests sent to slow backends.")
+            logger.debug(f"Backend '{backend}' slower than {hedge_after}s; sending hedged request.")
+            hedge_timeout = None if timeout is None else max(0.0, timeout - hedge_after)
+            pending.add(asyncio.ensure_future(_async_attempt(func, hedge_timeout)))
+        error: Optional[BaseException] = None
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not pending:
+                raise error
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def async_call_with_resilience(
+    func: Callable[[Optional[float]], Awaitable[T]],
+    backend: str,
+    policy: Optional[RetryPolicy] = None,
+    breaker_config: Optional[Dict[str, Any]] = None,
+    hedge_after: Optional[float] = None,
+) -> T:
+    """
+    Async counterpart of `call_with_resilience`.
+
+    Each attempt is additionally bounded with `asyncio.wait_for` using the attempt
+    timeout, and losing hedged attempts are cancelled.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_breaker(backend, breaker_config)
+    deadline = current_deadline()
+    attempt = 0
+    while True:
+        timeout = _attempt_timeout(policy, deadline, backend)
+        breaker.before_call()
+        try:
+            if hedge_after is not None and (timeout is None or hedge_after < timeout):
+                result = await _async_hedged_call(func, timeout, hedge_after, backend)
+            else:
+                result = await _async_attempt(func, timeout)
+        except Exception as e:
+            if not _record_outcome(breaker, backend, e):
+                raise
+            delay = _sleep_budget(policy, attempt, deadline)
+            if delay is None:
+                raise
+            metrics.inc("swarm_backend_retries_total", labels={"backend": backend},
+                        help_text="Retried backend calls.")
+            logger.warning(f"Call to backend '{backend}' failed ({e}); retry {attempt + 1} in {delay:.2f}s.")
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        _record_outcome(breaker, backend, None)
+        return result
@@ -0,0 +1,553 @@
+"""
+Workspace file listing and code search for coding blueprints.
+
+A `Workspace` keeps a per-directory listing of a source tree that honours
+`.gitignore` files (plus a few always-ignored directories such as `.git`
+and `node_modules`). Listings are revalidated against directory and
+`.gitignore` modification times, so repeated calls only stat directories and
+re-read the ones that changed.
+
+`Workspace.search` scans candidate files with a bytes regex over `mmap`,
+reporting one `SearchMatch` (path, line number, line) per matching line and
+stopping at `limit`. Large searches are split into batches scanned by a
+process pool (`SWARM_SEARCH_WORKERS`, default up to 4; 1 disables it), and
+binary files are skipped. With `SWARM_SEARCH_TRIGRAM_INDEX=true`, each
+file's trigrams are cached (invalidated by mtime and size, least recently
+used files evicted past TRIGRAM_CACHE_FILES) and files lacking the trigrams
+of a pattern's required literals are never opened.
+"""
+
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 200
+# Directories skipped whatever the .gitignore files say.
+ALWAYS_IGNORED = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", ".tox", ".mypy_cache", ".pytest_cache",
+})
+# A file with a NUL byte in its first block is treated as binary.
+BINARY_SNIFF_BYTES = 8192
+MAX_LINE_CHARS = 500
+COUNT_CHUNK = 1024 * 1024
+# Searches over fewer bytes than this are scanned in the calling thread.
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+BATCH_BYTES = 8 * 1024 * 1024
+BATCH_FILES = 256
+# Files whose trigrams a workspace keeps, and workspaces kept by get_workspace.
+TRIGRAM_CACHE_FILES = 4096
+WORKSPACE_CACHE_SIZE = 16
+
+
+class SearchMatch:
+    """A line matching a search, with its 1-based line number."""
+
+    __slots__ = ("path", "line", "text")
+
+    def __init__(self, path: str, line: int, text: str):
+        self.path = path
+        self.line = line
+        self.text = text
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, SearchMatch) and (self.path, self.line, self.text) == (other.path, other.line, other.text)
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}: {self.text}"
+
+    def __repr__(self) -> str:
+        return f"SearchMatch({self.path!r}, {self.line}, {self.text!r})"
+
+
+# -----------------------------------------------------------------------------
+# .gitignore rules
+# -----------------------------------------------------------------------------
+
+class IgnoreRule:
+    """One `.gitignore` pattern, matched against paths relative to the directory it was read from."""
+
+    __slots__ = ("base", "negate", "dir_only", "regex")
+
+    def __init__(self, base: str, pattern: str):
+        self.base = base
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # A pattern with an inner slash is relative to its .gitignore; otherwise it matches at any depth.
+        anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        body = _glob_to_regex(pattern)
+        self.regex = re.compile(body if anchored else f"(?:.*/)?{body}")
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        return self.regex.fullmatch(rel_path) is not None
+
+
+def _glob_to_regex(pattern: str) -> str:
+    out, i = [], 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("/**", i) and i + 3 == len(pattern):
+            out.append("/.*")
+            break
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return "".join(out)
+
+
+def parse_gitignore(path: str, base: str) -> List[IgnoreRule]:
+    """Read the rules of the `.gitignore` at `path`, which lives in workspace directory `base`."""
+    rules = []
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\n").rstrip()
+                if line and not line.startswith("#"):
+                    rules.append(IgnoreRule(base, line))
+    except OSError as e:
+        logger.debug(f"Cannot read {path}: {e}")
+    return rules
+
+
+def is_ignored(rel_path: str, is_dir: bool, rules: Sequence[IgnoreRule]) -> bool:
+    """Apply `rules` in order; as in git, the last matching rule decides."""
+    ignored = False
+    for rule in rules:
+        if ignored != (not rule.negate) and rule.matches(rel_path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+# -----------------------------------------------------------------------------
+# Scanning (runs in worker processes)
+# -----------------------------------------------------------------------------
+
+def _count_newlines(data: mmap.mmap, start: int, end: int) -> int:
+    # mmap has no count(); copy at most COUNT_CHUNK bytes at a time.
+    count = 0
+    for offset in range(start, end, COUNT_CHUNK):
+        count += data[offset:min(end, offset + COUNT_CHUNK)].count(b"\n")
+    return count
+
+
+def _scan_file(root: str, rel_path: str, regex: "re.Pattern[bytes]", limit: int) -> List[Tuple[str, int, str]]:
+    matches: List[Tuple[str, int, str]] = []
+    try:
+        with open(os.path.join(root, rel_path), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return matches
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1:
+                    return matches
+                pos, line, counted = 0, 1, 0
+                while len(matches) < limit:
+                    match = regex.search(data, pos)
+                    if match is None:
+                        break
+                    start = match.start()
+                    line += _count_newlines(data, counted, start)
+                    counted = start
+                    line_start = data.rfind(b"\n", 0, start) + 1
+                    line_end = data.find(b"\n", start)
+                    if line_end == -1:
+                        line_end = len(data)
+                    text = data[line_start:line_end].decode("utf-8", errors="replace").rstrip("\r")
+                    matches.append((rel_path, line, text[:MAX_LINE_CHARS]))
+                    # One match per line, like grep.
+                    pos = line_end + 1
+                    if pos > len(data):
+                        break
+    except (OSError, ValueError) as e:
+        logger.debug(f"Skipping {rel_path}: {e}")
+    return matches
+
+
+def _scan_batch(root: str, paths: Sequence[str], pattern: bytes, flags: int, limit: int) -> List[Tuple[str, int, str]]:
+    regex = re.compile(pattern, flags)
+    matches: List[Tuple[str, int, str]] = []
+    for rel_path in paths:
+        matches.extend(_scan_file(root, rel_path, regex, limit - len(matches)))
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def _file_trigrams(path: str) -> FrozenSet[bytes]:
+    with open(path, "rb") as f:
+        data = f.read().lower()
+    return frozenset(data[i:i + 3] for i in range(len(data) - 2))
+
+
+def required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Return literal strings every match of `pattern` must contain.
+
+    Only runs of literal characters in the top-level sequence are collected;
+    a top-level alternation yields nothing, since no single literal is required.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return []
+    literals, current = [], []
+    for op, value in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(value))
+            continue
+        if op is sre_parse.BRANCH:
+            return []
+        if current:
+            literals.append("".join(current))
+            current = []
+    if current:
+        literals.append("".join(current))
+    return literals
+
+
+def _trigrams_of(literals: Iterable[str]) -> FrozenSet[bytes]:
+    grams = set()
+    for literal in literals:
+        data = literal.encode("utf-8").lower()
+        grams.update(data[i:i + 3] for i in range(len(data) - 2))
+    return frozenset(grams)
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def search_workers() -> int:
+    raw = os.getenv("SWARM_SEARCH_WORKERS")
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            logger.warning(f"Ignoring invalid SWARM_SEARCH_WORKERS: {raw!r}")
+    return min(4, os.cpu_count() or 1)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers do not inherit the server's threads, locks or connections.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_search_pool() -> None:
+    """Stop the search worker processes (for shutdown hooks and tests)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+# -----------------------------------------------------------------------------
+# Workspace
+# -----------------------------------------------------------------------------
+
+class _DirListing:
+    __slots__ = ("mtime_ns", "rules_key", "rules", "files", "dirs")
+
+    def __init__(self, mtime_ns, rules_key, rules, files, dirs):
+        self.mtime_ns = mtime_ns
+        self.rules_key = rules_key
+        self.rules = rules
+        self.files = files
+        self.dirs = dirs
+
+
+class Workspace:
+    """
+    A source tree with a cached, `.gitignore`-aware file list.
+
+    Args:
+        root (str): The directory to serve.
+        trigram_index (bool): Cache per-file trigrams to skip files that cannot match a search.
+    """
+
+    def __init__(self, root: str, trigram_index: bool = False):
+        self.root = os.path.realpath(root)
+        self.trigram_index = trigram_index
+        self._lock = threading.Lock()
+        self._listings: Dict[str, _DirListing] = {}
+        self._trigrams_lock = threading.Lock()
+        self._trigrams: "OrderedDict[str, Tuple[Tuple[int, int], FrozenSet[bytes]]]" = OrderedDict()
+
+    def files(self, path: str = "", recursive: bool = True) -> List[str]:
+        """
+        List the files under `path` that are not ignored.
+
+        Args:
+            path (str): Directory relative to the workspace root ("" for the root).
+            recursive (bool): Include subdirectories.
+
+        Returns:
+            List[str]: Paths relative to the workspace root, in walk order.
+        """
+        rel_dir = os.path.normpath(path).replace(os.sep, "/").strip("/")
+        rel_dir = "" if rel_dir == "." else rel_dir
+        files: List[str] = []
+        with self._lock:
+            rules, rules_key = self._ancestor_rules(rel_dir)
+            self._walk(rel_dir, rules, rules_key, recursive, files)
+        return files
+
+    def _ancestor_rules(self, rel_dir: str) -> Tuple[List[IgnoreRule], tuple]:
+        rules: List[IgnoreRule] = []
+        key: tuple = ()
+        if not rel_dir:
+            return rules, key
+        parts = rel_dir.split("/")
+        for depth in range(len(parts)):
+            ancestor = "/".join(parts[:depth])
+            gitignore = os.path.join(self.root, ancestor, ".gitignore")
+            mtime = _mtime_ns(gitignore)
+            if mtime is not None:
+                rules = rules + parse_gitignore(gitignore, ancestor)
+                key = key + ((ancestor, mtime),)
+        return rules, key
+
+    def _walk(self, rel_dir: str, rules: List[IgnoreRule], rules_key: tuple, recursive: bool, out: List[str]) -> None:
+        abs_dir = os.path.join(self.root, rel_dir)
+        dir_mtime = _mtime_ns(abs_dir)
+        if dir_mtime is None:
+            self._listings.pop(rel_dir, None)
+            return
+        gitignore = os.path.join(abs_dir, ".gitignore")
+        gitignore_mtime = _mtime_ns(gitignore)
+        if gitignore_mtime is not None:
+            rules_key = rules_key + ((rel_dir, gitignore_mtime),)
+
+        listing = self._listings.get(rel_dir)
+        if listing is None or listing.mtime_ns != dir_mtime or listing.rules_key != rules_key:
+            local = rules + parse_gitignore(gitignore, rel_dir) if gitignore_mtime is not None else rules
+            listing = self._list_dir(abs_dir, rel_dir, dir_mtime, rules_key, local)
+            self._listings[rel_dir] = listing
+
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        out.extend(prefix + name for name in listing.files)
+        if recursive:
+            for name in listing.dirs:
+                self._walk(prefix + name, listing.rules, rules_key, True, out)
+
+    @staticmethod
+    def _list_dir(abs_dir: str, rel_dir: str, mtime_ns: int, rules_key: tuple, rules: List[IgnoreRule]) -> _DirListing:
+        files, dirs = [], []
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        try:
+            entries = sorted(os.scandir(abs_dir), key=lambda entry: entry.name)
+        except OSError as e:
+            logger.debug(f"Cannot list {abs_dir}: {e}")
+            entries = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.is_file(follow_symlinks=False)
+            except OSError:
+                continue
+            if not (is_dir or is_file) or (is_dir and entry.name in ALWAYS_IGNORED):
+                continue
+            if is_ignored(prefix + entry.name, is_dir, rules):
+                continue
+            (dirs if is_dir else files).append(entry.name)
+        return _DirListing(mtime_ns, rules_key, rules, files, dirs)
+
+    def _candidates(self, files: List[str], pattern: str, flags: int) -> List[str]:
+        """Drop files whose cached trigrams show they cannot contain the pattern's literals."""
+        required = _trigrams_of(required_literals(pattern, flags))
+        if not required:
+            return files
+        candidates = []
+        for rel_path in files:
+            path = os.path.join(self.root, rel_path)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                with self._trigrams_lock:
+                    self._trigrams.pop(rel_path, None)
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            with self._trigrams_lock:
+                cached = self._trigrams.get(rel_path)
+                if cached is not None and cached[0] == signature:
+                    self._trigrams.move_to_end(rel_path)
+            if cached is None or cached[0] != signature:
+                # Read outside the lock, so concurrent searches are not serialised on file I/O.
+                try:
+                    cached = (signature, _file_trigrams(path))
+                except OSError:
+                    continue
+                with self._trigrams_lock:
+                    self._trigrams[rel_path] = cached
+                    self._trigrams.move_to_end(rel_path)
+                    while len(self._trigrams) > TRIGRAM_CACHE_FILES:
+                        self._trigrams.popitem(last=False)
+            if required <= cached[1]:
+                candidates.append(rel_path)
+        return candidates
+
+    def search(
+        self,
+        pattern: str,
+        path: str = "",
+        recursive: bool = True,
+        case_insensitive: bool = False,
+        limit: int = DEFAULT_LIMIT,
+    ) -> List[SearchMatch]:
+        """
+        Find lines matching the regex `pattern` in the workspace's text files.
+
+        Args:
+            pattern (str): A Python regular expression, matched line by line.
+            path (str): Directory to search, relative to the workspace root.
+            recursive (bool): Include subdirectories.
+            case_insensitive (bool): Ignore case.
+            limit (int): Maximum number of matches to return.
+
+        Returns:
+            List[SearchMatch]: Matches in file-list order, at most `limit`.
+
+        Raises:
+            re.error: If `pattern` is not a valid regular expression.
+        """
+        flags = re.MULTILINE | (re.IGNORECASE if case_insensitive else 0)
+        regex_bytes = pattern.encode("utf-8")
+        re.compile(regex_bytes, flags)
+        limit = max(0, limit)
+        files = self.files(path, recursive=recursive)
+        if self.trigram_index:
+            files = self._candidates(files, pattern, flags)
+        if not files or not limit:
+            return []
+
+        batches = _batches(self.root, files)
+        workers = search_workers()
+        if workers <= 1 or len(batches) <= 1:
+            raw = _scan_batch(self.root, files, regex_bytes, flags, limit)
+        else:
+            pool = _get_pool(workers)
+            futures = [pool.submit(_scan_batch, self.root, batch, regex_bytes, flags, limit) for batch in batches]
+            raw = []
+            try:
+                # Collect in submission order, so results match a sequential scan.
+                for future in futures:
+                    raw.extend(future.result())
+                    if len(raw) >= limit:
+                        break
+            finally:
+                for future in futures:
+                    future.cancel()
+        return [SearchMatch(*match) for match in raw[:limit]]
+
+
+def _batches(root: str, files: List[str]) -> List[List[str]]:
+    """Split `files` into batches of about `BATCH_BYTES`; small searches stay a single batch."""
+    sizes = []
+    total = 0
+    for rel_path in files:
+        try:
+            size = os.path.getsize(os.path.join(root, rel_path))
+        except OSError:
+            size = 0
+        sizes.append(size)
+        total += size
+    if total < PARALLEL_MIN_BYTES:
+        return [files]
+    batches, current, current_bytes = [], [], 0
+    for rel_path, size in zip(files, sizes):
+        current.append(rel_path)
+        current_bytes += size
+        if current_bytes >= BATCH_BYTES or len(current) >= BATCH_FILES:
+            batches.append(current)
+            current, current_bytes = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+_workspaces: "OrderedDict[Tuple[str, bool], Workspace]" = OrderedDict()
+_workspaces_lock = threading.Lock()
+
+
+def get_workspace(root: str, trigram_index: Optional[bool] = None) -> Workspace:
+    """
+    Return the shared `Workspace` for `root`, so its caches outlive a single tool call.
+
+    The WORKSPACE_CACHE_SIZE most recently used workspaces are kept.
+
+    Args:
+        root (str): The directory to serve.
+        trigram_index (Optional[bool]): Enable the trigram prefilter; defaults to
+            `SWARM_SEARCH_TRIGRAM_INDEX`.
+
+    Returns:
+        Workspace: The cached workspace.
+    """
+    if trigram_index is None:
+        trigram_index = os.getenv("SWARM_SEARCH_TRIGRAM_INDEX", "false").lower() in ("true", "1", "t", "yes")
+    key = (os.path.realpath(root), trigram_index)
+    with _workspaces_lock:
+        workspace = _workspaces.get(key)
+        if workspace is None:
+            workspace = _workspaces[key] = Workspace(key[0], trigram_index=trigram_index)
+            while len(_workspaces) > WORKSPACE_CACHE_SIZE:
+                _workspaces.popitem(last=False)
+        _workspaces.move_to_end(key)
+        return workspace
@@ -10,21 +10,30 @@ Endpoints:
     - GET /django_chat/: Lists conversations for the logged-in user.
     - POST /django_chat/start/: Starts a new conversation.
 """
+import asyncio
+import hashlib
 import json
+import logging
+import math
 import uuid
 import time
 import os
 import redis
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
+from channels.db import database_sync_to_async
+
 # Django & DRF imports
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.views import SpectacularAPIView as BaseSpectacularAPIView
 
@@ -35,21 +44,29 @@ SpectacularAPIView = HiddenSpectacularAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.pagination import CursorPagination
 
 # Project-specific imports
-from swarm.auth import EnvOrTokenAuthentication
+from swarm.auth import EnvOrTokenAuthentication, IsOperator
 from swarm.models import ChatConversation, ChatMessage
 from swarm.extensions.blueprint import discover_blueprints
 from swarm.extensions.blueprint.blueprint_base import BlueprintBase
 from swarm.extensions.config.config_loader import load_server_config, load_llm_config
-from swarm.utils.logger_setup import setup_logger
+from swarm.events import DeltaEvent, FinalEvent, MessageEvent, StreamEvent, ToolCallDeltaEvent
+from swarm.messages import Message, to_wire
+from swarm.utils.logger_setup import lazy_json, setup_logger
 from swarm.utils.redact import redact_sensitive_data
 from swarm.utils.general_utils import extract_chat_id
+from swarm.utils.metrics import registry as metrics_registry
+from swarm.utils.process import cancel_scope, request_cancellation
+from swarm.utils.resilience import Deadline, DeadlineExceeded, ResilienceError, deadline_scope
+from swarm.passthrough import UpstreamError, proxy_chat_completion, record_usage
+from swarm.throttling import TenantRateThrottle, limit_in_flight
 from swarm.extensions.blueprint.blueprint_utils import filter_blueprints
 
 from .settings import DJANGO_DATABASE
 from .models import ChatMessage
-from .serializers import ChatMessageSerializer
+from .serializers import ChatMessageSerializer, requested_fields
 
 # -----------------------------------------------------------------------------
 # Initialization
@@ -108,14 +125,15 @@ except ValueError as e:
 # Helper Functions
 # -----------------------------------------------------------------------------
 def serialize_swarm_response(response: Any, model_name: str, context_variables: Dict[str, Any]) -> Dict[str, Any]:
-    logger.debug(f"Serializing Swarm response, type: {type(response)}, model: {model_name}")
+    logger.debug("Serializing Swarm response, type: %s, model: %s", type(response), model_name)
 
     if hasattr(response, 'messages'):
-        messages = response.messages
-        logger.debug(f"Extracted messages from Response object: {json.dumps(messages, indent=2)}")
+        # Compact in-memory messages become wire dicts here, at the API boundary.
+        messages = to_wire(response.messages)
+        logger.debug("Extracted messages from Response object: %s", lazy_json(messages))
     elif isinstance(response, dict):
         messages = response.get("messages", [])
-        logger.debug(f"Extracted messages from dict: {json.dumps(messages, indent=2)}")
+        logger.debug("Extracted messages from dict: %s", lazy_json(messages))
     elif isinstance(response, str):
         logger.warning(f"Received string response instead of dictionary: {response[:100]}{'...' if len(response) > 100 else ''}, treating as message content")
         messages = [{"role": "assistant", "content": response}]
@@ -124,6 +142,8 @@ def serialize_swarm_response(response: Any, model_name: str, context_variables:
         messages = []
 
     def remove_functions(obj: Any) -> Any:
+        if isinstance(obj, Message):
+            return obj.to_dict()
         if isinstance(obj, dict):
             return {k: remove_functions(v) for k, v in obj.items() if k != "functions" and not callable(v)}
         elif hasattr(obj, "__dict__"):
@@ -136,14 +156,10 @@ def serialize_swarm_response(response: Any, model_name: str, context_variables:
         return obj
 
     response_dict = response.__dict__ if hasattr(response, '__dict__') else response
-    try:
+    if logger.isEnabledFor(logging.DEBUG):
         safe_response = remove_functions(response_dict)
-        safe_context = remove_functions(context_variables)
-        logger.debug(f"Cleaned response: {json.dumps(safe_response, indent=2) if isinstance(safe_response, dict) else str(safe_response)[:500]}")
-        logger.debug(f"Cleaned context variables: {json.dumps(safe_context, indent=2)[:1000]}")
-    except (TypeError, ValueError) as e:
-        logger.warning(f"Failed to log response or context due to serialization error: {str(e)}")
-        logger.debug(f"Response type: {type(response)}, Context type: {type(context_variables)}")
+        logger.debug("Cleaned response: %s", lazy_json(safe_response) if isinstance(safe_response, dict) else str(safe_response)[:500])
+        logger.debug("Cleaned context variables: %s", lazy_json(remove_functions(context_variables), limit=1000))
 
     if hasattr(response, 'agent'):
         response_dict['agent'] = remove_functions(response.agent)
@@ -155,7 +171,7 @@ def serialize_swarm_response(response: Any, model_name: str, context_variables:
 
     formatted_messages = []
     for i, msg in enumerate(messages):
-        logger.debug(f"Processing message {i}: {json.dumps(msg, indent=2)}")
+        logger.debug("Processing message %d: %s", i, lazy_json(msg))
         if msg.get("role") == "assistant" and msg.get("content"):
             formatted_msg = {
                 "index": len(formatted_messages),
@@ -166,7 +182,7 @@ def serialize_swarm_response(response: Any, model_name: str, context_variables:
                 "finish_reason": "stop"
             }
             formatted_messages.append(formatted_msg)
-            logger.debug(f"Added to choices from loop: {json.dumps(formatted_msg, indent=2)}")
+            logger.debug("Added to choices from loop: %s", lazy_json(formatted_msg))
 
     if messages and messages[-1].get("role") == "assistant" and messages[-1].get("content"):
         last_content = messages[-1]["content"]
@@ -180,12 +196,12 @@ def serialize_swarm_response(response: Any, model_name: str, context_variables:
                 "finish_reason": "stop"
             }
             formatted_messages.append(formatted_msg)
-            logger.debug(f"Added last message via failsafe: {json.dumps(formatted_msg, indent=2)}")
+            logger.debug("Added last message via failsafe: %s", lazy_json(formatted_msg))
 
     if not formatted_messages:
         logger.warning("No assistant messages with content found for 'choices' after all checks")
 
-    logger.debug(f"Final formatted_messages: {json.dumps(formatted_messages, indent=2)}")
+    logger.debug("Final formatted_messages: %s", lazy_json(formatted_messages))
 
     # Improved token counting
     prompt_tokens = 0
@@ -305,16 +321,15 @@ def load_conversation_history(conversation_id: Optional[str], messages: List[dic
             logger.error(f"⚠️ Error retrieving conversation history from Redis: {e}", exc_info=True)
 
     if not past_messages:
-        try:
-            conversation = ChatConversation.objects.get(conversation_id=conversation_id)
-            query = conversation.messages.all()
-            if tool_call_id:
-                query = query.filter(tool_call_id=tool_call_id)
-            past_messages = list(query.order_by("timestamp").values("sender", "content", "timestamp", "tool_call_id"))
+        # One range scan on the (conversation, [tool_call_id,] timestamp) indexes.
+        query = ChatMessage.objects.filter(conversation_id=conversation_id)
+        if tool_call_id:
+            query = query.filter(tool_call_id=tool_call_id)
+        past_messages = list(query.order_by("timestamp").values("sender", "content", "timestamp", "tool_call_id"))
+        if past_messages:
             logger.debug(f"✅ Retrieved {len(past_messages)} messages from DB for conversation: {conversation_id}, tool_call_id: {tool_call_id}")
-        except ChatConversation.DoesNotExist:
+        elif not ChatConversation.objects.filter(conversation_id=conversation_id).exists():
             logger.warning(f"⚠️ No existing conversation found in DB for ID: {conversation_id}")
-            past_messages = []
 
     formatted_past_messages = [
         {
@@ -336,23 +351,32 @@ def store_conversation_history(conversation_id, full_history, response_obj=None)
         else:
             logger.debug(f"🔄 Updating existing ChatConversation: {conversation_id}")
 
-        stored_messages = set(chat.messages.values_list("content", flat=True))
-        new_messages = []
+        candidates = []
         for msg in full_history:
             if not msg.get("content") and not msg.get("tool_calls"):
                 logger.warning(f"⚠️ Skipping empty message in conversation {conversation_id}")
                 continue
-            role = msg.get("role", "unknown")
             content = msg.get("content", "")
             serialized_content = content if content.strip() else json.dumps(msg.get("tool_calls", {}))
-            if serialized_content not in stored_messages:
+            candidates.append((msg, serialized_content, ChatMessage.hash_content(serialized_content)))
+
+        # Only the candidates' hashes are looked up (conversation, content_hash index), not every stored message.
+        stored_hashes = set()
+        if candidates and not created:
+            stored_hashes = set(chat.messages.filter(
+                content_hash__in={content_hash for _, _, content_hash in candidates}
+            ).order_by().values_list("content_hash", flat=True))
+        new_messages = []
+        for msg, serialized_content, content_hash in candidates:
+            if content_hash not in stored_hashes:
                 new_messages.append(ChatMessage(
                     conversation=chat,
-                    sender=role,
+                    sender=msg.get("role", "unknown"),
                     content=serialized_content,
+                    content_hash=content_hash,
                     tool_call_id=msg.get("tool_call_id")
                 ))
-                stored_messages.add(serialized_content)
+                stored_hashes.add(content_hash)
 
         if new_messages:
             ChatMessage.objects.bulk_create(new_messages)
@@ -362,7 +386,7 @@ def store_conversation_history(conversation_id, full_history, response_obj=None)
 
         if REDIS_AVAILABLE and redis_client:
             try:
-                redis_client.set(conversation_id, json.dumps(full_history))
+                redis_client.set(conversation_id, json.dumps(to_wire(full_history)))
             except Exception as e:
                 logger.error(f"Error updating Redis: {e}", exc_info=True)
 
@@ -371,12 +395,182 @@ def store_conversation_history(conversation_id, full_history, response_obj=None)
         logger.error(f"⚠️ Error storing conversation history: {e}", exc_info=True)
         return False
 
+def request_timeout(request) -> Optional[float]:
+    """
+    Return the time budget for a request in seconds.
+
+    Clients may send `X-Request-Timeout` (seconds); otherwise `SWARM_REQUEST_TIMEOUT`
+    applies. Without either, backend calls are only bounded by their own timeouts.
+    """
+    raw = request.headers.get("X-Request-Timeout") or os.getenv("SWARM_REQUEST_TIMEOUT")
+    if not raw:
+        return None
+    try:
+        timeout = float(raw)
+    except ValueError:
+        logger.warning(f"Ignoring invalid request timeout: {raw!r}")
+        return None
+    return timeout if timeout > 0 else None
+
+def backend_error_response(error: ResilienceError) -> Response:
+    """Map an open circuit or saturated pool to 503 (with Retry-After) and an expired deadline to 504."""
+    if isinstance(error, DeadlineExceeded):
+        logger.warning(f"Request deadline exceeded: {error}")
+        return Response({"error": str(error)}, status=504)
+    logger.warning(f"Backend unavailable: {error}")
+    response = Response({"error": str(error)}, status=503)
+    response["Retry-After"] = str(max(1, math.ceil(getattr(error, "retry_after", 1))))
+    return response
+
+def passthrough_chat_completion(request, model: str, body: dict, llm_cfg: dict) -> Any:
+    """
+    Proxy a request for a passthrough LLM and relay the upstream body unchanged.
+
+    Under ASGI the upstream response is read on the server's event loop and
+    streamed back as an async iterator; under WSGI a pooled sync client streams it.
+    Token usage reported upstream is accounted to the authenticated user.
+    """
+    user = str(getattr(request.user, "username", "") or request.user)
+    use_async = isinstance(getattr(request, "_request", request), ASGIRequest)
+    try:
+        with deadline_scope(request_timeout(request)):
+            proxied = proxy_chat_completion(
+                model, body, llm_cfg,
+                use_async=use_async,
+                on_usage=lambda usage: record_usage(model, user, usage),
+            )
+    except ResilienceError as e:
+        return backend_error_response(e)
+    except Exception as e:
+        logger.error(f"Error forwarding to passthrough model '{model}': {e}", exc_info=True)
+        return Response({"error": f"Error during execution: {str(e)}"}, status=502)
+
+    if isinstance(proxied, UpstreamError):
+        return HttpResponse(proxied.content, status=proxied.status_code, content_type=proxied.content_type)
+    content = proxied.__aiter__() if use_async else iter(proxied)
+    response = StreamingHttpResponse(content, status=proxied.status_code, content_type=proxied.content_type)
+    if proxied.streaming:
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+    return response
+
 def run_conversation(blueprint_instance: Any, messages_extended: List[dict], context_vars: dict) -> Tuple[Any, dict]:
     result = blueprint_instance.run_with_context(messages_extended, context_vars)
     response_obj = result["response"]
     updated_context = result["context_variables"]
     return response_obj, updated_context
 
+def sse_chunk(completion_id: str, model: str, created: int, choices: List[dict], **extra: Any) -> str:
+    """One server-sent event carrying a `chat.completion.chunk`."""
+    chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model, "choices": choices}
+    chunk.update(extra)
+    return f"data: {json.dumps(chunk, default=str)}\n\n"
+
+def stream_chat_completion(request, blueprint_instance: Any, model: str, messages_extended: List[dict],
+                           context_vars: dict, conversation_id: Optional[str]) -> Any:
+    """
+    Stream a blueprint run as OpenAI-style server-sent events.
+
+    Text deltas are sent as standard `chat.completion.chunk`s (with the agent as
+    `sender`), so any OpenAI streaming client can read them. Tool starts and ends
+    and handoffs are chunks with no choices and an `event` object (see
+    `swarm.events`); the last chunk has `finish_reason: "stop"` and the updated
+    `context_variables`, followed by `data: [DONE]`.
+
+    The first event is produced before the response starts, so a backend that is
+    down or a deadline that has passed still gets a proper 503/504. Each later
+    step runs under the request's remaining deadline and cancellation token;
+    under ASGI the steps run in worker threads, with the usual connection
+    cleanup around each, and the body is an async iterator.
+    """
+    timeout = request_timeout(request)
+    deadline = Deadline(timeout) if timeout else None
+    token = request_cancellation(request)
+    events = blueprint_instance.run_with_context_stream(messages_extended, context_vars)
+
+    def step() -> Any:
+        with deadline_scope(deadline.remaining() if deadline else None), cancel_scope(token):
+            return next(events, None)
+
+    try:
+        first = step()
+    except ResilienceError as e:
+        return backend_error_response(e)
+    except Exception as e:
+        logger.error(f"Error during execution: {e}", exc_info=True)
+        return Response({"error": f"Error during execution: {str(e)}"}, status=500)
+
+    completion_id = f"swarm-chat-completion-{uuid.uuid4()}"
+    created = int(time.time())
+    started = set()
+
+    def encode(event: StreamEvent) -> Optional[str]:
+        if isinstance(event, (ToolCallDeltaEvent, MessageEvent)):
+            return None  # the text was sent as deltas; tool calls are reported when they run
+        if isinstance(event, DeltaEvent):
+            delta = {"content": event.content, "sender": event.agent}
+            if not started:
+                started.add(event.agent)
+                delta["role"] = "assistant"
+            return sse_chunk(completion_id, model, created, [{"index": 0, "delta": delta, "finish_reason": None}])
+        if isinstance(event, FinalEvent):
+            serialized = serialize_swarm_response(event.response, model, event.context_variables)
+            extra = {"context_variables": serialized["context_variables"]}
+            if conversation_id:
+                extra["conversation_id"] = conversation_id
+                store_conversation_history(conversation_id, messages_extended, event.response)
+            return sse_chunk(completion_id, model, created, [{"index": 0, "delta": {}, "finish_reason": "stop"}], **extra)
+        return sse_chunk(completion_id, model, created, [], event=event.to_dict())
+
+    def fail(e: Exception) -> str:
+        logger.error(f"Error during streamed execution: {e}", exc_info=not isinstance(e, ResilienceError))
+        return sse_chunk(completion_id, model, created, [], error={"message": str(e), "type": type(e).__name__})
+
+    def body() -> Iterator[str]:
+        event = first
+        try:
+            while event is not None:
+                frame = encode(event)
+                if frame:
+                    yield frame
+                event = step()
+        except Exception as e:
+            yield fail(e)
+        finally:
+            events.close()  # stops the run if the client went away mid-stream
+        yield "data: [DONE]\n\n"
+
+    async def async_body() -> AsyncIterator[str]:
+        # Worker threads, so a long model call does not hold Django's shared sync thread;
+        # database_sync_to_async closes the connections each step opens there.
+        run_step = database_sync_to_async(step, thread_sensitive=False)
+        run_encode = database_sync_to_async(encode, thread_sensitive=False)
+        event = first
+        pending = None
+        try:
+            while event is not None:
+                frame = await run_encode(event)
+                if frame:
+                    yield frame
+                # Waiting on the future, not awaiting it, so a disconnect leaves the step running.
+                pending = asyncio.ensure_future(run_step())
+                await asyncio.wait({pending})
+                event = pending.result()
+        except Exception as e:
+            yield fail(e)
+        finally:
+            if pending is not None:
+                # A step may still be running in its thread; the generator can only be closed once it returns.
+                await asyncio.gather(pending, return_exceptions=True)
+            await database_sync_to_async(events.close, thread_sensitive=False)()
+        yield "data: [DONE]\n\n"
+
+    use_async = isinstance(getattr(request, "_request", request), ASGIRequest)
+    response = StreamingHttpResponse(async_body() if use_async else body(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 # -----------------------------------------------------------------------------
 # Views
 # -----------------------------------------------------------------------------
@@ -385,11 +579,13 @@ def run_conversation(blueprint_instance: Any, messages_extended: List[dict], con
 @csrf_exempt
 @authentication_classes([EnvOrTokenAuthentication])
 @permission_classes([IsAuthenticated])
+@throttle_classes([TenantRateThrottle])
+@limit_in_flight
 def chat_completions(request):
     if request.method != "POST":
         return Response({"error": "Method not allowed. Use POST."}, status=405)
 
-    logger.info(f"Authenticated User: {request.user}")
+    logger.debug("Authenticated user: %s", request.user)
 
     parse_result = parse_chat_request(request)
     if isinstance(parse_result, Response):
@@ -404,14 +600,22 @@ def chat_completions(request):
         model_type = "blueprint"
     logger.info(f"Identified model type: {model_type} for model: {model}")
 
+    if model_type == "llm":
+        return passthrough_chat_completion(request, model, body, llm_cfg)
+
     blueprint_instance_response = get_blueprint_instance(model, context_vars)
     if isinstance(blueprint_instance_response, Response):
         return blueprint_instance_response
     blueprint_instance = blueprint_instance_response
 
     messages_extended = load_conversation_history(conversation_id, messages, tool_call_id)
+    if body.get("stream"):
+        return stream_chat_completion(request, blueprint_instance, model, messages_extended, context_vars, conversation_id)
     try:
-        response_obj, updated_context = run_conversation(blueprint_instance, messages_extended, context_vars)
+        with deadline_scope(request_timeout(request)), cancel_scope(request_cancellation(request)):
+            response_obj, updated_context = run_conversation(blueprint_instance, messages_extended, context_vars)
+    except ResilienceError as e:
+        return backend_error_response(e)
     except Exception as e:
         logger.error(f"Error during execution: {e}", exc_info=True)
         return Response({"error": f"Error during execution: {str(e)}"}, status=500)
@@ -455,7 +659,6 @@ def list_models(request):
         return JsonResponse({"error": "Method not allowed. Use GET."}, status=405)
 
     try:
-        global blueprints_metadata, config
         allowed = os.getenv("SWARM_BLUEPRINTS")
         if allowed and allowed.strip():
             blueprints_metadata_local = filter_blueprints(blueprints_metadata, allowed)
@@ -487,6 +690,20 @@ def list_models(request):
         logger.error(f"Error listing models: {e}", exc_info=True)
         return JsonResponse({"error": "Internal Server Error"}, status=500)
 
+@api_view(["GET"])
+@authentication_classes([EnvOrTokenAuthentication])
+@permission_classes([IsOperator])
+def metrics(request):
+    """
+    Expose in-process metrics (circuit breaker state, retries, hedges, token usage) in Prometheus format.
+
+    The output names backends and users, so it is off unless SWARM_METRICS_ENABLED
+    is set, and then only readable by operators (see `swarm.auth.IsOperator`).
+    """
+    if not getattr(settings, "SWARM_METRICS_ENABLED", False):
+        return HttpResponse(status=404)
+    return HttpResponse(metrics_registry.render(), content_type="text/plain; version=0.0.4")
+
 @csrf_exempt
 def django_chat_webpage(request, blueprint_name):
     return render(request, 'django_chat_webpage.html', {
@@ -542,19 +759,64 @@ def serve_swarm_config(request):
         logger.error(f"Error decoding JSON from {config_path}: {e}")
         return JsonResponse({"error": "Invalid JSON format in configuration file."}, status=500)
 
+class ChatMessagePagination(CursorPagination):
+    """Stable keyset pages in (timestamp, id) order; per-conversation pages use the (conversation, timestamp, id) index."""
+    ordering = ("timestamp", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+def conditional_response(request, response):
+    """
+    Add an ETag (a digest of the response data) to a successful GET response,
+    and turn it into a 304 if the request's If-None-Match matches.
+
+    No Last-Modified is sent: message timestamps record creation only, so
+    edits and deletions would not move it and If-Modified-Since would return
+    304 for changed data.
+    """
+    if request.method != "GET" or response.status_code != 200:
+        return response
+    payload = json.dumps(response.data, sort_keys=True, cls=DjangoJSONEncoder)
+    etag = f'"{hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()}"'
+    response["ETag"] = etag
+    return get_conditional_response(request._request, etag=etag, response=response)
+
 class ChatMessageViewSet(ModelViewSet):
+    """
+    Chat messages, paginated with an opaque cursor (`?cursor=`, `?page_size=`).
+
+    List filters: `conversation_id`. Any GET accepts `fields=a,b` for sparse
+    responses and honours If-None-Match.
+    """
     authentication_classes = []
     permission_classes = [AllowAny]
     queryset = ChatMessage.objects.all()
     serializer_class = ChatMessageSerializer
-
-    @extend_schema(summary="List all chat messages")
+    pagination_class = ChatMessagePagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        conversation_id = self.request.query_params.get("conversation_id")
+        if conversation_id:
+            queryset = queryset.filter(conversation_id=conversation_id)
+        model_fields = {field.name for field in ChatMessage._meta.concrete_fields}
+        selected = requested_fields(self.request) & model_fields
+        if selected:
+            # id and timestamp are always needed for the cursor.
+            queryset = queryset.only(*(selected | {"id", "timestamp"}))
+        return queryset
+
+    @extend_schema(summary="List chat messages, oldest first")
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        response = super().list(request, *args, **kwargs)
+        return conditional_response(request, response)
 
     @extend_schema(summary="Retrieve a chat message by its unique id")
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        instance = self.get_object()
+        response = Response(self.get_serializer(instance).data)
+        return conditional_response(request, response)
 
     @extend_schema(summary="Create a new chat message")
     def create(self, request, *args, **kwargs):
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for `redact_sensitive_data`.
+
+Compares the compiled redactor with the previous implementation, which scanned
+the whole environment for every string leaf. Run from the repository root:
+
+    python tests/benchmarks/bench_redact.py
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from swarm.utils.redact import redact_sensitive_data  # noqa: E402
+
+
+def legacy_redact(data, sensitive_keys=None, mask="****", reveal_chars=4):
+    if sensitive_keys is None:
+        sensitive_keys = ["api_key", "token"]
+
+    def partially_redact(value):
+        if len(value) <= reveal_chars * 2:
+            return mask
+        return f"{value[:reveal_chars]}{mask}{value[-reveal_chars:]}"
+
+    if isinstance(data, dict):
+        new_dict = {}
+        for key, value in data.items():
+            if isinstance(value, (dict, list)):
+                new_dict[key] = legacy_redact(value, sensitive_keys, mask, reveal_chars)
+            elif isinstance(value, str) and any(k.lower() == key.lower() for k in sensitive_keys):
+                new_dict[key] = partially_redact(value)
+            else:
+                new_dict[key] = value
+        return new_dict
+    if isinstance(data, list):
+        return [legacy_redact(item, sensitive_keys, mask, reveal_chars) for item in data]
+    if isinstance(data, str):
+        for env_value in os.environ.values():
+            if data == env_value:
+                return partially_redact(data)
+    return data
+
+
+def sample_config(servers=50):
+    return {
+        "llm": {f"profile{i}": {"model": "gpt-4o", "base_url": "https://api.example.com/v1", "api_key": "sk-" + "x" * 40}
+                for i in range(10)},
+        "mcpServers": {
+            f"server{i}": {"command": "npx", "args": ["-y", f"@example/server-{i}", "/tmp/data", "--verbose"],
+                           "env": {"API_TOKEN": "t" * 32, "MODE": "fast"}}
+            for i in range(servers)
+        },
+    }
+
+
+def main(number=200):
+    os.environ.setdefault("BENCH_SERVICE_API_KEY", "sk-bench-0123456789abcdef")
+    config = sample_config()
+    for name, func in (("legacy", legacy_redact), ("compiled", redact_sensitive_data)):
+        seconds = timeit.timeit(lambda: func(config), number=number)
+        print(f"{name:>8}: {seconds / number * 1e6:9.1f} us per call ({len(os.environ)} env vars)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+
+class EnvOrTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        from swarm import auth
+        self.auth = auth
+        auth.token_cache.clear()
+        self.env = patch.dict(os.environ, {"ENABLE_API_AUTH": "true", "API_AUTH_TOKEN": ""})
+        self.env.start()
+        self.user = User.objects.create_user(username="tenant", password="pw")
+        self.token = Token.objects.create(user=self.user)
+
+    def tearDown(self):
+        self.env.stop()
+        self.auth.token_cache.clear()
+
+    def authenticate(self, header):
+        request = Request(RequestFactory().get("/", HTTP_AUTHORIZATION=header))
+        return self.auth.EnvOrTokenAuthentication().authenticate(request)
+
+    def test_env_settings_are_reparsed_only_on_change(self):
+        first = self.auth.get_env_auth_settings()
+        self.assertIs(self.auth.get_env_auth_settings(), first)
+        os.environ["ENABLE_API_AUTH"] = "false"
+        self.assertFalse(self.auth.get_env_auth_settings().enabled)
+        self.assertIsInstance(self.authenticate("")[0], self.auth.EnvAuthenticatedUser)
+
+    def test_env_token(self):
+        os.environ["API_AUTH_TOKEN"] = "secret"
+        self.assertIsInstance(self.authenticate("Bearer secret")[0], self.auth.EnvAuthenticatedUser)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate("Bearer secreT")
+
+    def test_db_token_is_cached_until_revoked(self):
+        header = f"Token {self.token.key}"
+        self.assertEqual(self.authenticate(header)[0], self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(header)[0], self.user)
+
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(header)
+
+    def test_deactivating_user_evicts_cached_token(self):
+        header = f"Token {self.token.key}"
+        self.authenticate(header)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(header)
+
+    def test_cache_expires_and_is_bounded(self):
+        clock = [0.0]
+        cache = self.auth.TokenCache(max_size=2, ttl=10, clock=lambda: clock[0])
+        for key in ("a", "b", "c"):
+            cache.set(key, self.user, None)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+        clock[0] = 11
+        self.assertIsNone(cache.get("c"))
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        from swarm import auth
+        auth.token_cache.clear()
+        self.env = patch.dict(os.environ, {"ENABLE_API_AUTH": "true", "API_AUTH_TOKEN": ""})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+
+    def get(self, user=None):
+        from swarm import views
+        headers = {"HTTP_AUTHORIZATION": f"Token {Token.objects.create(user=user).key}"} if user else {}
+        return views.metrics(RequestFactory().get("/metrics", **headers))
+
+    def test_metrics_are_off_by_default(self):
+        staff = User.objects.create_user(username="ops", password="pw", is_staff=True)
+        self.assertEqual(self.get(staff).status_code, 404)
+
+    @override_settings(SWARM_METRICS_ENABLED=True)
+    def test_metrics_are_for_operators_only(self):
+        self.assertEqual(self.get().status_code, 401)
+        self.assertEqual(self.get(User.objects.create_user(username="tenant", password="pw")).status_code, 403)
+        response = self.get(User.objects.create_user(username="ops", password="pw", is_staff=True))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
@@ -0,0 +1,64 @@
+from django.test import Client, TestCase
+
+
+class ChatMessageViewSetTest(TestCase):
+    def setUp(self):
+        from swarm.models import ChatConversation, ChatMessage
+        self.client = Client()
+        first = ChatConversation.objects.create(conversation_id="conv-1")
+        second = ChatConversation.objects.create(conversation_id="conv-2")
+        self.messages = [
+            ChatMessage.objects.create(conversation=first, sender="user", content=f"message {i}")
+            for i in range(5)
+        ]
+        ChatMessage.objects.create(conversation=second, sender="user", content="elsewhere")
+
+    def get(self, url, **headers):
+        return self.client.get(url, **headers)
+
+    def test_cursor_pages_through_one_conversation(self):
+        url = "/v1/chat/messages/?conversation_id=conv-1&page_size=2"
+        contents = []
+        while url:
+            body = self.get(url).json()
+            self.assertLessEqual(len(body["results"]), 2)
+            contents += [message["content"] for message in body["results"]]
+            url = body["next"]
+        self.assertEqual(contents, [f"message {i}" for i in range(5)])
+
+    def test_sparse_fields(self):
+        body = self.get("/v1/chat/messages/?conversation_id=conv-2&fields=id,content,bogus").json()
+        self.assertEqual(body["results"], [{"id": body["results"][0]["id"], "content": "elsewhere"}])
+
+    def test_list_conditional_get(self):
+        response = self.get("/v1/chat/messages/?conversation_id=conv-1")
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+
+        cached = self.get("/v1/chat/messages/?conversation_id=conv-1", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+        message = self.messages[0]
+        message.content = "edited"
+        message.save()
+        refreshed = self.get("/v1/chat/messages/?conversation_id=conv-1", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertNotEqual(refreshed["ETag"], etag)
+
+    def test_if_modified_since_alone_never_hides_edits(self):
+        url = "/v1/chat/messages/?conversation_id=conv-1"
+        message = self.messages[0]
+        message.content = "edited"
+        message.save()
+        # Later than every creation timestamp, as a client would send after its first fetch.
+        response = self.get(url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["content"], "edited")
+
+    def test_retrieve_conditional_get(self):
+        url = f"/v1/chat/messages/{self.messages[1].pk}/"
+        etag = self.get(url)["ETag"]
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.get(url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
@@ -0,0 +1,110 @@
+import asyncio
+
+from django.test import SimpleTestCase, override_settings
+from src.swarm.types import Response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConsumerTest(SimpleTestCase):
+    def test_coalescer_flushes_on_size_or_age(self):
+        from swarm.consumers import FrameCoalescer
+
+        clock = FakeClock()
+        coalescer = FrameCoalescer(0.03, 8, clock=clock)
+        assert coalescer.timeout() is None
+
+        assert coalescer.add("Hel") is False
+        clock.now = 0.01
+        assert coalescer.add("lo ") is False
+        assert abs(coalescer.timeout() - 0.02) < 1e-9
+        clock.now = 0.05
+        assert coalescer.timeout() == 0.0
+        assert coalescer.take() == "Hello " and coalescer.timeout() is None
+
+        assert coalescer.add("wörld!!") is True  # 8 bytes in UTF-8
+        assert coalescer.take() == "wörld!!"
+
+    @override_settings(SWARM_WS_FLUSH_INTERVAL=10, SWARM_WS_FLUSH_BYTES=4)
+    def test_respond_streams_blueprint_events_as_batched_fragments(self):
+        from swarm.consumers import DjangoChatConsumer
+        from swarm.events import DeltaEvent, FinalEvent, HandoffEvent, MessageEvent, ToolStartEvent
+        from swarm.messages import Message
+
+        class Blueprint:
+            def run_with_context_stream(self, messages, context_variables):
+                assert messages == [{"role": "user", "content": "hi"}]
+                yield ToolStartEvent("Triage", "call_1", "handoff_to_helper", "{}")
+                yield HandoffEvent("Triage", "Helper")
+                for part in ["<b>", "ol", "d", "!"]:
+                    yield DeltaEvent("Helper", part)
+                message = Message(role="assistant", content="<b>old!", sender="Helper")
+                yield MessageEvent("Helper", message)
+                yield FinalEvent(Response(messages=[message], agent=None, context_variables={}),
+                                 {"active_agent_name": "Helper"})
+
+        frames = []
+
+        async def send(text_data):
+            frames.append(text_data)
+
+        consumer = DjangoChatConsumer()
+        consumer.blueprint = Blueprint()
+        consumer.messages = []
+        consumer.context_variables = {}
+        consumer.cancellation = None
+        consumer.send = send
+        asyncio.run(consumer.respond("hi"))
+
+        target = frames[1].split('id="')[2].split('"')[0]
+        chunks = [frame for frame in frames if frame.startswith(f'<div hx-swap-oob="beforeend:#{target}">')]
+        assert "handoff_to_helper" in chunks[0] and "handed off to Helper" in chunks[1]
+        assert chunks[2:] == [
+            f'<div hx-swap-oob="beforeend:#{target}">&lt;b&gt;ol</div>',
+            f'<div hx-swap-oob="beforeend:#{target}">d!</div>',
+        ]
+        assert "&lt;b&gt;old!" in frames[-1] and 'hx-swap-oob="true"' in frames[-1]
+        assert consumer.messages == [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "<b>old!", "sender": "Helper"},
+        ]
+        assert consumer.context_variables == {"active_agent_name": "Helper"}
+
+    def test_respond_closes_the_run_when_sending_fails(self):
+        from swarm.consumers import DjangoChatConsumer
+        from swarm.events import DeltaEvent, ToolStartEvent
+
+        closed = []
+
+        class Blueprint:
+            def run_with_context_stream(self, messages, context_variables):
+                try:
+                    yield ToolStartEvent("Triage", "call_1", "lookup", "{}")
+                    while True:
+                        yield DeltaEvent("Triage", "tick")
+                finally:
+                    closed.append(True)
+
+        frames = []
+
+        async def send(text_data):
+            if "is calling lookup" in text_data:
+                raise ConnectionError("socket closed")
+            frames.append(text_data)
+
+        consumer = DjangoChatConsumer()
+        consumer.blueprint = Blueprint()
+        consumer.messages = []
+        consumer.context_variables = {}
+        consumer.cancellation = None
+        consumer.send = send
+        asyncio.run(consumer.respond("hi"))
+
+        assert closed == [True]
+        assert "socket closed" in frames[-1]
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+from src.swarm.context import REMOVED, ContextSizeError, ContextVariables, DefaultView
+from src.swarm.core import Swarm
+from src.swarm.messages import ToolCall
+from src.swarm.types import Agent
+
+
+def test_writes_stay_in_the_overlay():
+    defaults = {"user_goal": "", "metadata": {"channel": {"id": "c1"}}, "tags": ["a"]}
+    request = {"user_name": "ada"}
+    context = ContextVariables(request, defaults)
+
+    context["user_goal"] = "learn"
+    context["metadata"]["channel"]["id"] = "c2"
+    context["tags"].append("b")
+    del context["user_name"]
+
+    assert context.to_dict() == {"user_goal": "learn", "metadata": {"channel": {"id": "c2"}}, "tags": ["a", "b"]}
+    assert "user_name" not in context and len(context) == 3
+    assert defaults == {"user_goal": "", "metadata": {"channel": {"id": "c1"}}, "tags": ["a"]}
+    assert request == {"user_name": "ada"}
+
+
+def test_reads_without_copying():
+    metadata = {"channel": {"id": "c1"}}
+    context = ContextVariables({"metadata": metadata})
+    assert context.peek("metadata") is metadata
+    assert DefaultView(context)["metadata"] is metadata
+    assert DefaultView(context)["missing"] == "" and DefaultView(context).get("missing") is None
+    assert "missing" not in DefaultView(context)
+    assert context.changes() == {}
+
+
+def test_snapshots_are_isolated_and_record_changes():
+    context = ContextVariables({"count": 1, "items": [1]})
+    context["active_agent_name"] = "Triage"
+
+    scope = context.snapshot()
+    scope["count"] = 2
+    scope["items"].append(2)
+    scope.peek("active_agent_name")
+    del scope["active_agent_name"]
+    assert scope.changes() == {"count": 2, "items": [1, 2], "active_agent_name": REMOVED}
+    assert context.to_dict() == {"count": 1, "items": [1], "active_agent_name": "Triage"}
+
+    untouched = context.snapshot()
+    untouched["items"]
+    assert untouched.changes() == {}
+
+    context.apply(scope.changes())
+    assert context.to_dict() == {"count": 2, "items": [1, 2]}
+
+
+def test_snapshot_depth_is_bounded():
+    context = ContextVariables({"n": 0})
+    for n in range(1, 50):
+        context["n"] = n
+        context = context.snapshot()
+    assert context["n"] == 49
+    assert len(context._layers) <= 8
+
+
+def test_size_limits():
+    context = ContextVariables({"big": "x" * 100}, max_keys=2, max_value_bytes=10)
+    context["small"] = "ok"
+    with pytest.raises(ContextSizeError):
+        context["other"] = 1
+    with pytest.raises(ContextSizeError):
+        context["small"] = {"too": "large value"}
+    context["small"] = "fine"
+    assert context["big"] == "x" * 100
+
+
+def test_tool_changes_apply_only_on_success():
+    swarm = Swarm(config={"llm": {"default": {"model": "gpt-4o", "api_key": "sk-test"}}})
+
+    def remember(topic, context_variables):
+        context_variables["topics"].append(topic)
+        return "ok"
+
+    def fail(context_variables):
+        context_variables["topics"].append("lost")
+        raise RuntimeError("boom")
+
+    caller = {"topics": ["intro"]}
+    context = ContextVariables(caller)
+    calls = [
+        ToolCall("call_1", {"name": "remember", "arguments": json.dumps({"topic": "graphs"})}),
+        ToolCall("call_2", {"name": "fail", "arguments": "{}"}),
+    ]
+    response = swarm.handle_tool_calls(calls, [remember, fail], context, debug=False)
+
+    assert response.messages[1]["content"].startswith("Error:")
+    assert context["topics"] == ["intro", "graphs"]
+    assert caller == {"topics": ["intro"]}
+
+
+def test_run_with_context_does_not_leak_between_requests():
+    from src.swarm.extensions.blueprint.blueprint_base import BlueprintBase
+
+    class Response:
+        def __init__(self, agent, context_variables):
+            self.messages = []
+            self.agent = agent
+            self.context_variables = context_variables
+
+    class FakeSwarm:
+        def __init__(self, agent):
+            self.agents = {agent.name: agent}
+
+        def run(self, agent, messages, context_variables, stream, debug):
+            context = dict(context_variables)
+            context["seen"] = messages[-1]["content"]
+            return Response(agent, context)
+
+    class Blueprint(BlueprintBase):
+        metadata = {}
+
+        def create_agents(self):
+            return {}
+
+    agent = Agent(name="Solo", functions=[])
+    blueprint = Blueprint.__new__(Blueprint)
+    blueprint.context_variables = {"user_goal": ""}
+    blueprint.starting_agent = agent
+    blueprint.swarm = FakeSwarm(agent)
+
+    first = blueprint.run_with_context([{"role": "user", "content": "hi"}], {"channel_id": "c1"})
+    second = blueprint.run_with_context([{"role": "user", "content": "bye"}], {})
+
+    assert first["context_variables"] == {"user_goal": "", "channel_id": "c1", "active_agent_name": "Solo", "seen": "hi"}
+    assert second["context_variables"] == {"user_goal": "", "active_agent_name": "Solo", "seen": "bye"}
+    assert blueprint.context_variables == {"user_goal": ""}
@@ -0,0 +1,59 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+
+class ConversationHistoryQueriesTest(TestCase):
+    def setUp(self):
+        from swarm import views
+        from swarm.models import ChatConversation, ChatMessage
+        self.views = views
+        self.ChatMessage = ChatMessage
+        conversation = ChatConversation.objects.create(conversation_id="conv")
+        ChatMessage.objects.bulk_create([
+            ChatMessage(conversation=conversation, sender="user", content=f"old {i}",
+                        content_hash=ChatMessage.hash_content(f"old {i}"), tool_call_id=f"call-{i % 3}")
+            for i in range(200)
+        ])
+
+    def count_queries(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        return ctx.captured_queries
+
+    def test_store_looks_up_only_new_messages(self):
+        history = [{"role": "user", "content": "old 5"}, {"role": "assistant", "content": "new reply"}]
+        queries = self.count_queries(lambda: self.views.store_conversation_history("conv", history))
+        # get_or_create, the hash lookup and one bulk insert, however long the conversation is.
+        self.assertEqual(len(queries), 3)
+        self.assertFalse(any("old 1" in q["sql"] for q in queries))
+        self.assertEqual(self.ChatMessage.objects.filter(conversation_id="conv").count(), 201)
+
+        self.views.store_conversation_history("conv", history)
+        self.assertEqual(self.ChatMessage.objects.filter(conversation_id="conv").count(), 201)
+
+    def test_load_is_a_single_query(self):
+        queries = self.count_queries(lambda: self.views.load_conversation_history("conv", [], tool_call_id="call-1"))
+        self.assertEqual(len(queries), 1)
+
+    def test_lookups_use_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("checks SQLite query plans")
+        history = self.ChatMessage.objects.filter(conversation_id="conv").order_by("timestamp")
+        by_tool = history.filter(tool_call_id="call-1")
+        dedupe = self.ChatMessage.objects.filter(conversation_id="conv", content_hash__in=["x", "y"]).order_by()
+        for queryset, index in (
+            (history, "swarm_chatmsg_conv_ts_idx"),
+            (by_tool, "swarm_chatmsg_conv_tool_idx"),
+            (dedupe, "swarm_chatmsg_conv_hash_idx"),
+        ):
+            plan = queryset.explain()
+            self.assertIn(index, plan)
+            self.assertNotIn("USE TEMP B-TREE", plan)
+
+    def test_saving_a_message_hashes_its_content(self):
+        message = self.ChatMessage.objects.filter(conversation_id="conv").first()
+        message.content = "changed"
+        message.save(update_fields=["content"])
+        message.refresh_from_db()
+        self.assertEqual(message.content_hash, self.ChatMessage.hash_content("changed"))
@@ -0,0 +1,236 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from src.swarm.core import Swarm
+from src.swarm.graph import AgentGraph, RunContext, find_handoff_targets, handoff
+from src.swarm.types import Agent, Tool
+
+
+def make_agents():
+    agents = {}
+
+    def handoff_to_helper() -> Agent:
+        return agents["Helper"]
+
+    def handoff_back_to_triage() -> Agent:
+        return agents["Triage"]
+
+    def lookup(query: str) -> str:
+        return f"found {query}"
+
+    agents["Triage"] = Agent(name="Triage", functions=[handoff_to_helper, lookup])
+    agents["Helper"] = Agent(name="Helper", functions=[handoff_back_to_triage])
+    return agents
+
+
+def make_swarm():
+    with patch("src.swarm.core.OpenAI"):
+        swarm = Swarm(config={"llm": {"default": {"model": "gpt-4o", "api_key": "sk-test"}}})
+    swarm.agents.update(make_agents())
+    return swarm
+
+
+def tool_call_message(name, call_id="call_1"):
+    tool_call = SimpleNamespace(id=call_id, type="function", function=SimpleNamespace(name=name, arguments="{}"))
+    message = MagicMock()
+    message.content = ""
+    message.tool_calls = [tool_call]
+    message.function_call = None
+    message.model_dump_json.return_value = json.dumps({
+        "role": "assistant",
+        "content": "",
+        "tool_calls": [{"id": call_id, "type": "function", "function": {"name": name, "arguments": "{}"}}],
+    })
+    return message
+
+
+def text_message(text):
+    message = MagicMock()
+    message.content = text
+    message.tool_calls = None
+    message.function_call = None
+    message.model_dump_json.return_value = json.dumps({"role": "assistant", "content": text})
+    return message
+
+
+def test_compile_agent_graph_collects_handoff_edges():
+    swarm = make_swarm()
+    graph = asyncio.run(swarm.compile_agent_graph())
+
+    assert isinstance(graph, AgentGraph)
+    assert graph.edges["Triage"] == frozenset({"Helper"})
+    assert graph.edges["Helper"] == frozenset({"Triage"})
+    assert graph.reachable_from("Triage") == frozenset({"Helper"})
+    assert [tool["function"]["name"] for tool in graph["Triage"].tools] == ["handoff_to_helper", "lookup"]
+
+
+def test_handoff_targets_are_read_without_calling_functions():
+    calls = []
+    helper = Agent(name="Helper")
+
+    def handoff_to_helper() -> Agent:
+        calls.append("closure")
+        return helper
+
+    def transfer_to_billing():
+        calls.append("constant")
+        return registry["Billing"]
+
+    @handoff("Triage")
+    def escalate():
+        calls.append("declared")
+
+    @handoff(resolve=True)
+    def pick_agent():
+        calls.append("resolved")
+        return helper
+
+    registry = {}
+    names = {"Helper", "Billing", "Triage"}
+    assert find_handoff_targets([handoff_to_helper], names) == frozenset({"Helper"})
+    assert find_handoff_targets([transfer_to_billing], names) == frozenset({"Billing"})
+    assert find_handoff_targets([escalate], names) == frozenset({"Triage"})
+    assert calls == []
+    assert find_handoff_targets([pick_agent], names) == frozenset({"Helper"})
+    assert calls == ["resolved"]
+
+
+def test_compile_agent_graph_does_not_mutate_registered_agents():
+    swarm = make_swarm()
+    discovered = Tool(name="remote_tool", func=lambda **kwargs: "ok", input_schema={"type": "object"})
+    swarm.agents["Triage"].mcp_servers = ["memory"]
+    original_functions = list(swarm.agents["Triage"].functions)
+
+    async def fake_discover(agent, debug=False):
+        return agent.functions + ([discovered] if agent.mcp_servers else [])
+
+    with patch.object(swarm, "discover_and_merge_agent_tools", side_effect=fake_discover):
+        graph = asyncio.run(swarm.compile_agent_graph())
+
+    assert swarm.agents["Triage"].functions == original_functions
+    assert "remote_tool" in graph["Triage"].function_map
+    assert graph["Triage"].agent is not swarm.agents["Triage"]
+    assert graph["Helper"].agent is swarm.agents["Helper"]
+    with pytest.raises(AttributeError):
+        graph["Triage"].functions = ()
+
+
+def test_run_context_copies_context_variables():
+    swarm = make_swarm()
+    swarm.agent_graph = asyncio.run(swarm.compile_agent_graph())
+    shared = {"user_goal": "help"}
+
+    run_context = swarm.create_run_context(swarm.agents["Triage"], shared)
+
+    assert isinstance(run_context, RunContext)
+    assert run_context.context_variables["active_agent_name"] == "Triage"
+    assert "active_agent_name" not in shared
+
+
+def test_run_handoff_uses_graph_without_rediscovery():
+    swarm = make_swarm()
+    swarm.agent_graph = asyncio.run(swarm.compile_agent_graph())
+    replies = iter([tool_call_message("handoff_to_helper"), text_message("done")])
+
+    with patch.object(swarm, "get_chat_completion_message", side_effect=lambda **kwargs: next(replies)) as completion, \
+         patch.object(swarm, "discover_and_merge_agent_tools") as discover:
+        response = swarm.run(agent=swarm.agents["Triage"], messages=[{"role": "user", "content": "hi"}])
+
+    discover.assert_not_called()
+    assert response.agent.name == "Helper"
+    assert response.context_variables["active_agent_name"] == "Helper"
+    assert completion.call_args_list[1].kwargs["agent"].name == "Helper"
+    assert [tool["function"]["name"] for tool in completion.call_args_list[1].kwargs["tools"]] == ["handoff_back_to_triage"]
+
+
+def test_get_chat_completion_does_not_replace_shared_client():
+    swarm = make_swarm()
+    swarm.config["llm"]["other"] = {"model": "llama", "base_url": "http://localhost:11434/v1"}
+    default_client = swarm.client
+    with patch("src.swarm.core.OpenAI") as mock_openai:
+        swarm.get_chat_completion(
+            agent=Agent(name="Other", model="other"),
+            history=[],
+            context_variables={},
+            model_override=None,
+            stream=False,
+            debug=False,
+        )
+        swarm.get_chat_completion(
+            agent=Agent(name="Other", model="other"),
+            history=[],
+            context_variables={},
+            model_override=None,
+            stream=False,
+            debug=False,
+        )
+
+    assert mock_openai.call_count == 1
+    assert swarm.client is default_client
+    assert "api_key" not in swarm.config["llm"]["other"]
+
+
+def test_prefetch_compiles_reachable_agents_in_background():
+    swarm = make_swarm()
+    triage = swarm.agents["Triage"]
+    swarm.publish_agent_graph(asyncio.run(swarm.compile_agent_graph({"Triage": triage}, agent_names=swarm.agents)))
+    assert "Helper" not in swarm.agent_graph
+
+    thread = swarm.prefetch_agent_graph(triage)
+    thread.join(timeout=5)
+
+    assert "Helper" in swarm.agent_graph
+    assert swarm.agent_graph["Helper"].matches(swarm.agents["Helper"])
+    assert not swarm._pending_compiles
+
+
+def test_handoff_waits_for_inflight_prefetch_instead_of_rediscovering():
+    swarm = make_swarm()
+    helper = swarm.agents["Helper"]
+    release = threading.Event()
+    discovered = []
+
+    async def slow_discover(agent, debug=False):
+        discovered.append(agent.name)
+        if agent.name == "Helper":
+            await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        return agent.functions
+
+    with patch.object(swarm, "discover_and_merge_agent_tools", side_effect=slow_discover):
+        swarm.publish_agent_graph(asyncio.run(swarm.compile_agent_graph({"Triage": swarm.agents["Triage"]}, agent_names=swarm.agents)))
+        thread = swarm.prefetch_agent_graph(swarm.agents["Triage"])
+        assert "Helper" in swarm._pending_compiles
+
+        release.set()
+        graph = swarm._graph_for(helper, None, debug=False)
+        thread.join(timeout=5)
+
+    assert graph["Helper"].matches(helper)
+    assert discovered.count("Helper") == 1
+
+
+def test_tool_provider_joins_inflight_discovery():
+    from src.swarm.extensions.mcp.mcp_tool_provider import MCPToolProvider
+    provider = MCPToolProvider("memory", {"command": "npx", "args": []})
+    provider.cache = MagicMock(get=MagicMock(return_value=None))
+    calls = []
+
+    async def list_tools():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [Tool(name="remember", func=lambda **kwargs: None)]
+
+    provider.client.list_tools = list_tools
+
+    async def discover_twice():
+        agent = Agent(name="A")
+        return await asyncio.gather(provider.discover_tools(agent), provider.discover_tools(agent))
+
+    first, second = asyncio.run(discover_twice())
+
+    assert len(calls) == 1
+    assert [t.name for t in first] == [t.name for t in second] == ["remember"]
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+from swarm.db.config import database_settings
+
+
+def test_sqlite_is_the_default():
+    settings = database_settings(Path("/srv"), {})
+    assert settings == {"ENGINE": "django.db.backends.sqlite3", "NAME": "/srv/db.sqlite3"}
+
+
+def test_postgres_uses_persistent_health_checked_connections():
+    settings = database_settings(Path("/srv"), {"DJANGO_DATABASE": "postgres", "POSTGRES_CONNECT_TIMEOUT": "5"})
+    assert settings["ENGINE"] == "django.db.backends.postgresql"
+    assert settings["CONN_MAX_AGE"] == 60
+    assert settings["CONN_HEALTH_CHECKS"] is True
+    assert settings["OPTIONS"] == {"connect_timeout": 5}
+
+    settings = database_settings(Path("/srv"), {
+        "DJANGO_DATABASE": "postgres", "POSTGRES_CONN_MAX_AGE": "0", "POSTGRES_CONN_HEALTH_CHECKS": "false",
+    })
+    assert (settings["CONN_MAX_AGE"], settings["CONN_HEALTH_CHECKS"]) == (0, False)
+
+
+def test_pool_replaces_persistent_connections():
+    settings = database_settings(Path("/srv"), {
+        "DJANGO_DATABASE": "postgres", "POSTGRES_POOL": "true", "POSTGRES_POOL_MAX_SIZE": "20",
+        "POSTGRES_CONN_MAX_AGE": "300",
+    })
+    assert settings["ENGINE"] == "swarm.db.postgresql_pool"
+    assert settings["CONN_MAX_AGE"] == 0
+    assert settings["OPTIONS"]["pool"]["max_size"] == 20
+    assert settings["OPTIONS"]["pool"]["min_size"] == 2
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        database_settings(Path("/srv"), {"DJANGO_DATABASE": "mysql"})
@@ -0,0 +1,102 @@
+import difflib
+import os
+
+import pytest
+from src.swarm.utils import fileio
+from src.swarm.utils.fileio import PatchError, apply_unified_diff, atomic_write, line_index, read_lines
+
+
+def make_diff(old, new):
+    return "".join(difflib.unified_diff(old.splitlines(True), new.splitlines(True), "a/f.py", "b/f.py"))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "f.py"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+    return path
+
+
+def test_read_lines_returns_a_range(source):
+    piece = read_lines(str(source), 10, 12)
+    assert piece.text == "line 10\nline 11\nline 12\n"
+    assert (piece.start, piece.end, piece.total_lines) == (10, 12, 100)
+
+    numbered = read_lines(str(source), 99, line_numbers=True)
+    assert numbered.text == "99: line 99\n100: line 100\n"
+    assert read_lines(str(source), 1, max_lines=5).end == 5
+    assert read_lines(str(source), 150).text == ""
+
+
+def test_index_is_cached_until_the_file_changes(source, monkeypatch):
+    first = line_index(str(source))
+    assert line_index(str(source)) is first
+
+    source.write_text("only\nthree\nlines")
+    index = line_index(str(source))
+    assert index is not first and index.line_count == 3
+    assert read_lines(str(source), 3).text == "lines"
+
+
+def test_large_files_are_indexed_through_mmap(tmp_path, monkeypatch):
+    monkeypatch.setattr(fileio, "MMAP_THRESHOLD", 0)
+    monkeypatch.setattr(fileio, "CHUNK_BYTES", 7)
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"alpha\r\nbeta\r\ngamma\r\n")
+    index = line_index(str(path))
+    assert list(index.offsets) == [0, 7, 13, 20]
+    assert index.newline == b"\r\n"
+    assert read_lines(str(path), 2, 2).text == "beta\r\n"
+
+
+def test_if_hash_skips_unchanged_content(source):
+    digest = read_lines(str(source)).sha256
+    assert read_lines(str(source), if_hash=digest).unchanged
+    source.write_text("changed\n")
+    fresh = read_lines(str(source), if_hash=digest)
+    assert not fresh.unchanged and fresh.text == "changed\n"
+
+
+def test_apply_unified_diff(source):
+    old = source.read_text()
+    new = old.replace("line 5\n", "line five\n").replace("line 80\n", "line 80\ninserted\n")
+    result = apply_unified_diff(str(source), make_diff(old, new))
+    assert source.read_text() == new
+    assert (result.hunks, result.added, result.removed) == (2, 2, 1)
+    assert result.sha256 == read_lines(str(source)).sha256
+
+
+def test_drifted_hunks_are_located(source):
+    old = source.read_text()
+    diff = make_diff(old, old.replace("line 50\n", "line fifty\n"))
+    source.write_text("header\n" * 3 + old)
+    apply_unified_diff(str(source), diff)
+    assert "line fifty\n" in source.read_text() and source.read_text().startswith("header\n")
+
+
+def test_mismatched_or_stale_patches_leave_the_file_alone(source):
+    old = source.read_text()
+    digest = read_lines(str(source)).sha256
+    with pytest.raises(PatchError):
+        apply_unified_diff(str(source), make_diff("nothing\nlike\nthis\n", "x\n"))
+    with pytest.raises(PatchError):
+        apply_unified_diff(str(source), make_diff(old, old + "tail\n"), expected_hash="0" * 64)
+    assert source.read_text() == old
+    assert read_lines(str(source)).sha256 == digest
+    assert [name for name in os.listdir(source.parent) if name.endswith(".tmp")] == []
+
+
+def test_missing_final_newline_is_preserved(tmp_path):
+    path = tmp_path / "f.txt"
+    path.write_text("a\nb")
+    apply_unified_diff(str(path), make_diff("a\nb", "A\nb"))
+    assert path.read_text() == "A\nb"
+
+
+def test_atomic_write_keeps_mode_and_creates_directories(tmp_path):
+    path = tmp_path / "nested" / "script.sh"
+    atomic_write(str(path), "#!/bin/sh\n")
+    os.chmod(path, 0o755)
+    atomic_write(str(path), "#!/bin/sh\necho hi\n")
+    assert path.read_text() == "#!/bin/sh\necho hi\n"
+    assert os.stat(path).st_mode & 0o777 == 0o755
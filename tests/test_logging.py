@@ -0,0 +1,88 @@
+import json
+import logging
+
+from src.swarm.utils.logger_setup import (
+    JsonFormatter, Lazy, StructuredFormatter, TraceSampler, configure_logging, lazy_json,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, formatter):
+        super().__init__()
+        self.setFormatter(formatter)
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def make_logger(name, level, formatter=None):
+    std = logging.getLogger(name)
+    std.handlers = []
+    std.propagate = False
+    std.setLevel(level)
+    handler = ListHandler(formatter or StructuredFormatter("%(message)s"))
+    std.addHandler(handler)
+    return std, handler
+
+
+def test_lazy_values_are_not_rendered_when_level_disabled():
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "big"
+
+    std, handler = make_logger("swarm.test.lazy", logging.INFO)
+    std.debug("payload: %s", Lazy(expensive))
+    std.debug("payload", extra={"fields": {"body": Lazy(expensive)}})
+    assert calls == [] and handler.lines == []
+
+    std.info("payload: %s", Lazy(expensive))
+    assert calls == [1]
+    assert handler.lines == ["payload: big"]
+
+
+def test_structured_fields_in_text_and_json():
+    std, handler = make_logger("swarm.test.fields", logging.DEBUG)
+    std.debug("turn done", extra={"fields": {"agent": "Triage", "payload": lazy_json({"a": 1}, indent=None)}})
+    assert handler.lines == ['turn done agent=Triage payload={"a": 1}']
+
+    std, handler = make_logger("swarm.test.json", logging.DEBUG, JsonFormatter())
+    std.info("tool %s done", "search", extra={"fields": {"tool_ms": 12, "result": Lazy(lambda: {"ok": True})}})
+    entry = json.loads(handler.lines[0])
+    assert entry["message"] == "tool search done"
+    assert entry["level"] == "INFO" and entry["logger"] == "swarm.test.json"
+    assert entry["tool_ms"] == 12 and entry["result"] == {"ok": True}
+
+
+def test_lazy_json_truncates_and_survives_errors():
+    assert str(lazy_json({"k": "x" * 50}, indent=None, limit=10)) == '{"k": "xxx...'
+    assert str(Lazy(lambda: 1 / 0)).startswith("<unrenderable")
+
+
+def test_lazy_json_can_redact_secrets():
+    rendered = str(lazy_json({"api_key": "sk-abcdefghijklmnop", "model": "gpt-4o"}, indent=None, redact=True))
+    assert "sk-abcdefghijklmnop" not in rendered and '"model": "gpt-4o"' in rendered
+
+
+def test_trace_sampler():
+    debug_logger, _ = make_logger("swarm.test.sampler", logging.DEBUG)
+    info_logger, _ = make_logger("swarm.test.sampler.info", logging.INFO)
+    rolls = iter([0.05, 0.5])
+    sampler = TraceSampler(rate=0.1, rng=lambda: next(rolls))
+    assert sampler.sample(debug_logger) is True
+    assert sampler.sample(debug_logger) is False
+    assert TraceSampler(rate=1.0).sample(info_logger) is False
+    assert TraceSampler(rate=0.0).sample(debug_logger) is False
+
+
+def test_configure_logging_keeps_existing_root_handlers():
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    root.addHandler(logging.NullHandler())
+    try:
+        configure_logging(force=False)
+        assert all(h in root.handlers for h in handlers)
+    finally:
+        root.handlers = handlers
@@ -0,0 +1,296 @@
+"""
+Conformance tests for the native MCP providers.
+
+Each scenario is a sequence of tool calls with the text the reference server
+returns. The native providers are checked against them on every run; with
+SWARM_MCP_CONFORMANCE=1 (and npx/uvx able to fetch the servers) the same calls
+are also replayed against the real servers over stdio and the results compared.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+from src.swarm.core import Swarm
+from src.swarm.db.sqlite import close_pools
+from src.swarm.extensions.mcp.mcp_tool_provider import MCPToolProvider
+from src.swarm.extensions.mcp.native import NativeToolProvider, create_native_provider, find_native_provider
+from src.swarm.types import Agent
+
+# Tool names and their (properties, required) as listed by the reference servers.
+REFERENCE_TOOLS = {
+    "filesystem": {
+        "read_file": ({"path"}, ["path"]),
+        "read_multiple_files": ({"paths"}, ["paths"]),
+        "write_file": ({"path", "content"}, ["path", "content"]),
+        "edit_file": ({"path", "edits", "dryRun"}, ["path", "edits"]),
+        "create_directory": ({"path"}, ["path"]),
+        "list_directory": ({"path"}, ["path"]),
+        "directory_tree": ({"path"}, ["path"]),
+        "move_file": ({"source", "destination"}, ["source", "destination"]),
+        "search_files": ({"path", "pattern", "excludePatterns"}, ["path", "pattern"]),
+        "get_file_info": ({"path"}, ["path"]),
+        "list_allowed_directories": (set(), []),
+    },
+    "memory": {
+        "create_entities": ({"entities"}, ["entities"]),
+        "create_relations": ({"relations"}, ["relations"]),
+        "add_observations": ({"observations"}, ["observations"]),
+        "delete_entities": ({"entityNames"}, ["entityNames"]),
+        "delete_observations": ({"deletions"}, ["deletions"]),
+        "delete_relations": ({"relations"}, ["relations"]),
+        "read_graph": (set(), []),
+        "search_nodes": ({"query"}, ["query"]),
+        "open_nodes": ({"names"}, ["names"]),
+    },
+    "sqlite": {
+        "read_query": ({"query"}, ["query"]),
+        "write_query": ({"query"}, ["query"]),
+        "create_table": ({"query"}, ["query"]),
+        "list_tables": (set(), []),
+        "describe_table": ({"table_name"}, ["table_name"]),
+        "append_insight": ({"insight"}, ["insight"]),
+    },
+    "sequential-thinking": {
+        "sequentialthinking": (
+            {"thought", "nextThoughtNeeded", "thoughtNumber", "totalThoughts", "isRevision", "revisesThought",
+             "branchFromThought", "branchId", "needsMoreThoughts"},
+            ["thought", "nextThoughtNeeded", "thoughtNumber", "totalThoughts"],
+        ),
+    },
+}
+
+
+def server_configs(root):
+    """Stdio configs for the reference servers, rooted at `root`."""
+    return {
+        "filesystem": {"command": "npx", "args": ["-y", "@modelcontextprotocol/server-filesystem", str(root)]},
+        "memory": {"command": "npx", "args": ["-y", "@modelcontextprotocol/server-memory"],
+                   "env": {"MEMORY_FILE_PATH": str(root / "memory.json")}},
+        "sqlite": {"command": "uvx", "args": ["mcp-server-sqlite", "--db-path", str(root / "test.db")]},
+        "sequential-thinking": {"command": "npx", "args": ["-y", "@modelcontextprotocol/server-sequential-thinking"]},
+    }
+
+
+def graph(entities=(), relations=()):
+    return json.dumps({"entities": list(entities), "relations": list(relations)}, indent=2)
+
+
+ALICE = {"name": "Alice", "entityType": "person", "observations": ["likes tea"]}
+ACME = {"name": "Acme", "entityType": "company", "observations": []}
+WORKS_AT = {"from": "Alice", "to": "Acme", "relationType": "works at"}
+
+# (tool, arguments, expected text, is_error); "{root}" is the scenario directory.
+SCENARIOS = {
+    "filesystem": [
+        ("write_file", {"path": "{root}/notes.txt", "content": "one\ntwo\nthree\n"},
+         "Successfully wrote to {root}/notes.txt", False),
+        ("read_file", {"path": "{root}/notes.txt"}, "one\ntwo\nthree\n", False),
+        ("create_directory", {"path": "{root}/src"}, "Successfully created directory {root}/src", False),
+        ("create_directory", {"path": "{root}/src/pkg"}, "Successfully created directory {root}/src/pkg", False),
+        ("move_file", {"source": "{root}/notes.txt", "destination": "{root}/src/notes.txt"},
+         "Successfully moved {root}/notes.txt to {root}/src/notes.txt", False),
+        ("list_directory", {"path": "{root}/src"}, "[FILE] notes.txt\n[DIR] pkg", False),
+        ("directory_tree", {"path": "{root}/src"}, json.dumps([
+            {"name": "notes.txt", "type": "file"}, {"name": "pkg", "type": "directory", "children": []},
+        ], indent=2), False),
+        ("search_files", {"path": "{root}", "pattern": "NOTES"}, "{root}/src/notes.txt", False),
+        ("search_files", {"path": "{root}", "pattern": "notes", "excludePatterns": ["src"]}, "No matches found", False),
+        ("edit_file", {"path": "{root}/src/notes.txt", "edits": [{"oldText": "two", "newText": "2"}]},
+         "```diff\nIndex: {root}/src/notes.txt\n" + "=" * 67 + "\n--- {root}/src/notes.txt\toriginal\n"
+         "+++ {root}/src/notes.txt\tmodified\n@@ -1,3 +1,3 @@\n one\n-two\n+2\n three\n```\n\n", False),
+        ("read_multiple_files", {"paths": ["{root}/src/notes.txt", "{root}/missing.txt"]},
+         None, False),
+        ("read_file", {"path": "/etc/passwd"}, None, True),
+        ("list_allowed_directories", {}, "Allowed directories:\n{root}", False),
+    ],
+    "memory": [
+        ("create_entities", {"entities": [ALICE, ACME]}, json.dumps([ALICE, ACME], indent=2), False),
+        ("create_entities", {"entities": [ALICE]}, "[]", False),
+        ("create_relations", {"relations": [WORKS_AT]}, json.dumps([WORKS_AT], indent=2), False),
+        ("add_observations", {"observations": [{"entityName": "Alice", "contents": ["likes tea", "writes Go"]}]},
+         json.dumps([{"entityName": "Alice", "addedObservations": ["writes Go"]}], indent=2), False),
+        ("search_nodes", {"query": "GO"}, graph([{**ALICE, "observations": ["likes tea", "writes Go"]}]), False),
+        ("open_nodes", {"names": ["Alice", "Acme"]},
+         graph([{**ALICE, "observations": ["likes tea", "writes Go"]}, ACME], [WORKS_AT]), False),
+        ("delete_observations", {"deletions": [{"entityName": "Alice", "observations": ["likes tea"]}]},
+         "Observations deleted successfully", False),
+        ("delete_entities", {"entityNames": ["Acme"]}, "Entities deleted successfully", False),
+        ("read_graph", {}, graph([{**ALICE, "observations": ["writes Go"]}]), False),
+        ("delete_relations", {"relations": [WORKS_AT]}, "Relations deleted successfully", False),
+    ],
+    "sqlite": [
+        ("create_table", {"query": "CREATE TABLE services (name TEXT, type TEXT)"}, "Table created successfully", False),
+        ("write_query", {"query": "INSERT INTO services VALUES ('fly', 'hosting')"}, "[{'affected_rows': 1}]", False),
+        ("read_query", {"query": "SELECT * FROM services"}, "[{'name': 'fly', 'type': 'hosting'}]", False),
+        ("list_tables", {}, "[{'name': 'services'}]", False),
+        ("read_query", {"query": "SELECT * FROM missing"}, "Database error: no such table: missing", False),
+        ("write_query", {"query": "SELECT 1"}, "Error: SELECT queries are not allowed for write_query", False),
+        ("append_insight", {"insight": "fly is cheap"}, "Insight added to memo", False),
+    ],
+    "sequential-thinking": [
+        ("sequentialthinking", {"thought": "Start", "nextThoughtNeeded": True, "thoughtNumber": 3, "totalThoughts": 2},
+         json.dumps({"thoughtNumber": 3, "totalThoughts": 3, "nextThoughtNeeded": True, "branches": [],
+                     "thoughtHistoryLength": 1}, indent=2), False),
+        ("sequentialthinking", {"thought": "", "nextThoughtNeeded": True, "thoughtNumber": 1, "totalThoughts": 1},
+         json.dumps({"error": "Invalid thought: must be a string", "status": "failed"}, indent=2), True),
+    ],
+}
+
+
+def fill(value, root):
+    if isinstance(value, str):
+        return value.replace("{root}", str(root))
+    if isinstance(value, list):
+        return [fill(item, root) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, root) for key, item in value.items()}
+    return value
+
+
+def result_text(result):
+    return "".join(item.text for item in result.content), bool(result.model_dump(by_alias=True).get("isError"))
+
+
+@pytest.fixture
+def root(tmp_path):
+    yield tmp_path
+    close_pools()
+
+
+@pytest.mark.parametrize("server", sorted(REFERENCE_TOOLS))
+def test_native_tools_match_reference_schemas(server, root):
+    provider = create_native_provider(server, server_configs(root)[server])
+    tools = asyncio.run(provider.discover_tools(Agent(name="tester")))
+    listed = {tool.name: tool.input_schema for tool in tools}
+    assert set(listed) == set(REFERENCE_TOOLS[server])
+    for name, (properties, required) in REFERENCE_TOOLS[server].items():
+        assert listed[name]["type"] == "object"
+        assert set(listed[name]["properties"]) == properties
+        assert listed[name].get("required", []) == required
+
+
+@pytest.mark.parametrize("server", sorted(SCENARIOS))
+def test_native_results_match_reference_servers(server, root):
+    provider = create_native_provider(server, server_configs(root)[server])
+    for tool, arguments, expected, is_error in SCENARIOS[server]:
+        text, error = result_text(provider.call_tool(tool, fill(arguments, root)))
+        assert error == is_error, (tool, text)
+        if expected is not None:
+            assert text == fill(expected, root), tool
+
+
+def test_filesystem_edge_cases(root):
+    provider = create_native_provider("filesystem", server_configs(root)["filesystem"])
+    (root / "a.txt").write_text("x")
+    text, _ = result_text(provider.call_tool("read_multiple_files", {"paths": [f"{root}/a.txt", f"{root}/b.txt"]}))
+    assert text.startswith(f"{root}/a.txt:\nx\n\n---\n{root}/b.txt: Error - ")
+
+    outside = root.parent / (root.name + "-sibling")
+    outside.mkdir()
+    text, error = result_text(provider.call_tool("write_file", {"path": f"{outside}/x", "content": ""}))
+    assert error and text.startswith("Error: Access denied - path outside allowed directories")
+
+    os.symlink("/etc", root / "link")
+    text, error = result_text(provider.call_tool("list_directory", {"path": f"{root}/link"}))
+    assert error and "symlink target outside allowed directories" in text
+
+    (root / "code.py").write_text("def f():\n    return 1\n")
+    text, _ = result_text(provider.call_tool("edit_file", {
+        "path": f"{root}/code.py", "dryRun": True,
+        "edits": [{"oldText": "return 1", "newText": "return 2"}],
+    }))
+    assert "-    return 1\n+    return 2\n" in text
+    assert (root / "code.py").read_text() == "def f():\n    return 1\n"
+
+    provider.call_tool("edit_file", {
+        "path": f"{root}/code.py",
+        "edits": [{"oldText": "return 1  ", "newText": "return 3"}],
+    })
+    assert (root / "code.py").read_text() == "def f():\n    return 3\n"
+
+
+def test_memory_graph_uses_the_server_file_format(root):
+    provider = create_native_provider("memory", server_configs(root)["memory"])
+    provider.call_tool("create_entities", {"entities": [ALICE]})
+    provider.call_tool("create_relations", {"relations": [WORKS_AT]})
+    lines = (root / "memory.json").read_text().split("\n")
+    assert [json.loads(line)["type"] for line in lines] == ["entity", "relation"]
+
+    text, error = result_text(provider.call_tool("add_observations", {
+        "observations": [{"entityName": "Alice", "contents": ["new"]}, {"entityName": "Nobody", "contents": ["x"]}],
+    }))
+    assert error and text == "Error: Entity with name Nobody not found"
+    assert "new" not in (root / "memory.json").read_text()
+
+    # Another writer (e.g. the stdio server) changes the file: the next call sees it.
+    (root / "memory.json").write_text(json.dumps({"type": "entity", **ACME}))
+    text, _ = result_text(provider.call_tool("read_graph", {}))
+    assert json.loads(text) == {"entities": [ACME], "relations": []}
+
+
+def test_sequential_thinking_keeps_history_and_branches(root):
+    provider = create_native_provider("sequential-thinking", {})
+    provider.call_tool("sequentialthinking", {"thought": "a", "nextThoughtNeeded": True,
+                                              "thoughtNumber": 1, "totalThoughts": 2})
+    text, _ = result_text(provider.call_tool("sequentialthinking", {
+        "thought": "b", "nextThoughtNeeded": False, "thoughtNumber": 2, "totalThoughts": 2,
+        "branchFromThought": 1, "branchId": "alt",
+    }))
+    assert json.loads(text) == {"thoughtNumber": 2, "totalThoughts": 2, "nextThoughtNeeded": False,
+                                "branches": ["alt"], "thoughtHistoryLength": 2}
+
+
+def test_providers_are_selected_by_config(root):
+    configs = server_configs(root)
+    assert find_native_provider("fs", configs["filesystem"]).name == "filesystem"
+    assert find_native_provider("db", {"args": ["-y", "mcp-server-sqlite-npx", "x.db"]}).name == "sqlite"
+    assert find_native_provider("memory", {"command": "python", "args": ["my_memory.py"]}).name == "memory"
+    assert find_native_provider("notes", {"native": "memory"}).name == "memory"
+    assert find_native_provider("brave-search", {"args": ["-y", "@modelcontextprotocol/server-brave-search"]}) is None
+
+    swarm = Swarm.__new__(Swarm)
+    assert isinstance(swarm._create_tool_provider("sqlite", {**configs["sqlite"], "mode": "native"}),
+                      NativeToolProvider)
+    assert isinstance(swarm._create_tool_provider("sqlite", configs["sqlite"]), MCPToolProvider)
+    assert isinstance(swarm._create_tool_provider("brave", {"command": "npx", "mode": "native"}), MCPToolProvider)
+
+
+def test_native_tools_are_called_synchronously(root):
+    provider = create_native_provider("sqlite", server_configs(root)["sqlite"])
+    tools = {tool.name: tool for tool in asyncio.run(provider.discover_tools(Agent(name="tester")))}
+    assert not tools["list_tables"].dynamic
+    assert result_text(tools["list_tables"].func()) == ("[]", False)
+    text, error = result_text(tools["read_query"].func())
+    assert error is False and text == "Error: Invalid arguments for read_query: missing query"
+
+
+@pytest.mark.skipif(
+    os.environ.get("SWARM_MCP_CONFORMANCE") != "1" or not (shutil.which("npx") and shutil.which("uvx")),
+    reason="set SWARM_MCP_CONFORMANCE=1 with npx and uvx available to compare against the stdio servers",
+)
+@pytest.mark.parametrize("server", sorted(SCENARIOS))
+def test_native_results_match_stdio_servers(server, tmp_path):
+    native_root, stdio_root = tmp_path / "native", tmp_path / "stdio"
+    native_root.mkdir()
+    stdio_root.mkdir()
+    native = create_native_provider(server, server_configs(native_root)[server])
+    stdio = MCPToolProvider(server, server_configs(stdio_root)[server])
+    steps = SCENARIOS[server]
+    if server == "sequential-thinking":
+        # Each stdio call starts a fresh server, so only history-independent calls compare.
+        steps = steps[:1]
+
+    async def call_stdio(tool, arguments):
+        return await stdio.client._create_tool_callable(tool)(**arguments)
+
+    try:
+        for tool, arguments, _, _ in steps:
+            native_text, native_error = result_text(native.call_tool(tool, fill(arguments, native_root)))
+            stdio_text, stdio_error = result_text(asyncio.run(call_stdio(tool, fill(arguments, stdio_root))))
+            assert native_error == stdio_error, tool
+            assert native_text.replace(str(native_root), "{root}") == stdio_text.replace(str(stdio_root), "{root}")
+    finally:
+        close_pools()
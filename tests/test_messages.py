@@ -0,0 +1,79 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from openai.types.chat import ChatCompletionMessage
+from src.swarm.core import Swarm
+from src.swarm.messages import Message, ToolCall, as_messages, to_wire
+from src.swarm.types import Agent
+
+
+WIRE_CALL = {"id": "call_1", "type": "function", "function": {"name": "lookup", "arguments": '{"q": "x"}'}}
+
+
+def test_messages_read_like_wire_dicts():
+    message = Message.from_dict({"role": "assistant", "content": None, "sender": "Triage",
+                                 "tool_calls": [WIRE_CALL], "refusal": None, "id": "m1"})
+    assert message["role"] == "assistant" and message["content"] is None
+    assert message.get("tool_calls")[0]["function"]["name"] == "lookup"
+    assert message.tool_calls[0].function.arguments == '{"q": "x"}'
+    assert message.get("id") == "m1" and "refusal" not in message
+    assert message.to_dict() == {"role": "assistant", "content": None, "sender": "Triage",
+                                 "tool_calls": [WIRE_CALL], "id": "m1"}
+    assert message == message.to_dict()
+    json.dumps(to_wire([message]))
+
+
+def test_messages_are_immutable_and_shared():
+    message = Message(role="user", content="hi")
+    with pytest.raises(AttributeError):
+        message.content = "changed"
+    with pytest.raises(TypeError):
+        message["content"] = "changed"
+
+    history = as_messages([message, {"role": "user", "content": "again"}])
+    assert history[0] is message
+    assert as_messages(history)[1] is history[1]
+
+    edited = message.replace(content="bye")
+    assert edited.content == "bye" and message.content == "hi" and edited.role is message.role
+
+
+def test_strings_are_interned_and_equal_messages_hash_equal():
+    sender = "".join(["Tri", "age"])
+    a = Message.from_dict({"role": "assistant", "content": "ok", "sender": sender})
+    b = Message.from_dict({"role": "assistant", "content": "ok", "sender": "Triage"})
+    assert a.sender is b.sender
+    assert a == b and hash(a) == hash(b)
+    assert len({a, b}) == 1
+    assert not hasattr(a, "__dict__")
+
+    parts = Message(role="user", content=[{"type": "text", "text": "hi"}])
+    assert parts.to_dict()["content"] == [{"type": "text", "text": "hi"}]
+    hash(parts)
+
+
+def test_sdk_messages_are_converted():
+    completion = ChatCompletionMessage(role="assistant", content=None, tool_calls=[WIRE_CALL])
+    completion.sender = "Triage"
+    message = Message.coerce(completion)
+    assert message.sender == "Triage"
+    assert message.tool_calls == (ToolCall.coerce(WIRE_CALL),)
+    assert set(message) == {"role", "content", "sender", "tool_calls"}
+
+
+def test_run_keeps_history_as_shared_messages():
+    swarm = Swarm(config={"llm": {"default": {"model": "gpt-4o", "api_key": "sk-test"}}})
+    agent = Agent(name="Solo", functions=[])
+    first = Message(role="user", content="hi")
+    reply = ChatCompletionMessage(role="assistant", content="hello")
+
+    with patch.object(swarm, "get_chat_completion_message", return_value=reply):
+        response = swarm.run(agent=agent, messages=[first])
+    assert response.messages == [{"role": "assistant", "content": "hello", "sender": "Solo"}]
+    assert isinstance(response.messages[0], Message)
+
+    with patch.object(swarm, "get_chat_completion_message", return_value=reply) as completion:
+        swarm.run(agent=agent, messages=[first, *response.messages, {"role": "user", "content": "more"}])
+    history = completion.call_args.kwargs["history"]
+    assert history[0] is first and history[1] is response.messages[0]
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.test import TestCase, Client
+from src.swarm import passthrough
+
+LLM_CONFIG = {
+    "raw": {"provider": "openai", "model": "upstream-model", "base_url": "http://upstream/v1", "api_key": "sk-up", "passthrough": True},
+}
+
+SSE_BODY = (
+    b'data: {"id":"c1","choices":[{"delta":{"content":"Hel"}}]}\n\n'
+    b'data: {"id":"c1","choices":[{"delta":{"content":"lo"}}]}\n\n'
+    b'data: {"id":"c1","choices":[],"usage":{"prompt_tokens":7,"completion_tokens":2,"total_tokens":9}}\n\n'
+    b"data: [DONE]\n\n"
+)
+# What a client that did not ask for `stream_options` receives.
+SSE_BODY_WITHOUT_USAGE = SSE_BODY.replace(
+    b'data: {"id":"c1","choices":[],"usage":{"prompt_tokens":7,"completion_tokens":2,"total_tokens":9}}\n\n', b""
+)
+
+
+class ChunkedStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Response body delivered in small chunks, like a real streaming upstream."""
+
+    def __init__(self, data, size=16):
+        self.chunks = [data[i:i + size] for i in range(0, len(data), size)]
+
+    def __iter__(self):
+        yield from self.chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def upstream_handler(seen):
+    def handler(request):
+        seen.append(request)
+        payload = json.loads(request.content)
+        if payload.get("stream"):
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=ChunkedStream(SSE_BODY))
+        body = json.dumps({"id": "c1", "model": payload["model"], "usage": {"prompt_tokens": 3, "completion_tokens": 1}})
+        return httpx.Response(200, headers={"content-type": "application/json"}, stream=ChunkedStream(body.encode()))
+    return handler
+
+
+def test_usage_meter_finds_usage_in_tail():
+    meter = passthrough.UsageMeter()
+    for i in range(0, len(SSE_BODY), 5):
+        meter.feed(SSE_BODY[i:i + 5])
+    assert meter.usage() == {"prompt_tokens": 7, "completion_tokens": 2, "total_tokens": 9}
+
+
+def test_async_proxy_streams_raw_bytes(monkeypatch):
+    seen = []
+    transport = httpx.MockTransport(upstream_handler(seen))
+    monkeypatch.setattr(passthrough, "_get_async_client", lambda base_url: httpx.AsyncClient(base_url=base_url, transport=transport))
+    usages = []
+
+    async def main():
+        proxied = await sync_to_async(passthrough.proxy_chat_completion)(
+            "raw", {"model": "raw", "stream": True, "messages": []}, LLM_CONFIG, use_async=True, on_usage=usages.append,
+        )
+        return proxied, b"".join([chunk async for chunk in proxied])
+
+    proxied, body = asyncio.run(main())
+
+    assert proxied.streaming
+    assert body == SSE_BODY_WITHOUT_USAGE
+    assert usages == [{"prompt_tokens": 7, "completion_tokens": 2, "total_tokens": 9}]
+    sent = json.loads(seen[0].content)
+    assert sent["model"] == "upstream-model"
+    assert sent["stream_options"] == {"include_usage": True}
+    assert seen[0].headers["Authorization"] == "Bearer sk-up"
+
+
+def test_requested_stream_options_are_forwarded_and_relayed_unchanged(monkeypatch):
+    seen = []
+    transport = httpx.MockTransport(upstream_handler(seen))
+    monkeypatch.setattr(passthrough, "_get_client", lambda base_url: httpx.Client(base_url=base_url, transport=transport))
+    usages = []
+
+    proxied = passthrough.proxy_chat_completion(
+        "raw", {"model": "raw", "stream": True, "stream_options": {"include_usage": True}, "messages": []},
+        LLM_CONFIG, on_usage=usages.append,
+    )
+
+    assert b"".join(proxied) == SSE_BODY
+    assert json.loads(seen[0].content)["stream_options"] == {"include_usage": True}
+    assert usages == [{"prompt_tokens": 7, "completion_tokens": 2, "total_tokens": 9}]
+
+
+def test_usage_chunk_filter_keeps_other_events_across_chunk_boundaries():
+    usage_filter = passthrough.UsageChunkFilter()
+    relayed = b"".join(usage_filter.feed(SSE_BODY[i:i + 7]) for i in range(0, len(SSE_BODY), 7))
+    assert relayed + usage_filter.flush() == SSE_BODY_WITHOUT_USAGE
+
+
+class PassthroughViewTest(TestCase):
+    def setUp(self):
+        os.environ["ENABLE_API_AUTH"] = "True"
+        os.environ["API_AUTH_TOKEN"] = "dummy-token"
+        from swarm.auth import EnvOrTokenAuthentication
+
+        class DummyUser:
+            username = "proxy-user"
+            is_authenticated = True
+            is_anonymous = False
+
+        self.original_authenticate = EnvOrTokenAuthentication.authenticate
+        EnvOrTokenAuthentication.authenticate = lambda self, request: (
+            (DummyUser(), None) if request.META.get("HTTP_AUTHORIZATION") == "Bearer dummy-token" else None
+        )
+        from swarm import views
+        self.original_config = views.config
+        views.config = {"llm": LLM_CONFIG}
+        self.seen = []
+        transport = httpx.MockTransport(upstream_handler(self.seen))
+        from swarm import passthrough as live_passthrough
+        self.passthrough = live_passthrough
+        self.original_get_client = live_passthrough._get_client
+        live_passthrough._get_client = lambda base_url: httpx.Client(base_url=base_url, transport=transport)
+
+    def tearDown(self):
+        from swarm.auth import EnvOrTokenAuthentication
+        from swarm import views
+        EnvOrTokenAuthentication.authenticate = self.original_authenticate
+        views.config = self.original_config
+        self.passthrough._get_client = self.original_get_client
+
+    def post(self, payload, token="dummy-token"):
+        return Client().post(
+            "/v1/chat/completions", data=json.dumps(payload), content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+
+    def test_streams_upstream_bytes_and_accounts_usage(self):
+        from swarm.utils.metrics import registry
+        before = registry.get("swarm_llm_tokens_total", {"model": "raw", "user": "proxy-user", "kind": "prompt_tokens"})
+        response = self.post({"model": "raw", "stream": True, "messages": [{"role": "user", "content": "hi"}]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b"".join(response.streaming_content), SSE_BODY_WITHOUT_USAGE)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        after = registry.get("swarm_llm_tokens_total", {"model": "raw", "user": "proxy-user", "kind": "prompt_tokens"})
+        self.assertEqual(after - before, 7)
+
+    def test_requires_authentication(self):
+        response = self.post({"model": "raw", "messages": [{"role": "user", "content": "hi"}]}, token="wrong")
+        self.assertIn(response.status_code, (401, 403))
+        self.assertEqual(self.seen, [])
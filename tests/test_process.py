@@ -0,0 +1,134 @@
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+from src.swarm.utils.process import (
+    CancelOnDisconnect,
+    CancellationToken,
+    OutputBuffer,
+    cancel_scope,
+    reset_command_limits,
+    run_command,
+    run_command_async,
+)
+from src.swarm.utils.resilience import deadline_scope
+
+PY = sys.executable
+
+
+def test_output_buffer_keeps_head_and_tail():
+    buffer = OutputBuffer(head_bytes=4, tail_bytes=4)
+    for chunk in (b"abc", b"defgh", b"ijkl"):
+        buffer.write(chunk)
+    assert buffer.total == 12
+    assert buffer.dropped == 4
+    assert buffer.text() == "abcd\n... [4 bytes truncated] ...\nijkl"
+
+    small = OutputBuffer(head_bytes=4, tail_bytes=4)
+    small.write(b"abcdef")
+    assert not small.truncated and small.text() == "abcdef"
+
+
+def test_run_command_captures_output_and_status():
+    result = run_command([PY, "-c", "import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)"])
+    assert result.returncode == 3
+    assert (result.stdout, result.stderr) == ("out\n", "err\n")
+    assert not result.ok and result.error == "err\n"
+
+    assert run_command("echo hello", shell=True).stdout == "hello\n"
+
+
+def test_large_output_is_bounded():
+    script = "import sys; sys.stdout.write('a' * 100000 + 'END')"
+    result = run_command([PY, "-c", script], head_bytes=10, tail_bytes=10)
+    assert result.ok and result.truncated
+    assert result.stdout.startswith("a" * 10) and result.stdout.endswith("END")
+    assert len(result.stdout) < 100
+
+
+def test_output_limit_stops_the_command():
+    script = "import sys\nwhile True: sys.stdout.write('x' * 4096)"
+    result = run_command([PY, "-c", script], max_output=64 * 1024)
+    assert result.reason == "output_limit"
+    assert not result.ok
+
+
+def test_timeout_kills_the_process_group():
+    started = time.monotonic()
+    # The shell's child must die with it, or its open pipe would keep the read going.
+    result = run_command(f"{PY} -c 'import time; time.sleep(30)'; echo done", shell=True, timeout=0.5)
+    assert result.reason == "timeout"
+    assert "done" not in result.stdout
+    assert time.monotonic() - started < 10
+
+
+def test_request_deadline_caps_the_timeout():
+    with deadline_scope(0.3):
+        result = run_command([PY, "-c", "import time; time.sleep(30)"], timeout=60)
+    assert result.reason == "timeout"
+
+
+def test_cancelling_the_scope_stops_running_commands():
+    with cancel_scope() as token:
+        threading.Timer(0.3, token.cancel).start()
+        result = run_command([PY, "-c", "import time; time.sleep(30)"])
+    assert result.reason == "cancelled"
+    assert result.error.startswith("Command cancelled.")
+
+    parent = CancellationToken()
+    with cancel_scope(parent), cancel_scope() as child:
+        parent.cancel()
+        assert child.cancelled
+
+
+def test_commands_run_concurrently_up_to_the_limit(monkeypatch):
+    monkeypatch.setenv("SWARM_MAX_CONCURRENT_COMMANDS", "2")
+    reset_command_limits()
+    sleep = [PY, "-c", "import time; time.sleep(0.5)"]
+
+    async def main():
+        started = time.monotonic()
+        results = await asyncio.gather(*(run_command_async(sleep) for _ in range(4)))
+        return results, time.monotonic() - started
+
+    try:
+        results, elapsed = asyncio.run(main())
+    finally:
+        reset_command_limits()
+    assert all(result.ok for result in results)
+    # Two batches of two, not four sequential runs and not all four at once.
+    assert 0.9 < elapsed < 1.9
+
+
+def test_cancel_on_disconnect_cancels_the_request_token():
+    seen = {}
+
+    async def app(scope, receive, send):
+        token = scope["swarm.cancellation"]
+        assert (await receive())["type"] == "http.request"
+        for _ in range(50):
+            if token.cancelled:
+                break
+            await asyncio.sleep(0.01)
+        seen["reason"] = token.reason
+
+    async def main():
+        messages = asyncio.Queue()
+        await messages.put({"type": "http.request", "body": b"", "more_body": False})
+        task = asyncio.ensure_future(CancelOnDisconnect(app)({"type": "http"}, messages.get, None))
+        await asyncio.sleep(0.05)
+        await messages.put({"type": "http.disconnect"})
+        await task
+
+    asyncio.run(main())
+    assert seen["reason"] == "client disconnected"
+
+
+@pytest.mark.parametrize("status", [0, 1])
+def test_error_text_falls_back_to_stdout(status):
+    result = run_command([PY, "-c", f"import sys; print('only stdout'); sys.exit({status})"])
+    assert result.ok is (status == 0)
+    if not result.ok:
+        assert result.error == "only stdout\n"
@@ -1,11 +1,13 @@
 import os
 import pytest
-from src.swarm.utils.redact import redact_sensitive_data
+from src.swarm.utils.redact import clear_registered_secrets, redact_sensitive_data
 
 @pytest.fixture(autouse=True)
 def setup_env(monkeypatch):
     # Set up environment variables for testing so that "secretvalue" is considered sensitive.
     monkeypatch.setenv("TEST_API_KEY", "secretvalue")
+    yield
+    clear_registered_secrets()
 
 def test_redact_sensitive_key_in_dict(monkeypatch):
     data = {"api_key": "secretvalue", "other": "value"}
@@ -15,9 +17,11 @@ def test_redact_sensitive_key_in_dict(monkeypatch):
     assert result["other"] == "value"
 
 def test_no_redaction_for_non_sensitive_key(monkeypatch):
-    data = {"username": "secretvalue"}
+    data = {"username": "someuser"}
     result = redact_sensitive_data(data, reveal_chars=3, mask="***")
-    assert result["username"] == "secretvalue"
+    assert result["username"] == "someuser"
+    # A known secret is still masked, whatever the key.
+    assert redact_sensitive_data({"username": "secretvalue"}, reveal_chars=3, mask="***") == {"username": "sec***lue"}
 
 def test_redact_in_nested_structure(monkeypatch):
     data = {"outer": {"token": "secretvalue", "info": "data"}, "list": [{"api_key": "secretvalue"}, "nochange"]}
@@ -40,4 +44,38 @@ def test_short_string(monkeypatch):
     monkeypatch.setenv("SHORT", short_value)
     data = {"api_key": short_value}
     result = redact_sensitive_data(data, reveal_chars=3, mask="###")
-    assert result["api_key"] == "###"
\ No newline at end of file
+    assert result["api_key"] == "###"
+
+def test_redacts_secret_embedded_in_string(monkeypatch):
+    monkeypatch.setenv("EMBEDDED_SERVICE_TOKEN", "tok-0123456789")
+    data = ["Authorization: Bearer tok-0123456789 sent", {"note": "tok-0123456789"}]
+    result = redact_sensitive_data(data, reveal_chars=3, mask="***")
+    assert result[0] == "Authorization: Bearer tok***789 sent"
+    assert result[1] == {"note": "tok***789"}
+
+def test_redacts_secret_embedded_in_dict_value(monkeypatch):
+    monkeypatch.setenv("MY_API_KEY", "sk-supersecret123")
+    monkeypatch.setenv("MODEL_NAME", "gpt-4o-mini")
+    data = {"url": "https://h/?k=sk-supersecret123", "model": "gpt-4o-mini"}
+    result = redact_sensitive_data(data)
+    assert result == {"url": "https://h/?k=sk-s****t123", "model": "gpt-4o-mini"}
+
+def test_case_insensitive_keys_and_shared_unchanged_subtrees():
+    untouched = {"model": "gpt-4o", "args": ["-y", "server"]}
+    data = {"API_KEY": "abcdefghij", "profile": untouched}
+    result = redact_sensitive_data(data, reveal_chars=2, mask="*")
+    assert result["API_KEY"] == "ab*ij"
+    assert result["profile"] is untouched
+    assert data["API_KEY"] == "abcdefghij"
+
+def test_registered_config_secrets_are_redacted():
+    from src.swarm.utils.redact import collect_secrets, register_secrets
+    config = {"llm": {"default": {"api_key": "sk-config-only-secret", "model": "m"}}}
+    register_secrets(collect_secrets(config))
+    assert redact_sensitive_data("key=sk-config-only-secret", reveal_chars=2, mask="..") == "key=sk..et"
+
+def test_clearing_registered_secrets():
+    from src.swarm.utils.redact import register_secrets
+    register_secrets(["sk-config-only-secret"])
+    clear_registered_secrets()
+    assert redact_sensitive_data("key=sk-config-only-secret") == "key=sk-config-only-secret"
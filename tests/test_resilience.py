@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from src.swarm.utils.metrics import registry
+from src.swarm.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    RetryPolicy,
+    async_call_with_resilience,
+    breaker_states,
+    call_with_resilience,
+    current_deadline,
+    deadline_scope,
+    get_breaker,
+    is_retryable,
+    reset_breakers,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+FAST = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.002)
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    delays = [policy.backoff(10) for _ in range(50)]
+    assert all(0 <= d <= 4.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_is_retryable_follows_status_and_cause():
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+    try:
+        try:
+            raise TimeoutError("slow")
+        except TimeoutError as e:
+            raise RuntimeError("Failed to list tools.") from e
+    except RuntimeError as wrapped:
+        assert is_retryable(wrapped)
+    assert not is_retryable(CircuitOpenError("x", 1.0))
+
+
+def test_retries_transient_errors_then_succeeds():
+    calls = []
+
+    def flaky(timeout):
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise StatusError(503)
+        return "ok"
+
+    assert call_with_resilience(flaky, backend="llm:test", policy=FAST) == "ok"
+    assert len(calls) == 3
+    assert registry.get("swarm_backend_retries_total", {"backend": "llm:test"}) >= 2
+
+
+def test_non_retryable_error_is_raised_immediately():
+    calls = []
+
+    def bad_request(timeout):
+        calls.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        call_with_resilience(bad_request, backend="llm:test", policy=FAST)
+    assert len(calls) == 1
+    assert get_breaker("llm:test").state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_and_half_open_probe_closes_it():
+    now = [0.0]
+    breaker = CircuitBreaker("mcp:test", failure_threshold=2, recovery_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after == pytest.approx(10)
+
+    now[0] = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    now = [0.0]
+    breaker = CircuitBreaker("mcp:test", failure_threshold=1, recovery_timeout=5, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 5.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_open_breaker_fails_fast_and_is_exported():
+    def down(timeout):
+        raise ConnectionError("refused")
+
+    config = {"failure_threshold": 3, "recovery_timeout": 60}
+    with pytest.raises(ConnectionError):
+        call_with_resilience(down, backend="llm:down", policy=FAST, breaker_config=config)
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience(down, backend="llm:down", policy=FAST, breaker_config=config)
+
+    assert breaker_states()["llm:down"] == CircuitBreaker.OPEN
+    assert 'swarm_circuit_breaker_state{backend="llm:down"} 2' in registry.render()
+
+
+def test_deadline_caps_attempt_timeout_and_stops_retries():
+    seen = []
+
+    def slow(timeout):
+        seen.append(timeout)
+        raise TimeoutError("slow")
+
+    policy = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=1.0, timeout=30)
+    with deadline_scope(0.5):
+        with pytest.raises(TimeoutError):
+            call_with_resilience(slow, backend="llm:slow", policy=policy)
+    assert seen and seen[0] <= 0.5
+    assert len(seen) < 5
+
+    with deadline_scope(0.0):
+        with pytest.raises(DeadlineExceeded):
+            call_with_resilience(lambda timeout: "never", backend="llm:slow", policy=policy)
+
+
+def test_nested_deadline_scope_keeps_earlier_deadline():
+    with deadline_scope(1.0) as outer:
+        with deadline_scope(100.0) as inner:
+            assert inner is outer
+        with deadline_scope(None) as same:
+            assert same is outer
+    assert current_deadline() is None
+
+
+def test_hedged_request_returns_fastest_result():
+    release = threading.Event()
+    calls = []
+
+    def call(timeout):
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(2)
+            return "slow"
+        return "fast"
+
+    start = time.monotonic()
+    assert call_with_resilience(call, backend="llm:hedge", policy=FAST, hedge_after=0.05) == "fast"
+    assert time.monotonic() - start < 1
+    release.set()
+    assert registry.get("swarm_backend_hedges_total", {"backend": "llm:hedge"}) >= 1
+
+
+def test_async_call_retries_and_hedges():
+    calls = []
+
+    async def flaky(timeout):
+        calls.append(1)
+        if len(calls) == 1:
+            raise asyncio.TimeoutError()
+        if len(calls) == 2:
+            await asyncio.sleep(5)
+        return "ok"
+
+    async def main():
+        return await async_call_with_resilience(flaky, backend="mcp:async", policy=FAST, hedge_after=0.05)
+
+    assert asyncio.run(main()) == "ok"
+    assert len(calls) == 3
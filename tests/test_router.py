@@ -0,0 +1,190 @@
+import json
+import threading
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from src.swarm import passthrough
+from src.swarm.core import Swarm
+from src.swarm.router import EndpointPool, Endpoint, NoEndpointAvailable, build_pool, get_router
+from src.swarm.types import Agent
+from src.swarm.utils.resilience import get_breaker, reset_breakers
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+LLM_PROFILES = {
+    "box-a": {"provider": "ollama", "model": "llama3", "base_url": "http://box-a:11434/v1", "api_key": ""},
+    "box-b": {"provider": "ollama", "model": "llama3", "base_url": "http://box-b:11434/v1", "api_key": ""},
+    "openai": {"provider": "openai", "model": "gpt-4o-mini", "api_key": "sk-test"},
+    "local": {
+        "passthrough": True,
+        "endpoints": [
+            {"profile": "box-a", "weight": 2, "max_concurrency": 2},
+            {"profile": "box-b", "max_concurrency": 1},
+            {"profile": "openai", "weight": 0.5},
+        ],
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+def make_pool(**kwargs):
+    return EndpointPool("p", [Endpoint("a", {"base_url": "http://a"}, **kwargs), Endpoint("b", {"base_url": "http://b"})])
+
+
+def test_build_pool_merges_profiles():
+    pool = build_pool("local", LLM_PROFILES)
+    assert [e.name for e in pool.endpoints] == ["box-a", "box-b", "openai"]
+    assert pool.endpoints[0].config["base_url"] == "http://box-a:11434/v1"
+    assert pool.endpoints[0].weight == 2
+    assert pool.endpoints[1].max_concurrency == 1
+    with pytest.raises(ValueError):
+        build_pool("local", {"local": {"endpoints": [{"profile": "missing"}]}})
+
+
+def test_pooled_breaker_uses_configured_thresholds():
+    profiles = {
+        "box-a": dict(LLM_PROFILES["box-a"], circuit_breaker={"failure_threshold": 1, "recovery_timeout": 7}),
+        "local": {"endpoints": [{"profile": "box-a"}]},
+    }
+    pool = build_pool("local", profiles)
+    pool.acquire()
+    breaker = get_breaker("llm:http://box-a:11434/v1")
+    assert (breaker.failure_threshold, breaker.recovery_timeout) == (1, 7)
+
+
+def test_least_outstanding_respects_weights():
+    pool = make_pool(weight=2)
+    leased = [pool.acquire() for _ in range(3)]
+    assert [e.name for e in leased].count("a") == 2
+
+
+def test_ewma_prefers_faster_endpoint():
+    pool = EndpointPool("p", [Endpoint("slow", {"base_url": "s"}), Endpoint("fast", {"base_url": "f"})], strategy="ewma")
+    pool.release(pool.acquire(exclude=["fast"]), latency=1.0)
+    pool.release(pool.acquire(exclude=["slow"]), latency=0.1)
+    assert pool.acquire().name == "fast"
+
+
+def test_concurrency_limit_blocks_until_release():
+    pool = EndpointPool("p", [Endpoint("only", {"base_url": "o"}, max_concurrency=1)], queue_timeout=0.05)
+    first = pool.acquire()
+    with pytest.raises(NoEndpointAvailable):
+        pool.acquire()
+
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    assert pool.acquire(timeout=2).name == "only"
+
+
+def test_failover_on_429_and_skip_open_circuit():
+    pool = make_pool(weight=10)
+    seen = []
+
+    def call(endpoint):
+        seen.append(endpoint.name)
+        if endpoint.name == "a":
+            raise StatusError(429)
+        return endpoint.name
+
+    assert pool.call(call) == "b"
+    assert seen == ["a", "b"]
+    assert all(e.outstanding == 0 for e in pool.endpoints)
+
+    breaker = get_breaker("llm:http://a")
+    while breaker.state != "open":
+        breaker.record_failure()
+    seen.clear()
+    assert pool.call(call) == "b"
+    assert seen == ["b"]
+
+
+def test_non_transient_error_does_not_fail_over():
+    pool = make_pool(weight=10)
+    calls = []
+
+    def call(endpoint):
+        calls.append(endpoint.name)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        pool.call(call)
+    assert calls == ["a"]
+
+
+def test_streamed_result_holds_lease_until_consumed():
+    pool = make_pool()
+    stream = pool.call(lambda endpoint: iter([1, 2]), stream=True)
+    assert sum(e.outstanding for e in pool.endpoints) == 1
+    assert list(stream) == [1, 2]
+    assert sum(e.outstanding for e in pool.endpoints) == 0
+
+
+def test_get_chat_completion_routes_through_pool():
+    config = {"llm": dict(LLM_PROFILES, default=LLM_PROFILES["openai"])}
+    with patch("src.swarm.core.OpenAI"):
+        swarm = Swarm(config=config)
+    assert swarm.router is get_router(config["llm"])
+
+    clients = {}
+
+    def client_for(llm_config):
+        client = clients.setdefault(llm_config.get("base_url"), MagicMock())
+        if llm_config.get("base_url") == "http://box-a:11434/v1":
+            client.chat.completions.create.side_effect = StatusError(503)
+        return client
+
+    with patch.object(swarm, "_get_client", side_effect=client_for):
+        for _ in range(2):
+            swarm.get_chat_completion(
+                agent=Agent(name="A", model="local"), history=[], context_variables={},
+                model_override=None, stream=False, debug=False,
+            )
+
+    models = [
+        call.kwargs["model"]
+        for client in clients.values()
+        for call in client.chat.completions.create.call_args_list
+    ]
+    assert "llama3" in models
+    assert clients["http://box-a:11434/v1"].chat.completions.create.call_count >= 1
+    assert sum(e.outstanding for e in swarm.router.pool("local").endpoints) == 0
+
+
+def test_passthrough_forwards_to_pool_endpoint(monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.host == "box-a":
+            return httpx.Response(429, json={"error": "busy"})
+        body = json.dumps({"id": "chatcmpl-1", "model": json.loads(request.content)["model"]}).encode()
+        return httpx.Response(200, headers={"content-type": "application/json"}, stream=httpx.ByteStream(body))
+
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(passthrough, "_get_client", lambda base_url: httpx.Client(base_url=base_url, transport=transport))
+    profiles = json.loads(json.dumps(LLM_PROFILES))
+    profiles["local"]["endpoints"][0]["weight"] = 100
+
+    proxied = passthrough.proxy_chat_completion(
+        "local", {"model": "local", "messages": [{"role": "user", "content": "hi"}]}, profiles
+    )
+    pool = get_router(profiles).pool("local")
+    assert pool.endpoints[1].outstanding == 1
+
+    content = b"".join(proxied)
+
+    assert proxied.status_code == 200
+    assert json.loads(content)["model"] == "llama3"
+    assert [r.url.host for r in requests] == ["box-a", "box-b"]
+    assert pool.endpoints[1].outstanding == 0
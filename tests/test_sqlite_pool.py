@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+from src.swarm.db.sqlite import SQLitePool, SQLiteTools, close_pools, get_pool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SQLitePool(str(tmp_path / "blueprint.db"))
+    pool.executescript("""
+        CREATE TABLE services (id INTEGER PRIMARY KEY, name TEXT NOT NULL, type TEXT NOT NULL);
+        CREATE INDEX services_type ON services (type);
+    """)
+    yield pool
+    pool.close()
+
+
+def test_connections_are_per_thread_and_reused(pool):
+    conn = pool.connection()
+    assert pool.connection() is conn
+    assert pool.query_one("PRAGMA journal_mode")[0] == "wal"
+    assert pool.query_one("PRAGMA busy_timeout")[0] == 5000
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(pool.connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_executemany_commits_in_batches(pool):
+    rows = ((f"svc{i}", "hosting") for i in range(1050))
+    assert pool.executemany("INSERT INTO services (name, type) VALUES (?, ?)", rows, batch_size=100) == 1050
+    assert pool.query_one("SELECT COUNT(*) FROM services")[0] == 1050
+    assert not pool.connection().in_transaction
+
+
+def test_failed_transaction_rolls_back(pool):
+    with pytest.raises(RuntimeError):
+        with pool.transaction() as conn:
+            conn.execute("INSERT INTO services (name, type) VALUES ('a', 'b')")
+            raise RuntimeError("boom")
+    assert pool.query("SELECT * FROM services") == []
+
+
+def test_shared_pools_are_keyed_by_path(tmp_path):
+    path = str(tmp_path / "shared.db")
+    try:
+        assert get_pool(path) is get_pool(str(tmp_path / "." / "shared.db"))
+    finally:
+        close_pools()
+
+
+def test_sqlite_tools_match_the_mcp_server(pool):
+    tools = SQLiteTools(pool)
+    assert tools.write_query("INSERT INTO services (name, type) VALUES ('fly', 'hosting')") == "[{'affected_rows': 1}]"
+    assert tools.read_query("SELECT name, type FROM services") == "[{'name': 'fly', 'type': 'hosting'}]"
+    assert tools.list_tables() == "[{'name': 'services'}]"
+    assert "'name': 'type'" in tools.describe_table("services")
+    assert tools.create_table("CREATE TABLE notes (body TEXT)") == "Table created successfully"
+    assert tools.read_query("DELETE FROM services") == "Error: Only SELECT queries are allowed for read_query"
+    assert tools.write_query("SELECT 1") == "Error: SELECT queries are not allowed for write_query"
+    assert tools.read_query("SELECT * FROM missing").startswith("Database error: no such table")
+    assert tools.append_insight("fly is free") == "Insight added to memo"
@@ -0,0 +1,233 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from django.test import RequestFactory, TestCase
+from openai.types.chat import ChatCompletionChunk
+from src.swarm.core import Swarm
+from src.swarm.events import DeltaEvent, FinalEvent, ToolStartEvent
+from src.swarm.streaming import StreamAssembler
+from src.swarm.types import Agent, Response
+
+
+def chunk(**delta):
+    return ChatCompletionChunk.model_validate({
+        "id": "c1", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+    })
+
+
+def tool_call_delta(name=None, arguments="", call_id=None):
+    function = {"arguments": arguments}
+    if name:
+        function["name"] = name
+    return [{"index": 0, "id": call_id, "type": "function" if call_id else None, "function": function}]
+
+
+def make_swarm():
+    agents = {}
+
+    def handoff_to_helper(reason: str) -> Agent:
+        return agents["Helper"]
+
+    agents["Triage"] = Agent(name="Triage", functions=[handoff_to_helper])
+    agents["Helper"] = Agent(name="Helper", functions=[])
+    with patch("src.swarm.core.OpenAI"):
+        swarm = Swarm(config={"llm": {"default": {"model": "gpt-4o", "api_key": "sk-test"}}})
+    swarm.agents.update(agents)
+    swarm.agent_graph = asyncio.run(swarm.compile_agent_graph())
+    return swarm
+
+
+def test_run_stream_yields_typed_events():
+    swarm = make_swarm()
+    turns = iter([
+        [
+            chunk(role="assistant", tool_calls=tool_call_delta("handoff_to_helper", call_id="call_1")),
+            chunk(tool_calls=tool_call_delta(arguments='{"reason": ')),
+            chunk(tool_calls=tool_call_delta(arguments='"poetry"}')),
+        ],
+        [chunk(role="assistant", content="Hel"), chunk(content="lo")],
+    ])
+
+    with patch.object(swarm, "get_chat_completion", side_effect=lambda **kwargs: iter(next(turns))):
+        events = list(swarm.run_stream(agent=swarm.agents["Triage"], messages=[{"role": "user", "content": "hi"}]))
+
+    assert [event.type for event in events] == [
+        "tool_call_delta", "tool_call_delta", "tool_call_delta", "message", "tool_start", "tool_end", "handoff",
+        "delta", "delta", "message", "final",
+    ]
+    assert [(event.id, event.name) for event in events[:3]] == [("call_1", "handoff_to_helper"), (None, None), (None, None)]
+    assert events[4].name == "handoff_to_helper" and json.loads(events[4].arguments) == {"reason": "poetry"}
+    assert events[6].to_dict() == {"type": "handoff", "from_agent": "Triage", "to_agent": "Helper"}
+    assert events[9].to_dict() == {"type": "message", "agent": "Helper",
+                                   "message": {"role": "assistant", "content": "Hello", "sender": "Helper"}}
+    assert "".join(event.content for event in events if isinstance(event, DeltaEvent)) == "Hello"
+
+    response = events[-1].response
+    assert response.agent.name == "Helper"
+    assert response.context_variables["active_agent_name"] == "Helper"
+    assert [message["role"] for message in response.messages] == ["assistant", "tool", "assistant"]
+    assert response.messages[-1] == {"role": "assistant", "content": "Hello", "sender": "Helper"}
+
+
+def test_assembler_reads_deltas_without_modifying_them():
+    deltas = [
+        {"role": "assistant", "content": "Let me check. "},
+        {"tool_calls": [{"index": 1, "id": "call_b", "type": "function", "function": {"name": "beta", "arguments": ""}}]},
+        {"tool_calls": [{"index": 0, "id": "call_a", "type": "function", "function": {"name": "alpha", "arguments": "{"}}]},
+        {"tool_calls": [{"index": 1, "function": {"arguments": "{}"}}, {"index": 0, "function": {"arguments": "}"}}]},
+    ]
+    frozen = json.dumps(deltas)
+    assembler = StreamAssembler("Triage")
+    events = [event for delta in deltas for event in assembler.add(delta)]
+
+    assert json.dumps(deltas) == frozen
+    assert [event.type for event in events] == ["delta", "tool_call_delta", "tool_call_delta", "tool_call_delta", "tool_call_delta"]
+    message = assembler.message()
+    assert message.content == "Let me check. " and message.sender == "Triage"
+    assert [(tc.id, tc.function.name, tc.function.arguments) for tc in message.tool_calls] == [
+        ("call_a", "alpha", "{}"), ("call_b", "beta", "{}"),
+    ]
+
+
+def test_assembler_accepts_sdk_deltas():
+    assembler = StreamAssembler("Solo")
+    for part in ["a", "b", None, "c"]:
+        assembler.add(chunk(content=part).choices[0].delta)
+    assert assembler.message() == {"role": "assistant", "content": "abc", "sender": "Solo"}
+    assert StreamAssembler("Solo").message().content is None
+
+
+def test_run_and_stream_keeps_the_original_chunk_format():
+    swarm = make_swarm()
+    completion = [chunk(role="assistant", content="Hi"), chunk(content="!")]
+
+    with patch.object(swarm, "get_chat_completion", return_value=iter(completion)):
+        chunks = list(swarm.run_and_stream(agent=swarm.agents["Helper"], messages=[{"role": "user", "content": "hi"}]))
+
+    assert chunks[:4] == [
+        {"delim": "start"},
+        {"role": "assistant", "sender": "Helper", "content": "Hi"},
+        {"role": "assistant", "sender": "Helper", "content": "!"},
+        {"delim": "end"},
+    ]
+    assert chunks[-1]["response"].messages == [{"role": "assistant", "content": "Hi!", "sender": "Helper"}]
+
+
+def make_blueprint(run_with_context=None):
+    from src.swarm.extensions.blueprint.blueprint_base import BlueprintBase
+
+    attrs = {"metadata": {}, "create_agents": lambda self: {}}
+    if run_with_context:
+        attrs["run_with_context"] = run_with_context
+    blueprint_class = type("StreamingBlueprint", (BlueprintBase,), attrs)
+    agent = Agent(name="Solo", functions=[])
+
+    class FakeSwarm:
+        agents = {"Solo": agent}
+
+        def run_stream(self, agent, messages, context_variables):
+            yield DeltaEvent(agent.name, "hi")
+            yield FinalEvent(Response(messages=[], agent=agent, context_variables={**context_variables, "seen": True}))
+
+    blueprint = blueprint_class.__new__(blueprint_class)
+    blueprint.context_variables = {"user_goal": ""}
+    blueprint.starting_agent = agent
+    blueprint.swarm = FakeSwarm()
+    return blueprint
+
+
+def test_run_with_context_stream_ends_with_request_context():
+    blueprint = make_blueprint()
+    events = list(blueprint.run_with_context_stream([{"role": "user", "content": "hi"}], {"channel_id": "c1"}))
+
+    assert [event.type for event in events] == ["delta", "final"]
+    assert events[-1].context_variables == {
+        "user_goal": "", "channel_id": "c1", "active_agent_name": "Solo", "seen": True,
+    }
+    assert blueprint.context_variables == {"user_goal": ""}
+
+
+def test_run_with_context_stream_respects_custom_run_with_context():
+    blueprint = make_blueprint(lambda self, messages, context: {"response": "custom", "context_variables": context})
+    events = list(blueprint.run_with_context_stream([], {"x": 1}))
+    assert len(events) == 1 and events[0].response == "custom" and events[0].context_variables == {"x": 1}
+
+
+class StreamingViewTest(TestCase):
+    def test_chat_completion_streams_server_sent_events(self):
+        from swarm import views
+        from swarm.events import DeltaEvent, FinalEvent, ToolStartEvent
+
+        class Blueprint:
+            def run_with_context_stream(self, messages, context_variables):
+                yield DeltaEvent("Solo", "Hel")
+                yield ToolStartEvent("Solo", "call_1", "lookup", "{}")
+                yield DeltaEvent("Solo", "lo")
+                yield FinalEvent(Response(messages=[], agent=None, context_variables={}), {"active_agent_name": "Solo"})
+
+        request = RequestFactory().post("/v1/chat/completions")
+        response = views.stream_chat_completion(request, Blueprint(), "echo", [], {}, None)
+        assert response["Content-Type"] == "text/event-stream"
+
+        frames = b"".join(response.streaming_content).decode().split("\n\n")
+        assert frames[-2:] == ["data: [DONE]", ""]
+        chunks = [json.loads(frame[len("data: "):]) for frame in frames[:-2]]
+        assert [c["choices"][0]["delta"].get("content") if c["choices"] else c["event"]["type"] for c in chunks[:3]] == \
+            ["Hel", "tool_start", "lo"]
+        assert chunks[0]["choices"][0]["delta"] == {"role": "assistant", "content": "Hel", "sender": "Solo"}
+        assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+        assert chunks[-1]["context_variables"] == {"active_agent_name": "Solo"}
+
+    async def test_asgi_stream_closes_the_run_when_the_client_goes_away(self):
+        from django.test import AsyncRequestFactory
+        from swarm import views
+        from swarm.events import DeltaEvent
+
+        closed = []
+
+        class Blueprint:
+            def run_with_context_stream(self, messages, context_variables):
+                try:
+                    while True:
+                        yield DeltaEvent("Solo", "tick")
+                finally:
+                    closed.append(True)
+
+        request = AsyncRequestFactory().post("/v1/chat/completions")
+        response = views.stream_chat_completion(request, Blueprint(), "echo", [], {}, None)
+        body = response._iterator  # the view's own generator; streaming_content wraps it
+        assert "tick" in await body.__anext__()
+        await body.aclose()
+        assert closed == [True]
+
+    async def test_asgi_stream_closes_the_run_when_the_client_goes_away_during_a_step(self):
+        import asyncio
+        import time
+        from django.test import AsyncRequestFactory
+        from swarm import views
+        from swarm.events import DeltaEvent
+
+        closed = []
+
+        class Blueprint:
+            def run_with_context_stream(self, messages, context_variables):
+                try:
+                    yield DeltaEvent("Solo", "tick")
+                    time.sleep(0.3)  # a slow model call
+                    while True:
+                        yield DeltaEvent("Solo", "tock")
+                finally:
+                    closed.append(True)
+
+        request = AsyncRequestFactory().post("/v1/chat/completions")
+        response = views.stream_chat_completion(request, Blueprint(), "echo", [], {}, None)
+        body = response._iterator
+        assert "tick" in await body.__anext__()
+        step = asyncio.ensure_future(body.__anext__())
+        await asyncio.sleep(0.05)
+        step.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await step
+        assert closed == [True]
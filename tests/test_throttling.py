@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+from django.test import AsyncClient, Client, TestCase, override_settings
+from src.swarm.throttling import (
+    AdmissionController, MemoryAdmissionBackend, Overloaded, parse_rate, tenant_key,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_rate():
+    assert parse_rate("") is None
+    assert parse_rate("120/minute") == (2.0, 120.0)
+    assert parse_rate("5/s") == (5.0, 5.0)
+    with pytest.raises(ValueError):
+        parse_rate("10/fortnight")
+
+
+def test_token_bucket_refills_and_reports_wait():
+    clock = FakeClock()
+    backend = MemoryAdmissionBackend(clock=clock)
+    assert [backend.take("t", rate=1.0, burst=2) for _ in range(2)] == [0.0, 0.0]
+    assert backend.take("t", rate=1.0, burst=2) == pytest.approx(1.0)
+    assert backend.take("other", rate=1.0, burst=2) == 0.0
+
+    clock.now += 1.5
+    assert backend.take("t", rate=1.0, burst=2) == 0.0
+
+
+def test_bucket_store_is_bounded():
+    backend = MemoryAdmissionBackend(max_keys=2)
+    for tenant in ("a", "b", "c"):
+        backend.take(tenant, rate=1.0, burst=1)
+    assert list(backend._buckets) == ["b", "c"]
+
+
+def test_expired_leases_are_reclaimed():
+    clock = FakeClock()
+    backend = MemoryAdmissionBackend(clock=clock)
+    assert backend.acquire_slot("g", 1, "l1", ttl=10)
+    assert not backend.acquire_slot("g", 1, "l2", ttl=10)
+    clock.now += 11
+    assert backend.acquire_slot("g", 1, "l2", ttl=10)
+
+
+def test_queued_request_gets_released_slot():
+    controller = AdmissionController(MemoryAdmissionBackend(), max_in_flight=1, max_queue=1, queue_timeout=2)
+    first = controller.acquire()
+    threading.Timer(0.1, controller.release, args=(first,)).start()
+    second = controller.acquire()
+    assert second is not None and second != first
+    assert controller.in_flight() == 1
+
+
+def test_full_queue_and_queue_timeout_shed_load():
+    controller = AdmissionController(MemoryAdmissionBackend(), max_in_flight=1, max_queue=0, queue_timeout=0.1)
+    controller.acquire()
+    with pytest.raises(Overloaded) as excinfo:
+        controller.acquire()
+    assert excinfo.value.retry_after >= 1
+
+    controller.max_queue = 1
+    with pytest.raises(Overloaded):
+        controller.acquire(timeout=0.1)
+
+
+def test_backend_errors_fail_open():
+    class BrokenBackend:
+        def take(self, *args):
+            raise ConnectionError("redis down")
+
+        def acquire_slot(self, *args):
+            raise ConnectionError("redis down")
+
+    controller = AdmissionController(BrokenBackend(), rate="1/minute", max_in_flight=1)
+    assert controller.check_rate("t") == 0.0
+    assert controller.acquire() is not None
+
+
+def test_tenant_key():
+    class User:
+        pk = 7
+        is_authenticated = True
+
+    assert tenant_key(User()) == "user:7"
+    assert tenant_key(object(), "Bearer abc").startswith("token:")
+    assert tenant_key(object(), "Bearer abc") != tenant_key(object(), "Bearer abd")
+    assert tenant_key(object(), remote_addr="10.0.0.1") == "ip:10.0.0.1"
+
+
+class ChatCompletionsAdmissionTest(TestCase):
+    def setUp(self):
+        self.original_env = {k: os.environ.get(k) for k in ("ENABLE_API_AUTH", "API_AUTH_TOKEN")}
+        os.environ["ENABLE_API_AUTH"] = "True"
+        os.environ["API_AUTH_TOKEN"] = "dummy-token"
+
+    def tearDown(self):
+        for key, value in self.original_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    def post(self):
+        return Client().post(
+            "/v1/chat/completions",
+            data=json.dumps({"model": "no-such-model", "messages": [{"role": "user", "content": "hi"}]}),
+            content_type="application/json",
+            HTTP_AUTHORIZATION="Bearer dummy-token",
+        )
+
+    @override_settings(SWARM_RATE_LIMIT="1/minute", SWARM_MAX_IN_FLIGHT=0)
+    def test_rate_limited_tenant_gets_429(self):
+        self.assertNotEqual(self.post().status_code, 429)
+        response = self.post()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    @override_settings(SWARM_RATE_LIMIT="", SWARM_MAX_IN_FLIGHT=1, SWARM_MAX_QUEUE=0)
+    def test_in_flight_cap_gets_503(self):
+        from swarm.throttling import get_admission_controller
+        controller = get_admission_controller()
+        lease = controller.acquire()
+        try:
+            response = self.post()
+        finally:
+            controller.release(lease)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+        self.assertNotEqual(self.post().status_code, 503)
+        self.assertEqual(controller.in_flight(), 0)
+
+    @override_settings(SWARM_RATE_LIMIT="", SWARM_MAX_IN_FLIGHT=1, SWARM_MAX_QUEUE=4, SWARM_QUEUE_TIMEOUT=5)
+    async def test_asgi_requests_are_rejected_instead_of_queued(self):
+        from swarm.throttling import get_admission_controller
+        controller = get_admission_controller()
+        lease = controller.acquire()
+        started = time.monotonic()
+        try:
+            response = await AsyncClient().post(
+                "/v1/chat/completions",
+                data=json.dumps({"model": "no-such-model", "messages": [{"role": "user", "content": "hi"}]}),
+                content_type="application/json",
+                headers={"Authorization": "Bearer dummy-token"},
+            )
+        finally:
+            controller.release(lease)
+        self.assertEqual(response.status_code, 503)
+        self.assertLess(time.monotonic() - started, 2)
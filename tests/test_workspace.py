@@ -0,0 +1,130 @@
+import os
+
+import pytest
+from src.swarm.utils import workspace as workspace_module
+from src.swarm.utils.workspace import SearchMatch, Workspace, required_literals
+
+
+def write(root, rel_path, content):
+    path = root / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content)
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    write(tmp_path, ".gitignore", "*.log\nbuild/\n!keep.log\n/top_only.txt\n")
+    write(tmp_path, "main.py", "import os\n\ndef main():\n    return os.getcwd()\n")
+    write(tmp_path, "keep.log", "kept\n")
+    write(tmp_path, "debug.log", "ignored\n")
+    write(tmp_path, "top_only.txt", "ignored\n")
+    write(tmp_path, "pkg/top_only.txt", "not anchored here\n")
+    write(tmp_path, "pkg/.gitignore", "secret.py\n")
+    write(tmp_path, "pkg/secret.py", "def main(): pass\n")
+    write(tmp_path, "pkg/util.py", "def helper():\n    return 'main'\n")
+    write(tmp_path, "build/out.py", "def main(): pass\n")
+    write(tmp_path, "node_modules/dep/index.js", "function main() {}\n")
+    write(tmp_path, "image.bin", b"\x00\x01def main")
+    return tmp_path
+
+
+def test_files_honour_gitignore(tree):
+    files = Workspace(str(tree)).files()
+    assert sorted(files) == [
+        ".gitignore", "image.bin", "keep.log", "main.py", "pkg/.gitignore", "pkg/top_only.txt", "pkg/util.py",
+    ]
+    assert Workspace(str(tree)).files("pkg", recursive=False) == ["pkg/.gitignore", "pkg/top_only.txt", "pkg/util.py"]
+
+
+def test_listing_is_revalidated_by_mtime(tree):
+    workspace = Workspace(str(tree))
+    assert "pkg/new.py" not in workspace.files()
+    write(tree, "pkg/new.py", "x = 1\n")
+    assert "pkg/new.py" in workspace.files()
+
+    gitignore = tree / "pkg" / ".gitignore"
+    gitignore.write_text("secret.py\nnew.py\n")
+    stat = gitignore.stat()
+    os.utime(gitignore, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert "pkg/new.py" not in workspace.files()
+
+
+def test_search_reports_lines_and_respects_limit(tree):
+    workspace = Workspace(str(tree))
+    assert workspace.search(r"def \w+\(") == [
+        SearchMatch("main.py", 3, "def main():"),
+        SearchMatch("pkg/util.py", 1, "def helper():"),
+    ]
+    assert len(workspace.search("main", limit=1)) == 1
+    assert workspace.search("MAIN") == []
+    assert [m.path for m in workspace.search("MAIN", case_insensitive=True)] == ["main.py", "pkg/util.py"]
+    assert workspace.search("main", recursive=False)[0].path == "main.py"
+    assert all(m.path != "pkg/util.py" for m in workspace.search("main", recursive=False))
+
+
+def test_trigram_index_skips_files_without_required_literals(tree, monkeypatch):
+    workspace = Workspace(str(tree), trigram_index=True)
+    scanned = []
+    original = workspace_module._scan_batch
+
+    def spy(root, paths, *args):
+        scanned.extend(paths)
+        return original(root, paths, *args)
+
+    monkeypatch.setattr(workspace_module, "_scan_batch", spy)
+    assert [m.path for m in workspace.search(r"getcwd\(\)")] == ["main.py"]
+    assert scanned == ["main.py"]
+
+    write(tree, "pkg/util.py", "import os\nos.getcwd()\n")
+    assert [m.path for m in workspace.search(r"getcwd\(\)")] == ["main.py", "pkg/util.py"]
+
+
+def test_trigram_cache_is_bounded_and_forgets_deleted_files(tree, monkeypatch):
+    monkeypatch.setattr(workspace_module, "TRIGRAM_CACHE_FILES", 2)
+    workspace = Workspace(str(tree), trigram_index=True)
+    workspace.search("getcwd")
+    assert list(workspace._trigrams) == ["pkg/top_only.txt", "pkg/util.py"]
+
+    files = workspace.files()
+    (tree / "pkg" / "util.py").unlink()
+    workspace._candidates(files, "getcwd", 0)
+    assert "pkg/util.py" not in workspace._trigrams
+
+
+def test_get_workspace_keeps_recent_workspaces(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace_module, "_workspaces", workspace_module.OrderedDict())
+    monkeypatch.setattr(workspace_module, "WORKSPACE_CACHE_SIZE", 2)
+    roots = [tmp_path / name for name in ("a", "b", "c")]
+    for root in roots:
+        root.mkdir()
+    first = workspace_module.get_workspace(str(roots[0]), trigram_index=False)
+    workspace_module.get_workspace(str(roots[1]), trigram_index=False)
+    assert workspace_module.get_workspace(str(roots[0]), trigram_index=False) is first
+    workspace_module.get_workspace(str(roots[2]), trigram_index=False)
+    assert [key[0] for key in workspace_module._workspaces] == [str(roots[0].resolve()), str(roots[2].resolve())]
+
+
+def test_required_literals():
+    assert required_literals(r"def \w+_handler\(") == ["def ", "_handler("]
+    assert required_literals("foo|bar") == []
+    assert required_literals("a.b") == ["a", "b"]
+
+
+def test_parallel_search_matches_sequential(tree, monkeypatch):
+    for i in range(30):
+        write(tree, f"many/file_{i:02}.py", "x = 1\n" * 50 + f"needle {i}\n")
+    sequential = Workspace(str(tree)).search("needle", limit=25)
+
+    monkeypatch.setenv("SWARM_SEARCH_WORKERS", "2")
+    monkeypatch.setattr(workspace_module, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(workspace_module, "BATCH_FILES", 4)
+    try:
+        parallel = Workspace(str(tree)).search("needle", limit=25)
+    finally:
+        workspace_module.shutdown_search_pool()
+    assert parallel == sequential
+    assert len(parallel) == 25 and parallel[-1].text == "needle 24"
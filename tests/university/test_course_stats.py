@@ -0,0 +1,95 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blueprints.university.models import Course, CourseStats, Enrollment, Student, TeachingUnit, filter_students
+from blueprints.university.stats import refresh_course_stats
+
+
+@pytest.fixture
+def catalogue(db):
+    maths = TeachingUnit.objects.create(code="MTH1", name="Maths")
+    physics = TeachingUnit.objects.create(code="PHY1", name="Physics")
+    science = Course.objects.create(code="BSCI", name="Science", coordinator="Dr A")
+    science.teaching_units.set([maths, physics])
+    empty = Course.objects.create(code="BART", name="Arts", coordinator="Dr B")
+    ann = Student.objects.create(name="Ann", gpa=Decimal("3.00"))
+    bob = Student.objects.create(name="Bob", gpa=Decimal("2.00"), status="idle")
+    # Ann takes both units of the course and must only be counted once.
+    Enrollment.objects.create(student=ann, teaching_unit=maths)
+    Enrollment.objects.create(student=ann, teaching_unit=physics)
+    Enrollment.objects.create(student=bob, teaching_unit=physics)
+    return {"science": science, "empty": empty, "ann": ann, "bob": bob, "maths": maths, "physics": physics}
+
+
+@pytest.mark.django_db
+def test_annotations_match_properties(catalogue):
+    courses = {c.code: c for c in Course.objects.with_stats(materialized=False)}
+    for code, course in courses.items():
+        plain = Course.objects.get(code=code)
+        assert course.enrolled_students_count == plain.enrolled_students_count
+        assert course.average_gpa == pytest.approx(float(plain.average_gpa))
+    assert courses["BSCI"].enrolled_students == 2
+    assert courses["BSCI"].gpa_average == pytest.approx(2.5)
+    assert (courses["BART"].enrolled_students, courses["BART"].gpa_average) == (0, 0.0)
+
+
+@pytest.mark.django_db
+def test_course_list_query_count_is_constant(catalogue):
+    client = Client()
+
+    def list_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get("/v1/university/courses/")
+        assert response.status_code == 200
+        return len(ctx.captured_queries), response.json()
+
+    few, body = list_queries()
+    assert {c["code"]: c["enrolled_students"] for c in body} == {"BSCI": 2, "BART": 0}
+
+    for i in range(10):
+        Course.objects.create(code=f"C{i}", name=f"Course {i}", coordinator="Dr C").teaching_units.add(catalogue["maths"])
+    many, _ = list_queries()
+    assert few == many
+
+
+@pytest.mark.django_db
+def test_filter_students_by_unit_without_duplicates(catalogue):
+    students = filter_students(unit_codes=["MTH1", "PHY1"])
+    assert sorted(s.name for s in students) == ["Ann", "Bob"]
+    assert [s.name for s in filter_students(status="idle", unit_codes=["PHY1"])] == ["Bob"]
+
+
+@pytest.mark.django_db
+@override_settings(UNIVERSITY_COURSE_STATS_TABLE=True)
+def test_materialised_stats_follow_changes(catalogue, django_capture_on_commit_callbacks):
+    science = catalogue["science"]
+    assert refresh_course_stats() == 2
+
+    def stats():
+        row = CourseStats.objects.get(course=science)
+        return row.enrolled_students, row.average_gpa
+
+    assert stats() == (2, pytest.approx(2.5))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        carl = Student.objects.create(name="Carl", gpa=Decimal("4.00"))
+        Enrollment.objects.create(student=carl, teaching_unit=catalogue["maths"])
+    assert stats() == (3, pytest.approx(3.0))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        carl.gpa = Decimal("1.00")
+        carl.save()
+    assert stats() == (3, pytest.approx(2.0))
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        science.teaching_units.remove(catalogue["maths"])
+        Enrollment.objects.filter(student=catalogue["bob"]).delete()
+    assert len(callbacks) == 1
+    assert stats() == (1, pytest.approx(3.0))
+
+    listed = Course.objects.with_stats().get(pk=science.pk)
+    assert (listed.enrolled_students, listed.average_gpa) == (1, pytest.approx(3.0))
@@ -0,0 +1,96 @@
+import pytest
+from django.db import connection
+
+from blueprints.university import search as search_module
+from blueprints.university.model_queries import (
+    comprehensive_search, search_courses, search_enrollments, search_teaching_units,
+)
+from blueprints.university.models import Course, Enrollment, Student, TeachingUnit
+
+fts_only = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="exercises the SQLite FTS5 index"
+)
+
+
+@pytest.fixture
+def courses(db):
+    Course.objects.create(code="BSCI", name="Bachelor of Science", coordinator="Dr Ada")
+    Course.objects.create(code="BART", name="Bachelor of Arts", coordinator="Dr Science Fan")
+    Course.objects.create(code="MSCI", name="Master of Science in Science Education", coordinator="Dr Bob")
+    Course.objects.create(code="BENG", name="Bachelor of Engineering", coordinator="Dr Eve")
+
+
+def icontains_codes(query):
+    return {c.code for c in Course.objects.filter(name__icontains=query)} | {
+        c.code for c in Course.objects.filter(code__icontains=query)
+    } | {c.code for c in Course.objects.filter(coordinator__icontains=query)}
+
+
+@pytest.mark.django_db
+def test_search_matches_icontains_semantics(courses):
+    for query in ("science", "SCI", "achel", "Dr", "nothing here"):
+        assert {row["code"] for row in search_courses(query)} == icontains_codes(query), query
+
+
+@fts_only
+@pytest.mark.django_db
+def test_index_is_used_and_kept_in_sync(courses):
+    assert "swarm_course_fts" in search_module.availability.get(connection)
+
+    course = Course.objects.get(code="BENG")
+    course.name = "Bachelor of Robotics"
+    course.save()
+    assert [row["code"] for row in search_courses("robotics")] == ["BENG"]
+    assert search_courses("engineering") == []
+
+    course.delete()
+    assert search_courses("robotics") == []
+
+
+@fts_only
+@pytest.mark.django_db
+def test_results_are_ranked(courses):
+    codes = [row["code"] for row in search_courses("science")]
+    # Two matching columns beat one.
+    assert codes[0] == "MSCI"
+
+
+@pytest.mark.django_db
+def test_limit_and_offset_page_through_results(courses):
+    everything = search_courses("bachelor", limit=0)
+    assert len(everything) == 3
+    pages = search_courses("bachelor", limit=2) + search_courses("bachelor", limit=2, offset=2)
+    assert pages == everything
+    assert comprehensive_search("bachelor", limit=1)["courses"] == everything[:1]
+
+
+@pytest.mark.django_db
+def test_fallback_without_index(courses, monkeypatch):
+    monkeypatch.setattr(search_module.availability, "get", lambda connection: frozenset())
+    assert [row["code"] for row in search_courses("science")] == ["BSCI", "BART", "MSCI"]
+    # Queries shorter than a trigram always use the fallback.
+    assert {row["code"] for row in search_courses("dr")} == {"BSCI", "BART", "MSCI", "BENG"}
+
+
+@fts_only
+@pytest.mark.django_db
+def test_dropped_triggers_are_repaired():
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER swarm_teachingunit_fts_ai")
+    assert search_module.repair_search_triggers(connection) == ["swarm_teachingunit"]
+    assert search_module.repair_search_triggers(connection) == []
+
+    TeachingUnit.objects.create(code="PHYS101", name="Physics", teaching_prompt="")
+    assert [row["code"] for row in search_teaching_units("phys")] == ["PHYS101"]
+
+
+@pytest.mark.django_db
+def test_teaching_unit_and_enrollment_searches(db):
+    unit = TeachingUnit.objects.create(code="MTHS120", name="Calculus")
+    TeachingUnit.objects.create(code="PHYS101", name="Mechanics", channel_id="C1")
+    Enrollment.objects.create(student=Student.objects.create(name="Ann"), teaching_unit=unit)
+
+    assert [row["id"] for row in search_teaching_units(None)] == [unit.id]
+    assert [row["code"] for row in search_teaching_units("calc")] == ["MTHS120"]
+    # Dates in the results used to break the debug log's json.dumps.
+    assert search_enrollments("enrolled")[0]["status"] == "enrolled"
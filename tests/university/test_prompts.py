@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blueprints.university.models import Course, LearningObjective, Subtopic, TeachingUnit, Topic
+from blueprints.university.prompts import (
+    NO_LEARNING_OBJECTIVES, PromptBundleCache, build_prompt_bundle, prompt_cache,
+)
+
+
+def make_unit(code, channel_id=None):
+    unit = TeachingUnit.objects.create(code=code, name=f"Unit {code}", teaching_prompt=f"teach {code}", channel_id=channel_id)
+    course = Course.objects.create(code=f"C{code}", name=f"Course {code}", coordinator="Dr X", teaching_prompt=f"course {code}")
+    course.teaching_units.add(unit)
+    topic = Topic.objects.create(teaching_unit=unit, name=f"Topic {code}", teaching_prompt=f"topic {code}")
+    Subtopic.objects.create(topic=topic, name=f"Sub {code}", teaching_prompt=f"sub {code}")
+    LearningObjective.objects.create(topic=topic, description=f"objective {code}")
+    return unit
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as ctx:
+        func()
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_bundle_renders_all_sections():
+    make_unit("MTH1", channel_id="C100")
+    make_unit("PHY1")
+
+    bundle = build_prompt_bundle("C100")
+    assert bundle.teaching_prompt == "- **Teaching Unit (Unit PHY1):** teach PHY1"
+    assert bundle.related_prompts.splitlines() == [
+        "- **Course: Course PHY1**: course PHY1",
+        "- **Topic: Topic PHY1**: topic PHY1",
+        "  - **Subtopic: Sub PHY1**: sub PHY1",
+    ]
+    assert bundle.learning_objectives == "  - **Learning Objective:** objective PHY1"
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_units():
+    make_unit("AAA1")
+    build_prompt_bundle(None)  # warm the search index probe
+    one_unit = count_queries(lambda: build_prompt_bundle(None))
+
+    for i in range(5):
+        make_unit(f"BBB{i}")
+    many_units = count_queries(lambda: build_prompt_bundle(None))
+
+    assert one_unit == many_units
+    assert len(build_prompt_bundle(None).learning_objectives.splitlines()) == 6
+
+
+@pytest.mark.django_db
+def test_cache_is_invalidated_by_model_changes():
+    cache = PromptBundleCache(ttl=60)
+    prompt_cache.invalidate()
+    unit = make_unit("CHM1")
+
+    first = cache.get(None)
+    assert count_queries(lambda: cache.get(None)) == 0
+
+    cache.invalidate()
+    LearningObjective.objects.filter(topic__teaching_unit=unit).delete()
+    assert cache.get(None).learning_objectives == NO_LEARNING_OBJECTIVES
+    assert cache.get(None) is not first
+
+    prompt_cache.get(None)
+    Topic.objects.create(teaching_unit=unit, name="New", teaching_prompt="fresh")
+    assert "fresh" in prompt_cache.get(None).related_prompts